@@ -0,0 +1,67 @@
+"""Add daily_sentiment_rollup + stats_rollup_state
+
+Revision ID: 20261016_sentiment_rollup
+Revises: 20260122_4_economic_tables
+Create Date: 2026-10-16
+
+Bảng tổng hợp số bài theo ngày × topic × domain × category × sentiment × emotion,
+cập nhật tăng dần khi ingest (watermark trong stats_rollup_state). Trend report,
+website stats, social stats đọc từ đây thay vì quét sentiment_analysis.
+
+Dữ liệu được dựng lần đầu bởi SentimentRollupService (lần gọi đầu tiên khi chưa
+có watermark), không cần backfill trong migration.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261016_sentiment_rollup'
+down_revision: Union[str, None] = '20260122_4_economic_tables'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create daily_sentiment_rollup and stats_rollup_state"""
+    op.create_table(
+        'daily_sentiment_rollup',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.Float(), nullable=True),
+        sa.Column('updated_at', sa.Float(), nullable=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('topic_id', sa.Integer(), nullable=True),
+        sa.Column('topic_name', sa.String(length=512), nullable=True),
+        sa.Column('source_domain', sa.String(length=256), nullable=True),
+        sa.Column('category', sa.String(length=256), nullable=True),
+        sa.Column('sentiment_group', sa.String(length=20), nullable=False),
+        sa.Column('emotion', sa.String(length=30), nullable=False),
+        sa.Column('article_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('source_url', sa.String(length=2048), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_daily_sentiment_rollup_day', 'daily_sentiment_rollup', ['day'])
+    op.create_index('idx_rollup_day_domain', 'daily_sentiment_rollup', ['day', 'source_domain'])
+    op.create_index('idx_rollup_day_topic', 'daily_sentiment_rollup', ['day', 'topic_id'])
+
+    op.create_table(
+        'stats_rollup_state',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.Float(), nullable=True),
+        sa.Column('updated_at', sa.Float(), nullable=True),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Drop rollup tables"""
+    op.drop_table('stats_rollup_state')
+    op.drop_index('idx_rollup_day_topic', table_name='daily_sentiment_rollup')
+    op.drop_index('idx_rollup_day_domain', table_name='daily_sentiment_rollup')
+    op.drop_index('ix_daily_sentiment_rollup_day', table_name='daily_sentiment_rollup')
+    op.drop_table('daily_sentiment_rollup')
@@ -0,0 +1,55 @@
+"""Add composite/covering indexes for statistics & trend report queries
+
+Revision ID: 20261016_sentiment_report_idx
+Revises: 20261016_stats_upsert_keys
+Create Date: 2026-10-16
+
+Các query báo cáo lọc sentiment_analysis theo khoảng nửa mở
+`published_date >= start AND published_date < end + 1 ngày` (không còn
+func.date(published_date)), nên dùng được index ghép:
+  - idx_sentiment_published_covering: (published_date, topic_id, sentiment_group, emotion, source_domain)
+    trend report, hot topics, topic mention stats, dựng lại rollup theo kỳ (index-only scan)
+  - idx_sentiment_topic_published: (topic_id, published_date, sentiment_group, emotion)
+    query theo từng topic trong kỳ (số bài kỳ trước, emotion breakdown)
+  - idx_sentiment_analyzed_topic: (analyzed_at, topic_id, sentiment_group, emotion)
+    trend alerts (spike / crisis) theo analyzed_at
+
+Trên Postgres index được tạo CONCURRENTLY (không khoá ghi bảng đang ingest).
+Kiểm tra plan: scripts/check_report_query_plans.py
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261016_sentiment_report_idx'
+down_revision: Union[str, None] = '20261016_stats_upsert_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REPORT_INDEXES = {
+    'idx_sentiment_published_covering': ['published_date', 'topic_id', 'sentiment_group', 'emotion', 'source_domain'],
+    'idx_sentiment_topic_published': ['topic_id', 'published_date', 'sentiment_group', 'emotion'],
+    'idx_sentiment_analyzed_topic': ['analyzed_at', 'topic_id', 'sentiment_group', 'emotion'],
+}
+
+
+def upgrade() -> None:
+    """Create report indexes on sentiment_analysis"""
+    with op.get_context().autocommit_block():
+        for name, columns in REPORT_INDEXES.items():
+            op.create_index(
+                name, 'sentiment_analysis', columns,
+                if_not_exists=True, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Drop report indexes"""
+    with op.get_context().autocommit_block():
+        for name in REPORT_INDEXES:
+            op.drop_index(
+                name, table_name='sentiment_analysis',
+                if_exists=True, postgresql_concurrently=True
+            )
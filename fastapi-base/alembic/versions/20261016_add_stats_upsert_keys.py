@@ -0,0 +1,50 @@
+"""Add unique upsert keys for website/social activity stats
+
+Revision ID: 20261016_stats_upsert_keys
+Revises: 20261016_sentiment_rollup
+Create Date: 2026-10-16
+
+calculate_website_stats / calculate_social_stats ghi bằng một
+INSERT ... ON CONFLICT DO UPDATE mỗi batch, cần unique index làm conflict target:
+  - website_activity_stats: (period_type, period_start, domain, coalesce(topic_id))
+  - social_activity_stats: (period_type, period_start, platform, account_name, coalesce(topic_id))
+topic_id NULL (dòng tổng hợp) được coalesce về -2147483648 (NULL_TOPIC_KEY).
+
+Các dòng trùng khoá do cách ghi cũ (SELECT rồi INSERT từng dòng) được xoá,
+giữ dòng mới nhất.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261016_stats_upsert_keys'
+down_revision: Union[str, None] = '20261016_sentiment_rollup'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NULL_TOPIC_KEY = 'coalesce(topic_id, -2147483648)'
+
+UPSERT_KEYS = {
+    'website_activity_stats': ('uq_website_stats_period_domain_topic', ['period_type', 'period_start', 'domain']),
+    'social_activity_stats': ('uq_social_stats_period_account_topic', ['period_type', 'period_start', 'platform', 'account_name']),
+}
+
+
+def upgrade() -> None:
+    """Deduplicate stats rows and create unique upsert indexes"""
+    for table, (index_name, columns) in UPSERT_KEYS.items():
+        key = ", ".join(columns + [NULL_TOPIC_KEY])
+        op.execute(f"""
+            DELETE FROM {table}
+            WHERE id NOT IN (SELECT max(id) FROM {table} GROUP BY {key})
+        """)
+        op.create_index(index_name, table, columns + [sa.text(NULL_TOPIC_KEY)], unique=True)
+
+
+def downgrade() -> None:
+    """Drop unique upsert indexes"""
+    for table, (index_name, _) in UPSERT_KEYS.items():
+        op.drop_index(index_name, table_name=table)
@@ -210,7 +210,7 @@ async def update_all_superset_tables(
             results['trend_reports'] = 'updated'
             
             # Keyword stats
-            stats_service.calculate_keyword_stats("weekly")
+            stats_service.calculate_keyword_stats("weekly", incremental=True)
             db.commit()
             results['keyword_stats'] = 'updated'
             
@@ -12,9 +12,14 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+import asyncio
+import httpx
+import queue
 import requests
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 from app.core.database import get_db
@@ -48,6 +53,19 @@ class SyncTriggerRequest(BaseModel):
     auth_token: Optional[str] = None
     auth_type: Optional[str] = Field(None, description="bearer, basic, api_key")
     query_params: Optional[Dict[str, Any]] = None
+    pipelined: bool = Field(default=True, description="Fetch/transform/write song song (False = tuan tu tung page)")
+    prefetch_pages: int = Field(default=4, ge=1, le=32, description="So page fetch dong thoi")
+    transform_workers: int = Field(default=2, ge=1, le=16)
+    write_batch_size: int = Field(default=200, ge=1, le=2000, description="So docs moi lan bulk insert")
+
+
+class StageStats(BaseModel):
+    """Throughput cua mot stage trong pipeline"""
+    items: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0
+    rate_per_second: Optional[float] = None
+    queue_depth: Optional[int] = None
 
 
 class SyncStatusResponse(BaseModel):
@@ -62,6 +80,8 @@ class SyncStatusResponse(BaseModel):
     error: Optional[str] = None
     elapsed_seconds: Optional[float] = None
     rate_per_second: Optional[float] = None
+    mode: Optional[str] = None
+    stages: Optional[Dict[str, StageStats]] = None
 
 
 # ============================================
@@ -75,7 +95,7 @@ _sync_state: SyncStatusResponse = SyncStatusResponse(status=SyncStatus.IDLE)
 # HELPER FUNCTIONS
 # ============================================
 
-def fetch_from_source_api(
+def _build_source_request(
     source_api_base: str,
     endpoint: str,
     limit: Optional[int] = None,
@@ -84,23 +104,41 @@ def fetch_from_source_api(
     headers: Optional[Dict] = None,
     auth_token: Optional[str] = None,
     auth_type: Optional[str] = None
-) -> Dict[str, Any]:
-    """Lay data tu API nguon"""
+):
+    """(url, query params, headers) cho mot page cua API nguon"""
     url = f"{source_api_base}{endpoint}"
     
-    query_params = params or {}
+    query_params = dict(params or {})
     if limit:
         query_params['limit'] = limit
     if offset:
         query_params['offset'] = offset
     
-    req_headers = headers or {}
+    req_headers = dict(headers or {})
     if auth_token:
         if auth_type == "bearer":
             req_headers['Authorization'] = f"Bearer {auth_token}"
         elif auth_type == "api_key":
             req_headers['X-API-Key'] = auth_token
     
+    return url, query_params, req_headers
+
+
+def fetch_from_source_api(
+    source_api_base: str,
+    endpoint: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    params: Optional[Dict] = None,
+    headers: Optional[Dict] = None,
+    auth_token: Optional[str] = None,
+    auth_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """Lay data tu API nguon"""
+    url, query_params, req_headers = _build_source_request(
+        source_api_base, endpoint, limit, offset, params, headers, auth_token, auth_type
+    )
+    
     logger.info(f"Fetching from {url}")
     
     max_retries = 3
@@ -118,6 +156,33 @@ def fetch_from_source_api(
                 raise
 
 
+async def fetch_from_source_api_async(client: httpx.AsyncClient, url: str, params: Dict, headers: Dict) -> Any:
+    """Ban async cua fetch_from_source_api (dung chung connection pool cua client)"""
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            response = await client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            if attempt < max_retries - 1:
+                logger.warning(f"Fetch attempt {attempt + 1} failed ({params.get('offset', 0)}): {e}, retrying...")
+                await asyncio.sleep(2 ** attempt)
+            else:
+                logger.error(f"All fetch attempts failed: {e}")
+                raise
+
+
+def parse_source_page(data: Any, fetch_limit: int):
+    """Response API nguon -> (raw_docs, has_more)"""
+    if isinstance(data, dict):
+        raw_docs = data.get('data', data.get('items', data.get('results', [])))
+        return raw_docs, data.get('has_more', False)
+    if isinstance(data, list):
+        return data, len(data) == fetch_limit
+    return [], False
+
+
 def transform_document(raw_doc: Dict[str, Any]) -> Dict[str, Any]:
     """Transform document tu API nguon sang format chuan"""
     content = (
@@ -204,148 +269,16 @@ def send_to_ingest_api(
     skip_duplicates: bool = True,
     analyze_sentiment: bool = True
 ) -> Dict[str, Any]:
-    """Gui documents toi API /ingest"""
-    from app.models import Article, SentimentAnalysis
-    from app.services.sentiment import get_sentiment_analyzer
-    from app.services.classification import get_category_classifier
-    from app.services.etl.data_normalizer import normalize_and_validate
-    from app.core.database import SessionLocal
-    from app.utils.domain_utils import ensure_domain
-    
-    saved = 0
-    skipped = 0
-    sentiment_saved = 0
-    
-    analyzer = get_sentiment_analyzer() if analyze_sentiment else None
-    classifier = get_category_classifier()
-    
-    db = SessionLocal()
-    
-    try:
-        for doc in documents:
-            try:
-                normalized, is_valid, errors, warnings = normalize_and_validate(doc)
-                if not is_valid:
-                    skipped += 1
-                    continue
-                
-                if skip_duplicates:
-                    existing = db.query(Article).filter(Article.url == normalized['url']).first()
-                    if existing:
-                        skipped += 1
-                        continue
-                
-                metadata = normalized['metadata']
-                published_date = None
-                published_datetime = None
-                published_str = metadata.get("published")
-                if published_str:
-                    try:
-                        if isinstance(published_str, (int, float)):
-                            published_date = float(published_str)
-                            published_datetime = datetime.fromtimestamp(published_date)
-                        else:
-                            published_datetime = datetime.fromisoformat(str(published_str).replace('Z', '+00:00'))
-                            published_date = published_datetime.timestamp()
-                    except:
-                        pass
-                
-                classification = classifier.classify(normalized['content'], metadata.get("title"))
-                final_category = metadata.get("category") or classification.category
-                
-                engagement = metadata.get("engagement", {})
-                likes = engagement.get("likes", 0)
-                shares = engagement.get("shares", 0)
-                comments = engagement.get("comments", 0)
-                views = engagement.get("views", 0)
-                
-                engagement_rate = None
-                if views > 0:
-                    engagement_rate = (likes + shares + comments) / views
-                
-                social = metadata.get("social_account", {})
-                location = metadata.get("location", {})
-                
-                # Ensure domain is filled
-                article_data = {
-                    'url': normalized['url'],
-                    'source': normalized['url'],
-                    'domain': normalized['domain'],
-                    'social_platform': normalized['platform'],
-                    'account_name': social.get("account_name")
-                }
-                article_data = ensure_domain(article_data)
-                
-                article = Article(
-                    url=article_data['url'],
-                    source_type=normalized['source_type'],
-                    source=article_data['source'],
-                    domain=article_data['domain'],
-                    title=metadata.get("title"),
-                    content=normalized['content'],
-                    summary=metadata.get("description"),
-                    author=metadata.get("author"),
-                    published_date=published_date,
-                    category=final_category,
-                    tags=metadata.get("tags"),
-                    images=metadata.get("images"),
-                    likes_count=likes,
-                    shares_count=shares,
-                    comments_count=comments,
-                    views_count=views,
-                    engagement_rate=engagement_rate,
-                    social_platform=normalized['platform'],
-                    account_name=social.get("account_name"),
-                    province=location.get("province"),
-                    is_cleaned=True,
-                    raw_metadata=metadata
-                )
-                
-                db.add(article)
-                db.flush()
-                saved += 1
-                
-                if analyzer:
-                    result = analyzer.analyze(normalized['content'])
-                    sentiment_record = SentimentAnalysis(
-                        article_id=article.id,
-                        source_url=normalized['url'],
-                        source_domain=normalized['domain'],
-                        title=metadata.get("title"),
-                        emotion=result.emotion,
-                        emotion_vi=result.emotion_vi,
-                        emotion_icon=result.icon,
-                        sentiment_group=result.group,
-                        sentiment_group_vi=result.group_vi,
-                        confidence=result.confidence,
-                        emotion_scores=result.all_scores,
-                        category=final_category,
-                        published_date=published_datetime,
-                        content_snippet=normalized['content'][:200]
-                    )
-                    db.add(sentiment_record)
-                    sentiment_saved += 1
-            
-            except Exception as e:
-                logger.error(f"Error processing document: {e}", exc_info=True)
-                skipped += 1
-        
-        try:
-            db.commit()
-            logger.info(f"Batch committed: {saved} saved, {skipped} skipped")
-        except Exception as e:
-            logger.error(f"Failed to commit batch: {e}", exc_info=True)
-            db.rollback()
-            raise
-        
-    finally:
-        db.close()
+    """Ghi documents qua IngestService (cùng pipeline với /ingest, batch insert)"""
+    from app.services.etl.ingest_service import get_ingest_service
     
-    return {
-        "saved": saved,
-        "skipped": skipped,
-        "sentiment_analyzed": sentiment_saved
-    }
+    result = get_ingest_service().ingest(
+        documents,
+        skip_duplicates=skip_duplicates,
+        analyze_sentiment=analyze_sentiment
+    )
+    logger.info(f"Batch committed: {result['saved']} saved, {result['skipped']} skipped")
+    return result
 
 
 def run_sync_task(
@@ -358,15 +291,37 @@ def run_sync_task(
     headers: Optional[Dict] = None,
     auth_token: Optional[str] = None,
     auth_type: Optional[str] = None,
-    query_params: Optional[Dict] = None
+    query_params: Optional[Dict] = None,
+    pipelined: bool = False,
+    prefetch_pages: int = 4,
+    transform_workers: int = 2,
+    write_batch_size: int = 200
 ):
     """Background task de chay sync"""
     global _sync_state
     
+    if pipelined:
+        return run_sync_pipeline(
+            source_api_base=source_api_base,
+            endpoint=endpoint,
+            limit=limit,
+            batch_size=batch_size,
+            skip_duplicates=skip_duplicates,
+            analyze_sentiment=analyze_sentiment,
+            headers=headers,
+            auth_token=auth_token,
+            auth_type=auth_type,
+            query_params=query_params,
+            prefetch_pages=prefetch_pages,
+            transform_workers=transform_workers,
+            write_batch_size=write_batch_size
+        )
+    
     _sync_state = SyncStatusResponse(
         status=SyncStatus.RUNNING,
         source_api=source_api_base,
-        started_at=datetime.now()
+        started_at=datetime.now(),
+        mode="sequential"
     )
     
     try:
@@ -401,14 +356,7 @@ def run_sync_task(
                 logger.error(f"Failed to fetch: {e}")
                 raise
             
-            if isinstance(data, dict):
-                raw_docs = data.get('data', data.get('items', data.get('results', [])))
-                has_more = data.get('has_more', False)
-            elif isinstance(data, list):
-                raw_docs = data
-                has_more = len(raw_docs) == fetch_limit
-            else:
-                break
+            raw_docs, has_more = parse_source_page(data, fetch_limit)
             
             if not raw_docs:
                 break
@@ -459,6 +407,257 @@ def run_sync_task(
         _sync_state.completed_at = datetime.now()
 
 
+_STOP = object()
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Blocking put (backpressure), bo cuoc khi pipeline bi dung"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    """Blocking get, tra ve _STOP khi pipeline bi dung"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _STOP
+
+
+def run_sync_pipeline(
+    source_api_base: str,
+    endpoint: str,
+    limit: Optional[int],
+    batch_size: int,
+    skip_duplicates: bool,
+    analyze_sentiment: bool,
+    headers: Optional[Dict] = None,
+    auth_token: Optional[str] = None,
+    auth_type: Optional[str] = None,
+    query_params: Optional[Dict] = None,
+    prefetch_pages: int = 4,
+    transform_workers: int = 2,
+    write_batch_size: int = 200
+):
+    """
+    Sync dang pipeline: fetch -> transform -> write chay chong len nhau
+    
+    - fetch: event loop rieng, httpx.AsyncClient (pooled), toi da prefetch_pages page dong thoi
+    - transform: transform_workers threads (transform_document + normalize/classify)
+    - write: thread hien tai, gom write_batch_size docs / bulk insert
+    
+    Cac stage noi bang queue co gioi han (2 * prefetch_pages) -> writer cham thi
+    fetch tu dung lai. Throughput tung stage nam trong _sync_state.stages.
+    """
+    global _sync_state
+    from app.core.database import SessionLocal
+    from app.services.etl.ingest_service import get_ingest_service
+    from app.services.sentiment import get_sentiment_analyzer
+    from app.services.classification import get_category_classifier
+    
+    stages = {"fetch": StageStats(), "transform": StageStats(), "write": StageStats()}
+    state = SyncStatusResponse(
+        status=SyncStatus.RUNNING,
+        source_api=source_api_base,
+        started_at=datetime.now(),
+        mode="pipelined",
+        stages=stages
+    )
+    _sync_state = state
+    
+    queue_size = prefetch_pages * 2
+    raw_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    doc_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    stats_lock = threading.Lock()
+    failures: List[str] = []
+    start_time = time.time()
+    
+    service = get_ingest_service()
+    classifier = get_category_classifier()
+    analyzer = get_sentiment_analyzer() if analyze_sentiment else None
+    
+    def record(stage: str, items: int, busy: float):
+        with stats_lock:
+            stats = stages[stage]
+            stats.items += items
+            stats.batches += 1
+            stats.busy_seconds = round(stats.busy_seconds + busy, 3)
+    
+    def refresh():
+        elapsed = time.time() - start_time
+        state.elapsed_seconds = elapsed
+        state.rate_per_second = state.total_fetched / elapsed if elapsed > 0 else 0
+        for stats in stages.values():
+            stats.rate_per_second = stats.items / elapsed if elapsed > 0 else 0
+        stages["transform"].queue_depth = raw_queue.qsize()
+        stages["write"].queue_depth = doc_queue.qsize()
+    
+    # ---------- fetch ----------
+    async def fetch_pages():
+        limits = httpx.Limits(max_connections=prefetch_pages, max_keepalive_connections=prefetch_pages)
+        async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+            
+            async def fetch_page(offset: int):
+                fetch_limit = min(batch_size, limit - offset) if limit else batch_size
+                url, params, req_headers = _build_source_request(
+                    source_api_base, endpoint, fetch_limit, offset, query_params, headers, auth_token, auth_type
+                )
+                started = time.perf_counter()
+                data = await fetch_from_source_api_async(client, url, params, req_headers)
+                raw_docs, has_more = parse_source_page(data, fetch_limit)
+                return offset, raw_docs, has_more, time.perf_counter() - started
+            
+            next_offset = 0
+            page_step = batch_size
+            end_offset = None  # biet khi co page bao het data
+            in_flight_max = 1  # page dau tien fetch mot minh: biet API co phan trang + page size thuc te
+            pending = set()
+            try:
+                while True:
+                    while (
+                        not stop.is_set() and end_offset is None and len(pending) < in_flight_max
+                        and (not limit or next_offset < limit)
+                    ):
+                        pending.add(asyncio.create_task(fetch_page(next_offset)))
+                        next_offset += page_step
+                    if not pending:
+                        break
+                    
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        offset, raw_docs, has_more, busy = task.result()
+                        if end_offset is not None and offset >= end_offset:
+                            continue
+                        if not raw_docs or not has_more:
+                            page_end = offset + len(raw_docs)
+                            end_offset = page_end if end_offset is None else min(end_offset, page_end)
+                        if not raw_docs:
+                            continue
+                        if in_flight_max == 1:
+                            # API co the tra it hon limit (gioi han phia server) -> buoc offset theo page thuc te
+                            page_step = len(raw_docs)
+                            next_offset = offset + page_step
+                        
+                        record("fetch", len(raw_docs), busy)
+                        with stats_lock:
+                            state.total_fetched += len(raw_docs)
+                        if not await asyncio.to_thread(_put, raw_queue, raw_docs, stop):
+                            return
+                    in_flight_max = prefetch_pages
+            finally:
+                for task in pending:
+                    task.cancel()
+    
+    def fetch_stage():
+        try:
+            asyncio.run(fetch_pages())
+        except Exception as e:
+            logger.error(f"Sync fetch failed: {e}", exc_info=True)
+            failures.append(f"fetch: {e}")
+            stop.set()
+        finally:
+            for _ in range(transform_workers):
+                _put(raw_queue, _STOP, stop)
+    
+    # ---------- transform ----------
+    def transform_stage():
+        try:
+            while True:
+                raw_docs = _get(raw_queue, stop)
+                if raw_docs is _STOP:
+                    break
+                
+                started = time.perf_counter()
+                docs = []
+                for raw_doc in raw_docs:
+                    try:
+                        docs.append(transform_document(raw_doc))
+                    except Exception as e:
+                        logger.warning(f"Transform failed: {e}")
+                prepared, skipped, _ = service.prepare_documents(docs, classifier)
+                record("transform", len(raw_docs), time.perf_counter() - started)
+                
+                if not _put(doc_queue, (prepared, skipped + len(raw_docs) - len(docs)), stop):
+                    break
+        except Exception as e:
+            logger.error(f"Sync transform failed: {e}", exc_info=True)
+            failures.append(f"transform: {e}")
+            stop.set()
+        finally:
+            _put(doc_queue, _STOP, stop)
+    
+    # ---------- write ----------
+    result = {"saved": 0, "skipped": 0, "sentiment_analyzed": 0, "errors": []}
+    buffer: List[Dict] = []
+    
+    def flush(db):
+        started = time.perf_counter()
+        service.write_prepared(db, buffer, skip_duplicates, analyzer, result)
+        record("write", len(buffer), time.perf_counter() - started)
+        buffer.clear()
+        result["errors"].clear()
+        state.total_saved = result["saved"]
+        state.total_skipped = result["skipped"]
+        state.total_sentiment = result["sentiment_analyzed"]
+    
+    fetch_thread = threading.Thread(target=fetch_stage, name="sync-fetch", daemon=True)
+    fetch_thread.start()
+    executor = ThreadPoolExecutor(max_workers=transform_workers, thread_name_prefix="sync-transform")
+    for _ in range(transform_workers):
+        executor.submit(transform_stage)
+    
+    db = SessionLocal()
+    try:
+        finished_workers = 0
+        while finished_workers < transform_workers:
+            item = _get(doc_queue, stop)
+            if item is _STOP:
+                if stop.is_set():
+                    break
+                finished_workers += 1
+                continue
+            
+            prepared, skipped = item
+            result["skipped"] += skipped
+            buffer.extend(prepared)
+            if len(buffer) >= write_batch_size:
+                flush(db)
+            refresh()
+        
+        if buffer:
+            flush(db)
+    except Exception as e:
+        logger.error(f"Sync write failed: {e}", exc_info=True)
+        failures.append(f"write: {e}")
+    finally:
+        stop.set()
+        db.close()
+        fetch_thread.join()
+        executor.shutdown(wait=True)
+    
+    state.total_skipped = result["skipped"]
+    refresh()
+    state.completed_at = datetime.now()
+    if failures:
+        state.status = SyncStatus.FAILED
+        state.error = "; ".join(failures)
+        logger.error(f"Sync failed: {state.error}")
+    else:
+        state.status = SyncStatus.COMPLETED
+        logger.info(
+            f"Sync completed (pipelined): fetched={state.total_fetched}, saved={state.total_saved}, "
+            + ", ".join(f"{name}={stats.rate_per_second:.1f}/s" for name, stats in stages.items())
+        )
+
+
 # ============================================
 # API ENDPOINTS (3 endpoints)
 # ============================================
@@ -504,13 +703,18 @@ async def trigger_sync(
         headers=request.headers,
         auth_token=request.auth_token,
         auth_type=request.auth_type,
-        query_params=request.query_params
+        query_params=request.query_params,
+        pipelined=request.pipelined,
+        prefetch_pages=request.prefetch_pages,
+        transform_workers=request.transform_workers,
+        write_batch_size=request.write_batch_size
     )
     
     return SyncStatusResponse(
         status=SyncStatus.RUNNING,
         source_api=request.source_api_base,
-        started_at=datetime.now()
+        started_at=datetime.now(),
+        mode="pipelined" if request.pipelined else "sequential"
     )
 
 
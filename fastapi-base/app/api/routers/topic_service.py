@@ -11,10 +11,10 @@ from app.core.database import get_db
 from app.models.model_article import Article
 from app.models.model_sentiment import SentimentAnalysis
 from app.services.topic.model import TopicModel
-from app.services.sentiment.sentiment_service import get_sentiment_analyzer
-from app.services.classification import get_category_classifier
-from app.utils.domain_utils import ensure_domain
+from app.services.etl.ingest_service import get_ingest_service, IngestJobStatus
+import asyncio
 import logging
+import queue
 import threading
 
 logger = logging.getLogger(__name__)
@@ -52,190 +52,56 @@ class TrainRequest(BaseModel):
 
 
 @router.post("/ingest")
-async def ingest_documents(request: IngestRequest, db: Session = Depends(get_db)):
-    """Ingest documents with sentiment analysis and auto-update statistics"""
-    try:
-        saved = 0
-        skipped = 0
-        sentiment_saved = 0
-        errors = []
-        
-        analyzer = get_sentiment_analyzer() if request.analyze_sentiment else None
-        classifier = get_category_classifier()
-        
-        from app.services.etl.data_normalizer import normalize_and_validate
-        
-        for doc in request.documents:
-            try:
-                doc_dict = {
-                    "source": doc.source,
-                    "source_id": doc.source_id,
-                    "content": doc.content,
-                    "metadata": doc.metadata or {}
-                }
-                
-                normalized, is_valid, norm_errors, warnings = normalize_and_validate(doc_dict)
-                
-                if not is_valid:
-                    errors.append({"url": doc.source_id, "errors": norm_errors})
-                    skipped += 1
-                    continue
-                
-                if request.skip_duplicates:
-                    existing = db.query(Article).filter(Article.url == normalized['url']).first()
-                    if existing:
-                        skipped += 1
-                        continue
-                
-                metadata = normalized['metadata']
-                
-                published_date = None
-                published_datetime = None
-                published_str = metadata.get("published")
-                if published_str:
-                    try:
-                        if isinstance(published_str, (int, float)):
-                            published_date = float(published_str)
-                            published_datetime = datetime.fromtimestamp(published_date)
-                        else:
-                            published_datetime = datetime.fromisoformat(str(published_str).replace('Z', '+00:00'))
-                            published_date = published_datetime.timestamp()
-                    except:
-                        pass
-                
-                classification = classifier.classify(normalized['content'], metadata.get("title"))
-                final_category = metadata.get("category") or classification.category
-                
-                engagement = metadata.get("engagement", {})
-                reactions = engagement.get("reactions", {})
-                likes = engagement.get("likes", 0)
-                shares = engagement.get("shares", 0)
-                comments = engagement.get("comments", 0)
-                views = engagement.get("views", 0)
-                engagement_rate = (likes + shares + comments) / views if views > 0 else None
-                
-                social = metadata.get("social_account", {})
-                location = metadata.get("location", {})
-                
-                # Ensure domain is filled
-                article_data = ensure_domain({
-                    'url': normalized['url'],
-                    'source': normalized['url'],
-                    'domain': normalized['domain'],
-                    'social_platform': normalized['platform'],
-                    'account_name': social.get("account_name")
-                })
-                
-                article = Article(
-                    url=article_data['url'],
-                    source_type=normalized['source_type'],
-                    source=article_data['source'],
-                    domain=article_data['domain'],
-                    title=metadata.get("title"),
-                    content=normalized['content'],
-                    summary=metadata.get("description"),
-                    author=metadata.get("author"),
-                    published_date=published_date,
-                    category=final_category,
-                    tags=metadata.get("tags"),
-                    images=metadata.get("images"),
-                    likes_count=likes,
-                    shares_count=shares,
-                    comments_count=comments,
-                    views_count=views,
-                    reactions=reactions if reactions else None,
-                    engagement_rate=engagement_rate,
-                    social_platform=normalized['platform'],
-                    account_id=social.get("account_id"),
-                    account_name=social.get("account_name"),
-                    account_url=social.get("account_url"),
-                    account_type=social.get("account_type"),
-                    account_followers=social.get("followers"),
-                    post_id=metadata.get("post_id"),
-                    post_type=metadata.get("post_type"),
-                    post_language=metadata.get("language", "vi"),
-                    province=location.get("province"),
-                    district=location.get("district"),
-                    ward=location.get("ward"),
-                    location_text=metadata.get("location_text") or location.get("location_text"),
-                    coordinates=location.get("coordinates"),
-                    is_cleaned=True,
-                    raw_metadata=metadata
-                )
-                
-                db.add(article)
-                db.flush()
-                saved += 1
-                
-                if analyzer:
-                    result = analyzer.analyze(normalized['content'])
-                    sentiment_record = SentimentAnalysis(
-                        article_id=article.id,
-                        source_url=normalized['url'],
-                        source_domain=normalized['domain'],
-                        title=metadata.get("title"),
-                        emotion=result.emotion,
-                        emotion_vi=result.emotion_vi,
-                        emotion_icon=result.icon,
-                        sentiment_group=result.group,
-                        sentiment_group_vi=result.group_vi,
-                        confidence=result.confidence,
-                        emotion_scores=result.all_scores,
-                        category=final_category,
-                        published_date=published_datetime,
-                        content_snippet=normalized['content'][:200] if normalized['content'] else None
-                    )
-                    db.add(sentiment_record)
-                    sentiment_saved += 1
-                
-            except Exception as e:
-                errors.append(f"{doc.source_id}: {str(e)}")
-        
-        db.commit()
-        
-        # Auto-update statistics
-        stats_updated = []
-        if saved > 0:
-            try:
-                from app.services.statistics import get_statistics_service
-                from app.services.trends import get_trend_service
-                
-                stats_service = get_statistics_service(db)
-                trend_service = get_trend_service(db)
-                
-                stats_service.create_daily_snapshot()
-                stats_updated.append("daily_snapshot")
-                
-                if db.query(SentimentAnalysis).count() >= 10:
-                    stats_service.calculate_trend_report("weekly")
-                    stats_service.calculate_hot_topics("weekly")
-                    stats_service.calculate_keyword_stats("weekly")
-                    stats_updated.append("weekly_stats")
-                
-                trend_service.detect_trend_alerts(hours_back=24)
-                trend_service.calculate_hashtag_stats("daily")
-                trend_service.detect_viral_content("daily")
-                trend_service.calculate_category_trends("daily")
-                
-                db.commit()
-            except Exception as e:
-                db.rollback()
-                logger.warning(f"Could not auto-update stats: {e}")
-        
-        return {
-            "status": "success",
-            "saved": saved,
-            "skipped": skipped,
-            "sentiment_analyzed": sentiment_saved,
-            "stats_updated": stats_updated,
-            "errors": errors[:10] if errors else [],
-            "total_in_db": db.query(Article).count()
+async def ingest_documents(request: IngestRequest, wait: bool = False):
+    """
+    Ingest documents with sentiment analysis and auto-update statistics
+
+    Job chạy nền trên worker pool của IngestService (không block event loop):
+    trả về job_id ngay, poll tại GET /ingest/jobs/{job_id}.
+    wait=true: chờ job xong rồi trả kết quả (saved, skipped, ...).
+    """
+    documents = [
+        {
+            "source": doc.source,
+            "source_id": doc.source_id,
+            "content": doc.content,
+            "metadata": doc.metadata or {}
         }
-        
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Ingest error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        for doc in request.documents
+    ]
+
+    try:
+        job = get_ingest_service().submit(
+            documents,
+            skip_duplicates=request.skip_duplicates,
+            analyze_sentiment=request.analyze_sentiment,
+            update_stats=True
+        )
+    except queue.Full:
+        raise HTTPException(status_code=503, detail="Ingest queue is full, retry later")
+
+    if not wait:
+        return {"status": "queued", "job_id": job.job_id, "total": job.total}
+
+    result = await asyncio.wrap_future(job.future)
+    if result["status"] == IngestJobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return {**result, "status": "success"}
+
+
+@router.get("/ingest/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Trạng thái / kết quả của một ingest job"""
+    job = get_ingest_service().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingest job {job_id} not found")
+    return job.to_dict()
+
+
+@router.get("/ingest/queue")
+async def get_ingest_queue():
+    """Tình trạng hàng đợi ingest (queue depth, workers)"""
+    return get_ingest_service().get_queue_stats()
 
 
 @router.post("/train")
@@ -279,6 +145,16 @@ async def train_topics(request: TrainRequest, db: Session = Depends(get_db)):
                 sentiment_record.topic_name = article.topic_name
         
         db.commit()
+        
+        # topic_id/topic_name đổi hàng loạt -> dựng lại rollup thống kê
+        try:
+            from app.services.statistics.rollup_service import get_sentiment_rollup_service
+            get_sentiment_rollup_service(db).rebuild()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not rebuild sentiment rollup: {e}")
+        
         topic_model.save("default_model")
         
         return {
@@ -302,6 +178,7 @@ async def train_topics(request: TrainRequest, db: Session = Depends(get_db)):
 async def hybrid_train(
     request: TrainRequest, 
     force_full: bool = False,
+    incremental: bool = False,
     db: Session = Depends(get_db)
 ):
     """
@@ -309,6 +186,8 @@ async def hybrid_train(
     
     - Auto-detects if full retrain needed (monthly, drift, new data)
     - Uses transform for daily updates
+    - incremental=true: merge new articles into the model (stable topic IDs,
+      new topics for new themes), full retrain only on concept drift
     - Force full training with force_full=true
     
     Example:
@@ -316,6 +195,9 @@ async def hybrid_train(
     # Auto decision
     curl -X POST http://localhost:7777/api/topic-service/hybrid-train
     
+    # Incremental update
+    curl -X POST "http://localhost:7777/api/topic-service/hybrid-train?incremental=true"
+    
     # Force full training
     curl -X POST "http://localhost:7777/api/topic-service/hybrid-train?force_full=true"
     ```
@@ -342,7 +224,8 @@ async def hybrid_train(
             force_full_train=force_full,
             min_topic_size=request.min_topic_size,
             use_vietnamese_tokenizer=request.use_vietnamese_tokenizer,
-            enable_topicgpt=request.enable_topicgpt
+            enable_topicgpt=request.enable_topicgpt,
+            incremental=incremental
         )
         
         return result
@@ -0,0 +1,242 @@
+"""
+LLM Response Cache - Content-addressed, persistent cache for LLM calls
+
+Key = sha256 of the full request (endpoint + model + messages/prompt + generation
+params), so different prompts never collide, the same model name served by
+different providers (OpenAI vs OpenRouter) never shares an entry, and identical
+requests from different services (TopicGPT, TopicGPT V2, field classifiers)
+share one entry.
+
+Storage: SQLite (WAL) - one row per response, written per call (no full-file
+rewrite), with an in-process LRU in front. Entries expire after `ttl_seconds`
+and the table is trimmed to `max_entries` (least recently used first).
+
+Usage:
+    cache = get_llm_cache()
+    text = cache.chat(client, "field_classifier", model="gpt-4o-mini", messages=[...], temperature=0.3)
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path("data") / "cache" / "llm_cache.db"
+
+try:
+    from app.core.metrics import track_llm_cache
+except ImportError:  # metrics deps (prometheus/psutil) not installed, e.g. in scripts
+    track_llm_cache = None
+
+
+def make_cache_key(**request: Any) -> str:
+    """Stable content hash of an LLM request (any JSON-serializable fields)"""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed LLM response cache with LRU front, TTL and size bound"""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        max_entries: int = 200_000,
+        ttl_seconds: Optional[float] = 90 * 24 * 3600,
+        memory_size: int = 2048,
+        evict_every: int = 500
+    ):
+        """
+        Initialize cache
+
+        Args:
+            path: SQLite database file
+            max_entries: Max rows kept on disk (LRU eviction beyond this)
+            ttl_seconds: Entry lifetime (None = never expire)
+            memory_size: Entries kept in the in-process LRU
+            evict_every: Run eviction every N writes
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_size = memory_size
+        self.evict_every = evict_every
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (response, created_at)
+        self._writes_since_evict = 0
+
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                namespace TEXT,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and created_at + self.ttl_seconds < now
+
+    def _remember(self, key: str, response: str, created_at: float):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _track(self, namespace: str, hit: bool):
+        if track_llm_cache is not None:
+            track_llm_cache(namespace, hit)
+
+    def get(self, key: str, namespace: str = "default") -> Optional[str]:
+        """Get cached response (None on miss or expiry)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self._track(namespace, True)
+                return entry[0]
+
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or self._expired(row[1], now):
+                if entry is not None:
+                    self._memory.pop(key, None)
+                self.stats["misses"] += 1
+                self._track(namespace, False)
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, row[0], row[1])
+            self.stats["disk_hits"] += 1
+            self._track(namespace, True)
+            return row[0]
+
+    def set(self, key: str, response: str, namespace: str = "default", model: Optional[str] = None):
+        """Store a response"""
+        if response is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, namespace, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, model, response, now, now)
+            )
+            self._conn.commit()
+            self._remember(key, response, now)
+            self.stats["writes"] += 1
+
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self.evict_every:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired rows, then least recently used rows beyond max_entries"""
+        self._writes_since_evict = 0
+        evicted = 0
+        if self.ttl_seconds is not None:
+            evicted += self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+
+        total = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if total > self.max_entries:
+            evicted += self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (total - self.max_entries,)
+            ).rowcount
+        self._conn.commit()
+
+        if evicted:
+            self.stats["evicted"] += evicted
+            logger.info(f"LLM cache: evicted {evicted} entries")
+
+    def chat(self, client, namespace: str, **request: Any) -> Optional[str]:
+        """
+        Cached OpenAI-compatible chat completion
+
+        Args:
+            client: OpenAI / OpenRouter client (its base_url is part of the key)
+            namespace: Caller name (metrics + bookkeeping only, not part of the key)
+            **request: Arguments of client.chat.completions.create (model, messages, ...)
+
+        Returns:
+            Message content (exceptions from the API are propagated)
+        """
+        endpoint = str(getattr(client, "base_url", "") or "")
+        key = make_cache_key(api="chat.completions", endpoint=endpoint, **request)
+        cached = self.get(key, namespace)
+        if cached is not None:
+            return cached
+
+        response = client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        self.set(key, content, namespace=namespace, model=request.get("model"))
+        return content
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Delete all entries (or only those written by one namespace)"""
+        with self._lock:
+            if namespace is None:
+                deleted = self._conn.execute("DELETE FROM llm_cache").rowcount
+                self._memory.clear()
+            else:
+                keys = [r[0] for r in self._conn.execute(
+                    "SELECT key FROM llm_cache WHERE namespace = ?", (namespace,)
+                )]
+                deleted = self._conn.execute(
+                    "DELETE FROM llm_cache WHERE namespace = ?", (namespace,)
+                ).rowcount
+                for key in keys:
+                    self._memory.pop(key, None)
+            self._conn.commit()
+        return deleted
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "memory_entries": len(self._memory),
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global instances (one per database file)
+_llm_caches: Dict[str, LLMCache] = {}
+
+def get_llm_cache(path: Optional[Path] = None) -> LLMCache:
+    """Get or create shared LLM cache"""
+    path = Path(path) if path else DEFAULT_CACHE_PATH
+    key = str(path.resolve())
+    if key not in _llm_caches:
+        _llm_caches[key] = LLMCache(path)
+    return _llm_caches[key]
@@ -44,6 +44,12 @@ ARTICLES_PROCESSED = Counter(
     'Total articles processed'
 )
 
+LLM_CACHE_LOOKUPS = Counter(
+    'llm_cache_lookups_total',
+    'LLM response cache lookups',
+    ['namespace', 'result']  # hit, miss
+)
+
 DATABASE_CONNECTIONS = Gauge(
     'database_connections_active',
     'Active database connections'
@@ -150,3 +156,8 @@ def track_articles(count: int):
 def set_db_connections(count: int):
     """Update active database connection count"""
     DATABASE_CONNECTIONS.set(count)
+
+
+def track_llm_cache(namespace: str, hit: bool):
+    """Track LLM response cache hit/miss"""
+    LLM_CACHE_LOOKUPS.labels(namespace=namespace, result='hit' if hit else 'miss').inc()
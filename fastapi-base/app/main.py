@@ -164,5 +164,15 @@ app = get_application()
 # Setup Prometheus metrics
 setup_metrics(app)
 
+
+@app.on_event("startup")
+def load_fingerprint_store():
+    """Load the persistent ETL dedupe index once at startup"""
+    try:
+        from app.services.etl.fingerprint_store import get_fingerprint_store
+        get_fingerprint_store()
+    except Exception as e:
+        logging.warning(f"Could not load fingerprint store: {e}")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001, reload=settings.DEBUG)
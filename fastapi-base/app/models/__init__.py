@@ -20,7 +20,9 @@ from app.models.model_statistics import (
     TopicMentionStats,
     WebsiteActivityStats,
     SocialActivityStats,
-    DailySnapshot
+    DailySnapshot,
+    DailySentimentRollup,
+    StatsRollupState
 )
 from app.models.model_trends import (
     TrendAlert,
@@ -3,7 +3,7 @@ Sentiment Analysis Model
 Bảng lưu kết quả phân tích cảm xúc - dùng cho Superset dashboard
 Hỗ trợ 15 sắc thái cảm xúc chi tiết
 """
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from app.models.model_base import BareBaseModel
 
@@ -55,3 +55,13 @@ class SentimentAnalysis(BareBaseModel):
     
     # Content snippet để preview
     content_snippet = Column(Text)  # 200 chars đầu
+    
+    # Index ghép cho các query báo cáo (lọc published_date/analyzed_at theo khoảng nửa mở)
+    __table_args__ = (
+        # Trend / hot topics / topic mention / rollup: khoảng thời gian + GROUP BY topic, sentiment, emotion, domain
+        Index('idx_sentiment_published_covering', 'published_date', 'topic_id', 'sentiment_group', 'emotion', 'source_domain'),
+        # Query theo từng topic trong kỳ (kỳ trước, emotion breakdown)
+        Index('idx_sentiment_topic_published', 'topic_id', 'published_date', 'sentiment_group', 'emotion'),
+        # Trend alerts (spike / crisis) theo analyzed_at
+        Index('idx_sentiment_analyzed_topic', 'analyzed_at', 'topic_id', 'sentiment_group', 'emotion'),
+    )
@@ -2,8 +2,8 @@
 Statistics Models - Các bảng thống kê cho Superset Dashboard
 Tự động tính toán và cập nhật từ data đã làm sạch
 """
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Date, JSON, Boolean
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Date, JSON, Boolean, Index
+from sqlalchemy.sql import func, literal_column
 from app.models.model_base import BareBaseModel
 
 
@@ -223,6 +223,18 @@ class WebsiteActivityStats(BareBaseModel):
     created_at = Column(DateTime, server_default=func.now())
 
 
+# Khoá upsert (ON CONFLICT) của website/social stats: topic_id NULL (tổng hợp) được coalesce
+# về một giá trị không phải topic thật (-1 = outlier của BERTopic) để các dòng NULL trùng nhau
+NULL_TOPIC_KEY = literal_column('-2147483648')
+
+Index(
+    'uq_website_stats_period_domain_topic',
+    WebsiteActivityStats.period_type, WebsiteActivityStats.period_start, WebsiteActivityStats.domain,
+    func.coalesce(WebsiteActivityStats.topic_id, NULL_TOPIC_KEY),
+    unique=True
+)
+
+
 class SocialActivityStats(BareBaseModel):
     """
     Thống kê các trang mạng xã hội hoạt động nhiều nhất theo chủ đề
@@ -278,6 +290,15 @@ class SocialActivityStats(BareBaseModel):
     created_at = Column(DateTime, server_default=func.now())
 
 
+Index(
+    'uq_social_stats_period_account_topic',
+    SocialActivityStats.period_type, SocialActivityStats.period_start,
+    SocialActivityStats.platform, SocialActivityStats.account_name,
+    func.coalesce(SocialActivityStats.topic_id, NULL_TOPIC_KEY),
+    unique=True
+)
+
+
 class DailySnapshot(BareBaseModel):
     """
     Snapshot hàng ngày - dùng để vẽ timeline chi tiết
@@ -314,3 +335,38 @@ class DailySnapshot(BareBaseModel):
     trending_down = Column(JSON)  # Topics đang giảm
     
     created_at = Column(DateTime, server_default=func.now())
+
+
+class DailySentimentRollup(BareBaseModel):
+    """
+    Số bài theo ngày × topic × domain × category × sentiment × emotion
+    Nguồn cho trend report / website stats / social stats (GROUP BY trên dòng đã tổng hợp)
+    Cập nhật bởi SentimentRollupService khi ingest, không sửa tay
+    """
+    __tablename__ = "daily_sentiment_rollup"
+
+    day = Column(Date, nullable=False, index=True)
+
+    # Chiều tổng hợp (NULL giữ nguyên như bảng gốc)
+    topic_id = Column(Integer)
+    topic_name = Column(String(512))
+    source_domain = Column(String(256))
+    category = Column(String(256))
+    sentiment_group = Column(String(20), nullable=False)
+    emotion = Column(String(30), nullable=False)
+
+    article_count = Column(Integer, nullable=False, default=0)
+    source_url = Column(String(2048))  # max(source_url) của ô - account_url cho social stats
+
+    __table_args__ = (
+        Index('idx_rollup_day_domain', 'day', 'source_domain'),
+        Index('idx_rollup_day_topic', 'day', 'topic_id'),
+    )
+
+
+class StatsRollupState(BareBaseModel):
+    """Watermark của các bảng rollup: đã cộng các dòng nguồn có id <= last_id"""
+    __tablename__ = "stats_rollup_state"
+
+    name = Column(String(50), nullable=False, unique=True)
+    last_id = Column(Integer, nullable=False, default=0)
@@ -7,6 +7,8 @@ import re
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
+from app.services.classification.keyword_matcher import KeywordIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -165,6 +167,12 @@ class CategoryClassifier:
     
     def __init__(self):
         self.categories = CATEGORIES
+        # Tất cả keywords của mọi category trong 1 matcher (build 1 lần)
+        self._index = KeywordIndex({
+            cat_id: cat_info["keywords"]
+            for cat_id, cat_info in self.categories.items()
+            if cat_id != "khac"
+        })
     
     def classify(self, text: str, title: str = None) -> ClassificationResult:
         """Phân loại nội dung vào danh mục phù hợp nhất"""
@@ -174,26 +182,15 @@ class CategoryClassifier:
         # Combine title và content (title có weight cao hơn)
         full_text = f"{(title or '')} {(title or '')} {text or ''}".lower()
         
-        # Tính score cho mỗi category
-        scores = {}
-        matched = {}
+        # Tính score cho mỗi category (1 lần quét cho tất cả keywords)
+        matched = {cat_id: [] for cat_id in self._index.keys}
+        matched.update(self._index.match(full_text, normalized=True))
         
-        for cat_id, cat_info in self.categories.items():
-            if cat_id == "khac":
-                continue
-            
-            score = 0
-            matches = []
-            
-            for keyword in cat_info["keywords"]:
-                if keyword in full_text:
-                    # Keyword dài hơn có weight cao hơn
-                    weight = len(keyword.split())
-                    score += weight
-                    matches.append(keyword)
-            
-            scores[cat_id] = score
-            matched[cat_id] = matches
+        # Keyword dài hơn có weight cao hơn
+        scores = {
+            cat_id: sum(len(keyword.split()) for keyword in matches)
+            for cat_id, matches in matched.items()
+        }
         
         # Tìm category có score cao nhất
         if not any(scores.values()):
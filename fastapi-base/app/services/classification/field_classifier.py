@@ -7,7 +7,7 @@ import logging
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, insert, update
 
 from app.models.model_article import Article
 from app.models.model_field_classification import (
@@ -16,9 +16,13 @@ from app.models.model_field_classification import (
     FieldStatistics
 )
 from app.services.classification.llm_classifier import LLMFieldClassifier
+from app.services.classification.keyword_matcher import KeywordIndex
 
 logger = logging.getLogger(__name__)
 
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
 # Platform detection mapping
 SOCIAL_PLATFORMS = {
     'facebook.com': 'Facebook',
@@ -34,6 +38,35 @@ SOCIAL_PLATFORMS = {
 }
 
 
+def normalize_text(text: str) -> str:
+    """Chuẩn hóa text để so sánh từ khóa"""
+    if not text:
+        return ""
+    # Chuyển về lowercase, loại bỏ dấu câu
+    text = text.lower()
+    text = _PUNCTUATION_RE.sub(' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
+    return text.strip()
+
+
+# KeywordIndex của bảng Field: (fingerprint keywords, index), build lại khi Field.keywords đổi
+_field_keyword_index: Optional[Tuple[tuple, KeywordIndex]] = None
+
+def get_field_keyword_index(fields: List[Field]) -> KeywordIndex:
+    """Compiled whole-word keyword index cho danh sách lĩnh vực (cache theo nội dung keywords)"""
+    global _field_keyword_index
+    fingerprint = tuple((f.id, tuple(f.keywords)) for f in fields if f.keywords)
+    if _field_keyword_index is None or _field_keyword_index[0] != fingerprint:
+        index = KeywordIndex(
+            {field_id: keywords for field_id, keywords in fingerprint},
+            whole_word=True,
+            normalize=normalize_text
+        )
+        _field_keyword_index = (fingerprint, index)
+        logger.info(f"Built field keyword index: {len(fingerprint)} fields, {len(index.matcher)} keywords")
+    return _field_keyword_index[1]
+
+
 class FieldClassificationService:
     """Service để phân loại bài viết theo lĩnh vực"""
     
@@ -44,13 +77,7 @@ class FieldClassificationService:
     
     def _normalize_text(self, text: str) -> str:
         """Chuẩn hóa text để so sánh từ khóa"""
-        if not text:
-            return ""
-        # Chuyển về lowercase, loại bỏ dấu câu
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return normalize_text(text)
     
     def _detect_platform(self, source: str, url: str = None) -> str:
         """
@@ -74,25 +101,38 @@ class FieldClassificationService:
         # Nếu không match với social platform nào, coi như là báo chí
         return 'Newspaper'
     
-    def _match_keywords(self, text: str, keywords: List[str]) -> Tuple[bool, List[str]]:
+    def _match_keywords(self, text: str, fields: List[Field]) -> Dict[int, List[str]]:
         """
-        Kiểm tra xem text có chứa từ khóa nào không
-        Returns: (có_match, danh_sách_keywords_matched)
+        Tìm từ khóa (whole word) của tất cả lĩnh vực trong 1 lần quét text
+        Returns: {field_id: danh_sách_keywords_matched} (chỉ lĩnh vực có match)
         """
-        if not text or not keywords:
-            return False, []
-        
-        normalized_text = self._normalize_text(text)
-        matched = []
+        if not text:
+            return {}
+        return get_field_keyword_index(fields).match(text)
+    
+    def _best_keyword_match(
+        self,
+        field_matches: Dict[int, List[str]],
+        fields: List[Field]
+    ) -> Optional[Tuple[int, float, List[str]]]:
+        """
+        Chọn lĩnh vực có nhiều keyword match nhất (hòa -> lĩnh vực đứng trước)
+        Returns: (field_id, confidence, matched_keywords) hoặc None
+        """
+        best_match = None
+        best_score = 0
+        best_keywords = []
         
-        for keyword in keywords:
-            normalized_keyword = self._normalize_text(keyword)
-            # Tìm keyword dạng whole word
-            pattern = r'\b' + re.escape(normalized_keyword) + r'\b'
-            if re.search(pattern, normalized_text):
-                matched.append(keyword)
+        for field in fields:
+            matched_keywords = field_matches.get(field.id)
+            if matched_keywords and len(matched_keywords) > best_score:
+                best_score = len(matched_keywords)
+                best_match = field
+                best_keywords = matched_keywords
         
-        return len(matched) > 0, matched
+        if not best_match:
+            return None
+        return best_match.id, min(1.0, best_score / 5.0), best_keywords  # Normalize score
     
     def classify_article(
         self, 
@@ -142,28 +182,11 @@ class FieldClassificationService:
             # Ghép title + content để tìm keyword
             text_to_search = f"{article.title or ''} {article.content or ''} {article.summary or ''}"
             
-            best_match = None
-            best_score = 0
-            best_keywords = []
-            
-            # Tìm lĩnh vực match nhất
-            for field in fields:
-                if not field.keywords:
-                    continue
-                
-                matched, matched_keywords = self._match_keywords(text_to_search, field.keywords)
-                if matched:
-                    score = len(matched_keywords)
-                    if score > best_score:
-                        best_score = score
-                        best_match = field
-                        best_keywords = matched_keywords
+            best = self._best_keyword_match(self._match_keywords(text_to_search, fields), fields)
             
             # Nếu match được bằng keyword
-            if best_match:
-                result_field_id = best_match.id
-                result_confidence = min(1.0, best_score / 5.0)  # Normalize score
-                result_keywords = best_keywords
+            if best:
+                result_field_id, result_confidence, result_keywords = best
                 result_method = "keyword"
         
         # Nếu không match được và method cho phép LLM
@@ -229,24 +252,41 @@ class FieldClassificationService:
         article_ids: Optional[List[int]] = None,
         force: bool = False,
         limit: Optional[int] = None,
-        method: str = "auto"  # auto, keyword, llm
+        method: str = "auto",  # auto, keyword, llm
+        chunk_size: int = 500,
+        llm_articles_per_prompt: int = 5
     ) -> Dict[str, any]:
         """
         Phân loại nhiều bài viết cùng lúc
         
+        Lĩnh vực được load 1 lần; bài viết được stream theo chunk (yield_per) trên
+        connection riêng, phân loại trong bộ nhớ (keyword index 1 lần quét/bài,
+        LLM gộp nhiều bài/prompt) và upsert ArticleFieldClassification theo chunk.
+        
         Args:
             article_ids: Danh sách ID bài viết cần phân loại. Nếu None, phân loại tất cả
             force: Có phân loại lại không
             limit: Giới hạn số lượng bài viết xử lý
             method: Phương pháp phân loại (auto, keyword, llm)
+            chunk_size: Số bài mỗi chunk (1 lần upsert + commit)
+            llm_articles_per_prompt: Số bài gộp trong 1 prompt LLM
             
         Returns:
             Dict chứa thống kê kết quả
         """
         start_time = time.time()
         
+        total_processed = 0
+        classified_count = 0
+        failed_count = 0
+        field_counts = {}
+        method_stats = {"keyword": 0, "llm": 0}
+        
+        fields = self.db.query(Field).order_by(Field.order_index).all()
+        field_names = {f.id: f.name for f in fields}
+        
         # Lấy danh sách bài viết cần phân loại
-        query = self.db.query(Article.id)
+        query = self.db.query(Article.id, Article.title, Article.content, Article.summary)
         
         if article_ids:
             query = query.filter(Article.id.in_(article_ids))
@@ -259,37 +299,35 @@ class FieldClassificationService:
         if limit:
             query = query.limit(limit)
         
-        article_ids_to_process = [row[0] for row in query.all()]
-        
-        # Phân loại từng bài
-        classified_count = 0
-        failed_count = 0
-        field_counts = {}
-        method_stats = {"keyword": 0, "llm": 0}
-        
-        for article_id in article_ids_to_process:
-            try:
-                result = self.classify_article(article_id, force=force, method=method)
-                if result:
-                    classified_count += 1
-                    field_name = self.db.query(Field.name).filter(
-                        Field.id == result.field_id
-                    ).scalar()
-                    field_counts[field_name] = field_counts.get(field_name, 0) + 1
+        if fields:
+            # Connection riêng cho server-side cursor: commit từng chunk trên self.db không đóng cursor
+            with self.db.get_bind().connect() as reader:
+                rows = reader.execute(query.statement.execution_options(yield_per=chunk_size))
+                for chunk in rows.partitions():
+                    total_processed += len(chunk)
+                    try:
+                        results = self._classify_chunk(chunk, fields, method, llm_articles_per_prompt)
+                        self._upsert_classifications(results)
+                    except Exception as e:
+                        self.db.rollback()
+                        failed_count += len(chunk)
+                        logger.error(f"Error classifying chunk of {len(chunk)} articles: {e}")
+                        continue
                     
-                    # Track method used
-                    if result.classification_method in method_stats:
-                        method_stats[result.classification_method] += 1
-                else:
-                    failed_count += 1
-            except Exception as e:
-                failed_count += 1
-                print(f"Error classifying article {article_id}: {e}")
+                    failed_count += len(chunk) - len(results)
+                    for article_id, (field_id, confidence, keywords, result_method) in results.items():
+                        classified_count += 1
+                        field_name = field_names.get(field_id)
+                        field_counts[field_name] = field_counts.get(field_name, 0) + 1
+                        if result_method in method_stats:
+                            method_stats[result_method] += 1
+        else:
+            total_processed = failed_count = query.count()
         
         processing_time = time.time() - start_time
         
         return {
-            "total_processed": len(article_ids_to_process),
+            "total_processed": total_processed,
             "classified": classified_count,
             "failed": failed_count,
             "field_distribution": field_counts,
@@ -297,6 +335,87 @@ class FieldClassificationService:
             "processing_time": processing_time
         }
     
+    def _classify_chunk(
+        self,
+        rows: List,
+        fields: List[Field],
+        method: str,
+        llm_articles_per_prompt: int
+    ) -> Dict[int, Tuple[int, float, List[str], str]]:
+        """
+        Phân loại 1 chunk bài viết trong bộ nhớ
+        
+        Returns:
+            {article_id: (field_id, confidence, matched_keywords, method)} - chỉ bài phân loại được
+        """
+        results = {}
+        pending = []  # Bài cần LLM
+        
+        if method in ["auto", "keyword"]:
+            index = get_field_keyword_index(fields)
+            for row in rows:
+                text_to_search = f"{row.title or ''} {row.content or ''} {row.summary or ''}"
+                best = self._best_keyword_match(index.match(text_to_search), fields)
+                if best:
+                    results[row.id] = (*best, "keyword")
+                else:
+                    pending.append(row)
+        else:
+            pending = list(rows)
+        
+        if pending and method in ["auto", "llm"]:
+            if self.use_llm and self.llm_classifier and self.llm_classifier.is_available():
+                logger.info(f"Using LLM to classify {len(pending)} articles")
+                fields_data = [
+                    {"id": f.id, "name": f.name, "description": f.description or ""}
+                    for f in fields
+                ]
+                llm_results = self.llm_classifier.classify_batch(
+                    [{"id": row.id, "title": row.title or "", "content": row.content or ""} for row in pending],
+                    fields_data,
+                    articles_per_prompt=llm_articles_per_prompt
+                )
+                for row, llm_result in zip(pending, llm_results):
+                    if llm_result:
+                        field_id, confidence, reason = llm_result
+                        results[row.id] = (field_id, confidence, [reason], "llm")
+        
+        return results
+    
+    def _upsert_classifications(self, results: Dict[int, Tuple[int, float, List[str], str]]):
+        """Bulk insert/update ArticleFieldClassification cho 1 chunk (1 SELECT + 1 commit)"""
+        if not results:
+            return
+        
+        existing = {}
+        for row_id, article_id in self.db.query(
+            ArticleFieldClassification.id, ArticleFieldClassification.article_id
+        ).filter(
+            ArticleFieldClassification.article_id.in_(list(results))
+        ).order_by(ArticleFieldClassification.id):
+            existing.setdefault(article_id, row_id)
+        
+        now = time.time()
+        inserts, updates = [], []
+        for article_id, (field_id, confidence, keywords, result_method) in results.items():
+            values = {
+                "field_id": field_id,
+                "confidence_score": confidence,
+                "matched_keywords": keywords,
+                "classification_method": result_method,
+                "updated_at": now
+            }
+            if article_id in existing:
+                updates.append({"id": existing[article_id], **values})
+            else:
+                inserts.append({"article_id": article_id, "created_at": now, **values})
+        
+        if inserts:
+            self.db.execute(insert(ArticleFieldClassification), inserts)
+        if updates:
+            self.db.execute(update(ArticleFieldClassification), updates)
+        self.db.commit()
+    
     def get_field_distribution(self) -> List[Dict[str, any]]:
         """
         Lấy phân bố bài viết theo lĩnh vực
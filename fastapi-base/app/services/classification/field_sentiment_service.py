@@ -10,6 +10,7 @@ from datetime import datetime, timedelta, date
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc
 
+from app.core.llm_cache import get_llm_cache
 from app.models.model_article import Article
 from app.models.model_field_classification import Field, ArticleFieldClassification
 from app.models.model_field_sentiment import FieldSentiment
@@ -143,7 +144,9 @@ Trả về JSON:
 Chỉ trả về JSON."""
 
         try:
-            response = self.client.chat.completions.create(
+            result_text = get_llm_cache().chat(
+                self.client,
+                "field_sentiment",
                 model=model,
                 messages=[
                     {"role": "system", "content": "Bạn là chuyên gia phân tích sentiment tin tức về Hưng Yên. Phân tích cảm xúc chính xác và khách quan."},
@@ -154,8 +157,6 @@ Chỉ trả về JSON."""
                 response_format={"type": "json_object"}
             )
             
-            result_text = response.choices[0].message.content
-            
             # Clean markdown
             result_text = result_text.strip()
             if result_text.startswith("```json"):
@@ -0,0 +1,236 @@
+"""
+Keyword Matcher - Compiled multi-keyword substring matcher
+
+Thay cho vòng lặp `keyword in text` với từng keyword: tất cả keywords được
+build thành một trie-regex duy nhất (compile một lần), một lần quét text trả
+về mọi keyword xuất hiện cùng vị trí.
+
+Semantics giống hệt `kw.lower() in text.lower()`:
+- Regex tìm keyword DÀI NHẤT bắt đầu tại mỗi vị trí
+- Keyword ngắn hơn nằm bên trong keyword dài (prefix, suffix, giữa) được suy ra
+  từ bảng "contains" tính sẵn, nên không bị mất match chồng lấn
+
+whole_word=True: giống `re.search(r'\\b' + kw + r'\\b', text)` - mọi occurrence
+(kể cả suy ra) được lọc theo ranh giới từ.
+
+case_sensitive=True: giống `kw in text` (không lowercase keyword lẫn text).
+
+KeywordIndex: nhiều nhóm keyword (category/lĩnh vực -> keywords) dùng chung
+một KeywordMatcher, một lần quét trả về keywords matched của mọi nhóm.
+
+Usage:
+    matcher = KeywordMatcher(["kinh tế", "tế", "đầu tư"])
+    matcher.matched_indices("Kinh tế tăng trưởng")   # {0, 1}
+    matcher.find_all("Kinh tế tăng trưởng")          # [("kinh tế", 0), ("tế", 5)]
+
+    index = KeywordIndex({"kinh_te": ["kinh tế", "đầu tư"], "y_te": ["y tế"]})
+    index.match("Đầu tư y tế")                       # {"kinh_te": ["đầu tư"], "y_te": ["y tế"]}
+"""
+import re
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build regex from a character trie (greedy: longest keyword wins)"""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """One compiled pattern for a whole keyword set (case-insensitive substring match)"""
+
+    def __init__(self, keywords: Iterable[str], whole_word: bool = False, case_sensitive: bool = False):
+        """
+        Args:
+            keywords: Keywords (được lowercase + strip, trùng lặp bị gộp)
+            whole_word: Chỉ match nguyên từ (ranh giới \\b hai đầu)
+            case_sensitive: Giữ nguyên hoa/thường của keywords và text (như `kw in text`)
+        """
+        self.whole_word = whole_word
+        self.case_sensitive = case_sensitive
+        self.keywords: List[str] = []
+        self._index: Dict[str, int] = {}
+        for keyword in keywords:
+            kw = (keyword or '').strip() if case_sensitive else (keyword or '').lower().strip()
+            if kw and kw not in self._index:
+                self._index[kw] = len(self.keywords)
+                self.keywords.append(kw)
+
+        # contains[i] = [(j, offset), ...]: keyword j xuất hiện trong keyword i tại offset
+        by_first_char: Dict[str, List[int]] = {}
+        for j, kw in enumerate(self.keywords):
+            by_first_char.setdefault(kw[0], []).append(j)
+
+        self._contains: List[List[Tuple[int, int]]] = []
+        for kw in self.keywords:
+            inner = []
+            for offset, ch in enumerate(kw):
+                for j in by_first_char.get(ch, ()):
+                    if kw.startswith(self.keywords[j], offset):
+                        inner.append((j, offset))
+            self._contains.append(inner)
+        self._implied: List[Set[int]] = [{j for j, _ in inner} for inner in self._contains]
+
+        self._pattern: Optional[re.Pattern] = None
+        if self.keywords:
+            # Lookahead: match ở mọi vị trí, kể cả chồng lấn
+            self._pattern = re.compile('(?=(' + _trie_pattern(self.keywords) + '))')
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def index_of(self, keyword: str) -> Optional[int]:
+        """Index of a keyword in self.keywords (None nếu không có)"""
+        keyword = keyword or ''
+        return self._index.get(keyword.strip() if self.case_sensitive else keyword.lower().strip())
+
+    def _longest_matches(self, text: str):
+        for m in self._pattern.finditer(text):
+            yield self._index[m.group(1)], m.start()
+
+    def _occurrences(self, text: str) -> Set[Tuple[int, int]]:
+        """All (start, keyword index) occurrences, lọc ranh giới từ nếu whole_word"""
+        occurrences = set()
+        for idx, start in self._longest_matches(text):
+            for j, offset in self._contains[idx]:
+                occurrences.add((start + offset, j))
+        if self.whole_word:
+            occurrences = {
+                (pos, j) for pos, j in occurrences
+                if _is_boundary(text, pos - 1, self.keywords[j][0])
+                and _is_boundary(text, pos + len(self.keywords[j]), self.keywords[j][-1])
+            }
+        return occurrences
+
+    def matched_indices(self, text: str, lowercase: bool = True) -> Set[int]:
+        """
+        Indices of all keywords occurring in text
+
+        Args:
+            text: Text to scan
+            lowercase: Lowercase text trước (False nếu text đã lowercase)
+        """
+        if not self._pattern or not text:
+            return set()
+        if lowercase and not self.case_sensitive:
+            text = text.lower()
+        if self.whole_word:
+            return {j for _, j in self._occurrences(text)}
+
+        found: Set[int] = set()
+        longest: Set[int] = set()
+        for idx, _ in self._longest_matches(text):
+            if idx not in longest:
+                longest.add(idx)
+                found |= self._implied[idx]
+        return found
+
+    def matched_keywords(self, text: str, lowercase: bool = True) -> List[str]:
+        """Keywords occurring in text (theo thứ tự của keyword list)"""
+        return [self.keywords[i] for i in sorted(self.matched_indices(text, lowercase))]
+
+    def find_all(self, text: str, lowercase: bool = True) -> List[Tuple[str, int]]:
+        """
+        All (keyword, start) occurrences in text, sorted by position
+
+        Args:
+            text: Text to scan
+            lowercase: Lowercase text trước (False nếu text đã lowercase)
+        """
+        if not self._pattern or not text:
+            return []
+        if lowercase and not self.case_sensitive:
+            text = text.lower()
+
+        return [(self.keywords[j], pos) for pos, j in sorted(self._occurrences(text))]
+
+
+class KeywordIndex:
+    """Keyword groups (group key -> keywords) behind one compiled KeywordMatcher"""
+
+    def __init__(
+        self,
+        groups: Dict[Hashable, Iterable[str]],
+        whole_word: bool = False,
+        normalize: Optional[Callable[[str], str]] = None
+    ):
+        """
+        Args:
+            groups: {group key: keywords}, thứ tự keywords trong nhóm được giữ nguyên
+            whole_word: Chỉ match nguyên từ
+            normalize: Chuẩn hóa keyword (và text trong match()); mặc định lowercase + strip
+        """
+        self.normalize = normalize or (lambda value: (value or '').lower().strip())
+        self.keys: List[Hashable] = list(groups)
+
+        self._originals: List[List[str]] = []
+        normalized: List[List[str]] = []
+        for key in self.keys:
+            originals = list(groups[key] or [])
+            self._originals.append(originals)
+            normalized.append([self.normalize(keyword) for keyword in originals])
+
+        self.matcher = KeywordMatcher(
+            (keyword for keywords in normalized for keyword in keywords), whole_word=whole_word
+        )
+
+        # matcher index -> [(group position, keyword position trong group)]
+        self._members: List[List[Tuple[int, int]]] = [[] for _ in range(len(self.matcher))]
+        for g, keywords in enumerate(normalized):
+            for k, keyword in enumerate(keywords):
+                idx = self.matcher.index_of(keyword)
+                if idx is not None:
+                    self._members[idx].append((g, k))
+
+    def match(self, text: str, normalized: bool = False) -> Dict[Hashable, List[str]]:
+        """
+        Keywords (bản gốc) matched của từng nhóm, theo thứ tự keywords trong nhóm
+
+        Args:
+            text: Text to scan
+            normalized: True nếu text đã qua normalize()
+
+        Returns:
+            {group key: [keywords]} - chỉ gồm nhóm có match
+        """
+        if not normalized:
+            text = self.normalize(text)
+        hits: Dict[int, List[int]] = {}
+        for idx in self.matcher.matched_indices(text, lowercase=False):
+            for g, k in self._members[idx]:
+                hits.setdefault(g, []).append(k)
+        return {
+            self.keys[g]: [self._originals[g][k] for k in sorted(positions)]
+            for g, positions in sorted(hits.items())
+        }
+
+    def find_all(self, text: str, normalized: bool = False) -> List[Tuple[str, int]]:
+        """All (normalized keyword, start) occurrences trong text đã normalize"""
+        if not normalized:
+            text = self.normalize(text)
+        return self.matcher.find_all(text, lowercase=False)
+
+
+def _is_boundary(text: str, pos: int, edge: str) -> bool:
+    """Ranh giới \\b giữa text[pos] và ký tự biên `edge` của keyword"""
+    neighbor_is_word = 0 <= pos < len(text) and _is_word_char(text[pos])
+    return neighbor_is_word != _is_word_char(edge)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
@@ -7,6 +7,8 @@ import logging
 from typing import Optional, Dict, List, Tuple
 from openai import OpenAI
 
+from app.core.llm_cache import get_llm_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,7 +90,10 @@ YÊU CẦU:
 Chỉ trả về JSON, không giải thích thêm."""
 
         try:
-            response = self.client.chat.completions.create(
+            # Cached: cùng bài viết + cùng danh sách lĩnh vực không gọi lại API
+            result_text = get_llm_cache().chat(
+                self.client,
+                "field_classifier",
                 model=model,
                 messages=[
                     {"role": "system", "content": "Bạn là chuyên gia phân loại tin tức Việt Nam."},
@@ -99,7 +104,6 @@ Chỉ trả về JSON, không giải thích thêm."""
                 response_format={"type": "json_object"}
             )
             
-            result_text = response.choices[0].message.content
             result = json.loads(result_text)
             
             field_id = result.get("field_id", 0)
@@ -124,28 +128,130 @@ Chỉ trả về JSON, không giải thích thêm."""
         self,
         articles: List[Dict],
         fields: List[Dict],
-        model: str = "gpt-3.5-turbo"
+        model: str = "gpt-3.5-turbo",
+        articles_per_prompt: int = 5
     ) -> List[Optional[Tuple[int, float, str]]]:
         """
-        Phân loại nhiều bài viết (từng bài một để tránh rate limit)
+        Phân loại nhiều bài viết, gộp `articles_per_prompt` bài vào 1 prompt
+        
+        Bài bị thiếu trong response gộp hoặc có field_id không nằm trong `fields`
+        được phân loại lại bằng classify_article; field_id = 0 hoặc confidence <= 0
+        được coi là "không phù hợp" (None), giống classify_article.
         
         Args:
             articles: List of {id, title, content}
             fields: Danh sách lĩnh vực
             model: Model OpenAI
+            articles_per_prompt: Số bài mỗi prompt (1 = từng bài một)
             
         Returns:
-            List of classification results
+            List of classification results (cùng thứ tự với articles)
         """
-        results = []
+        results: List[Optional[Tuple[int, float, str]]] = [None] * len(articles)
+        if not self.is_available():
+            logger.warning("LLM not available for classification")
+            return results
         
-        for article in articles:
-            result = self.classify_article(
-                title=article.get("title", ""),
-                content=article.get("content", ""),
-                fields=fields,
-                model=model
-            )
-            results.append(result)
+        valid_ids = {field['id'] for field in fields}
+        # Bỏ bài quá ngắn (giống classify_article)
+        eligible = [
+            (i, article) for i, article in enumerate(articles)
+            if len(f"{article.get('title') or ''}{article.get('content') or ''}".strip()) >= 10
+        ]
+        step = max(1, articles_per_prompt)
+        
+        for start in range(0, len(eligible), step):
+            group = eligible[start:start + step]
+            answers = self._classify_group([article for _, article in group], fields, model) if len(group) > 1 else {}
+            
+            for position, (i, article) in enumerate(group):
+                answer = answers.get(position)
+                if answer is not None:
+                    field_id, confidence, reason = answer
+                    if field_id == 0 or confidence <= 0:
+                        # LLM trả lời "không phù hợp" (giống classify_article)
+                        continue
+                    if field_id in valid_ids:
+                        results[i] = answer
+                        continue
+                
+                # Vắng mặt hoặc field_id không có trong danh sách -> gọi riêng
+                results[i] = self.classify_article(
+                    title=article.get("title", ""),
+                    content=article.get("content", ""),
+                    fields=fields,
+                    model=model
+                )
         
         return results
+    
+    def _classify_group(
+        self,
+        articles: List[Dict],
+        fields: List[Dict],
+        model: str,
+        max_chars: int = 1200
+    ) -> Dict[int, Tuple[int, float, str]]:
+        """
+        1 LLM call cho nhiều bài viết
+        
+        Returns:
+            {vị trí bài trong group: (field_id, confidence, reason)}; field_id = 0
+            nghĩa là LLM trả lời "không phù hợp", bài vắng mặt = response lỗi
+        """
+        fields_info = "\n".join(
+            f"{field['id']}. {field['name']}: {field.get('description', '')}" for field in fields
+        )
+        blocks = []
+        for position, article in enumerate(articles, 1):
+            title = article.get("title", "") or ""
+            content = article.get("content", "") or ""
+            article_text = f"{title}\n{content}" if content else title
+            if len(article_text) > max_chars:
+                article_text = article_text[:max_chars] + "..."
+            blocks.append(f"[BÀI {position}]\n{article_text}")
+        
+        prompt = f"""Phân tích {len(articles)} bài viết sau và xác định lĩnh vực phù hợp nhất cho TỪNG bài.
+
+DANH SÁCH LĨNH VỰC:
+{fields_info}
+
+{chr(10).join(blocks)}
+
+YÊU CẦU:
+- Phân tích từng bài ĐỘC LẬP, mỗi bài chọn 1 lĩnh vực phù hợp nhất từ danh sách trên
+- Nếu bài không phù hợp lĩnh vực nào, field_id = 0
+- Trả về JSON: {{"results": [{{"article": số thứ tự bài, "field_id": số, "confidence": số từ 0-1, "reason": "lý do ngắn gọn"}}, ...]}}
+
+Chỉ trả về JSON, không giải thích thêm."""
+
+        try:
+            result_text = get_llm_cache().chat(
+                self.client,
+                "field_classifier",
+                model=model,
+                messages=[
+                    {"role": "system", "content": "Bạn là chuyên gia phân loại tin tức Việt Nam."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=80 * len(articles) + 50,
+                response_format={"type": "json_object"}
+            )
+            items = json.loads(result_text).get("results", [])
+        except Exception as e:
+            logger.error(f" LLM batch classification error: {e}")
+            return {}
+        
+        answers = {}
+        for item in items:
+            try:
+                position = int(item["article"]) - 1
+                answer = (int(item.get("field_id", 0)), float(item.get("confidence", 0)), item.get("reason", ""))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= position < len(articles):
+                answers[position] = answer
+        
+        logger.info(f" LLM classified {len(answers)}/{len(articles)} articles in 1 call")
+        return answers
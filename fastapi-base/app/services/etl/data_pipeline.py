@@ -8,8 +8,10 @@ UPDATED: Sử dụng processors mới thay vì DataNormalizer
 import logging
 import json
 import os
+import time
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
 import pandas as pd
 from sqlalchemy.orm import Session
@@ -18,9 +20,33 @@ from sqlalchemy import text
 # Import processors mới thay vì DataNormalizer
 from app.services.etl.processors import get_processor, get_supported_types
 from app.services.etl.text_cleaner import TextCleaner
+from app.services.etl.fingerprint_store import get_fingerprint_store, DEDUPE_NAMESPACE
+from app.services.etl.parallel_processing import iter_process_parallel, clean_record
+from app.services.etl.jsonl_io import iter_records, write_records, is_jsonl, jsonl_filename, json_default
 
 logger = logging.getLogger(__name__)
 
+# Cột của bảng articles được ghi bởi Step 3 (load_processed_data_to_db)
+ARTICLE_COLUMNS = [
+    "title", "content", "url", "source", "source_type", "domain", "category",
+    "published_datetime", "published_date", "created_at", "updated_at",
+    "likes_count", "shares_count", "comments_count", "views_count", "reactions",
+    "social_platform", "account_name", "account_id", "account_url", "post_id", "post_type",
+    "tags", "images", "videos", "summary",
+    "word_count", "raw_metadata",
+]
+
+
+def _to_unix(dt_str: Optional[str]) -> Optional[float]:
+    """Convert ISO datetime string to Unix timestamp"""
+    if not dt_str:
+        return None
+    try:
+        dt = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+        return dt.timestamp()
+    except (ValueError, TypeError, AttributeError):
+        return None
+
 
 class DataPipelineService:
     """Service quản lý toàn bộ data flow: API → Processed → Training"""
@@ -43,7 +69,8 @@ class DataPipelineService:
         self,
         external_api_url: str,
         params: Optional[Dict] = None,
-        save_filename: Optional[str] = None
+        save_filename: Optional[str] = None,
+        compression: Optional[str] = None
     ) -> Dict:
         """
         Step 1: Fetch data từ external API và lưu raw
@@ -51,7 +78,8 @@ class DataPipelineService:
         Args:
             external_api_url: URL của external API
             params: Query parameters
-            save_filename: Tên file để lưu (default: raw_YYYYMMDD_HHMMSS.json)
+            save_filename: Tên file để lưu (default: raw_YYYYMMDD_HHMMSS.jsonl)
+            compression: None, 'gzip' hoặc 'zstd'
         
         Returns:
             Dict với file path và số records
@@ -67,23 +95,27 @@ class DataPipelineService:
             
             data = response.json()
             
+            if isinstance(data, list):
+                records = data
+            elif isinstance(data, dict):
+                records = data.get('data', [])
+            else:
+                records = []
+            
             # Generate filename
             if not save_filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                save_filename = f"raw_{timestamp}.json"
+                save_filename = jsonl_filename(f"raw_{timestamp}", compression)
             
             # Save raw data
             raw_file = self.raw_dir / save_filename
-            with open(raw_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            # Get record count
-            if isinstance(data, list):
-                record_count = len(data)
-            elif isinstance(data, dict):
-                record_count = len(data.get('data', []))
+            if is_jsonl(raw_file):
+                record_count = write_records(raw_file, records)
             else:
-                record_count = 0
+                # Legacy .json: giữ nguyên response
+                with open(raw_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                record_count = len(records)
             
             logger.info(f"    Saved {record_count} records to {raw_file}")
             
@@ -103,14 +135,18 @@ class DataPipelineService:
     def sync_from_database_to_raw(
         self,
         limit: Optional[int] = None,
-        save_filename: Optional[str] = None
+        save_filename: Optional[str] = None,
+        compression: Optional[str] = None
     ) -> Dict:
         """
         Step 1b: Export data từ database sang raw file
         
+        Rows được stream từ DB (server-side cursor) và ghi thẳng ra JSONL.
+        
         Args:
             limit: Số records tối đa
             save_filename: Tên file để lưu
+            compression: None, 'gzip' hoặc 'zstd'
         
         Returns:
             Dict với file path và số records
@@ -129,19 +165,14 @@ class DataPipelineService:
                 LIMIT :limit
             """)
             
-            rows = self.db.execute(query, {"limit": limit or 999999}).fetchall()
-            
-            if not rows:
-                logger.warning("   No articles found in database")
-                return {
-                    "status": "error",
-                    "message": "No articles found"
-                }
+            rows = self.db.execute(
+                query.execution_options(yield_per=1000),
+                {"limit": limit or 999999}
+            )
             
-            # Convert to dict
-            articles = []
-            for row in rows:
-                articles.append({
+            # Convert to dict (generator, không giữ toàn bộ rows trong RAM)
+            articles = (
+                {
                     "id": row[0],
                     "title": row[1],
                     "content": row[2],
@@ -150,24 +181,33 @@ class DataPipelineService:
                     "published_at": row[5].isoformat() if row[5] else None,
                     "created_at": row[6].isoformat() if row[6] else None,
                     "category": row[7]
-                })
+                }
+                for row in rows
+            )
             
             # Generate filename
             if not save_filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                save_filename = f"raw_from_db_{timestamp}.json"
+                save_filename = jsonl_filename(f"raw_from_db_{timestamp}", compression)
             
             # Save raw data
             raw_file = self.raw_dir / save_filename
-            with open(raw_file, 'w', encoding='utf-8') as f:
-                json.dump(articles, f, ensure_ascii=False, indent=2)
+            record_count = self._save_records(raw_file, articles)
+            
+            if record_count == 0:
+                raw_file.unlink(missing_ok=True)
+                logger.warning("   No articles found in database")
+                return {
+                    "status": "error",
+                    "message": "No articles found"
+                }
             
-            logger.info(f"    Exported {len(articles)} articles to {raw_file}")
+            logger.info(f"    Exported {record_count} articles to {raw_file}")
             
             return {
                 "status": "success",
                 "raw_file": str(raw_file),
-                "record_count": len(articles)
+                "record_count": record_count
             }
             
         except Exception as e:
@@ -180,7 +220,9 @@ class DataPipelineService:
     def process_raw_data(
         self,
         raw_file: str,
-        save_filename: Optional[str] = None
+        save_filename: Optional[str] = None,
+        compression: Optional[str] = None,
+        workers: int = 1
     ) -> Dict:
         """
         Step 2: Xử lý raw data → processed data
@@ -191,10 +233,14 @@ class DataPipelineService:
         - Extract metadata
         - Validate và filter
         
+        Records được đọc, xử lý và ghi từng dòng (JSONL), nên bộ nhớ không phụ
+        thuộc vào kích thước file.
+        
         Args:
-            raw_file: Path to raw data file
-            save_filename: Tên file processed (default: processed_YYYYMMDD_HHMMSS.json)
-            data_type: Loại data (facebook, tiktok, threads, newspaper) - auto detect if not provided
+            raw_file: Path to raw data file (.jsonl[.gz|.zst] hoặc .json cũ)
+            save_filename: Tên file processed (default: processed_<type>_YYYYMMDD_HHMMSS.jsonl)
+            compression: None, 'gzip' hoặc 'zstd'
+            workers: Số processes cho processing + cleaning (1 = tuần tự)
         
         Returns:
             Dict với processed file path và statistics
@@ -202,63 +248,33 @@ class DataPipelineService:
         logger.info(" Step 2: Processing raw data...")
         
         try:
-            # Load raw data
-            with open(raw_file, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
-            
-            # Handle different formats
-            if isinstance(raw_data, dict) and 'data' in raw_data:
-                records = raw_data['data']
-            elif isinstance(raw_data, list):
-                records = raw_data
-            else:
-                records = [raw_data]
+            records = iter_records(raw_file)
             
-            logger.info(f"   Processing {len(records)} records...")
-            
-            # Auto-detect data_type from first record if not provided
-            data_type = None
-            if records:
-                data_type = records[0].get('data_type', 'facebook')
+            # Auto-detect data_type from first record
+            first = next(records, None)
+            if first is None:
+                return {
+                    "status": "error",
+                    "error": f"No records in {raw_file}"
+                }
+            data_type = first.get('data_type', 'facebook')
             
             # Get appropriate processor
             processor = get_processor(data_type)
             logger.info(f"   Using {processor.data_type} processor")
             
-            # Process batch using new processor
-            processed_records, stats = processor.process_batch(records)
-            
-            # Additional text cleaning
-            for record in processed_records:
-                if record.get('content'):
-                    record['content_cleaned'] = self.cleaner.clean(record['content'])
-                if record.get('title'):
-                    record['title_cleaned'] = self.cleaner.clean(record['title'])
-                record['processed_at'] = datetime.now().isoformat()
-            
             # Generate filename
             if not save_filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                save_filename = f"processed_{data_type}_{timestamp}.json"
+                save_filename = jsonl_filename(f"processed_{data_type}_{timestamp}", compression)
             
-            # Save processed data
+            # Save processed data (streaming: process → clean → write)
             processed_file = self.processed_dir / save_filename
-            
-            # Convert datetime objects to ISO strings for JSON serialization
-            def convert_datetime(obj):
-                """Convert datetime objects to ISO strings"""
-                if isinstance(obj, datetime):
-                    return obj.isoformat()
-                elif isinstance(obj, dict):
-                    return {k: convert_datetime(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [convert_datetime(item) for item in obj]
-                return obj
-            
-            processed_records_serializable = convert_datetime(processed_records)
-            
-            with open(processed_file, 'w', encoding='utf-8') as f:
-                json.dump(processed_records_serializable, f, ensure_ascii=False, indent=2)
+            stats = processor.new_stats()
+            self._save_records(
+                processed_file,
+                self.iter_processed_records(chain([first], records), data_type, stats, workers=workers)
+            )
             
             logger.info(f"    Processed {stats['success']}/{stats['total']} records")
             logger.info(f"    Saved to {processed_file}")
@@ -281,10 +297,57 @@ class DataPipelineService:
                 "error": str(e)
             }
     
+    def iter_processed_records(
+        self,
+        records: Iterable[Dict],
+        data_type: str,
+        stats: Optional[Dict] = None,
+        workers: int = 1
+    ) -> Iterator[Dict]:
+        """
+        Generator: processor + text cleaning cho từng record
+        
+        Dùng để nối các step mà không cần file trung gian, ví dụ:
+            pipeline.load_records_to_db(
+                pipeline.iter_processed_records(iter_records(raw_file), 'facebook'),
+                bulk=True
+            )
+        
+        Args:
+            records: Raw records (iterable/generator)
+            data_type: facebook, tiktok, threads, newspaper
+            stats: Dict từ processor.new_stats() để nhận statistics (optional)
+            workers: > 1 = chạy processor + cleaning trên process pool (giữ thứ tự)
+        """
+        processor = get_processor(data_type)
+        if stats is None:
+            stats = processor.new_stats()
+        
+        if workers > 1:
+            yield from iter_process_parallel(records, data_type, stats, clean=True, workers=workers)
+            return
+        
+        for record in processor.iter_process(records, stats):
+            # Additional text cleaning
+            yield clean_record(record, self.cleaner)
+    
+    def _save_records(self, path: Path, records: Iterable[Dict]) -> int:
+        """Ghi records ra JSONL (streaming) hoặc .json cũ nếu filename là .json"""
+        if is_jsonl(path):
+            return write_records(path, records)
+        
+        records = list(records)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2, default=json_default)
+        return len(records)
+    
     def load_processed_data_to_db(
         self,
         processed_file: str,
-        update_existing: bool = False
+        update_existing: bool = False,
+        use_fingerprint_store: bool = True,
+        bulk: bool = False,
+        batch_size: int = 1000
     ) -> Dict:
         """
         Step 3: Load processed data vào database
@@ -292,135 +355,78 @@ class DataPipelineService:
         Args:
             processed_file: Path to processed file
             update_existing: Update nếu đã tồn tại (based on URL)
+            use_fingerprint_store: Bỏ qua URL đã load ở các lần chạy trước
+                                   mà không cần query DB
+            bulk: Dùng bulk upsert (INSERT ... ON CONFLICT) theo batch thay vì từng record
+            batch_size: Số records mỗi batch khi bulk=True
         
         Returns:
             Dict với statistics
         """
         logger.info(" Step 3: Loading processed data to database...")
+        logger.info(f"   Loading records from {processed_file}...")
+        
+        return self.load_records_to_db(
+            iter_records(processed_file),
+            update_existing=update_existing,
+            use_fingerprint_store=use_fingerprint_store,
+            bulk=bulk,
+            batch_size=batch_size
+        )
+    
+    def load_records_to_db(
+        self,
+        records: Iterable[Dict],
+        update_existing: bool = False,
+        use_fingerprint_store: bool = True,
+        bulk: bool = False,
+        batch_size: int = 1000
+    ) -> Dict:
+        """
+        Load processed records (iterable/generator) vào database
         
+        Xem load_processed_data_to_db cho ý nghĩa các tham số.
+        
+        Returns:
+            Dict với statistics
+        """
         try:
-            # Load processed data
-            with open(processed_file, 'r', encoding='utf-8') as f:
-                processed_data = json.load(f)
-            
-            logger.info(f"   Loading {len(processed_data)} records...")
-            
             stats = {
-                "total": len(processed_data),
+                "total": 0,
                 "inserted": 0,
                 "updated": 0,
-                "skipped": 0
+                "skipped": 0,
+                "skipped_by_index": 0,
+                "failed": 0
             }
             
-            for record in processed_data:
-                try:
-                    url = record.get('url')
-                    
-                    # Check if exists
-                    if url:
-                        existing = self.db.execute(
-                            text("SELECT id FROM articles WHERE url = :url"),
-                            {"url": url}
-                        ).fetchone()
-                        
-                        if existing:
-                            if update_existing:
-                                # Update
-                                update_query = text("""
-                                    UPDATE articles
-                                    SET title = :title,
-                                        content = :content,
-                                        category = :category,
-                                        updated_at = NOW()
-                                    WHERE url = :url
-                                """)
-                                self.db.execute(update_query, {
-                                    "title": record.get('title_cleaned', record.get('title')),
-                                    "content": record.get('content_cleaned', record.get('content')),
-                                    "category": record.get('category'),
-                                    "url": url
-                                })
-                                self.db.commit()  # Commit per record
-                                stats["updated"] += 1
-                            else:
-                                stats["skipped"] += 1
-                            continue
-                    
-                    # Insert new - với đầy đủ fields
-                    metadata = record.get('metadata', {})
-                    
-                    # Convert datetime to Unix timestamp
-                    def to_unix(dt_str):
-                        if not dt_str:
-                            return None
-                        try:
-                            from datetime import datetime
-                            dt = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
-                            return dt.timestamp()
-                        except:
-                            return None
-                    
-                    insert_query = text("""
-                        INSERT INTO articles (
-                            title, content, url, source, source_type, domain, category,
-                            published_datetime, published_date, created_at, updated_at,
-                            likes_count, shares_count, comments_count, views_count, reactions,
-                            social_platform, account_name, account_id, account_url, post_id, post_type,
-                            tags, images, videos, summary,
-                            word_count, raw_metadata
-                        )
-                        VALUES (
-                            :title, :content, :url, :source, :source_type, :domain, :category,
-                            :published_datetime, :published_date, :created_at, :updated_at,
-                            :likes_count, :shares_count, :comments_count, :views_count, :reactions,
-                            :social_platform, :account_name, :account_id, :account_url, :post_id, :post_type,
-                            :tags, :images, :videos, :summary,
-                            :word_count, :raw_metadata
-                        )
-                    """)
-                    
-                    reactions = metadata.get('reactions', {})
-                    
-                    self.db.execute(insert_query, {
-                        "title": record.get('title_cleaned', record.get('title')),
-                        "content": record.get('content_cleaned', record.get('content')),
-                        "url": url,
-                        "source": record.get('source', 'external'),
-                        "source_type": record.get('source_type', 'facebook'),
-                        "domain": record.get('domain'),
-                        "category": record.get('category'),
-                        "published_datetime": record.get('published_at'),
-                        "published_date": to_unix(record.get('published_at')),
-                        "created_at": to_unix(record.get('created_at')),
-                        "updated_at": to_unix(record.get('updated_at')),
-                        "likes_count": record.get('likes_count', 0),
-                        "shares_count": record.get('shares_count', 0),
-                        "comments_count": record.get('comments_count', 0),
-                        "views_count": record.get('views_count', 0),
-                        "reactions": json.dumps(reactions) if reactions else None,
-                        "social_platform": record.get('social_platform', record.get('platform', 'facebook')),
-                        "account_name": record.get('account_name'),
-                        "account_id": record.get('account_id'),
-                        "account_url": record.get('account_url'),
-                        "post_id": record.get('post_id'),
-                        "post_type": record.get('post_type'),
-                        "tags": json.dumps(record.get('tags')) if record.get('tags') else None,
-                        "images": json.dumps(record.get('images')) if record.get('images') else None,
-                        "videos": json.dumps(record.get('videos')) if record.get('videos') else None,
-                        "summary": record.get('summary'),
-                        "word_count": record.get('word_count', record.get('content_length')),
-                        "raw_metadata": json.dumps(record.get('raw_metadata', metadata))
-                    })
-                    self.db.commit()  # Commit per record
-                    stats["inserted"] += 1
-                    
-                except Exception as e:
-                    logger.error(f"   Failed to load record: {e}")
-                    logger.error(f"   Record URL: {record.get('url')}")
-                    self.db.rollback()  # Rollback chỉ record này
-                    continue
-            
-            logger.info(f"    Inserted: {stats['inserted']}, Updated: {stats['updated']}, Skipped: {stats['skipped']}")
+            # Persistent URL index of committed articles: skip known records without
+            # a DB round-trip. URLs are only added after their row is committed.
+            store = get_fingerprint_store() if use_fingerprint_store else None
+            if store is not None:
+                store.refresh()
+            
+            start_time = time.perf_counter()
+            records = self._count_records(records, stats)
+            
+            try:
+                if bulk:
+                    self._bulk_load_records(records, update_existing, store, stats, batch_size)
+                else:
+                    self._load_records_one_by_one(records, update_existing, store, stats)
+            finally:
+                # Persist URLs of batches committed so far, even if a later step failed
+                if store is not None:
+                    store.flush()
+            
+            elapsed = time.perf_counter() - start_time
+            stats["mode"] = "bulk" if bulk else "row"
+            stats["duration_seconds"] = round(elapsed, 3)
+            stats["records_per_second"] = round(stats["total"] / elapsed, 1) if elapsed > 0 else None
+            
+            logger.info(f"    Inserted: {stats['inserted']}, Updated: {stats['updated']}, Skipped: {stats['skipped']} "
+                        f"({stats['skipped_by_index']} by fingerprint index), Failed: {stats['failed']}")
+            logger.info(f"    Throughput: {stats['records_per_second']} records/s ({stats['mode']} mode)")
             
             return {
                 "status": "success",
@@ -435,6 +441,260 @@ class DataPipelineService:
                 "error": str(e)
             }
     
+    @staticmethod
+    def _count_records(records: Iterable[Dict], stats: Dict) -> Iterator[Dict]:
+        """Đếm stats["total"] trong lúc stream records"""
+        for record in records:
+            stats["total"] += 1
+            yield record
+    
+    def _article_params(self, record: Dict) -> Dict:
+        """Map processed record → bind params cho ARTICLE_COLUMNS"""
+        metadata = record.get('metadata', {})
+        reactions = metadata.get('reactions', {})
+        
+        return {
+            "title": record.get('title_cleaned', record.get('title')),
+            "content": record.get('content_cleaned', record.get('content')),
+            "url": record.get('url'),
+            "source": record.get('source', 'external'),
+            "source_type": record.get('source_type', 'facebook'),
+            "domain": record.get('domain'),
+            "category": record.get('category'),
+            "published_datetime": record.get('published_at'),
+            "published_date": _to_unix(record.get('published_at')),
+            "created_at": _to_unix(record.get('created_at')),
+            "updated_at": _to_unix(record.get('updated_at')),
+            "likes_count": record.get('likes_count', 0),
+            "shares_count": record.get('shares_count', 0),
+            "comments_count": record.get('comments_count', 0),
+            "views_count": record.get('views_count', 0),
+            "reactions": json.dumps(reactions) if reactions else None,
+            "social_platform": record.get('social_platform', record.get('platform', 'facebook')),
+            "account_name": record.get('account_name'),
+            "account_id": record.get('account_id'),
+            "account_url": record.get('account_url'),
+            "post_id": record.get('post_id'),
+            "post_type": record.get('post_type'),
+            "tags": json.dumps(record.get('tags')) if record.get('tags') else None,
+            "images": json.dumps(record.get('images')) if record.get('images') else None,
+            "videos": json.dumps(record.get('videos')) if record.get('videos') else None,
+            "summary": record.get('summary'),
+            "word_count": record.get('word_count', record.get('content_length')),
+            "raw_metadata": json.dumps(record.get('raw_metadata', metadata))
+        }
+    
+    def _load_records_one_by_one(
+        self,
+        records: Iterable[Dict],
+        update_existing: bool,
+        store,
+        stats: Dict
+    ):
+        """Row mode: SELECT + INSERT/UPDATE + commit cho từng record"""
+        insert_query = text(f"""
+            INSERT INTO articles ({", ".join(ARTICLE_COLUMNS)})
+            VALUES ({", ".join(":" + col for col in ARTICLE_COLUMNS)})
+        """)
+        
+        for record in records:
+            try:
+                url = record.get('url')
+                
+                if url and store is not None and not update_existing and store.has_url(url):
+                    stats["skipped"] += 1
+                    stats["skipped_by_index"] += 1
+                    continue
+                
+                # Check if exists
+                if url:
+                    existing = self.db.execute(
+                        text("SELECT id FROM articles WHERE url = :url"),
+                        {"url": url}
+                    ).fetchone()
+                    
+                    if existing:
+                        if store is not None:
+                            store.add(url=url)
+                        if update_existing:
+                            # Update
+                            update_query = text("""
+                                UPDATE articles
+                                SET title = :title,
+                                    content = :content,
+                                    category = :category,
+                                    updated_at = NOW()
+                                WHERE url = :url
+                            """)
+                            self.db.execute(update_query, {
+                                "title": record.get('title_cleaned', record.get('title')),
+                                "content": record.get('content_cleaned', record.get('content')),
+                                "category": record.get('category'),
+                                "url": url
+                            })
+                            self.db.commit()  # Commit per record
+                            stats["updated"] += 1
+                        else:
+                            stats["skipped"] += 1
+                        continue
+                
+                # Insert new - với đầy đủ fields
+                self.db.execute(insert_query, self._article_params(record))
+                self.db.commit()  # Commit per record
+                stats["inserted"] += 1
+                if store is not None and url:
+                    store.add(url=url)
+                
+            except Exception as e:
+                logger.error(f"   Failed to load record: {e}")
+                logger.error(f"   Record URL: {record.get('url')}")
+                self.db.rollback()  # Rollback chỉ record này
+                stats["failed"] += 1
+                continue
+    
+    def _bulk_load_records(
+        self,
+        records: Iterable[Dict],
+        update_existing: bool,
+        store,
+        stats: Dict,
+        batch_size: int
+    ):
+        """
+        Bulk mode: multi-row INSERT ... ON CONFLICT (url) theo batch, commit mỗi batch
+        
+        Batch lỗi được chia đôi và thử lại (bisect), nên một record hỏng chỉ
+        làm tốn thêm O(log batch_size) statements thay vì fallback từng record.
+        """
+        # Postgres giới hạn 65535 bind params mỗi statement
+        batch_size = max(1, min(batch_size, 65535 // len(ARTICLE_COLUMNS)))
+        
+        # Pre-filter: URL thiếu / đã biết / trùng trong file (ON CONFLICT không
+        # cho phép update cùng một row hai lần trong một statement)
+        seen_urls = set()
+        batch: List[Dict] = []
+        stats["batches"] = 0
+        
+        for record in records:
+            url = record.get('url')
+            if not url:
+                stats["failed"] += 1
+                continue
+            if store is not None and not update_existing and store.has_url(url):
+                stats["skipped"] += 1
+                stats["skipped_by_index"] += 1
+                continue
+            if url in seen_urls:
+                stats["skipped"] += 1
+                continue
+            seen_urls.add(url)
+            batch.append(record)
+            
+            if len(batch) >= batch_size:
+                self._upsert_batch(batch, update_existing, store, stats)
+                stats["batches"] += 1
+                batch = []
+        
+        if batch:
+            self._upsert_batch(batch, update_existing, store, stats)
+            stats["batches"] += 1
+    
+    def _upsert_batch(
+        self,
+        batch: List[Dict],
+        update_existing: bool,
+        store,
+        stats: Dict
+    ):
+        """Upsert một batch; nếu lỗi thì bisect để cô lập record hỏng"""
+        try:
+            params = {}
+            values = []
+            for i, record in enumerate(batch):
+                for col, value in self._article_params(record).items():
+                    params[f"{col}_{i}"] = value
+                values.append("(" + ", ".join(f":{col}_{i}" for col in ARTICLE_COLUMNS) + ")")
+            
+            if update_existing:
+                conflict = """
+                    ON CONFLICT (url) DO UPDATE
+                    SET title = EXCLUDED.title,
+                        content = EXCLUDED.content,
+                        category = EXCLUDED.category,
+                        updated_at = EXTRACT(EPOCH FROM NOW())
+                """
+            else:
+                conflict = "ON CONFLICT (url) DO NOTHING"
+            
+            # xmax = 0 → row mới insert, ngược lại là row đã tồn tại và được update
+            query = text(f"""
+                INSERT INTO articles ({", ".join(ARTICLE_COLUMNS)})
+                VALUES {", ".join(values)}
+                {conflict}
+                RETURNING (xmax = 0) AS inserted
+            """)
+            
+            returned = [row[0] for row in self.db.execute(query, params)]
+            self.db.commit()
+            
+        except Exception as e:
+            self.db.rollback()
+            if len(batch) == 1:
+                logger.error(f"   Failed to load record: {e}")
+                logger.error(f"   Record URL: {batch[0].get('url')}")
+                stats["failed"] += 1
+                return
+            
+            logger.warning(f"   Batch of {len(batch)} failed, bisecting: {e}")
+            mid = len(batch) // 2
+            self._upsert_batch(batch[:mid], update_existing, store, stats)
+            self._upsert_batch(batch[mid:], update_existing, store, stats)
+            return
+        
+        inserted = sum(1 for flag in returned if flag)
+        stats["inserted"] += inserted
+        stats["updated"] += len(returned) - inserted
+        stats["skipped"] += len(batch) - len(returned)
+        
+        if store is not None:
+            for record in batch:
+                store.add(url=record['url'])
+    
+    def rebuild_fingerprint_stores(self, batch_size: int = 5000) -> Dict:
+        """
+        Dựng lại fingerprint stores từ bảng articles
+        
+        Gọi sau khi xoá / khôi phục article rows: store chỉ append nên URL của
+        row đã xoá vẫn bị loader bỏ qua (và deduper coi là trùng) cho đến khi
+        dựng lại.
+        
+        Returns:
+            Dict với số records của từng store
+        """
+        from app.services.etl.hybrid_dedupe import get_hybrid_deduplicator
+        
+        deduplicator = get_hybrid_deduplicator()
+        urls = []
+        documents = []
+        rows = self.db.execute(
+            text("SELECT url, content FROM articles WHERE url IS NOT NULL OR content IS NOT NULL"),
+            execution_options={"yield_per": batch_size}
+        )
+        for url, content in rows:
+            if url:
+                urls.append((url, None, None))
+            simhash = deduplicator._compute_simhash(content) if content else None
+            documents.append((url, content, simhash))
+        
+        articles_count = get_fingerprint_store().rebuild(urls)
+        dedupe_count = get_fingerprint_store(DEDUPE_NAMESPACE).rebuild(documents)
+        logger.info(f"Fingerprint stores rebuilt: {articles_count} article URLs, {dedupe_count} dedupe records")
+        return {
+            "status": "success",
+            "articles": articles_count,
+            "dedupe": dedupe_count
+        }
+    
     def get_processed_data_for_training(
         self,
         processed_file: Optional[str] = None,
@@ -444,7 +704,7 @@ class DataPipelineService:
         Step 4: Load processed data cho training
         
         Args:
-            processed_file: Path to specific file (None = latest)
+            processed_file: Path to specific file, .jsonl[.gz|.zst] hoặc .json (None = latest)
             limit: Số records tối đa
         
         Returns:
@@ -456,7 +716,10 @@ class DataPipelineService:
             # Find file
             if not processed_file:
                 # Get latest processed file
-                processed_files = sorted(self.processed_dir.glob("processed_*.json"))
+                processed_files = sorted(
+                    f for f in self.processed_dir.glob("processed_*")
+                    if f.name.endswith(".json") or is_jsonl(f)
+                )
                 if not processed_files:
                     return {
                         "status": "error",
@@ -464,13 +727,10 @@ class DataPipelineService:
                     }
                 processed_file = processed_files[-1]
             
-            # Load data
-            with open(processed_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Apply limit
+            # Stream data, apply limit
+            data = iter_records(processed_file)
             if limit:
-                data = data[:limit]
+                data = islice(data, limit)
             
             # Prepare documents
             documents = []
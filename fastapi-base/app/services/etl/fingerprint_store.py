@@ -0,0 +1,258 @@
+"""
+Fingerprint Store - Persistent cross-run dedupe index for the ETL pipeline
+
+Stores (URL hash, content hash, SimHash) for every record the pipeline has
+kept, so re-crawled posts are dropped before any DB work.
+
+On-disk format: append-only file of fixed 24-byte records (3 x uint64,
+little-endian). The file is memory-mapped on load, new records are appended
+per batch under an exclusive file lock, and other processes pick them up
+with refresh(). A value of 0 means "field not present".
+
+Each namespace has its own file, so producers do not see each other's records:
+  - articles: URLs committed to the articles table (written by the DB loader
+    only after a successful commit, used to skip known rows)
+  - dedupe:   fingerprints of documents kept by HybridDeduplicator
+
+The file is append-only; when article rows are deleted or restored, rebuild the
+store from the source of truth with rebuild() (see DataPipeline.rebuild_fingerprint_stores).
+"""
+import fcntl
+import hashlib
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.etl.simhash_index import SimHashIndex
+
+logger = logging.getLogger(__name__)
+
+RECORD_DTYPE = np.dtype([("url", "<u8"), ("content", "<u8"), ("simhash", "<u8")])
+
+STORE_DIR = Path("data") / "dedupe_index"
+
+ARTICLES_NAMESPACE = "articles"
+DEDUPE_NAMESPACE = "dedupe"
+
+DEFAULT_STORE_PATH = STORE_DIR / f"{ARTICLES_NAMESPACE}.bin"
+
+
+def fingerprint64(text: str) -> int:
+    """Stable 64-bit fingerprint of normalized text (0 is reserved for 'absent')"""
+    normalized = text.lower().strip()
+    digest = hashlib.md5(normalized.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little') or 1
+
+
+class FingerprintStore:
+    """
+    Memory-mapped fingerprint store with in-memory lookup structures
+
+    - URL / content hashes: Python sets (O(1) membership)
+    - SimHashes: SimHashIndex (banded LSH) for near-duplicate lookup
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_STORE_PATH,
+        simhash_max_distance: int = 2,
+        simhash_index: str = "lsh"
+    ):
+        """
+        Initialize and load fingerprint store
+
+        Args:
+            path: Path to the fingerprint file
+            simhash_max_distance: Max Hamming distance for near-duplicates
+            simhash_index: SimHashIndex mode ('linear', 'numpy', 'lsh')
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self.lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+        self.simhash_max_distance = simhash_max_distance
+        self.simhash_index = simhash_index
+
+        self._reset()
+        self.refresh()
+        logger.info(f"Fingerprint store loaded: {self._loaded} records from {self.path}")
+
+    def _reset(self):
+        """Clear the in-memory lookup structures"""
+        self._urls = set()
+        self._contents = set()
+        self._simhashes = SimHashIndex(max_distance=self.simhash_max_distance, mode=self.simhash_index)
+
+        # Number of on-disk records already indexed (of file inode _inode)
+        self._loaded = 0
+        self._inode = None
+        self._pending: List[tuple] = []
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock shared by flush() and rebuild() across processes"""
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return self._loaded + len(self._pending)
+
+    def refresh(self) -> int:
+        """
+        Index records appended to the file since the last load
+        (by this or another process)
+
+        Returns:
+            Number of new records indexed
+        """
+        stat = self.path.stat()
+        if self._inode is not None and stat.st_ino != self._inode:
+            # File was rebuilt (replaced): re-index from scratch, keep pending records
+            pending = self._pending
+            self._reset()
+            self._pending = pending
+            if pending:
+                self._index(np.array(pending, dtype=RECORD_DTYPE))
+        self._inode = stat.st_ino
+
+        total = stat.st_size // RECORD_DTYPE.itemsize
+        if total <= self._loaded:
+            return 0
+
+        records = np.memmap(
+            self.path,
+            dtype=RECORD_DTYPE,
+            mode='r',
+            offset=self._loaded * RECORD_DTYPE.itemsize,
+            shape=(total - self._loaded,)
+        )
+        self._index(records)
+        new_count = total - self._loaded
+        self._loaded = total
+        del records
+        return new_count
+
+    def _index(self, records: np.ndarray):
+        """Add records to the in-memory lookup structures"""
+        urls = records["url"]
+        contents = records["content"]
+        self._urls.update(urls[urls != 0].tolist())
+        self._contents.update(contents[contents != 0].tolist())
+        for simhash in records["simhash"][records["simhash"] != 0].tolist():
+            self._simhashes.add(simhash)
+
+    def has_url(self, url: str) -> bool:
+        """Check if URL was seen before"""
+        return bool(url) and fingerprint64(url) in self._urls
+
+    def has_content(self, content: str) -> bool:
+        """Check if exact content was seen before"""
+        return bool(content) and fingerprint64(content) in self._contents
+
+    def has_near_simhash(self, simhash: int) -> bool:
+        """Check if a near-duplicate SimHash was seen before"""
+        return bool(simhash) and self._simhashes.find_near(simhash) is not None
+
+    def add(
+        self,
+        url: Optional[str] = None,
+        content: Optional[str] = None,
+        simhash: Optional[int] = None
+    ):
+        """
+        Add a record fingerprint (indexed immediately, persisted on flush)
+        """
+        url_fp = fingerprint64(url) if url else 0
+        content_fp = fingerprint64(content) if content else 0
+        simhash = simhash or 0
+
+        if url_fp:
+            self._urls.add(url_fp)
+        if content_fp:
+            self._contents.add(content_fp)
+        if simhash:
+            self._simhashes.add(simhash)
+
+        self._pending.append((url_fp, content_fp, simhash))
+
+    def rebuild(self, records: Iterable[Tuple[Optional[str], Optional[str], Optional[int]]]) -> int:
+        """
+        Replace the whole store with the given (url, content, simhash) records
+
+        Used when the source of truth changed in ways an append-only file cannot
+        express (article rows deleted or restored). Pending records are dropped.
+
+        Returns:
+            Number of records written
+        """
+        rows = np.array([
+            (fingerprint64(url) if url else 0, fingerprint64(content) if content else 0, simhash or 0)
+            for url, content, simhash in records
+        ], dtype=RECORD_DTYPE)
+
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with self._locked():
+            with open(tmp_path, 'wb') as tmp:
+                tmp.write(rows.tobytes())
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, self.path)
+
+        self._reset()
+        self.refresh()
+        logger.info(f"Fingerprint store rebuilt: {len(rows)} records in {self.path}")
+        return len(rows)
+
+    def flush(self) -> int:
+        """
+        Append pending fingerprints to disk
+
+        Returns:
+            Number of records written
+        """
+        if not self._pending:
+            return 0
+
+        batch = np.array(self._pending, dtype=RECORD_DTYPE)
+
+        with self._locked():
+            # Pick up other writers (or a rebuild) first so our offset stays correct
+            self.refresh()
+            with open(self.path, 'ab') as f:
+                f.write(batch.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._loaded += len(batch)
+
+        self._pending.clear()
+        logger.info(f"Fingerprint store: appended {len(batch)} records ({self._loaded} total)")
+        return len(batch)
+
+    def get_stats(self) -> Dict:
+        """Get store statistics"""
+        return {
+            "path": str(self.path),
+            "records": len(self),
+            "pending": len(self._pending),
+            "url_hashes": len(self._urls),
+            "content_hashes": len(self._contents),
+            "simhashes": len(self._simhashes)
+        }
+
+
+# Global instances (one per namespace)
+_fingerprint_stores: Dict[str, FingerprintStore] = {}
+
+def get_fingerprint_store(namespace: str = ARTICLES_NAMESPACE) -> FingerprintStore:
+    """Get or create the global fingerprint store of a namespace"""
+    if namespace not in _fingerprint_stores:
+        _fingerprint_stores[namespace] = FingerprintStore(STORE_DIR / f"{namespace}.bin")
+    return _fingerprint_stores[namespace]
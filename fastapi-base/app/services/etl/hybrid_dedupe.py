@@ -3,9 +3,12 @@ Hybrid Deduplicator - Combine hash-based + semantic deduplication
 """
 import hashlib
 import logging
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Optional
 from collections import defaultdict
 
+from app.services.etl.simhash_index import SimHashIndex, INDEX_MODES
+from app.services.etl.fingerprint_store import FingerprintStore, get_fingerprint_store, DEDUPE_NAMESPACE
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,11 +16,14 @@ class HybridDeduplicator:
     """
     Hybrid Deduplication Strategy:
     1. Fast hash-based deduplication (exact matches)
-    2. Semantic LLM-based deduplication (paraphrases/similar content)
+    2. Semantic deduplication (paraphrases/similar content)
+       - embedding: encode once + FAISS nearest neighbours (default)
+       - llm: pairwise LLM calls (legacy, capped at 50 documents)
     
     Optimized for cost:
     - Hash dedupe: Free, instant
-    - Semantic dedupe: Expensive, only for remaining duplicates
+    - Embedding dedupe: Local model, scales to the whole batch
+    - LLM: Only for borderline pairs (optional) or legacy mode
     """
     
     def __init__(
@@ -25,7 +31,16 @@ class HybridDeduplicator:
         hash_threshold: float = 0.9,
         semantic_threshold: float = 0.85,
         topicgpt_service=None,
-        enable_semantic: bool = True
+        enable_semantic: bool = True,
+        simhash_index: str = "lsh",
+        simhash_max_distance: int = 2,
+        fingerprint_store: Optional[FingerprintStore] = None,
+        semantic_method: str = "embedding",
+        embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        semantic_neighbors: int = 10,
+        escalate_borderline: bool = False,
+        borderline_margin: float = 0.05,
+        max_llm_pairs: int = 100
     ):
         """
         Initialize Hybrid Deduplicator
@@ -35,18 +50,44 @@ class HybridDeduplicator:
             semantic_threshold: Similarity threshold for semantic matching
             topicgpt_service: TopicGPT service instance
             enable_semantic: Enable semantic deduplication (costly)
+            simhash_index: Near-duplicate index mode ('linear', 'numpy', 'lsh')
+            simhash_max_distance: Max Hamming distance for SimHash near-duplicates
+            fingerprint_store: Persistent store to dedupe against previous runs
+            semantic_method: 'embedding' (FAISS neighbours) or 'llm' (pairwise LLM)
+            embedding_model: SentenceTransformer model for embedding dedupe
+            semantic_neighbors: Neighbours checked per document (k)
+            escalate_borderline: Ask the LLM about pairs just below semantic_threshold
+            borderline_margin: Width of the borderline band below semantic_threshold
+            max_llm_pairs: Max borderline pairs sent to the LLM per batch
         """
         self.hash_threshold = hash_threshold
         self.semantic_threshold = semantic_threshold
         self.enable_semantic = enable_semantic
         
+        if simhash_index not in INDEX_MODES:
+            raise ValueError(f"Unknown simhash index mode: {simhash_index}")
+        self.simhash_index = simhash_index
+        self.simhash_max_distance = simhash_max_distance
+        self.fingerprint_store = fingerprint_store
+        
+        if semantic_method not in ("embedding", "llm"):
+            raise ValueError(f"Unknown semantic method: {semantic_method}")
+        self.semantic_method = semantic_method
+        self.embedding_model_name = embedding_model
+        self.embedding_model = None
+        self.semantic_neighbors = semantic_neighbors
+        self.escalate_borderline = escalate_borderline
+        self.borderline_margin = borderline_margin
+        self.max_llm_pairs = max_llm_pairs
+        
         # Hash storage
         self.seen_hashes: Set[str] = set()
         self.url_hashes: Dict[str, str] = {}
         self.content_hashes: Dict[str, str] = {}
         
-        # Initialize TopicGPT service for semantic matching
-        if enable_semantic:
+        # Initialize TopicGPT service (LLM mode or borderline escalation)
+        self.topicgpt = None
+        if enable_semantic and (semantic_method == "llm" or escalate_borderline):
             if topicgpt_service:
                 self.topicgpt = topicgpt_service
             else:
@@ -54,11 +95,15 @@ class HybridDeduplicator:
                 self.topicgpt = get_topicgpt_service()
             
             if not self.topicgpt.is_available():
-                logger.warning("TopicGPT not available - semantic dedupe disabled")
-                self.enable_semantic = False
+                if semantic_method == "llm":
+                    logger.warning("TopicGPT not available - semantic dedupe disabled")
+                    self.enable_semantic = False
+                else:
+                    logger.warning("TopicGPT not available - borderline escalation disabled")
+                    self.escalate_borderline = False
         
         logger.info(f"Hybrid Deduplicator initialized "
-                   f"(semantic: {'enabled' if self.enable_semantic else 'disabled'})")
+                   f"(semantic: {self.semantic_method if self.enable_semantic else 'disabled'})")
     
     def _compute_hash(self, text: str, method: str = "md5") -> str:
         """Compute hash of text"""
@@ -83,8 +128,11 @@ class HybridDeduplicator:
         v = [0] * num_bits
         
         for token in tokens:
-            # Hash token
-            h = hash(token)
+            # Hash token (stable across processes, unlike hash())
+            h = int.from_bytes(
+                hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(),
+                'little'
+            )
             
             # Update bit vector
             for i in range(num_bits):
@@ -151,6 +199,10 @@ class HybridDeduplicator:
             unique_docs = self._semantic_deduplicate(unique_docs)
             logger.info(f"After semantic dedupe: {len(unique_docs)} documents")
         
+        # Persist fingerprints of this batch for the next run
+        if self.fingerprint_store is not None:
+            self.fingerprint_store.flush()
+        
         logger.info(f"Final: {len(unique_docs)}/{len(documents)} unique documents")
         return unique_docs
     
@@ -165,10 +217,18 @@ class HybridDeduplicator:
         - Exact URL matches
         - Exact content matches
         - Near-duplicate detection with SimHash
+        - Matches against previous runs (if fingerprint_store is set)
         """
+        store = self.fingerprint_store
+        if store is not None:
+            store.refresh()
+        
         unique_docs = []
         seen_exact = set()
-        simhashes = {}
+        simhashes = SimHashIndex(
+            max_distance=self.simhash_max_distance,
+            mode=self.simhash_index
+        )
         
         for doc in documents:
             # Extract URL and content
@@ -182,15 +242,17 @@ class HybridDeduplicator:
             # Check exact URL match
             if use_url and url:
                 url_hash = self._compute_hash(url)
-                if url_hash in seen_exact:
+                if url_hash in seen_exact or (store is not None and store.has_url(url)):
                     logger.debug(f"Duplicate URL: {url[:50]}")
                     continue
                 seen_exact.add(url_hash)
             
+            simhash = None
+            
             # Check exact content match
             if use_content and content:
                 content_hash = self._compute_hash(content)
-                if content_hash in seen_exact:
+                if content_hash in seen_exact or (store is not None and store.has_content(content)):
                     logger.debug(f"Duplicate content: {content[:50]}")
                     continue
                 seen_exact.add(content_hash)
@@ -199,32 +261,174 @@ class HybridDeduplicator:
                 simhash = self._compute_simhash(content)
                 
                 # Check against existing simhashes
-                is_near_duplicate = False
-                for existing_hash, _ in simhashes.items():
-                    distance = self._hamming_distance(simhash, existing_hash)
-                    # If Hamming distance < 3 bits, consider near-duplicate
-                    if distance < 3:
-                        is_near_duplicate = True
-                        logger.debug(f"Near-duplicate detected (distance: {distance})")
-                        break
-                
-                if is_near_duplicate:
+                match = simhashes.find_near(simhash)
+                if match is not None:
+                    logger.debug(f"Near-duplicate detected (distance: {match[1]})")
+                    continue
+                if store is not None and store.has_near_simhash(simhash):
+                    logger.debug("Near-duplicate of a previous run detected")
                     continue
                 
-                simhashes[simhash] = content[:100]
+                simhashes.add(simhash)
+            
+            if store is not None:
+                store.add(
+                    url=url if use_url else None,
+                    content=content if use_content else None,
+                    simhash=simhash
+                )
             
             # Add to unique documents
             unique_docs.append(doc)
         
         return unique_docs
     
-    def _semantic_deduplicate(
+    def _semantic_deduplicate(self, documents: List[Dict]) -> List[Dict]:
+        """Stage 2: Semantic deduplication (embedding or LLM)"""
+        if self.semantic_method == "llm":
+            return self._semantic_deduplicate_llm(documents)
+        return self._semantic_deduplicate_embedding(documents)
+    
+    def _get_embedding_model(self):
+        """Lazy-load SentenceTransformer model"""
+        if self.embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+            self.embedding_model = SentenceTransformer(self.embedding_model_name, device='cpu')
+            logger.info(f"Dedupe embedding model loaded: {self.embedding_model_name}")
+        return self.embedding_model
+    
+    def _semantic_deduplicate_embedding(
+        self,
+        documents: List[Dict],
+        max_chars: int = 1000,
+        encode_batch_size: int = 64
+    ) -> List[Dict]:
+        """
+        Stage 2: Semantic deduplication using embeddings + FAISS
+        - Encode every document once (batched)
+        - k nearest neighbours per document via FAISSIndexer
+        - Union pairs with cosine >= semantic_threshold into groups
+        - Optionally ask the LLM about borderline pairs
+        - Keep best document from each group
+        
+        Args:
+            documents: Pre-filtered documents from hash dedupe
+            max_chars: Characters per document fed to the encoder
+            encode_batch_size: Encoder batch size
+        
+        Returns:
+            Deduplicated documents
+        """
+        contents = [doc.get('cleaned_content') or doc.get('content', '') for doc in documents]
+        
+        # Same rule as LLM mode: short documents are never merged
+        candidates = [i for i, content in enumerate(contents) if len(content) >= 200]
+        if len(candidates) < 2:
+            return documents
+        
+        try:
+            from app.services.topic.indexer import FAISSIndexer
+            from app.services.topic.embedding_store import get_embedding_store
+            model = self._get_embedding_model()
+        except ImportError as e:
+            logger.warning(f"Embedding dedupe not available: {e}")
+            return documents
+        
+        embeddings = get_embedding_store(self.embedding_model_name).encode(
+            model,
+            [contents[i][:max_chars] for i in candidates],
+            batch_size=encode_batch_size
+        )
+        
+        indexer = FAISSIndexer(dimension=embeddings.shape[1])
+        indexer.build(embeddings, doc_ids=[str(i) for i in candidates])
+        
+        k = min(self.semantic_neighbors + 1, len(candidates))  # +1: self match
+        similarities, neighbors = indexer.search_batch(embeddings, k=k)
+        
+        # Union-find over candidate positions
+        parent = list(range(len(candidates)))
+        
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+        
+        def union(a: int, b: int):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+        
+        borderline_pairs: Dict[Tuple[int, int], float] = {}
+        low = self.semantic_threshold - self.borderline_margin
+        
+        # kNN lists are not symmetric, so every pair is checked from both sides
+        for a in range(len(candidates)):
+            for sim, b in zip(similarities[a], neighbors[a]):
+                b = int(b)
+                if b < 0 or b == a:
+                    continue
+                if sim >= self.semantic_threshold:
+                    union(a, b)
+                elif self.escalate_borderline and sim >= low:
+                    pair = (min(a, b), max(a, b))
+                    borderline_pairs[pair] = max(float(sim), borderline_pairs.get(pair, 0.0))
+        
+        borderline = [(sim, a, b) for (a, b), sim in borderline_pairs.items()]
+        if borderline:
+            self._escalate_borderline_pairs(borderline, candidates, contents, find, union)
+        
+        # Group documents (non-candidates stay on their own)
+        groups: Dict[int, List[int]] = {}
+        group_of = {doc_idx: find(pos) for pos, doc_idx in enumerate(candidates)}
+        for i in range(len(documents)):
+            key = candidates[group_of[i]] if i in group_of else i
+            groups.setdefault(key, []).append(i)
+        
+        # Keep best document from each group (longest content), in original order
+        unique_docs = []
+        for key in sorted(groups):
+            best_idx = max(groups[key], key=lambda idx: len(contents[idx]))
+            unique_docs.append(documents[best_idx])
+        
+        logger.info(f"Semantic dedupe (embedding): {len(documents)} -> {len(unique_docs)} documents "
+                   f"({len(borderline)} borderline pairs)")
+        
+        return unique_docs
+    
+    def _escalate_borderline_pairs(self, borderline, candidates, contents, find, union):
+        """Ask the LLM about the most similar borderline pairs"""
+        borderline.sort(reverse=True)
+        checked = 0
+        
+        for sim, a, b in borderline:
+            if checked >= self.max_llm_pairs:
+                logger.warning(f"Borderline pairs capped at {self.max_llm_pairs}")
+                break
+            if find(a) == find(b):
+                continue
+            
+            try:
+                similarity = self.topicgpt.detect_similarity(
+                    text1=contents[candidates[a]],
+                    text2=contents[candidates[b]],
+                    max_chars=300
+                )
+                checked += 1
+                if similarity >= self.semantic_threshold:
+                    union(a, b)
+                    logger.info(f"LLM confirmed borderline pair (cosine {sim:.2f}, llm {similarity:.2f})")
+            except Exception as e:
+                logger.warning(f"Error checking similarity: {e}")
+    
+    def _semantic_deduplicate_llm(
         self,
         documents: List[Dict],
         batch_size: int = 50
     ) -> List[Dict]:
         """
-        Stage 2: Semantic deduplication using LLM
+        Stage 2 (legacy): Semantic deduplication using pairwise LLM calls
         - Detect paraphrased content
         - Group similar articles
         - Keep best from each group
@@ -236,7 +440,7 @@ class HybridDeduplicator:
         Returns:
             Deduplicated documents
         """
-        if not self.enable_semantic or not self.topicgpt.is_available():
+        if not self.enable_semantic or not self.topicgpt or not self.topicgpt.is_available():
             logger.warning("Semantic dedupe not available")
             return documents
         
@@ -370,9 +574,12 @@ class HybridDeduplicator:
             "hash_threshold": self.hash_threshold,
             "semantic_threshold": self.semantic_threshold,
             "semantic_enabled": self.enable_semantic,
+            "semantic_method": self.semantic_method,
+            "simhash_index": self.simhash_index,
             "seen_hashes": len(self.seen_hashes),
             "url_hashes": len(self.url_hashes),
-            "content_hashes": len(self.content_hashes)
+            "content_hashes": len(self.content_hashes),
+            "fingerprint_store": self.fingerprint_store.get_stats() if self.fingerprint_store is not None else None
         }
 
 
@@ -380,8 +587,8 @@ class HybridDeduplicator:
 _deduplicator = None
 
 def get_hybrid_deduplicator() -> HybridDeduplicator:
-    """Get or create global hybrid deduplicator"""
+    """Get or create global hybrid deduplicator (own fingerprint namespace, not the loader's URL index)"""
     global _deduplicator
     if _deduplicator is None:
-        _deduplicator = HybridDeduplicator()
+        _deduplicator = HybridDeduplicator(fingerprint_store=get_fingerprint_store(DEDUPE_NAMESPACE))
     return _deduplicator
@@ -0,0 +1,545 @@
+"""
+Ingest Service - Ghi documents vào articles + sentiment_analysis (dùng chung cho /ingest và /sync)
+
+Pipeline mỗi batch (batch_size documents):
+  1. normalize_and_validate + classify (CPU, trong worker thread)
+  2. Một query `SELECT url FROM articles WHERE url IN (...)` cho cả batch
+  3. Bulk INSERT articles (RETURNING id) + bulk INSERT sentiment_analysis, một commit
+  4. Cuối mỗi lần ingest: cộng các dòng sentiment mới vào daily_sentiment_rollup
+
+Endpoint async không chạy pipeline trên event loop: `submit()` đưa job vào
+hàng đợi có giới hạn (queue.Full khi quá tải) và trả về IngestJob ngay; worker
+threads xử lý nền, caller poll trạng thái bằng job_id.
+
+Configuration (env):
+  INGEST_WORKERS      Số worker threads (mặc định 2)
+  INGEST_QUEUE_SIZE   Số job chờ tối đa (mặc định 100)
+  INGEST_BATCH_SIZE   Documents mỗi batch insert (mặc định 200)
+"""
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class IngestJobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class IngestJob:
+    """Một lần ingest (trạng thái + kết quả, poll được qua job_id)"""
+
+    def __init__(self, documents: List[Dict[str, Any]], skip_duplicates: bool, analyze_sentiment: bool, update_stats: bool):
+        self.job_id = uuid.uuid4().hex
+        self.documents = documents
+        self.total = len(documents)
+        self.skip_duplicates = skip_duplicates
+        self.analyze_sentiment = analyze_sentiment
+        self.update_stats = update_stats
+
+        self.status = IngestJobStatus.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.processed = 0
+        self.result: Dict[str, Any] = {"saved": 0, "skipped": 0, "sentiment_analyzed": 0, "errors": []}
+        self.error: Optional[str] = None
+
+        # Resolved khi job xong - cho caller muốn chờ (asyncio.wrap_future)
+        self.future: Future = Future()
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            "finished_at": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            "elapsed_seconds": elapsed,
+            **{k: v for k, v in self.result.items() if k != "errors"},
+            "errors": self.result["errors"][:10],
+            "error": self.error
+        }
+
+
+def _parse_published(value: Any) -> Tuple[Optional[float], Optional[datetime]]:
+    """metadata.published (timestamp hoặc ISO string) -> (timestamp, datetime)"""
+    if not value:
+        return None, None
+    try:
+        if isinstance(value, (int, float)):
+            return float(value), datetime.fromtimestamp(value)
+        published = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        return published.timestamp(), published
+    except (ValueError, TypeError, OverflowError, OSError):
+        return None, None
+
+
+class IngestService:
+    """Bounded job queue + worker pool + batched ingest vào DB"""
+
+    def __init__(self, workers: int = 2, queue_size: int = 100, batch_size: int = 200, max_jobs_kept: int = 1000):
+        """
+        Args:
+            workers: Số worker threads xử lý job
+            queue_size: Số job chờ tối đa trong hàng đợi
+            batch_size: Documents mỗi lần bulk insert
+            max_jobs_kept: Số job (đã xong) giữ lại để poll
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_jobs_kept = max_jobs_kept
+
+        self._queue: "queue.Queue[IngestJob]" = queue.Queue(maxsize=queue_size)
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    # ============================================
+    # JOB QUEUE
+    # ============================================
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"ingest-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(
+        self,
+        documents: List[Dict[str, Any]],
+        skip_duplicates: bool = True,
+        analyze_sentiment: bool = True,
+        update_stats: bool = True
+    ) -> IngestJob:
+        """
+        Đưa job vào hàng đợi (không block)
+
+        Raises:
+            queue.Full: Hàng đợi đầy (caller trả 503 / thử lại sau)
+        """
+        self._ensure_workers()
+        job = IngestJob(documents, skip_duplicates, analyze_sentiment, update_stats)
+        self._queue.put_nowait(job)
+
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_jobs_kept:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.status in (IngestJobStatus.QUEUED, IngestJobStatus.RUNNING):
+                    break
+                self._jobs.pop(oldest_id)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_queue_stats(self) -> Dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "workers": self.workers,
+            "queue_size": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "running": statuses.count(IngestJobStatus.RUNNING),
+            "jobs_kept": len(statuses)
+        }
+
+    def _worker(self):
+        from app.core.database import SessionLocal
+
+        while True:
+            job = self._queue.get()
+            job.status = IngestJobStatus.RUNNING
+            job.started_at = time.time()
+            db = None
+            try:
+                # Trong try: lỗi mở session (pool cạn, DB down) chỉ làm fail job này
+                db = SessionLocal()
+                self.ingest(
+                    job.documents,
+                    skip_duplicates=job.skip_duplicates,
+                    analyze_sentiment=job.analyze_sentiment,
+                    db=db,
+                    job=job
+                )
+                if job.update_stats and job.result["saved"] > 0:
+                    job.result["stats_updated"] = self._update_statistics(db)
+                job.status = IngestJobStatus.COMPLETED
+            except Exception as e:
+                logger.error(f"Ingest job {job.job_id} failed: {e}", exc_info=True)
+                job.status = IngestJobStatus.FAILED
+                job.error = str(e)
+            finally:
+                if db is not None:
+                    try:
+                        db.close()
+                    except Exception as e:
+                        logger.warning(f"Could not close session for ingest job {job.job_id}: {e}")
+                job.finished_at = time.time()
+                job.documents = None  # giải phóng content
+                if not job.future.done():
+                    job.future.set_result(job.to_dict())
+                self._queue.task_done()
+
+    # ============================================
+    # INGEST
+    # ============================================
+
+    def ingest(
+        self,
+        documents: List[Dict[str, Any]],
+        skip_duplicates: bool = True,
+        analyze_sentiment: bool = True,
+        db: Optional[Session] = None,
+        job: Optional[IngestJob] = None
+    ) -> Dict[str, Any]:
+        """
+        Ingest đồng bộ (gọi từ worker thread / background task, không gọi trên event loop)
+
+        Args:
+            documents: [{"source", "source_id", "content", "metadata"}]
+            skip_duplicates: Bỏ qua URL đã có trong DB (False = báo lỗi từng URL trùng)
+            analyze_sentiment: Ghi kèm sentiment_analysis
+            db: Session (None = tự mở SessionLocal)
+            job: Job để cập nhật progress
+
+        Returns:
+            {"saved", "skipped", "sentiment_analyzed", "errors"}
+        """
+        from app.services.sentiment import get_sentiment_analyzer
+        from app.services.classification import get_category_classifier
+
+        own_session = db is None
+        if own_session:
+            from app.core.database import SessionLocal
+            db = SessionLocal()
+
+        result = job.result if job else {"saved": 0, "skipped": 0, "sentiment_analyzed": 0, "errors": []}
+        analyzer = get_sentiment_analyzer() if analyze_sentiment else None
+        classifier = get_category_classifier()
+
+        try:
+            for start in range(0, len(documents), self.batch_size):
+                batch = documents[start:start + self.batch_size]
+                self._ingest_batch(db, batch, skip_duplicates, analyzer, classifier, result)
+                if job:
+                    job.processed += len(batch)
+            if result["sentiment_analyzed"] > 0:
+                self._update_rollup(db)
+            logger.info(
+                f"Ingested {len(documents)} docs: {result['saved']} saved, {result['skipped']} skipped"
+            )
+        finally:
+            if own_session:
+                db.close()
+        return result
+
+    def _ingest_batch(self, db: Session, batch: List[Dict[str, Any]], skip_duplicates: bool, analyzer, classifier, result: Dict):
+        prepared, skipped, errors = self.prepare_documents(batch, classifier)
+        result["skipped"] += skipped
+        result["errors"].extend(errors)
+        self.write_prepared(db, prepared, skip_duplicates, analyzer, result)
+
+    def prepare_documents(self, documents: List[Dict[str, Any]], classifier=None) -> Tuple[List[Dict], int, List]:
+        """
+        Normalize + validate + classify (không đụng DB, chạy được song song)
+
+        Returns:
+            (prepared rows, số doc bị bỏ qua, errors)
+        """
+        if classifier is None:
+            from app.services.classification import get_category_classifier
+            classifier = get_category_classifier()
+
+        prepared = []
+        skipped = 0
+        errors = []
+        for doc in documents:
+            source_id = doc.get("source_id")
+            try:
+                row, doc_errors = self._prepare_document(doc, classifier)
+            except Exception as e:
+                errors.append(f"{source_id}: {e}")
+                skipped += 1
+                continue
+            if doc_errors:
+                errors.append({"url": source_id, "errors": doc_errors})
+                skipped += 1
+                continue
+            prepared.append(row)
+        return prepared, skipped, errors
+
+    def write_prepared(self, db: Session, prepared: List[Dict], skip_duplicates: bool, analyzer, result: Dict):
+        """
+        Ghi một batch đã prepare: một query IN (...) check URL, bulk insert, một commit
+
+        Nếu bulk insert vẫn IntegrityError sau khi check lại, batch được ghi từng bài.
+
+        Args:
+            db: Session
+            prepared: Output của prepare_documents
+            skip_duplicates: False = báo lỗi từng URL đã tồn tại
+            analyzer: SentimentAnalyzer (None = không ghi sentiment)
+            result: Dict kết quả, cộng dồn saved/skipped/sentiment_analyzed/errors
+        """
+        from app.models import Article
+
+        unique = []
+        seen_urls = set()
+        for row in prepared:
+            if row["article"]["url"] in seen_urls:
+                result["skipped"] += 1
+                continue
+            seen_urls.add(row["article"]["url"])
+            unique.append(row)
+        prepared = unique
+
+        if not prepared:
+            return
+
+        for _ in range(2):
+            existing = set(db.execute(
+                select(Article.url).where(Article.url.in_([row["article"]["url"] for row in prepared]))
+            ).scalars())
+            if existing:
+                for row in prepared:
+                    if row["article"]["url"] in existing:
+                        result["skipped"] += 1
+                        if not skip_duplicates:
+                            result["errors"].append(f"{row['article']['url']}: URL already exists")
+                prepared = [row for row in prepared if row["article"]["url"] not in existing]
+                if not prepared:
+                    return
+
+            try:
+                saved, sentiment_saved = self._insert_rows(db, prepared, analyzer)
+                db.commit()
+                result["saved"] += saved
+                result["sentiment_analyzed"] += sentiment_saved
+                return
+            except IntegrityError:
+                # URL vừa được ghi bởi request song song -> check lại một lần
+                db.rollback()
+
+        # Vẫn xung đột -> ghi từng bài, chỉ bài lỗi bị bỏ qua (như ingest từng document trước đây)
+        self._write_rows_individually(db, prepared, skip_duplicates, analyzer, result)
+
+    def _write_rows_individually(self, db: Session, prepared: List[Dict], skip_duplicates: bool, analyzer, result: Dict):
+        """Fallback của write_prepared: một insert + commit mỗi bài"""
+        from app.models import Article
+
+        for row in prepared:
+            url = row["article"]["url"]
+            try:
+                saved, sentiment_saved = self._insert_rows(db, [row], analyzer)
+                db.commit()
+                result["saved"] += saved
+                result["sentiment_analyzed"] += sentiment_saved
+            except IntegrityError as e:
+                db.rollback()
+                result["skipped"] += 1
+                if db.execute(select(Article.id).where(Article.url == url)).first() is not None:
+                    if not skip_duplicates:
+                        result["errors"].append(f"{url}: URL already exists")
+                else:
+                    result["errors"].append(f"{url}: {e.orig}")
+
+    def _prepare_document(self, doc: Dict[str, Any], classifier) -> Tuple[Optional[Dict], List[str]]:
+        """Normalize + classify -> ({"article": row, "published_datetime"}, validation errors)"""
+        from app.services.etl.data_normalizer import normalize_and_validate
+        from app.utils.domain_utils import ensure_domain
+
+        doc = {
+            "source": doc.get("source", "web"),
+            "source_id": doc.get("source_id"),
+            "content": doc.get("content"),
+            "metadata": doc.get("metadata") or {}
+        }
+        normalized, is_valid, errors, warnings = normalize_and_validate(doc)
+        if not is_valid:
+            return None, errors or ["invalid document"]
+
+        metadata = normalized['metadata']
+        published_date, published_datetime = _parse_published(metadata.get("published"))
+
+        classification = classifier.classify(normalized['content'], metadata.get("title"))
+        final_category = metadata.get("category") or classification.category
+
+        engagement = metadata.get("engagement", {})
+        reactions = engagement.get("reactions", {})
+        likes = engagement.get("likes", 0)
+        shares = engagement.get("shares", 0)
+        comments = engagement.get("comments", 0)
+        views = engagement.get("views", 0)
+        engagement_rate = (likes + shares + comments) / views if views > 0 else None
+
+        social = metadata.get("social_account", {})
+        location = metadata.get("location", {})
+
+        # Ensure domain is filled
+        article_data = ensure_domain({
+            'url': normalized['url'],
+            'source': normalized['url'],
+            'domain': normalized['domain'],
+            'social_platform': normalized['platform'],
+            'account_name': social.get("account_name")
+        })
+
+        return {
+            "article": {
+                "url": article_data['url'],
+                "source_type": normalized['source_type'],
+                "source": article_data['source'],
+                "domain": article_data['domain'],
+                "title": metadata.get("title"),
+                "content": normalized['content'],
+                "summary": metadata.get("description"),
+                "author": metadata.get("author"),
+                "published_date": published_date,
+                "category": final_category,
+                "tags": metadata.get("tags"),
+                "images": metadata.get("images"),
+                "likes_count": likes,
+                "shares_count": shares,
+                "comments_count": comments,
+                "views_count": views,
+                "reactions": reactions if reactions else None,
+                "engagement_rate": engagement_rate,
+                "social_platform": normalized['platform'],
+                "account_id": social.get("account_id"),
+                "account_name": social.get("account_name"),
+                "account_url": social.get("account_url"),
+                "account_type": social.get("account_type"),
+                "account_followers": social.get("followers"),
+                "post_id": metadata.get("post_id"),
+                "post_type": metadata.get("post_type"),
+                "post_language": metadata.get("language", "vi"),
+                "province": location.get("province"),
+                "district": location.get("district"),
+                "ward": location.get("ward"),
+                "location_text": metadata.get("location_text") or location.get("location_text"),
+                "coordinates": location.get("coordinates"),
+                "is_cleaned": True,
+                "raw_metadata": metadata
+            },
+            "published_datetime": published_datetime
+        }, []
+
+    def _insert_rows(self, db: Session, prepared: List[Dict], analyzer) -> Tuple[int, int]:
+        """Bulk insert articles (RETURNING id theo thứ tự) + sentiment_analysis"""
+        from app.models import Article, SentimentAnalysis
+
+        article_ids = db.scalars(
+            insert(Article).returning(Article.id, sort_by_parameter_order=True),
+            [row["article"] for row in prepared]
+        ).all()
+
+        if analyzer is None:
+            return len(article_ids), 0
+
+        sentiments = analyzer.analyze_batch([row["article"]["content"] for row in prepared])
+        sentiment_rows = []
+        for article_id, row, sentiment in zip(article_ids, prepared, sentiments):
+            article = row["article"]
+            sentiment_rows.append({
+                "article_id": article_id,
+                "source_url": article["url"],
+                "source_domain": article["domain"],
+                "title": article["title"],
+                "emotion": sentiment.emotion,
+                "emotion_vi": sentiment.emotion_vi,
+                "emotion_icon": sentiment.icon,
+                "sentiment_group": sentiment.group,
+                "sentiment_group_vi": sentiment.group_vi,
+                "confidence": sentiment.confidence,
+                "emotion_scores": sentiment.all_scores,
+                "category": article["category"],
+                "published_date": row["published_datetime"],
+                "content_snippet": article["content"][:200] if article["content"] else None
+            })
+        db.execute(insert(SentimentAnalysis), sentiment_rows)
+        return len(article_ids), len(sentiment_rows)
+
+    def _update_rollup(self, db: Session):
+        """Cộng các dòng sentiment mới vào daily_sentiment_rollup (lỗi chỉ log, báo cáo sẽ tự dựng lại kỳ)"""
+        from app.services.statistics.rollup_service import get_sentiment_rollup_service
+
+        try:
+            get_sentiment_rollup_service(db).apply_new()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not update sentiment rollup: {e}")
+
+    def _update_statistics(self, db: Session) -> List[str]:
+        """Auto-update statistics sau khi có bài mới (giống /ingest cũ)"""
+        from app.models import SentimentAnalysis
+        from app.services.statistics import get_statistics_service
+        from app.services.trends import get_trend_service
+
+        stats_updated = []
+        try:
+            stats_service = get_statistics_service(db)
+            trend_service = get_trend_service(db)
+
+            stats_service.create_daily_snapshot()
+            stats_updated.append("daily_snapshot")
+
+            if db.query(SentimentAnalysis).count() >= 10:
+                stats_service.calculate_trend_report("weekly")
+                stats_service.calculate_hot_topics("weekly")
+                stats_service.calculate_keyword_stats("weekly", incremental=True)
+                stats_updated.append("weekly_stats")
+
+            trend_service.detect_trend_alerts(hours_back=24)
+            trend_service.calculate_hashtag_stats("daily")
+            trend_service.detect_viral_content("daily")
+            trend_service.calculate_category_trends("daily")
+
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not auto-update stats: {e}")
+        return stats_updated
+
+
+# Singleton
+_ingest_service: Optional[IngestService] = None
+_ingest_service_lock = threading.Lock()
+
+def get_ingest_service() -> IngestService:
+    """Get or create shared ingest service"""
+    global _ingest_service
+    with _ingest_service_lock:
+        if _ingest_service is None:
+            _ingest_service = IngestService(
+                workers=int(os.getenv("INGEST_WORKERS", "2")),
+                queue_size=int(os.getenv("INGEST_QUEUE_SIZE", "100")),
+                batch_size=int(os.getenv("INGEST_BATCH_SIZE", "200"))
+            )
+    return _ingest_service
@@ -0,0 +1,125 @@
+"""
+JSONL IO - Streaming reader/writer cho pipeline files
+
+Format: một JSON record mỗi dòng (.jsonl), có thể nén:
+- .jsonl.gz  (gzip, stdlib)
+- .jsonl.zst (zstd, cần package zstandard)
+
+Reader cũng đọc được file .json cũ (list, {"data": [...]} hoặc {"records": [...]})
+để các step mới tương thích với file đã có, nhưng chỉ JSONL mới thực sự streaming.
+"""
+import gzip
+import io
+import json
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+JSONL_SUFFIXES = {
+    None: ".jsonl",
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst",
+}
+
+
+def json_default(obj: Any) -> Any:
+    """Serialize datetime khi ghi (thay cho convert_datetime deep copy)"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def is_jsonl(path: PathLike) -> bool:
+    """Check if path is a (possibly compressed) JSONL file"""
+    name = Path(path).name
+    return any(name.endswith(suffix) for suffix in JSONL_SUFFIXES.values())
+
+
+def jsonl_filename(stem: str, compression: Optional[str] = None) -> str:
+    """Build filename for a JSONL file, e.g. processed_facebook_... + .jsonl.gz"""
+    if compression not in JSONL_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}. Supported: gzip, zstd")
+    if compression == "zstd" and not _zstd_available():
+        logger.warning("zstandard not installed, using gzip instead")
+        compression = "gzip"
+    return stem + JSONL_SUFFIXES[compression]
+
+
+def _zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _open_text(path: Path, mode: str):
+    """Open text stream, choose codec from file suffix"""
+    if path.name.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.name.endswith(".zst"):
+        import zstandard
+        if mode == "r":
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        else:
+            raw = zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_records(path: PathLike) -> Iterator[Dict]:
+    """
+    Stream records from a pipeline file
+
+    Args:
+        path: .jsonl / .jsonl.gz / .jsonl.zst (streaming) hoặc .json (legacy, load toàn bộ)
+
+    Yields:
+        Record dicts
+    """
+    path = Path(path)
+
+    if not is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and "data" in data:
+            yield from data["data"]
+        elif isinstance(data, dict) and "records" in data:
+            yield from data["records"]
+        elif isinstance(data, list):
+            yield from data
+        else:
+            yield data
+        return
+
+    with _open_text(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed line {line_no} in {path}: {e}")
+
+
+def write_records(path: PathLike, records: Iterable[Dict]) -> int:
+    """
+    Write records one per line (streaming, records có thể là generator)
+
+    Returns:
+        Number of records written
+    """
+    path = Path(path)
+    count = 0
+    with _open_text(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=json_default))
+            f.write("\n")
+            count += 1
+    return count
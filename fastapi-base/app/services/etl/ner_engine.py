@@ -0,0 +1,174 @@
+"""
+NER Engine - Precompiled single-scan engine cho rule-based NER
+
+Thay cho ~90 lượt quét của `_extract_rules` cũ (mỗi regex một `re.finditer`,
+mỗi tỉnh/thành một lượt `re.IGNORECASE`):
+  - Trigger scan: literal mở đầu của mọi rule (`(?:Ông|Bà|...)`, `(?:tỉnh|Tỉnh)`,
+    ...) gộp vào một KeywordMatcher case-sensitive (trie-regex), một lượt quét
+    trả về mọi vị trí ứng viên của mọi rule, kể cả chồng lấn
+  - Rule chỉ được thử `compiled.match(text, pos)` tại vị trí ứng viên của nó
+  - Gazetteer (tỉnh/thành): một KeywordMatcher, một lượt quét cho cả 63 tên
+  - Rule bắt đầu bằng chữ số chỉ chạy khi văn bản có chữ số
+
+Không gộp các rule thành một regex alternation: alternation chỉ trả về match
+trái nhất, làm mất các match chồng lấn giữa các rule (vd "Ngày 12/5/2024" khớp
+cả hai rule DATE). Thử từng rule tại vị trí ứng viên theo thứ tự tăng dần, bỏ
+qua vị trí nằm trong match trước, cho kết quả giống hệt `re.finditer` từng rule.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services.classification.keyword_matcher import KeywordMatcher
+
+# Rule mở đầu bằng một nhóm literal: (?:A|B|C)...
+_LEADING_ALTERNATION = re.compile(r'\(\?:([^()\\\[\]]*)\)')
+_DIGIT = re.compile(r'\d')
+_REGEX_SPECIAL = set('.^$*+?{}[]\\|()')
+
+# Step: ("rule", label, pattern) hoặc ("gazetteer", label, names)
+Step = Tuple[str, str, object]
+
+
+def _leading_literals(pattern: str) -> Optional[List[str]]:
+    """Các literal của nhóm mở đầu pattern (None nếu pattern không mở đầu bằng literal)"""
+    match = _LEADING_ALTERNATION.match(pattern)
+    if not match:
+        return None
+    literals = match.group(1).split('|')
+    if any(not literal or _REGEX_SPECIAL.intersection(literal) for literal in literals):
+        return None
+    return literals
+
+
+class NEREngine:
+    """Một lượt trigger scan + match neo tại vị trí ứng viên, giữ nguyên output của rules"""
+
+    def __init__(self, steps: Sequence[Step]):
+        """
+        Args:
+            steps: Các bước theo đúng thứ tự output (thứ tự entity trong mỗi label):
+                ("rule", label, pattern) - như re.finditer(pattern, text)
+                ("gazetteer", label, names) - như re.finditer(re.escape(name), text, re.I)
+                với từng name theo thứ tự của names
+        """
+        self._steps: List[Tuple[str, str, int]] = []
+        self._rules: List[re.Pattern] = []
+        self._rule_kind: List[str] = []  # "trigger" | "digit" | "scan"
+        self._gazetteers: List[List[str]] = []
+
+        triggers: Dict[str, List[int]] = {}
+        for kind, label, spec in steps:
+            if kind == "gazetteer":
+                self._steps.append((kind, label, len(self._gazetteers)))
+                self._gazetteers.append(list(spec))
+                continue
+
+            idx = len(self._rules)
+            self._rules.append(re.compile(spec))
+            literals = _leading_literals(spec)
+            if literals:
+                self._rule_kind.append("trigger")
+                for literal in literals:
+                    rules = triggers.setdefault(literal, [])
+                    if idx not in rules:
+                        rules.append(idx)
+            elif spec.startswith(r'\d'):
+                self._rule_kind.append("digit")
+            else:
+                self._rule_kind.append("scan")
+            self._steps.append((kind, label, idx))
+
+        self._triggers = KeywordMatcher(triggers, case_sensitive=True)
+        self._trigger_rules: Dict[str, List[int]] = {keyword: triggers[keyword] for keyword in self._triggers.keywords}
+
+        self._gazetteer_matchers = [KeywordMatcher(names) for names in self._gazetteers]
+        self._gazetteer_keys = [[name.lower().strip() for name in names] for names in self._gazetteers]
+
+    def _rule_matches(self, text: str) -> List[List[re.Match]]:
+        """Matches của từng rule (như re.finditer)"""
+        matches: List[List[re.Match]] = [[] for _ in self._rules]
+
+        candidates: List[List[int]] = [[] for _ in self._rules]
+        for keyword, pos in self._triggers.find_all(text, lowercase=False):
+            for idx in self._trigger_rules[keyword]:
+                candidates[idx].append(pos)
+
+        has_digit = None
+        for idx, compiled in enumerate(self._rules):
+            kind = self._rule_kind[idx]
+            if kind == "trigger":
+                next_pos = 0
+                for pos in candidates[idx]:
+                    if pos < next_pos:
+                        continue
+                    match = compiled.match(text, pos)
+                    if match:
+                        matches[idx].append(match)
+                        next_pos = match.end() if match.end() > pos else pos + 1
+                    else:
+                        next_pos = pos + 1
+                continue
+
+            if kind == "digit":
+                if has_digit is None:
+                    has_digit = _DIGIT.search(text) is not None
+                if not has_digit:
+                    continue
+            matches[idx].extend(compiled.finditer(text))
+        return matches
+
+    def _gazetteer_hits(self, g: int, lowered: Optional[str], text: str) -> List[Tuple[str, int, int]]:
+        """(name, start, end) theo thứ tự names, mỗi name theo vị trí tăng dần"""
+        names = self._gazetteers[g]
+        if lowered is None:
+            return [
+                (name, match.start(), match.end())
+                for name in names
+                for match in re.finditer(re.escape(name), text, re.IGNORECASE)
+            ]
+
+        positions: Dict[str, List[int]] = defaultdict(list)
+        next_pos: Dict[str, int] = {}
+        for keyword, pos in self._gazetteer_matchers[g].find_all(lowered, lowercase=False):
+            # Non-overlapping như finditer của từng name
+            if pos >= next_pos.get(keyword, 0):
+                positions[keyword].append(pos)
+                next_pos[keyword] = pos + len(keyword)
+
+        hits = []
+        for name, keyword in zip(names, self._gazetteer_keys[g]):
+            for pos in positions.get(keyword, ()):
+                hits.append((name, pos, pos + len(keyword)))
+        return hits
+
+    def extract(self, text: str) -> Dict[str, List[Dict]]:
+        """
+        Entities theo label, cùng thứ tự / nội dung với re.finditer từng rule
+
+        Returns:
+            {label: [{"text", "start", "end", "source"}]}
+        """
+        entities = defaultdict(list)
+        if not text:
+            return entities
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Lowercase đổi độ dài (ký tự đặc biệt) -> vị trí lệch, gazetteer quét từng name
+            lowered = None
+
+        matches = self._rule_matches(text)
+        for kind, label, idx in self._steps:
+            if kind == "gazetteer":
+                for name, start, end in self._gazetteer_hits(idx, lowered, text):
+                    entities[label].append({'text': name, 'start': start, 'end': end, 'source': 'gazetteer'})
+            else:
+                for match in matches[idx]:
+                    entities[label].append({
+                        'text': match.group(0).strip(),
+                        'start': match.start(),
+                        'end': match.end(),
+                        'source': 'rule'
+                    })
+        return entities
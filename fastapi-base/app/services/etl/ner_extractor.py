@@ -3,12 +3,18 @@ NER Extractor - Named Entity Recognition for Vietnamese text
 Extracts: PERSON, ORG, LOCATION, DATE, etc.
 """
 import logging
-import re
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Optional, Set, Tuple
 from collections import defaultdict
 
+from app.services.etl.ner_engine import NEREngine
+
 logger = logging.getLogger(__name__)
 
+# Tên người sau chức danh (2-6 từ viết hoa)
+PERSON_NAME_PATTERN = r'\s+([A-ZÀÁẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬĐÈÉẺẼẸÊẾỀỂỄỆÌÍỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴ][a-zàáảãạăắằẳẵặâấầẩẫậđèéẻẽẹêếềểễệìíỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵ]+(?:\s+[A-ZÀÁẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬĐÈÉẺẼẸÊẾỀỂỄỆÌÍỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴ][a-zàáảãạăắằẳẵặâấầẩẫậđèéẻẽẹêếềểễệìíỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵ]+){1,5})'
+
 
 class VietnameseNERExtractor:
     """
@@ -33,27 +39,42 @@ class VietnameseNERExtractor:
         
         # Try to load spaCy Vietnamese model
         if use_spacy:
-            try:
-                import spacy
-                # Try Vietnamese model first, fallback to multilingual
-                for model_name in ['vi_core_news_lg', 'vi_core_news_md', 'xx_ent_wiki_sm']:
-                    try:
-                        self.spacy_nlp = spacy.load(model_name)
-                        logger.info(f" Loaded spaCy model: {model_name}")
-                        break
-                    except:
-                        continue
-                        
-                if not self.spacy_nlp:
-                    logger.warning("No spaCy Vietnamese model found, using rule-based NER")
-            except ImportError:
-                logger.warning("spaCy not installed, using rule-based NER")
+            self._load_spacy()
         
         # Vietnamese entity patterns
         self._init_patterns()
         
         logger.info("NER Extractor initialized")
     
+    def _load_spacy(self):
+        """Load spaCy Vietnamese model (fallback multilingual)"""
+        try:
+            import spacy
+            # Try Vietnamese model first, fallback to multilingual
+            for model_name in ['vi_core_news_lg', 'vi_core_news_md', 'xx_ent_wiki_sm']:
+                try:
+                    self.spacy_nlp = spacy.load(model_name)
+                    logger.info(f" Loaded spaCy model: {model_name}")
+                    break
+                except:
+                    continue
+                    
+            if not self.spacy_nlp:
+                logger.warning("No spaCy Vietnamese model found, using rule-based NER")
+        except ImportError:
+            logger.warning("spaCy not installed, using rule-based NER")
+    
+    def __getstate__(self):
+        # spaCy pipeline không gửi sang worker process, worker tự load lại
+        state = self.__dict__.copy()
+        state['spacy_nlp'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.use_spacy:
+            self._load_spacy()
+    
     def _init_patterns(self):
         """Initialize regex patterns for Vietnamese entities"""
         
@@ -120,6 +141,19 @@ class VietnameseNERExtractor:
             r'\d+(?:[.,]\d{3})*\s*(?:tỷ|triệu|nghìn|ngàn|đồng|VNĐ|USD|EUR)',
             r'\d+(?:[.,]\d+)?\s*(?:tỷ đồng|triệu đồng|nghìn đồng)',
         ]
+        
+        # Precompiled engine: một lượt trigger scan cho mọi rule + gazetteer
+        self._engine = self._build_engine()
+    
+    def _build_engine(self) -> NEREngine:
+        """Engine với đúng thứ tự rules của rule-based NER"""
+        steps = [("rule", "PERSON", title_pattern + PERSON_NAME_PATTERN) for title_pattern in self.person_titles]
+        steps += [("rule", "ORG", pattern) for pattern in self.org_patterns]
+        steps += [("rule", "LOCATION", pattern) for pattern in self.location_patterns]
+        steps.append(("gazetteer", "LOCATION", list(self.vn_provinces)))
+        steps += [("rule", "DATE", pattern) for pattern in self.date_patterns]
+        steps += [("rule", "MONEY", pattern) for pattern in self.money_patterns]
+        return NEREngine(steps)
     
     def extract(self, text: str) -> Dict[str, List[Dict]]:
         """
@@ -202,77 +236,33 @@ class VietnameseNERExtractor:
         return entities
     
     def _extract_rules(self, text: str) -> Dict[str, List[Dict]]:
-        """Extract entities using regex rules"""
-        entities = defaultdict(list)
-        
-        # Extract PERSON (names with titles)
-        for title_pattern in self.person_titles:
-            # Name pattern after title
-            pattern = title_pattern + r'\s+([A-ZÀÁẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬĐÈÉẺẼẸÊẾỀỂỄỆÌÍỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴ][a-zàáảãạăắằẳẵặâấầẩẫậđèéẻẽẹêếềểễệìíỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵ]+(?:\s+[A-ZÀÁẢÃẠĂẮẰẲẴẶÂẤẦẨẪẬĐÈÉẺẼẸÊẾỀỂỄỆÌÍỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴ][a-zàáảãạăắằẳẵặâấầẩẫậđèéẻẽẹêếềểễệìíỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵ]+){1,5})'
-            for match in re.finditer(pattern, text):
-                full_match = match.group(0)
-                entities['PERSON'].append({
-                    'text': full_match.strip(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'source': 'rule'
-                })
-        
-        # Extract ORG
-        for pattern in self.org_patterns:
-            for match in re.finditer(pattern, text):
-                entities['ORG'].append({
-                    'text': match.group(0).strip(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'source': 'rule'
-                })
-        
-        # Extract LOCATION
-        for pattern in self.location_patterns:
-            for match in re.finditer(pattern, text):
-                entities['LOCATION'].append({
-                    'text': match.group(0).strip(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'source': 'rule'
-                })
-        
-        # Check for known provinces
-        for province in self.vn_provinces:
-            for match in re.finditer(re.escape(province), text, re.IGNORECASE):
-                entities['LOCATION'].append({
-                    'text': province,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'source': 'gazetteer'
-                })
-        
-        # Extract DATE
-        for pattern in self.date_patterns:
-            for match in re.finditer(pattern, text):
-                entities['DATE'].append({
-                    'text': match.group(0).strip(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'source': 'rule'
-                })
+        """Extract entities using regex rules (precompiled NEREngine)"""
+        return self._engine.extract(text)
+    
+    def extract_batch(
+        self,
+        texts: List[str],
+        workers: Optional[int] = None,
+        chunk_size: int = 500
+    ) -> List[Dict[str, List[Dict]]]:
+        """
+        Extract entities from multiple texts (giữ đúng thứ tự input)
         
-        # Extract MONEY
-        for pattern in self.money_patterns:
-            for match in re.finditer(pattern, text):
-                entities['MONEY'].append({
-                    'text': match.group(0).strip(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'source': 'rule'
-                })
+        Args:
+            texts: Danh sách văn bản
+            workers: Số processes (None/1 = chạy trong process hiện tại)
+            chunk_size: Số văn bản mỗi chunk gửi sang worker
+        """
+        if not workers or workers <= 1 or len(texts) <= chunk_size:
+            return [self.extract(text) for text in texts]
         
-        return entities
-    
-    def extract_batch(self, texts: List[str]) -> List[Dict[str, List[Dict]]]:
-        """Extract entities from multiple texts"""
-        return [self.extract(text) for text in texts]
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        workers = min(workers, len(chunks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            results = []
+            for chunk_results in executor.map(_extract_chunk, chunks):
+                results.extend(chunk_results)
+        return results
     
     def get_entity_summary(self, entities: Dict[str, List[Dict]]) -> Dict:
         """Get summary statistics of extracted entities"""
@@ -300,6 +290,19 @@ class VietnameseNERExtractor:
         return summary
 
 
+# Per-process extractor của extract_batch(workers > 1)
+_worker_extractor: Optional[VietnameseNERExtractor] = None
+
+
+def _init_worker(extractor: VietnameseNERExtractor):
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _extract_chunk(texts: List[str]) -> List[Dict[str, List[Dict]]]:
+    return [_worker_extractor.extract(text) for text in texts]
+
+
 # Singleton instance
 _ner_extractor = None
 
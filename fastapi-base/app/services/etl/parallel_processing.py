@@ -0,0 +1,155 @@
+"""
+Parallel Processing - Chạy processor + TextCleaner trên nhiều CPU cores
+
+Records được chia thành chunks, mỗi chunk xử lý trong một worker process
+(ProcessPoolExecutor). Output giữ đúng thứ tự input, statistics được merge
+như khi chạy tuần tự. Số chunks đang chạy được giới hạn nên bộ nhớ vẫn
+không phụ thuộc kích thước file khi input là generator (JSONL).
+
+Usage:
+    stats = BaseProcessor.new_stats()
+    for record in iter_process_parallel(records, 'facebook', stats, workers=8):
+        ...
+"""
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per-process state, khởi tạo một lần cho mỗi worker
+_worker_processor = None
+_worker_cleaner = None
+
+
+def _init_worker(data_type: str, clean: bool):
+    """Khởi tạo processor / cleaner trong worker process"""
+    global _worker_processor, _worker_cleaner
+    from app.services.etl.processors import get_processor
+    _worker_processor = get_processor(data_type)
+    if clean:
+        from app.services.etl.text_cleaner import TextCleaner
+        _worker_cleaner = TextCleaner()
+
+
+def _process_chunk(records: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """Worker: process (+ clean) một chunk, trả về (records, stats)"""
+    stats = _worker_processor.new_stats()
+    processed = list(_worker_processor.iter_process(records, stats))
+
+    if _worker_cleaner is not None:
+        clean_records(processed, _worker_cleaner)
+
+    return processed, stats
+
+
+def clean_record(record: Dict, cleaner) -> Dict:
+    """Additional text cleaning của DataPipelineService (content/title cleaned)"""
+    if record.get('content'):
+        record['content_cleaned'] = cleaner.clean(record['content'])
+    if record.get('title'):
+        record['title_cleaned'] = cleaner.clean(record['title'])
+    record['processed_at'] = datetime.now().isoformat()
+    return record
+
+
+def clean_records(records: List[Dict], cleaner) -> List[Dict]:
+    """clean_record cho cả chunk: content / title đi qua cleaner.clean_many"""
+    contents = cleaner.clean_many([record.get('content') for record in records])
+    titles = cleaner.clean_many([record.get('title') for record in records])
+    processed_at = datetime.now().isoformat()
+    for record, content, title in zip(records, contents, titles):
+        if record.get('content'):
+            record['content_cleaned'] = content
+        if record.get('title'):
+            record['title_cleaned'] = title
+        record['processed_at'] = processed_at
+    return records
+
+
+def merge_stats(target: Dict, source: Dict):
+    """Merge chunk statistics vào target"""
+    target['total'] += source['total']
+    target['success'] += source['success']
+    target['failed'] += source['failed']
+    target['errors'].extend(source['errors'])
+
+
+def _chunks(records: Iterable[Dict], chunk_size: int, stats: Dict) -> Iterator[List[Dict]]:
+    """
+    Chia records thành chunks; URL trùng giữa các chunks bị loại ở đây
+    (mỗi worker chỉ thấy chunk của nó)
+    """
+    seen_urls = set()
+    iterator = iter(records)
+
+    while True:
+        batch = list(islice(iterator, chunk_size))
+        if not batch:
+            return
+
+        chunk = []
+        for record in batch:
+            url = record.get('url', '')
+            if url in seen_urls:
+                stats['total'] += 1
+                stats['failed'] += 1
+                continue
+            seen_urls.add(url)
+            chunk.append(record)
+
+        if chunk:
+            yield chunk
+
+
+def iter_process_parallel(
+    records: Iterable[Dict],
+    data_type: str,
+    stats: Dict,
+    clean: bool = False,
+    workers: Optional[int] = None,
+    chunk_size: int = 500
+) -> Iterator[Dict]:
+    """
+    Process records song song, yield kết quả theo đúng thứ tự input
+
+    Args:
+        records: Raw records (iterable/generator)
+        data_type: facebook, tiktok, threads, newspaper
+        stats: Dict từ BaseProcessor.new_stats(), được cập nhật tại chỗ
+        clean: Chạy thêm TextCleaner (content_cleaned / title_cleaned)
+        workers: Số processes (default: os.cpu_count())
+        chunk_size: Số records mỗi chunk
+
+    Yields:
+        Processed records
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    logger.info(f"   Parallel processing: {workers} workers, chunk_size={chunk_size}")
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(data_type, clean)
+    ) as executor:
+        in_flight = deque()
+
+        for chunk in _chunks(records, chunk_size, stats):
+            in_flight.append(executor.submit(_process_chunk, chunk))
+
+            # Backpressure: đợi chunk cũ nhất trước khi submit thêm
+            if len(in_flight) >= max_in_flight:
+                processed, chunk_stats = in_flight.popleft().result()
+                merge_stats(stats, chunk_stats)
+                yield from processed
+
+        while in_flight:
+            processed, chunk_stats = in_flight.popleft().result()
+            merge_stats(stats, chunk_stats)
+            yield from processed
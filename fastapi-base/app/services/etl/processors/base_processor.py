@@ -8,7 +8,7 @@ Tich hop tu DataNormalizer va cac utils cu:
 - Vietnamese news domain detection
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Iterable, Iterator
 from datetime import datetime
 import logging
 import re
@@ -153,24 +153,58 @@ class BaseProcessor(ABC):
             self.errors.append(f"Processing error: {str(e)}")
             return {}, False, self.errors, self.warnings
     
-    def process_batch(self, records: List[Dict]) -> Tuple[List[Dict], Dict]:
+    def process_batch(
+        self,
+        records: List[Dict],
+        workers: int = 1,
+        chunk_size: int = 500
+    ) -> Tuple[List[Dict], Dict]:
         """
         Process a batch of records
         
+        Args:
+            records: Raw records
+            workers: So processes (> 1 = chia chunks qua process pool, giu thu tu output)
+            chunk_size: So records moi chunk khi workers > 1
+        
         Returns:
             (processed_records, statistics)
         """
-        processed = []
-        stats = {
-            'total': len(records),
+        stats = self.new_stats()
+        if workers > 1:
+            from app.services.etl.parallel_processing import iter_process_parallel
+            processed = list(iter_process_parallel(
+                records, self.data_type, stats, workers=workers, chunk_size=chunk_size
+            ))
+        else:
+            processed = list(self.iter_process(records, stats))
+        return processed, stats
+    
+    @staticmethod
+    def new_stats() -> Dict:
+        """Empty statistics dict (dung chung cho process_batch / iter_process)"""
+        return {
+            'total': 0,
             'success': 0,
             'failed': 0,
             'errors': []
         }
+    
+    def iter_process(self, records: Iterable[Dict], stats: Dict) -> Iterator[Dict]:
+        """
+        Streaming version of process_batch: yield tung record hop le
         
+        Args:
+            records: Iterable records (co the la generator doc tu file JSONL)
+            stats: Dict statistics (tu new_stats()), duoc cap nhat tai cho
+        
+        Yields:
+            Processed records
+        """
         seen_urls = set()
         
         for record in records:
+            stats['total'] += 1
             url = record.get('url', '')
             
             # Skip duplicates within batch
@@ -182,14 +216,12 @@ class BaseProcessor(ABC):
             result, is_valid, errors, warnings = self.process(record)
             
             if is_valid:
-                processed.append(result)
                 stats['success'] += 1
+                yield result
             else:
                 stats['failed'] += 1
                 if errors:
                     stats['errors'].extend(errors[:3])  # Limit errors
-        
-        return processed, stats
     
     def _parse_timestamp(self, record: Dict) -> Optional[datetime]:
         """
@@ -0,0 +1,178 @@
+"""
+SimHash Index - Near-duplicate lookup for SimHash fingerprints
+
+Modes:
+- linear: compare against every stored hash (Python loop, O(n) per lookup)
+- numpy: vectorized linear scan (XOR + popcount over a uint64 array)
+- lsh: bit-band multi-index hashing, only candidates are checked (sub-linear)
+
+LSH relies on the pigeonhole principle: split the hash into (max_distance + 1)
+bands; two hashes within max_distance bits must agree exactly on at least one
+band. The lsh mode therefore returns the same matches as a linear scan.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_MODES = ("linear", "numpy", "lsh")
+
+# Below this many candidates int.bit_count() beats building a numpy array
+_NUMPY_MIN_CANDIDATES = 32
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Vectorized popcount for a uint64 array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    # numpy < 2.0: per-byte lookup table
+    as_bytes = values.view(np.uint8).reshape(-1, 8)
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=1)
+
+
+class SimHashIndex:
+    """
+    Index of SimHash fingerprints for Hamming-distance near-duplicate lookup
+    """
+
+    def __init__(
+        self,
+        num_bits: int = 64,
+        max_distance: int = 2,
+        mode: str = "lsh",
+        num_bands: Optional[int] = None
+    ):
+        """
+        Initialize SimHash index
+
+        Args:
+            num_bits: SimHash width in bits (max 64)
+            max_distance: Max Hamming distance considered a near-duplicate
+            mode: 'linear', 'numpy' or 'lsh'
+            num_bands: LSH bands (default: max_distance + 1, must be > max_distance)
+        """
+        if mode not in INDEX_MODES:
+            raise ValueError(f"Unknown index mode: {mode}")
+        if num_bits > 64:
+            raise ValueError("SimHashIndex supports at most 64-bit hashes")
+
+        self.num_bits = num_bits
+        self.max_distance = max_distance
+        self.mode = mode
+
+        self.num_bands = num_bands or (max_distance + 1)
+        if self.num_bands <= max_distance:
+            raise ValueError("num_bands must be greater than max_distance")
+
+        # (shift, mask) per band
+        self._bands: List[Tuple[int, int]] = []
+        for b in range(self.num_bands):
+            start = b * num_bits // self.num_bands
+            end = (b + 1) * num_bits // self.num_bands
+            self._bands.append((start, (1 << (end - start)) - 1))
+
+        self._band_tables: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+
+        # Hashes in insertion order, grown by amortized doubling
+        self._hashes = np.zeros(1024, dtype=np.uint64)
+        self._size = 0
+
+        # Linear mode scans plain Python ints, like the original loop
+        self._values: List[int] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, simhash: int) -> int:
+        """Add a hash to the index and return its position"""
+        if self._size == len(self._hashes):
+            grown = np.zeros(len(self._hashes) * 2, dtype=np.uint64)
+            grown[:self._size] = self._hashes[:self._size]
+            self._hashes = grown
+
+        idx = self._size
+        self._hashes[idx] = simhash
+        self._size += 1
+
+        if self.mode == "linear":
+            self._values.append(simhash)
+        elif self.mode == "lsh":
+            for table, (shift, mask) in zip(self._band_tables, self._bands):
+                table.setdefault((simhash >> shift) & mask, []).append(idx)
+
+        return idx
+
+    def find_near(self, simhash: int) -> Optional[Tuple[int, int]]:
+        """
+        Find a stored hash within max_distance bits
+
+        Returns:
+            (index, distance) of the first match, or None
+        """
+        if self._size == 0:
+            return None
+
+        if self.mode == "linear":
+            return self._find_linear(simhash)
+        if self.mode == "numpy":
+            return self._check_numpy(simhash)
+        return self._find_lsh(simhash)
+
+    def _find_linear(self, simhash: int) -> Optional[Tuple[int, int]]:
+        """Linear scan (original behaviour, kept as baseline)"""
+        for idx, existing in enumerate(self._values):
+            distance = (simhash ^ existing).bit_count()
+            if distance <= self.max_distance:
+                return idx, distance
+        return None
+
+    def _find_lsh(self, simhash: int) -> Optional[Tuple[int, int]]:
+        """Check only hashes sharing at least one band"""
+        candidates = set()
+        for table, (shift, mask) in zip(self._band_tables, self._bands):
+            bucket = table.get((simhash >> shift) & mask)
+            if bucket:
+                candidates.update(bucket)
+
+        if not candidates:
+            return None
+
+        ordered = sorted(candidates)
+        if len(ordered) >= _NUMPY_MIN_CANDIDATES:
+            return self._check_numpy(simhash, np.array(ordered, dtype=np.int64))
+
+        for idx in ordered:
+            distance = (simhash ^ int(self._hashes[idx])).bit_count()
+            if distance <= self.max_distance:
+                return idx, distance
+        return None
+
+    def _check_numpy(
+        self,
+        simhash: int,
+        indices: Optional[np.ndarray] = None
+    ) -> Optional[Tuple[int, int]]:
+        """Vectorized Hamming check over the given indices (None = all hashes)"""
+        if indices is None:
+            hashes = self._hashes[:self._size]
+        else:
+            hashes = self._hashes[indices]
+
+        distances = popcount64(hashes ^ np.uint64(simhash))
+        hits = np.flatnonzero(distances <= self.max_distance)
+        if len(hits) == 0:
+            return None
+        first = hits[0]
+        idx = first if indices is None else indices[first]
+        return int(idx), int(distances[first])
+
+    def clear(self):
+        """Clear the index"""
+        self._band_tables = [{} for _ in self._bands]
+        self._hashes = np.zeros(1024, dtype=np.uint64)
+        self._size = 0
+        self._values = []
@@ -1,10 +1,25 @@
+import hashlib
 import re
+import threading
 import unicodedata
+from collections import OrderedDict
 from typing import Optional, List
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tăng khi đổi rule clean -> các cache dựa trên output của clean() (TokenCache) tự bị bỏ qua
+CLEANER_VERSION = 1
+
+# Precompiled rules của fused pipeline (cùng pattern với các step _remove_* / _normalize_*)
+_HTML_ENTITY = re.compile(r'&(?:[a-zA-Z]+|#\d+);')
+_URL = re.compile(r'http[s]?://\S+')
+_EMAIL = re.compile(r'\S+@\S+')
+_PHONE = re.compile(r'[\d\s\(\)\-\.]{10,}')
+_SPECIAL_CHARS = re.compile(r'[^\w\sàáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđÀÁẢÃẠĂẰẮẲẴẶÂẦẤẨẪẬÈÉẺẼẸÊỀẾỂỄỆÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴĐ.,!?;:\-]')
+_WHITESPACE = re.compile(r'\s+')
+_REPEATED_CHARS = re.compile(r'(.)\1{3,}')
+
 
 class TextCleaner:
     """
@@ -15,9 +30,27 @@ class TextCleaner:
     - Remove stopwords
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 20000):
+        """
+        Args:
+            cache_size: Số kết quả clean() giữ trong cache (key = hash của text + options, 0 = tắt)
+        """
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_stats = {"hits": 0, "misses": 0}
         self._init_vietnamese_resources()
     
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_cache'] = OrderedDict()
+        state.pop('_cache_lock', None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
+    
     def _init_vietnamese_resources(self):
         """Initialize Vietnamese NLP resources"""
         try:
@@ -59,6 +92,25 @@ class TextCleaner:
             'dùng': 'dùng', 'dùn': 'dùng', 'tìn': 'tìm',
             'thơì': 'thời', 'giơì': 'giời', 'ngươì': 'người'
         }
+        
+        self._compile_rules()
+    
+    def _compile_rules(self):
+        """
+        Gộp diacritic fixes thành một regex (mỗi lỗi một group, callback tra
+        bản sửa theo group) thay cho một re.sub cho từng lỗi. Bỏ các mục chỉ
+        khác hoa/thường ('toàn' -> 'toàn'): sau bước này text luôn bị lowercase.
+        """
+        wrongs = [wrong for wrong, correct in self.diacritic_fixes.items() if wrong.lower() != correct.lower()]
+        self._diacritic_corrections = [self.diacritic_fixes[wrong] for wrong in wrongs]
+        self._diacritic_pattern = None
+        if wrongs:
+            # Lookahead ký tự đầu: regex engine bỏ qua nhanh các vị trí không thể match
+            first_chars = ''.join(sorted({re.escape(wrong[0]) for wrong in wrongs}))
+            self._diacritic_pattern = re.compile(
+                r'(?=[' + first_chars + r'])\b(?:' + '|'.join('(' + wrong + ')' for wrong in wrongs) + r')\b',
+                re.IGNORECASE
+            )
     
     def clean(self, text: str, language: Optional[str] = 'vi', 
               deep_clean: bool = True, tokenize: bool = False) -> str:
@@ -77,22 +129,59 @@ class TextCleaner:
         if not text:
             return ''
         
-        # Basic cleaning
-        text = self._normalize_unicode(text)
-        text = self._remove_html_entities(text)
-        text = self._remove_urls(text)
-        text = self._remove_emails(text)
-        text = self._remove_phone_numbers(text)
-        text = self._remove_special_chars(text)
+        if not self.cache_size:
+            return self._clean_uncached(text, language, deep_clean, tokenize)
+        
+        key = self._cache_key(text, language, deep_clean, tokenize)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_stats["hits"] += 1
+                return cached
         
-        # Vietnamese-specific cleaning
-        if deep_clean and language == 'vi':
-            text = self._normalize_vietnamese_diacritics(text)
-            text = self._expand_abbreviations(text)
-            text = text.lower()  # Lowercase for consistency
+        result = self._clean_uncached(text, language, deep_clean, tokenize)
+        with self._cache_lock:
+            self.cache_stats["misses"] += 1
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+    
+    def clean_many(self, texts: List[str], language: Optional[str] = 'vi',
+                   deep_clean: bool = True, tokenize: bool = False) -> List[str]:
+        """
+        Batch clean() (giữ đúng thứ tự input); text trùng trong batch chỉ clean một lần
         
-        text = self._normalize_whitespace(text)
-        text = self._remove_repeated_chars(text)
+        Args:
+            texts: Danh sách văn bản (None / rỗng -> '')
+        """
+        done = {}
+        results = []
+        for text in texts:
+            if not text:
+                results.append('')
+                continue
+            if text not in done:
+                done[text] = self.clean(text, language, deep_clean, tokenize)
+            results.append(done[text])
+        return results
+    
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def get_cache_stats(self) -> dict:
+        with self._cache_lock:
+            return {"entries": len(self._cache), "max_entries": self.cache_size, **self.cache_stats}
+    
+    @staticmethod
+    def _cache_key(text: str, language: Optional[str], deep_clean: bool, tokenize: bool) -> bytes:
+        options = f"{language}|{int(deep_clean)}|{int(tokenize)}\x00"
+        return hashlib.blake2b((options + text).encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    
+    def _clean_uncached(self, text: str, language: Optional[str], deep_clean: bool, tokenize: bool) -> str:
+        text = self._clean_fused(text, deep_clean and language == 'vi')
         
         # Tokenization
         if tokenize and self.word_tokenize:
@@ -100,6 +189,38 @@ class TextCleaner:
         
         return text.strip()
     
+    def _clean_fused(self, text: str, vietnamese: bool) -> str:
+        """
+        Các step của clean() gộp lại, output giống hệt chạy tuần tự từng step:
+        - Step xoá (HTML entity, URL, email) chỉ chạy khi text có ký tự mở đầu
+          của pattern; hai pattern HTML entity gộp làm một
+        - Diacritic fixes: một regex cho mọi lỗi
+        - Vietnamese: expand abbreviations + lowercase trên cùng một lần split;
+          join bằng một dấu cách nên bước normalize whitespace không còn gì để làm
+        """
+        text = unicodedata.normalize('NFC', text)
+        if '&' in text:
+            text = _HTML_ENTITY.sub(' ', text)
+        if 'http' in text:
+            text = _URL.sub('', text)
+        if '@' in text:
+            text = _EMAIL.sub('', text)
+        text = _PHONE.sub('', text)
+        text = _SPECIAL_CHARS.sub(' ', text)
+        
+        if vietnamese:
+            if self._diacritic_pattern is not None:
+                text = self._diacritic_pattern.sub(self._fix_diacritic, text)
+            abbreviations = self.abbreviations
+            text = ' '.join([abbreviations.get(word.lower(), word) for word in text.split()]).lower()
+        else:
+            text = _WHITESPACE.sub(' ', text)
+        
+        return _REPEATED_CHARS.sub(r'\1\1', text)
+    
+    def _fix_diacritic(self, match: re.Match) -> str:
+        return self._diacritic_corrections[match.lastindex - 1]
+    
     def clean_for_topic_modeling(self, text: str) -> str:
         """
         Clean text specifically for topic modeling
@@ -2,13 +2,37 @@
 Vietnamese Tokenizer cho BERTopic
 Sử dụng underthesea - thư viện NLP tiếng Việt phổ biến nhất
 Tích hợp TextCleaner cho preprocessing chuyên sâu
+
+Word segmentation (underthesea) rất chậm và cùng một corpus bị tokenize lại mỗi
+lần train / extract keyphrases, nên kết quả được cache theo content hash:
+  - get_vietnamese_tokenizer(): tokenizer từng văn bản, có memoize
+  - tokenize_batch() / segment_batch(): cả corpus, một lượt đọc cache, các văn
+    bản chưa có trong cache được tokenize song song trên nhiều processes
+
+Văn bản mà underthesea / TextCleaner lỗi được tokenize bằng fallback_tokenize
+(segment_batch: giữ nguyên văn bản) nhưng không ghi vào cache, lần sau sẽ thử lại.
+Cache namespace gồm TOKENIZER_VERSION và text_cleaner.CLEANER_VERSION.
+
+Cache: SQLite (WAL) tại data/cache/tokens.db + LRU trong process.
 """
-import re
+import hashlib
+import json
 import logging
-from typing import List, Callable, Optional
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Tăng khi đổi logic tokenize/filter -> cache cũ tự bị bỏ qua
+TOKENIZER_VERSION = 1
+DEFAULT_TOKEN_CACHE_PATH = Path("data") / "cache" / "tokens.db"
+
 # Initialize TextCleaner singleton
 _text_cleaner = None
 _text_cleaner_initialized = False
@@ -59,15 +83,161 @@ def fallback_tokenize(text: str) -> List[str]:
         r'ÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮ'
         r'ỰỲÝỶỸỴĐ]+', text
     )
+
+
+class TokenCache:
+    """Content-hash -> token list, SQLite (WAL) với LRU phía trước"""
+
+    def __init__(self, path: Path = DEFAULT_TOKEN_CACHE_PATH, memory_size: int = 20000):
+        """
+        Args:
+            path: SQLite database file
+            memory_size: Số entries giữ trong LRU của process
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.memory_size = memory_size
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, List[str]]" = OrderedDict()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, tokens TEXT NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> str:
+        """Cache key = hash(namespace + text)"""
+        return hashlib.blake2b(f"{namespace}\x00{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def _remember(self, key: str, tokens: List[str]):
+        self._memory[key] = tokens
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Cached token lists của các keys có trong cache"""
+        found: Dict[str, List[str]] = {}
+        with self._lock:
+            pending = []
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self.stats["memory_hits"] += 1
+                else:
+                    pending.append(key)
+
+            for start in range(0, len(pending), 500):
+                chunk = pending[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, tokens FROM tokens WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, tokens in rows:
+                    found[key] = json.loads(tokens)
+                    self._remember(key, found[key])
+                self.stats["disk_hits"] += len(rows)
+                self.stats["misses"] += len(chunk) - len(rows)
+        return found
+
+    def set_many(self, items: Dict[str, List[str]]):
+        """Ghi nhiều entries trong một transaction"""
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tokens (key, tokens) VALUES (?, ?)",
+                [(key, json.dumps(tokens, ensure_ascii=False)) for key, tokens in items.items()]
+            )
+            self._conn.commit()
+            for key, tokens in items.items():
+                self._remember(key, tokens)
+            self.stats["writes"] += len(items)
+
+    def clear(self) -> int:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM tokens").rowcount
+            self._conn.commit()
+            self._memory.clear()
+        return deleted
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+        return {"path": str(self.path), "entries": entries, "memory_entries": len(self._memory), **self.stats}
+
+
+_token_cache: Optional[TokenCache] = None
+_token_cache_lock = threading.Lock()
+
+def get_token_cache() -> TokenCache:
+    """Get or create shared token cache"""
+    global _token_cache
+    with _token_cache_lock:
+        if _token_cache is None:
+            _token_cache = TokenCache()
+    return _token_cache
+
+
+def _namespace(mode: str) -> str:
+    """Namespace của cache: mode + tokenizer version + cleaner version + stopwords"""
+    stopwords = hashlib.md5("|".join(sorted(VIETNAMESE_STOPWORDS)).encode('utf-8')).hexdigest()[:8]
+    cleaner = "raw"
+    if mode == "tokenize":
+        # Tokens phụ thuộc output của TextCleaner (c0 = không có cleaner, chỉ lower())
+        from app.services.etl.text_cleaner import CLEANER_VERSION
+        cleaner = f"c{CLEANER_VERSION}" if get_text_cleaner() else "c0"
+    return f"{mode}:v{TOKENIZER_VERSION}:{cleaner}:{stopwords}"
+
+
+class _TokenizeFailed(Exception):
+    """Tokenizer lỗi với một văn bản; args[0] = text cho fallback_tokenize"""
+
+
+def _tokenize_or_fallback(fn: Callable[[str], List[str]], text: str) -> Optional[List[str]]:
+    """Tokens của fn, hoặc None nếu fn lỗi (caller dùng fallback, không cache)"""
+    try:
+        return fn(text)
+    except _TokenizeFailed:
+        return None
+
+
+def _cached_call(fn: Callable[[str], List[str]], namespace: str) -> Callable[[str], List[str]]:
+    """Memoize một tokenizer từng văn bản qua TokenCache (kết quả fallback không được cache)"""
+    def cached(text: str) -> List[str]:
+        if not text or not isinstance(text, str):
+            return []
+        cache = get_token_cache()
+        key = TokenCache.make_key(namespace, text)
+        tokens = cache.get_many([key]).get(key)
+        if tokens is None:
+            try:
+                tokens = fn(text)
+            except _TokenizeFailed as e:
+                return fallback_tokenize(e.args[0])
+            cache.set_many({key: tokens})
+        return list(tokens)
+
+    cached.__name__ = getattr(fn, "__name__", "cached_tokenize")
+    cached.__wrapped__ = fn
+    return cached
+
+
 _vietnamese_tokenizer = None
+_raw_vietnamese_tokenizer = None
 _tokenizer_initialized = False
 def get_vietnamese_tokenizer() -> Optional[Callable[[str], List[str]]]:
     """
     Tạo Vietnamese tokenizer sử dụng underthesea
     Trả về cả từ đơn và cụm từ có nghĩa (phrases)
+    Kết quả được memoize theo content hash (TokenCache)
     Returns None nếu không cài đặt được, sẽ fallback về simple tokenizer
     """
-    global _vietnamese_tokenizer, _tokenizer_initialized
+    global _vietnamese_tokenizer, _raw_vietnamese_tokenizer, _tokenizer_initialized
 
     if _tokenizer_initialized:
         return _vietnamese_tokenizer
@@ -91,7 +261,7 @@ def get_vietnamese_tokenizer() -> Optional[Callable[[str], List[str]]]:
                     text = cleaner.clean(text, deep_clean=True, tokenize=False)
                 except Exception as e:
                     logger.warning(f" Lỗi khi sử dụng TextCleaner: {e}")
-                    return fallback_tokenize(text)
+                    raise _TokenizeFailed(text) from e
             else:
                 text = text.lower().strip()
             
@@ -150,9 +320,10 @@ def get_vietnamese_tokenizer() -> Optional[Callable[[str], List[str]]]:
                 
             except Exception as e:
                 logger.warning(f"Lỗi khi tokenize với underthesea: {e}, fallback về simple tokenizer")
-                return fallback_tokenize(text)
+                raise _TokenizeFailed(text) from e
         
-        _vietnamese_tokenizer = vietnamese_tokenize
+        _raw_vietnamese_tokenizer = vietnamese_tokenize
+        _vietnamese_tokenizer = _cached_call(vietnamese_tokenize, _namespace("tokenize"))
         return _vietnamese_tokenizer
         
     except ImportError:
@@ -218,4 +389,130 @@ def create_vietnamese_vectorizer_tokenizer():
     """
     tokenizer = get_vietnamese_tokenizer()
     
-    return tokenizer if tokenizer else fallback_tokenize
\ No newline at end of file
+    return tokenizer if tokenizer else fallback_tokenize
+
+
+def _segment_text(text: str) -> List[str]:
+    """underthesea word_tokenize (list format), không clean / filter"""
+    from underthesea import word_tokenize
+    try:
+        return word_tokenize(text)
+    except Exception as e:
+        logger.warning(f"Lỗi khi segment với underthesea: {e}")
+        raise _TokenizeFailed(text) from e
+
+
+def _mode_function(mode: str) -> Callable[[str], List[str]]:
+    if mode == "segment":
+        return _segment_text
+    get_vietnamese_tokenizer()
+    return _raw_vietnamese_tokenizer or fallback_tokenize
+
+
+def _mode_fallback(mode: str) -> Callable[[str], List[str]]:
+    """Fallback cho văn bản tokenizer lỗi: segment giữ nguyên văn bản, tokenize dùng regex"""
+    return str.split if mode == "segment" else fallback_tokenize
+
+
+# Per-process tokenizer của batch API (workers > 1)
+_worker_fn: Optional[Callable[[str], List[str]]] = None
+
+def _init_worker(mode: str):
+    global _worker_fn
+    _worker_fn = _mode_function(mode)
+
+
+def _tokenize_chunk(texts: List[str]) -> List[Optional[List[str]]]:
+    return [_tokenize_or_fallback(_worker_fn, text) for text in texts]
+
+
+def _run_batch(
+    texts: List[str],
+    mode: str,
+    workers: Optional[int],
+    chunk_size: int,
+    use_cache: bool
+) -> List[List[str]]:
+    """Cache lookup cho cả batch, tokenize phần còn thiếu (song song nếu workers > 1)"""
+    fn = _mode_function(mode)
+    if fn is fallback_tokenize:
+        # Không có underthesea: regex tokenizer đủ nhanh, không cần cache
+        return [fallback_tokenize(text) if isinstance(text, str) else [] for text in texts]
+
+    namespace = _namespace(mode)
+    keys = [TokenCache.make_key(namespace, text) if text and isinstance(text, str) else None for text in texts]
+
+    cache = get_token_cache() if use_cache else None
+    found = cache.get_many({key for key in keys if key}) if cache else {}
+
+    missing: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key and key not in found:
+            missing.setdefault(key, text)
+
+    if missing:
+        pending = list(missing.values())
+        workers = min(workers or 1, os.cpu_count() or 1)
+        if workers > 1 and len(pending) > chunk_size:
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mode,)) as executor:
+                computed = [tokens for chunk in executor.map(_tokenize_chunk, chunks) for tokens in chunk]
+        else:
+            computed = [_tokenize_or_fallback(fn, text) for text in pending]
+
+        new_entries = {key: tokens for key, tokens in zip(missing.keys(), computed) if tokens is not None}
+        if cache:
+            cache.set_many(new_entries)
+        found.update(new_entries)
+
+        # Văn bản tokenizer lỗi: fallback, không cache
+        fallback = _mode_fallback(mode)
+        failed = {key: fallback(text) for key, text, tokens in zip(missing.keys(), pending, computed)
+                  if tokens is None}
+        found.update(failed)
+        logger.info(f"Tokenized {len(pending)} new texts ({len(texts) - len(pending)} from cache, "
+                    f"{len(failed)} fell back)")
+
+    return [list(found[key]) if key else [] for key in keys]
+
+
+def tokenize_batch(
+    texts: List[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 200,
+    use_cache: bool = True
+) -> List[List[str]]:
+    """
+    Batch version của get_vietnamese_tokenizer() (clean + segment + filter + n-grams)
+
+    Args:
+        texts: Văn bản
+        workers: Số processes cho các văn bản chưa có trong cache (None/1 = tuần tự)
+        chunk_size: Số văn bản mỗi chunk gửi sang worker
+        use_cache: Đọc/ghi TokenCache
+
+    Returns:
+        Token list cho từng văn bản (đúng thứ tự input)
+    """
+    return _run_batch(texts, "tokenize", workers, chunk_size, use_cache)
+
+
+def segment_batch(
+    texts: List[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 200,
+    use_cache: bool = True
+) -> List[List[str]]:
+    """
+    Batch underthesea word_tokenize (list format, không clean / filter), có cache
+
+    Văn bản underthesea lỗi được trả về dạng text.split() (không cache), các văn
+    bản còn lại vẫn được segment.
+
+    Raises:
+        ImportError: underthesea chưa được cài đặt
+
+    Returns:
+        Token list cho từng văn bản (đúng thứ tự input)
+    """
+    return _run_batch(texts, "segment", workers, chunk_size, use_cache)
@@ -0,0 +1,131 @@
+"""
+Lexicon Engine - Precompiled scorer cho emotion lexicon của SentimentAnalyzer
+
+Thay vòng lặp O(lexicon × tokens) của `_calculate_emotion_score` cũ:
+  - Cụm từ (có dấu cách): một KeywordMatcher cho mọi cụm từ của mọi emotion,
+    một lần quét text (semantics `term in text`)
+  - Từ đơn: index token -> [(emotion, weight)] (semantics `term in token`),
+    tính một lần cho mỗi token khác nhau rồi cache
+  - Phủ định / tăng cường / giảm nhẹ: xét token đứng trước trong cùng một lượt
+    quét trái -> phải
+
+Score giống hệt cách tính cũ: các đóng góp của mỗi emotion được cộng theo đúng
+thứ tự vòng lặp cũ (thứ tự term trong set, rồi thứ tự token), nên kể cả sai số
+float cũng trùng. Thứ tự term được chốt lúc build engine và đi theo engine khi
+pickle sang worker process.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.classification.keyword_matcher import KeywordMatcher
+
+# (emotion index, vị trí term trong lexicon của emotion, weight)
+Member = Tuple[int, int, float]
+
+
+class LexiconEngine:
+    """Token hash index + phrase matcher, một lượt quét mỗi văn bản"""
+
+    def __init__(
+        self,
+        lexicon: Dict[str, Dict],
+        negation_words: Iterable[str],
+        intensifiers: Iterable[str],
+        diminishers: Iterable[str],
+        cache_size: int = 200_000
+    ):
+        """
+        Args:
+            lexicon: {emotion: {"words": set(term), "weight": float}} (terms lowercase)
+            negation_words: Từ phủ định (so khớp với token đứng trước)
+            intensifiers: Từ tăng cường (x1.5)
+            diminishers: Từ giảm nhẹ (x0.7)
+            cache_size: Số token giữ trong cache token -> members
+        """
+        self.emotions: List[str] = list(lexicon)
+        self.negation_words = frozenset(negation_words)
+        self.intensifiers = frozenset(intensifiers)
+        self.diminishers = frozenset(diminishers)
+        self.cache_size = cache_size
+
+        phrase_members: Dict[str, List[Member]] = {}
+        word_members: Dict[str, List[Member]] = {}
+        for e, emotion in enumerate(self.emotions):
+            weight = lexicon[emotion]["weight"]
+            for pos, term in enumerate(lexicon[emotion]["words"]):
+                if ' ' in term:
+                    phrase_members.setdefault(term, []).append((e, pos, 1.5 * weight))
+                else:
+                    word_members.setdefault(term, []).append((e, pos, weight))
+
+        self._phrases = KeywordMatcher(phrase_members)
+        self._phrase_members = [phrase_members[term] for term in self._phrases.keywords]
+        self._words = KeywordMatcher(word_members)
+        self._word_members = [word_members[term] for term in self._words.keywords]
+
+        self._cache: Dict[str, Tuple[Member, ...]] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
+    def _token_members(self, token: str) -> Tuple[Member, ...]:
+        """Lexicon terms là substring của token (cached)"""
+        members = self._cache.get(token)
+        if members is None:
+            found = self._words.matched_indices(token, lowercase=False)
+            members = tuple(member for idx in sorted(found) for member in self._word_members[idx])
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[token] = members
+        return members
+
+    def score(self, text: str) -> List[float]:
+        """
+        Raw score của từng emotion (thứ tự self.emotions)
+
+        Args:
+            text: Văn bản đã lowercase
+        """
+        contributions: List[Optional[List[Tuple[int, int, float]]]] = [None] * len(self.emotions)
+
+        def add(e: int, key: Tuple[int, int, float]):
+            if contributions[e] is None:
+                contributions[e] = [key]
+            else:
+                contributions[e].append(key)
+
+        for idx in self._phrases.matched_indices(text, lowercase=False):
+            for e, pos, value in self._phrase_members[idx]:
+                add(e, (pos, -1, value))
+
+        cache = self._cache
+        prev = None
+        for i, token in enumerate(text.split()):
+            members = cache.get(token)
+            if members is None:
+                members = self._token_members(token)
+            if members:
+                if prev in self.negation_words:
+                    for e, pos, weight in members:
+                        add(e, (pos, i, -(0.5 * weight)))
+                else:
+                    if prev in self.intensifiers:
+                        multiplier = 1.5
+                    elif prev in self.diminishers:
+                        multiplier = 0.7
+                    else:
+                        multiplier = 1.0
+                    for e, pos, weight in members:
+                        add(e, (pos, i, multiplier * weight))
+            prev = token
+
+        scores = []
+        for items in contributions:
+            score = 0.0
+            if items:
+                items.sort()
+                for _, _, value in items:
+                    score += value
+            scores.append(max(0, score))
+        return scores
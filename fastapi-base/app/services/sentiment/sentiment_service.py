@@ -8,9 +8,13 @@ Sắc thái cảm xúc:
 - Trung tính: trung_lập, hoài_nghi
 """
 import logging
-from typing import List, Dict
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 
+from app.services.sentiment.lexicon_engine import LexiconEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +60,9 @@ class SentimentAnalyzer:
     
     def __init__(self):
         self._init_emotion_lexicon()
+        self._engine = LexiconEngine(
+            self.emotion_lexicon, self.negation_words, self.intensifiers, self.diminishers
+        )
     
     def _init_emotion_lexicon(self):
         """Từ điển cảm xúc đa sắc thái tiếng Việt"""
@@ -226,13 +233,8 @@ class SentimentAnalyzer:
         if not text or not text.strip():
             return self._default_result()
         
-        text_lower = text.lower()
-        
         # Tính điểm cho từng emotion
-        emotion_scores = {}
-        for emotion, data in self.emotion_lexicon.items():
-            score = self._calculate_emotion_score(text_lower, data["words"], data["weight"])
-            emotion_scores[emotion] = score
+        emotion_scores = dict(zip(self._engine.emotions, self._engine.score(text.lower())))
         
         # Tìm emotion có điểm cao nhất
         if not any(emotion_scores.values()):
@@ -265,35 +267,6 @@ class SentimentAnalyzer:
             all_scores=normalized_scores
         )
     
-    def _calculate_emotion_score(self, text: str, words: set, weight: float) -> float:
-        """Tính điểm cho một emotion cụ thể"""
-        score = 0.0
-        text_words = text.split()
-        
-        # Check từng từ/cụm từ
-        for term in words:
-            if ' ' in term:
-                # Cụm từ
-                if term in text:
-                    score += 1.5 * weight
-            else:
-                # Từ đơn
-                for i, word in enumerate(text_words):
-                    if term in word:
-                        multiplier = 1.0
-                        # Check intensifier trước đó
-                        if i > 0 and text_words[i-1] in self.intensifiers:
-                            multiplier = 1.5
-                        elif i > 0 and text_words[i-1] in self.diminishers:
-                            multiplier = 0.7
-                        # Check negation
-                        if i > 0 and text_words[i-1] in self.negation_words:
-                            score -= 0.5 * weight  # Phủ định
-                        else:
-                            score += multiplier * weight
-        
-        return max(0, score)
-    
     def _default_result(self) -> SentimentResult:
         """Kết quả mặc định khi không phát hiện cảm xúc"""
         return SentimentResult(
@@ -306,15 +279,50 @@ class SentimentAnalyzer:
             all_scores={k: 0.0 for k in EMOTION_CATEGORIES.keys()}
         )
     
-    def analyze_batch(self, texts: List[str]) -> List[SentimentResult]:
-        """Phân tích hàng loạt"""
-        return [self.analyze(text) for text in texts]
+    def analyze_batch(
+        self,
+        texts: List[str],
+        workers: Optional[int] = None,
+        chunk_size: int = 1000
+    ) -> List[SentimentResult]:
+        """
+        Phân tích hàng loạt (giữ đúng thứ tự input)
+
+        Args:
+            texts: Danh sách văn bản
+            workers: Số processes (None/1 = chạy trong process hiện tại)
+            chunk_size: Số văn bản mỗi chunk gửi sang worker
+        """
+        if not workers or workers <= 1 or len(texts) <= chunk_size:
+            return [self.analyze(text) for text in texts]
+
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        workers = min(workers, len(chunks), os.cpu_count() or 1)
+        # Gửi chính analyzer (lexicon + engine đã build) sang worker -> cùng thứ tự term, cùng score
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            results = []
+            for chunk_results in executor.map(_analyze_chunk, chunks):
+                results.extend(chunk_results)
+        return results
     
     def get_available_emotions(self) -> Dict:
         """Trả về danh sách các sắc thái cảm xúc có sẵn"""
         return EMOTION_CATEGORIES
 
 
+# Per-process analyzer của analyze_batch(workers > 1)
+_worker_analyzer: Optional[SentimentAnalyzer] = None
+
+
+def _init_worker(analyzer: SentimentAnalyzer):
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _analyze_chunk(texts: List[str]) -> List[SentimentResult]:
+    return [_worker_analyzer.analyze(text) for text in texts]
+
+
 # Singleton
 _analyzer = None
 
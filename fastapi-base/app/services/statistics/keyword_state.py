@@ -0,0 +1,139 @@
+"""
+Keyword Period State - Counters tích lũy theo kỳ cho WordCloud (KeywordStats)
+
+calculate_keyword_stats(incremental=True) chỉ tokenize các bài mới (id > last_id)
+rồi cộng dồn vào state của kỳ, thay vì đếm lại toàn bộ bài trong kỳ. Mọi counter
+(mention, document frequency, pos/neg/neu, topics, sources) đều cộng được nên
+kết quả giống lần tính đầy đủ.
+
+State lưu trong SQLite (WAL) cạnh token cache. Mỗi lần cập nhật, fingerprint của
+các bài id <= last_id (số bài, số bài có topic, tổng topic_id) được so với DB:
+bài bị xoá, bài commit muộn với id nhỏ hơn, topic được gán lại -> lệch
+fingerprint -> tính lại toàn bộ kỳ.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tăng khi đổi luật lọc / boost keyword -> state cũ bị bỏ, tính lại từ đầu
+KEYWORD_STATE_VERSION = 1
+DEFAULT_KEYWORD_STATE_PATH = Path("data") / "cache" / "keyword_stats.db"
+
+
+class KeywordPeriodState:
+    """Counters của mọi keyword trong một kỳ (period_type, period_start)"""
+
+    def __init__(self, period_type: str, period_start: date):
+        self.period_type = period_type
+        self.period_start = period_start
+        self.last_id = 0
+        self.fingerprint: Optional[List[int]] = None
+        # keyword -> {count, docs, pos, neg, neu, topics: Counter, sources: Counter, boost}
+        self.keywords: Dict[str, Dict] = {}
+
+    def to_json(self) -> str:
+        keywords = {}
+        for key, data in self.keywords.items():
+            keywords[key] = {
+                **{k: data[k] for k in ('count', 'docs', 'pos', 'neg', 'neu', 'boost')},
+                'topics': [[tid, tname, cnt] for (tid, tname), cnt in data['topics'].items()],
+                'sources': [[domain, cnt] for domain, cnt in data['sources'].items()],
+            }
+        return json.dumps({
+            "version": KEYWORD_STATE_VERSION,
+            "last_id": self.last_id,
+            "fingerprint": self.fingerprint,
+            "keywords": keywords,
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, period_type: str, period_start: date, payload: str) -> Optional["KeywordPeriodState"]:
+        """None nếu payload thuộc version cũ"""
+        raw = json.loads(payload)
+        if raw.get("version") != KEYWORD_STATE_VERSION:
+            return None
+
+        state = cls(period_type, period_start)
+        state.last_id = raw["last_id"]
+        state.fingerprint = raw["fingerprint"]
+        for key, data in raw["keywords"].items():
+            state.keywords[key] = {
+                **{k: data[k] for k in ('count', 'docs', 'pos', 'neg', 'neu', 'boost')},
+                'topics': Counter({(tid, tname): cnt for tid, tname, cnt in data['topics']}),
+                'sources': Counter({domain: cnt for domain, cnt in data['sources']}),
+            }
+        return state
+
+
+class KeywordStateStore:
+    """(period_type, period_start) -> KeywordPeriodState, SQLite (WAL)"""
+
+    def __init__(self, path: Path = DEFAULT_KEYWORD_STATE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._period_locks: Dict[tuple, threading.Lock] = {}
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS keyword_state ("
+            "period_type TEXT NOT NULL, period_start TEXT NOT NULL, state TEXT NOT NULL, "
+            "PRIMARY KEY (period_type, period_start))"
+        )
+        self._conn.commit()
+
+    def period_lock(self, period_type: str, period_start: date) -> threading.Lock:
+        """Lock cho load -> cộng dồn -> save của một kỳ (trong process)"""
+        with self._lock:
+            return self._period_locks.setdefault((period_type, period_start.isoformat()), threading.Lock())
+
+    def load(self, period_type: str, period_start: date) -> Optional[KeywordPeriodState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM keyword_state WHERE period_type = ? AND period_start = ?",
+                (period_type, period_start.isoformat())
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            return KeywordPeriodState.from_json(period_type, period_start, row[0])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Corrupt keyword state {period_type}/{period_start}: {e}")
+            return None
+
+    def save(self, state: KeywordPeriodState):
+        payload = state.to_json()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO keyword_state (period_type, period_start, state) VALUES (?, ?, ?)",
+                (state.period_type, state.period_start.isoformat(), payload)
+            )
+            self._conn.commit()
+
+    def clear(self) -> int:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM keyword_state").rowcount
+            self._conn.commit()
+        return deleted
+
+
+_keyword_state_store: Optional[KeywordStateStore] = None
+_keyword_state_store_lock = threading.Lock()
+
+def get_keyword_state_store() -> KeywordStateStore:
+    """Get or create shared keyword state store"""
+    global _keyword_state_store
+    with _keyword_state_store_lock:
+        if _keyword_state_store is None:
+            _keyword_state_store = KeywordStateStore()
+    return _keyword_state_store
@@ -0,0 +1,239 @@
+"""
+Sentiment Rollup - Bảng tổng hợp theo ngày cho trend report / website / social stats
+
+daily_sentiment_rollup giữ số bài theo (ngày × topic × domain × category ×
+sentiment_group × emotion). Báo cáo tuần/tháng GROUP BY trên các dòng đã tổng
+hợp thay vì load mọi SentimentAnalysis của kỳ.
+
+Cập nhật:
+  - apply_new(): cộng các dòng sentiment_analysis có id > watermark (gọi sau mỗi
+    lần ingest). Watermark nằm trong stats_rollup_state, khoá FOR UPDATE đến khi
+    commit nên các writer không cộng trùng
+  - ensure_fresh(start, end): apply_new + so fingerprint của kỳ (số bài, số bài
+    có topic, tổng topic_id) giữa rollup và bảng gốc. Lệch (bài bị xoá, bài commit
+    muộn với id nhỏ hơn watermark, topic_id được gán lại) -> dựng lại kỳ đó.
+    Chạy trong session riêng và commit ngay, nên khoá watermark không kéo dài
+    hết transaction báo cáo của caller (ingest workers không phải chờ)
+  - rebuild(): dựng lại toàn bộ bằng một INSERT ... SELECT ... GROUP BY (sau khi
+    train lại topic: topic_name đổi không làm lệch fingerprint)
+
+Phần cộng dồn không dùng ON CONFLICT: các cột chiều có thể NULL (topic_id,
+category, ...) mà unique constraint coi NULL là khác nhau, nên delta được merge
+với các ô hiện có trong Python (khoá tuple, None so sánh được).
+"""
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.model_sentiment import SentimentAnalysis
+from app.models.model_statistics import DailySentimentRollup, StatsRollupState
+from app.utils.time_utils import within_days
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = "daily_sentiment"
+
+# Chiều của một ô rollup (thứ tự = thứ tự cột trong grouped query)
+DIMENSIONS = ("day", "topic_id", "topic_name", "source_domain", "category", "sentiment_group", "emotion")
+
+
+def _as_date(value) -> date:
+    """func.date() trả về date (Postgres) hoặc 'YYYY-MM-DD' (SQLite)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class SentimentRollupService:
+    """Duy trì daily_sentiment_rollup từ sentiment_analysis"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._verified: Set[Tuple[date, date, int]] = set()
+
+    # ========== SOURCE QUERIES ==========
+
+    def _grouped_source(self, *conditions):
+        """SELECT <chiều>, count, max(source_url) FROM sentiment_analysis WHERE ... GROUP BY <chiều>"""
+        sa = SentimentAnalysis
+        day = func.date(sa.published_date)
+        dims = [day, sa.topic_id, sa.topic_name, sa.source_domain, sa.category, sa.sentiment_group, sa.emotion]
+        return select(
+            day.label("day"), *dims[1:],
+            func.count(sa.id).label("article_count"),
+            func.max(sa.source_url).label("source_url")
+        ).where(sa.published_date.isnot(None), *conditions).group_by(*dims)
+
+    def _source_range(self, start: Optional[date], end: Optional[date], last_id: int) -> list:
+        sa = SentimentAnalysis
+        conditions = [sa.id <= last_id]
+        if start is not None:
+            conditions.append(within_days(sa.published_date, start, end))
+        return conditions
+
+    def _max_source_id(self) -> int:
+        return self.db.query(func.max(SentimentAnalysis.id)).scalar() or 0
+
+    # ========== WATERMARK ==========
+
+    def _lock_state(self) -> Tuple[StatsRollupState, bool]:
+        """(state, created) - khoá dòng watermark đến hết transaction"""
+        state = self.db.query(StatsRollupState).filter(
+            StatsRollupState.name == ROLLUP_NAME
+        ).with_for_update().first()
+        if state is not None:
+            return state, False
+
+        # Lần đầu: flush ngay để writer song song vấp unique(name) trước khi dựng rollup
+        state = StatsRollupState(name=ROLLUP_NAME, last_id=0)
+        self.db.add(state)
+        self.db.flush()
+        return state, True
+
+    # ========== UPDATE ==========
+
+    def apply_new(self) -> int:
+        """
+        Cộng các dòng sentiment_analysis mới (id > watermark) vào rollup
+
+        Returns:
+            Watermark sau khi cập nhật
+        """
+        state, created = self._lock_state()
+        max_id = self._max_source_id()
+        if created:
+            self._rebuild(None, None, max_id)
+        elif max_id > state.last_id:
+            sa = SentimentAnalysis
+            rows = self.db.execute(self._grouped_source(sa.id > state.last_id, sa.id <= max_id)).all()
+            self._merge(rows)
+            logger.debug(f"Rollup: merged {len(rows)} cells for ids ({state.last_id}, {max_id}]")
+        else:
+            return state.last_id
+
+        state.last_id = max_id
+        return max_id
+
+    def _merge(self, rows: Sequence):
+        """Cộng các ô delta vào ô hiện có (cùng ngày) hoặc thêm ô mới"""
+        deltas: Dict[tuple, Tuple[int, Optional[str]]] = {}
+        for row in rows:
+            key = (_as_date(row.day),) + tuple(row[1:len(DIMENSIONS)])
+            deltas[key] = (row.article_count, row.source_url)
+        if not deltas:
+            return
+
+        days = {key[0] for key in deltas}
+        existing = {
+            tuple(getattr(cell, dim) for dim in DIMENSIONS): cell
+            for cell in self.db.query(DailySentimentRollup).filter(DailySentimentRollup.day.in_(days))
+        }
+        for key, (count, url) in deltas.items():
+            cell = existing.get(key)
+            if cell is None:
+                self.db.add(DailySentimentRollup(**dict(zip(DIMENSIONS, key)), article_count=count, source_url=url))
+                continue
+            cell.article_count += count
+            if url is not None and (cell.source_url is None or url > cell.source_url):
+                cell.source_url = url
+
+    def _rebuild(self, start: Optional[date], end: Optional[date], last_id: int):
+        """Xoá rồi dựng lại các ô của start..end (None = toàn bộ) từ các dòng id <= last_id"""
+        r = DailySentimentRollup
+        stmt = delete(r)
+        if start is not None:
+            stmt = stmt.where(r.day >= start, r.day <= end)
+        self.db.execute(stmt)
+
+        columns = list(DIMENSIONS) + ["article_count", "source_url"]
+        self.db.execute(insert(r).from_select(
+            columns, self._grouped_source(*self._source_range(start, end, last_id))
+        ))
+        self._verified = {v for v in self._verified if start is not None and (v[1] < start or v[0] > end)}
+
+    def rebuild(self) -> int:
+        """
+        Dựng lại toàn bộ rollup (sau khi topic_id/topic_name của nhiều bài đổi)
+
+        Returns:
+            Watermark mới
+        """
+        state, _ = self._lock_state()
+        max_id = self._max_source_id()
+        self._rebuild(None, None, max_id)
+        state.last_id = max_id
+        logger.info(f"Rollup rebuilt up to id {max_id}")
+        return max_id
+
+    # ========== VERIFY ==========
+
+    def _fingerprints(self, start: date, end: date, last_id: int) -> Tuple[list, list]:
+        """[số bài, số bài có topic, tổng topic_id] của kỳ: (bảng gốc, rollup)"""
+        sa = SentimentAnalysis
+        source = self.db.query(
+            func.count(sa.id),
+            func.count(sa.topic_id),
+            func.coalesce(func.sum(sa.topic_id), 0)
+        ).filter(*self._source_range(start, end, last_id)).one()
+
+        r = DailySentimentRollup
+        rollup = self.db.query(
+            func.coalesce(func.sum(r.article_count), 0),
+            func.coalesce(func.sum(case((r.topic_id.isnot(None), r.article_count), else_=0)), 0),
+            func.coalesce(func.sum(r.topic_id * r.article_count), 0)
+        ).filter(and_(r.day >= start, r.day <= end)).one()
+        return [int(v) for v in source], [int(v) for v in rollup]
+
+    @contextmanager
+    def _short_transaction(self):
+        """Service trên session riêng, commit khi xong (nhả khoá watermark ngay)"""
+        session = Session(bind=self.db.get_bind())
+        refresher = SentimentRollupService(session)
+        refresher._verified = self._verified
+        try:
+            yield refresher
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        self._verified = refresher._verified
+
+    def ensure_fresh(self, start: date, end: date) -> int:
+        """
+        Đảm bảo rollup của các ngày start..end khớp bảng gốc trước khi đọc
+
+        Cập nhật trong transaction riêng đã commit: query báo cáo tiếp theo trên
+        self.db (READ COMMITTED) thấy rollup mới, còn khoá watermark được nhả
+        trước khi caller chạy các bước báo cáo dài.
+
+        Returns:
+            Watermark
+        """
+        with self._short_transaction() as refresher:
+            return refresher._ensure_fresh(start, end)
+
+    def _ensure_fresh(self, start: date, end: date) -> int:
+        """ensure_fresh trên self.db (caller tự commit)"""
+        last_id = self.apply_new()
+        if (start, end, last_id) in self._verified:
+            return last_id
+
+        source, rollup = self._fingerprints(start, end, last_id)
+        if source != rollup:
+            logger.info(f"Rollup {start}..{end} stale (source={source}, rollup={rollup}), rebuilding period")
+            self._rebuild(start, end, last_id)
+        self._verified.add((start, end, last_id))
+        return last_id
+
+
+def get_sentiment_rollup_service(db: Session) -> SentimentRollupService:
+    """Factory function để lấy SentimentRollupService"""
+    return SentimentRollupService(db)
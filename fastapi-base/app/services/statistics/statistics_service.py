@@ -15,9 +15,12 @@ from app.models.model_sentiment import SentimentAnalysis
 from app.models.model_statistics import (
     TrendReport, HotTopic, KeywordStats, 
     TopicMentionStats, WebsiteActivityStats, 
-    SocialActivityStats, DailySnapshot
+    SocialActivityStats, DailySnapshot, DailySentimentRollup, NULL_TOPIC_KEY
 )
 from app.services.statistics.keyphrase_extractor import get_keyphrase_extractor
+from app.services.statistics.rollup_service import get_sentiment_rollup_service
+from app.services.statistics.keyword_state import KeywordPeriodState, get_keyword_state_store
+from app.utils.time_utils import within_days
 import openai
 import os
 import json
@@ -56,6 +59,79 @@ VIETNAMESE_STOPWORDS = {
     'gì', 'sao', 'thế', 'bao', 'mấy', 'đâu', 'lúc', 'giờ', 'chỉ'
 }
 
+# Keyword stats (WordCloud): TẤT CẢ từ đơn vô nghĩa
+KEYWORD_STOPWORDS = {
+    # Common stopwords
+    'và', 'của', 'là', 'có', 'được', 'cho', 'với', 'trong', 'này', 'đã',
+    'các', 'những', 'một', 'không', 'người', 'để', 'theo', 'về', 'từ',
+    'đến', 'như', 'tại', 'khi', 'sau', 'trên', 'ra', 'còn', 'nhiều',
+    'cũng', 'nhưng', 'hay', 'hoặc', 'nếu', 'thì', 'mà', 'vì', 'nên',
+    'rằng', 'bị', 'do', 'sẽ', 'đang', 'vào', 'lại', 'năm', 'ngày',
+    'việc', 'làm', 'nào', 'hơn', 'rất', 'quá', 'đây', 'đó', 'ai',
+    'gì', 'sao', 'thế', 'bao', 'mấy', 'đâu', 'lúc', 'giờ', 'chỉ',
+    'mình', 'bạn', 'anh', 'chị', 'em', 'ông', 'bà', 'cô', 'chú',
+    'con', 'cái', 'nhà', 'rồi', 'nữa', 'luôn', 'xong', 'xin', 'ạ',
+    'nhé', 'nha', 'nhỉ', 'ơi', 'hả', 'vậy', 'thôi', 'lắm', 'ghê',
+    'cần', 'muốn', 'phải', 'biết', 'thấy', 'nói', 'xem', 'đi', 'lên',
+    'xuống', 'qua', 'lại', 'mới', 'vừa', 'hết', 'xong', 'liền',
+    # Single meaningless words - EXPANDED
+    'tỉnh', 'xã', 'huyện', 'phường', 'quận', 'thôn', 'xóm', 'ấp',
+    'nhạc', 'nền', 'tiền', 'đất', 'nay', 'nhất', 'chơi', 'nước',
+    'gần', 'xa', 'cùng', 'số', 'hai', 'ba', 'bốn', 'năm', 'sáu',
+    'bảy', 'tám', 'chín', 'mười', 'trăm', 'nghìn', 'triệu', 'tỷ',
+    'xe', 'nhận', 'vẫn', 'tháng', 'tuần', 'ngày', 'giờ', 'phút',
+    'cả', 'toàn', 'mọi', 'tất', 'riêng', 'chung', 'khác', 'như',
+    'tết', 'lễ', 'hội', 'đêm', 'đầu', 'cuối', 'giữa', 'trước',
+    'sang', 'bên', 'quán', 'ngay', 'gặp', 'khu', 'thứ', 'yêu',
+    'thi', 'quanh', 'nhau', 'tốt', 'bằng', 'tới', 'tin', 'chiều',
+    'câu', 'đẹp', 'mua', 'mất', 'đường', 'lương', 'chỗ', 'chứ',
+    'tiếng', 'lần', 'giá', 'bài', 'trước', 'hưng', 'yên', 'hình',
+    'truyền', 'ocean', 'concert', 'show', 'live', 'clip', 'post',
+    # Social media garbage
+    'translate', 'with', 'created', 'http', 'https', 'www', 'com',
+    'tiktoknews', 'truyenhinhhungyen', 'facebook', 'tiktok', 'threads',
+    'video', 'photo', 'image', 'link', 'share', 'like', 'comment',
+    'by', 'the', 'and', 'for', 'you', 'this', 'that', 'are', 'was',
+    # Garbage patterns
+    'yêns', 'hưngs', 'việts', 'nams'
+}
+
+# GARBAGE PATTERNS to filter
+KEYWORD_GARBAGE_PATTERNS = [
+    'translate', 'http', 'www', 'tiktoknews', 'titkoknews', 'truyenhinhhungyen',
+    'created', 'by truyền', 'hưng yêns', '.com', '.vn', 'facebook.com',
+    'maduro', 'venezuela', 'khiến', 'khoảng', 'titkok',
+    'hôm nay', 'tối qua', 'thật sự', 'thời gian'
+]
+
+# NER garbage filter (emoji, numbers, garbage tokens)
+NER_GARBAGE = {
+    'translate', 'video', 'photo', 'link', 'http', 'https',
+    'zalo', 'facebook', 'tiktok', 'threads', 'instagram',
+    'ngày', 'tháng', 'năm', 'tuổi', 'số', 'tết', 'ảnh',
+    'phường', 'bố', 'mẹ', 'vụ', 'toàn', '2', '2026', '2025',
+}
+
+# HOT EVENT KEYWORDS - Boost these
+HOT_EVENT_PATTERNS = [
+    # Sự kiện nóng
+    'tai nạn', 'cháy', 'vụ án', 'bắt giữ', 'triệt phá', 'phá án',
+    'sập', 'đổ', 'lũ lụt', 'bão', 'động đất', 'dịch bệnh',
+    # Chính trị - xã hội
+    'biểu tình', 'đình công', 'tham nhũng', 'kỷ luật', 'bổ nhiệm',
+    'bầu cử', 'họp quốc hội', 'nghị quyết', 'chỉ thị',
+    # Kinh tế
+    'tăng giá', 'giảm giá', 'lạm phát', 'tỷ giá', 'chứng khoán',
+    'bất động sản', 'đấu giá', 'phá sản', 'nợ xấu',
+    # An ninh
+    'ma túy', 'cờ bạc', 'lừa đảo', 'trộm cắp', 'cướp',
+    'buôn lậu', 'đường dây', 'ổ nhóm', 'băng nhóm',
+    # Giao thông
+    'kẹt xe', 'ùn tắc', 'tai nạn giao thông', 'csgt', 'phạt nguội',
+    # Giải trí hot
+    'scandal', 'ly hôn', 'kết hôn', 'qua đời', 'nhập viện',
+]
+
 
 class StatisticsService:
     """Service tính toán và cập nhật các bảng thống kê"""
@@ -63,6 +139,7 @@ class StatisticsService:
     def __init__(self, db: Session):
         self.db = db
         self.keyphrase_extractor = get_keyphrase_extractor()
+        self.rollup = get_sentiment_rollup_service(db)
         
         # Initialize LangChain LLM for GPT cleaning
         self.llm = None
@@ -287,52 +364,63 @@ Giữ 25-35 cụm có nghĩa.
     # ========== TREND REPORT ==========
     
     def calculate_trend_report(self, period_type: str = "weekly", reference_date: date = None) -> TrendReport:
-        """Tính báo cáo xu hướng cho period_type"""
+        """Tính báo cáo xu hướng cho period_type (đếm từ daily_sentiment_rollup)"""
         start, end, label = self._get_period_range(period_type, reference_date)
+        self.rollup.ensure_fresh(start, end)
+        r = DailySentimentRollup
+        in_period = and_(r.day >= start, r.day <= end)
         
-        # Query sentiment data trong kỳ
-        sentiments = self.db.query(SentimentAnalysis).filter(
-            and_(
-                func.date(SentimentAnalysis.published_date) >= start,
-                func.date(SentimentAnalysis.published_date) <= end
-            )
-        ).all()
+        # Sentiment × emotion trong kỳ
+        counts = self.db.query(
+            r.sentiment_group, r.emotion, func.sum(r.article_count)
+        ).filter(in_period).group_by(r.sentiment_group, r.emotion).all()
         
-        if not sentiments:
+        if not counts:
             logger.info(f"No data for {period_type} {label}")
             return None
         
         # Tính toán
-        total = len(sentiments)
-        pos_count = sum(1 for s in sentiments if s.sentiment_group == 'positive')
-        neg_count = sum(1 for s in sentiments if s.sentiment_group == 'negative')
+        total = pos_count = neg_count = 0
+        emotion_dist = Counter()
+        for sentiment_group, emotion, count in counts:
+            count = int(count)
+            total += count
+            if sentiment_group == 'positive':
+                pos_count += count
+            elif sentiment_group == 'negative':
+                neg_count += count
+            emotion_dist[emotion] += count
         neu_count = total - pos_count - neg_count
         
-        # Emotion distribution
-        emotion_dist = Counter(s.emotion for s in sentiments)
-        
-        # Unique sources
-        unique_sources = len(set(s.source_domain for s in sentiments if s.source_domain))
+        # Sources (unique + top 10)
+        source_counts = Counter()
+        for domain, count in self.db.query(
+            r.source_domain, func.sum(r.article_count)
+        ).filter(in_period).group_by(r.source_domain):
+            if domain:
+                source_counts[domain] += int(count)
+        unique_sources = len(source_counts)
+        top_sources = [
+            {"domain": d, "count": c}
+            for d, c in sorted(source_counts.items(), key=lambda x: (-x[1], x[0]))[:10]
+        ]
         
         # Unique topics
-        unique_topics = len(set(s.topic_id for s in sentiments if s.topic_id))
+        unique_topics = sum(
+            1 for (topic_id,) in self.db.query(r.topic_id).filter(in_period).distinct() if topic_id
+        )
         
-        # Extract keywords từ tất cả content
-        all_text = " ".join(s.content_snippet or "" for s in sentiments)
+        # Extract keywords từ tất cả content (chỉ load cột content_snippet)
+        snippets = self.db.query(SentimentAnalysis.content_snippet).filter(within_days(SentimentAnalysis.published_date, start, end))
+        all_text = " ".join(snippet or "" for (snippet,) in snippets)
         top_keywords = self._extract_keywords(all_text, 20)
         
-        # Top sources
-        source_counts = Counter(s.source_domain for s in sentiments if s.source_domain)
-        top_sources = [{"domain": d, "count": c} for d, c in source_counts.most_common(10)]
-        
         # So sánh với kỳ trước
         prev_start = start - (end - start + timedelta(days=1))
         prev_end = start - timedelta(days=1)
-        prev_count = self.db.query(func.count(SentimentAnalysis.id)).filter(
-            and_(
-                func.date(SentimentAnalysis.published_date) >= prev_start,
-                func.date(SentimentAnalysis.published_date) <= prev_end
-            )
+        self.rollup.ensure_fresh(prev_start, prev_end)
+        prev_count = self.db.query(func.sum(r.article_count)).filter(
+            r.day >= prev_start, r.day <= prev_end
         ).scalar() or 0
         
         mention_change = ((total - prev_count) / prev_count * 100) if prev_count > 0 else 0
@@ -388,8 +476,7 @@ Giữ 25-35 cụm có nghĩa.
             func.sum(func.cast(SentimentAnalysis.sentiment_group == 'neutral', Integer)).label('neu'),
         ).filter(
             and_(
-                func.date(SentimentAnalysis.published_date) >= start,
-                func.date(SentimentAnalysis.published_date) <= end,
+                within_days(SentimentAnalysis.published_date, start, end),
                 SentimentAnalysis.topic_id.isnot(None)
             )
         ).group_by(
@@ -413,8 +500,7 @@ Giữ 25-35 cụm có nghĩa.
             prev_count = self.db.query(func.count(SentimentAnalysis.id)).filter(
                 and_(
                     SentimentAnalysis.topic_id == topic_id,
-                    func.date(SentimentAnalysis.published_date) >= prev_start,
-                    func.date(SentimentAnalysis.published_date) <= prev_end
+                    within_days(SentimentAnalysis.published_date, prev_start, prev_end)
                 )
             ).scalar() or 0
             
@@ -434,8 +520,7 @@ Giữ 25-35 cụm có nghĩa.
             ).filter(
                 and_(
                     SentimentAnalysis.topic_id == topic_id,
-                    func.date(SentimentAnalysis.published_date) >= start,
-                    func.date(SentimentAnalysis.published_date) <= end
+                    within_days(SentimentAnalysis.published_date, start, end)
                 )
             ).group_by(SentimentAnalysis.emotion).all()
             emotion_dist = {e: c for e, c in emotions}
@@ -445,8 +530,7 @@ Giữ 25-35 cụm có nghĩa.
             samples = self.db.query(SentimentAnalysis.title).filter(
                 and_(
                     SentimentAnalysis.topic_id == topic_id,
-                    func.date(SentimentAnalysis.published_date) >= start,
-                    func.date(SentimentAnalysis.published_date) <= end,
+                    within_days(SentimentAnalysis.published_date, start, end),
                     SentimentAnalysis.title.isnot(None)
                 )
             ).limit(5).all()
@@ -491,85 +575,11 @@ Giữ 25-35 cụm có nghĩa.
     
     # ========== KEYWORD STATS ==========
     
-    def calculate_keyword_stats(self, period_type: str = "weekly", reference_date: date = None, top_n: int = 100) -> List[KeywordStats]:
-        """Tính thống kê từ khóa cho WordCloud - ƯU TIÊN TÊN RIÊNG VÀ SỰ KIỆN HOT"""
-        start, end, label = self._get_period_range(period_type, reference_date)
-        
-        # Lấy tất cả content trong kỳ
-        articles = self.db.query(
-            SentimentAnalysis.content_snippet,
-            SentimentAnalysis.title,
-            SentimentAnalysis.sentiment_group,
-            SentimentAnalysis.topic_id,
-            SentimentAnalysis.topic_name,
-            SentimentAnalysis.source_domain
-        ).filter(
-            and_(
-                func.date(SentimentAnalysis.published_date) >= start,
-                func.date(SentimentAnalysis.published_date) <= end
-            )
-        ).all()
-        
-        if not articles:
-            return []
-        
-        # COMPREHENSIVE Vietnamese stopwords - TẤT CẢ từ đơn vô nghĩa
-        STOPWORDS = {
-            # Common stopwords
-            'và', 'của', 'là', 'có', 'được', 'cho', 'với', 'trong', 'này', 'đã',
-            'các', 'những', 'một', 'không', 'người', 'để', 'theo', 'về', 'từ',
-            'đến', 'như', 'tại', 'khi', 'sau', 'trên', 'ra', 'còn', 'nhiều',
-            'cũng', 'nhưng', 'hay', 'hoặc', 'nếu', 'thì', 'mà', 'vì', 'nên',
-            'rằng', 'bị', 'do', 'sẽ', 'đang', 'vào', 'lại', 'năm', 'ngày',
-            'việc', 'làm', 'nào', 'hơn', 'rất', 'quá', 'đây', 'đó', 'ai',
-            'gì', 'sao', 'thế', 'bao', 'mấy', 'đâu', 'lúc', 'giờ', 'chỉ',
-            'mình', 'bạn', 'anh', 'chị', 'em', 'ông', 'bà', 'cô', 'chú',
-            'con', 'cái', 'nhà', 'rồi', 'nữa', 'luôn', 'xong', 'xin', 'ạ',
-            'nhé', 'nha', 'nhỉ', 'ơi', 'hả', 'vậy', 'thôi', 'lắm', 'ghê',
-            'cần', 'muốn', 'phải', 'biết', 'thấy', 'nói', 'xem', 'đi', 'lên',
-            'xuống', 'qua', 'lại', 'mới', 'vừa', 'hết', 'xong', 'liền',
-            # Single meaningless words - EXPANDED
-            'tỉnh', 'xã', 'huyện', 'phường', 'quận', 'thôn', 'xóm', 'ấp',
-            'nhạc', 'nền', 'tiền', 'đất', 'nay', 'nhất', 'chơi', 'nước',
-            'gần', 'xa', 'cùng', 'số', 'hai', 'ba', 'bốn', 'năm', 'sáu',
-            'bảy', 'tám', 'chín', 'mười', 'trăm', 'nghìn', 'triệu', 'tỷ',
-            'xe', 'nhận', 'vẫn', 'tháng', 'tuần', 'ngày', 'giờ', 'phút',
-            'cả', 'toàn', 'mọi', 'tất', 'riêng', 'chung', 'khác', 'như',
-            'tết', 'lễ', 'hội', 'đêm', 'đầu', 'cuối', 'giữa', 'trước',
-            'sang', 'bên', 'quán', 'ngay', 'gặp', 'khu', 'thứ', 'yêu',
-            'thi', 'quanh', 'nhau', 'tốt', 'bằng', 'tới', 'tin', 'chiều',
-            'câu', 'đẹp', 'mua', 'mất', 'đường', 'lương', 'chỗ', 'chứ',
-            'tiếng', 'lần', 'giá', 'bài', 'trước', 'hưng', 'yên', 'hình',
-            'truyền', 'ocean', 'concert', 'show', 'live', 'clip', 'post',
-            # Social media garbage
-            'translate', 'with', 'created', 'http', 'https', 'www', 'com',
-            'tiktoknews', 'truyenhinhhungyen', 'facebook', 'tiktok', 'threads',
-            'video', 'photo', 'image', 'link', 'share', 'like', 'comment',
-            'by', 'the', 'and', 'for', 'you', 'this', 'that', 'are', 'was',
-            # Garbage patterns
-            'yêns', 'hưngs', 'việts', 'nams'
-        }
-        
-        # GARBAGE PATTERNS to filter
-        GARBAGE_PATTERNS = [
-            'translate', 'http', 'www', 'tiktoknews', 'titkoknews', 'truyenhinhhungyen',
-            'created', 'by truyền', 'hưng yêns', '.com', '.vn', 'facebook.com',
-            'maduro', 'venezuela', 'khiến', 'khoảng', 'titkok',
-            'hôm nay', 'tối qua', 'thật sự', 'thời gian'
-        ]
-        
-        # ==== NER: Detect Named Entities (tên riêng) ====
+    def _detect_named_entities(self, articles) -> set:
+        """NER (tên riêng) trên tối đa 200 bài đầu, chỉ giữ entity xuất hiện >= 2 lần"""
         named_entities = set()
         entity_counts = Counter()  # Count frequency of entities
         
-        # NER garbage filter (emoji, numbers, garbage tokens)
-        NER_GARBAGE = {
-            'translate', 'video', 'photo', 'link', 'http', 'https',
-            'zalo', 'facebook', 'tiktok', 'threads', 'instagram',
-            'ngày', 'tháng', 'năm', 'tuổi', 'số', 'tết', 'ảnh',
-            'phường', 'bố', 'mẹ', 'vụ', 'toàn', '2', '2026', '2025',
-        }
-        
         try:
             from underthesea import ner
             has_ner = True
@@ -579,7 +589,7 @@ Giữ 25-35 cụm có nghĩa.
         
         # Extract named entities from all articles first
         if has_ner:
-            for content, title, _, _, _, _ in articles[:200]:  # Limit for performance
+            for _, content, title, _, _, _, _ in articles[:200]:  # Limit for performance
                 text = f"{title or ''} {content or ''}"[:1000]
                 try:
                     entities = ner(text)
@@ -590,7 +600,7 @@ Giữ 25-35 cụm có nghĩa.
                             # Filter garbage
                             if len(clean_word) < 2:
                                 continue
-                            if clean_word in STOPWORDS or clean_word in NER_GARBAGE:
+                            if clean_word in KEYWORD_STOPWORDS or clean_word in NER_GARBAGE:
                                 continue
                             # Skip emoji, special chars, numbers only
                             if not any(c.isalpha() for c in clean_word):
@@ -606,30 +616,16 @@ Giữ 25-35 cụm có nghĩa.
         # Only keep entities that appear multiple times (more reliable)
         named_entities = {e for e, c in entity_counts.items() if c >= 2}
         logger.info(f"Found {len(named_entities)} named entities (filtered): {list(named_entities)[:20]}")
+        return named_entities
+    
+    def _count_keywords(self, articles, keyword_data: Dict[str, Dict]):
+        """
+        Đếm cụm từ của các bài, cộng dồn vào keyword_data
         
-        # ==== HOT EVENT KEYWORDS - Boost these ====
-        HOT_EVENT_PATTERNS = [
-            # Sự kiện nóng
-            'tai nạn', 'cháy', 'vụ án', 'bắt giữ', 'triệt phá', 'phá án',
-            'sập', 'đổ', 'lũ lụt', 'bão', 'động đất', 'dịch bệnh',
-            # Chính trị - xã hội
-            'biểu tình', 'đình công', 'tham nhũng', 'kỷ luật', 'bổ nhiệm',
-            'bầu cử', 'họp quốc hội', 'nghị quyết', 'chỉ thị',
-            # Kinh tế
-            'tăng giá', 'giảm giá', 'lạm phát', 'tỷ giá', 'chứng khoán',
-            'bất động sản', 'đấu giá', 'phá sản', 'nợ xấu',
-            # An ninh
-            'ma túy', 'cờ bạc', 'lừa đảo', 'trộm cắp', 'cướp',
-            'buôn lậu', 'đường dây', 'ổ nhóm', 'băng nhóm',
-            # Giao thông
-            'kẹt xe', 'ùn tắc', 'tai nạn giao thông', 'csgt', 'phạt nguội',
-            # Giải trí hot
-            'scandal', 'ly hôn', 'kết hôn', 'qua đời', 'nhập viện',
-        ]
-        
-        # Count keywords - CHỈ GIỮ CỤM TỪ 2+ TỪ HOẶC TỪ ĐƠN CÓ NGHĨA
-        keyword_data = {}
-        
+        Args:
+            articles: Rows (id, content_snippet, title, sentiment_group, topic_id, topic_name, source_domain)
+            keyword_data: keyword -> {count, docs, pos, neg, neu, topics, sources, boost}
+        """
         try:
             from underthesea import word_tokenize
             has_tokenizer = True
@@ -637,7 +633,7 @@ Giữ 25-35 cụm có nghĩa.
             has_tokenizer = False
             logger.warning("Vietnamese tokenizer not available")
         
-        for content, title, sentiment_group, topic_id, topic_name, domain in articles:
+        for _, content, title, sentiment_group, topic_id, topic_name, domain in articles:
             text = f"{title or ''} {content or ''}"
             
             # Tokenize
@@ -666,11 +662,11 @@ Giữ 25-35 cụm có nghĩa.
                     continue
                 
                 # 2. In stopwords
-                if word in STOPWORDS or display_word in STOPWORDS:
+                if word in KEYWORD_STOPWORDS or display_word in KEYWORD_STOPWORDS:
                     continue
                 
                 # 3. Contains garbage pattern
-                if any(p in word.lower() or p in display_word.lower() for p in GARBAGE_PATTERNS):
+                if any(p in word.lower() or p in display_word.lower() for p in KEYWORD_GARBAGE_PATTERNS):
                     continue
                 
                 # 4. Is digit
@@ -686,7 +682,7 @@ Giữ 25-35 cụm có nghĩa.
                 # 6. Check each word in phrase against stopwords
                 words_in_phrase = display_word.split()
                 # Cụm từ phải có ít nhất 2 từ có nghĩa
-                meaningful_words = [w for w in words_in_phrase if w not in STOPWORDS and len(w) >= 2]
+                meaningful_words = [w for w in words_in_phrase if w not in KEYWORD_STOPWORDS and len(w) >= 2]
                 if len(meaningful_words) < 1:
                     continue
                 
@@ -725,6 +721,76 @@ Giữ 25-35 cụm có nghĩa.
                         keyword_data[key]['topics'][(topic_id, topic_name)] += 1
                     if domain:
                         keyword_data[key]['sources'][domain] += 1
+    
+    def _keyword_fingerprint(self, period_filter, last_id: int) -> List[int]:
+        """(số bài, số bài có topic, tổng topic_id) của các bài trong kỳ có id <= last_id"""
+        total, with_topic, topic_sum = self.db.query(
+            func.count(SentimentAnalysis.id),
+            func.count(SentimentAnalysis.topic_id),
+            func.coalesce(func.sum(SentimentAnalysis.topic_id), 0)
+        ).filter(period_filter, SentimentAnalysis.id <= last_id).one()
+        return [int(total), int(with_topic), int(topic_sum)]
+    
+    def calculate_keyword_stats(
+        self,
+        period_type: str = "weekly",
+        reference_date: date = None,
+        top_n: int = 100,
+        incremental: bool = False
+    ) -> List[KeywordStats]:
+        """
+        Tính thống kê từ khóa cho WordCloud - ƯU TIÊN TÊN RIÊNG VÀ SỰ KIỆN HOT
+        
+        Counters của kỳ được lưu lại (KeywordPeriodState). incremental=True chỉ đếm
+        các bài mới từ lần tính trước rồi cộng dồn; tự đếm lại toàn bộ kỳ nếu bài
+        cũ trong kỳ đã bị xoá / đổi topic.
+        """
+        start, end, label = self._get_period_range(period_type, reference_date)
+        period_filter = within_days(SentimentAnalysis.published_date, start, end)
+        
+        store = get_keyword_state_store()
+        with store.period_lock(period_type, start):
+            state = store.load(period_type, start) if incremental else None
+            if state is not None and state.fingerprint != self._keyword_fingerprint(period_filter, state.last_id):
+                logger.info(f"Keyword state {period_type}/{start} is stale, recounting the whole period")
+                state = None
+            
+            query = self.db.query(
+                SentimentAnalysis.id,
+                SentimentAnalysis.content_snippet,
+                SentimentAnalysis.title,
+                SentimentAnalysis.sentiment_group,
+                SentimentAnalysis.topic_id,
+                SentimentAnalysis.topic_name,
+                SentimentAnalysis.source_domain
+            ).filter(period_filter)
+            
+            if state is None:
+                mode = "full"
+                state = KeywordPeriodState(period_type, start)
+                state.fingerprint = [0, 0, 0]
+                articles = query.order_by(SentimentAnalysis.id).all()
+                named_entities = self._detect_named_entities(articles) if articles else set()
+            else:
+                mode = "incremental"
+                articles = query.filter(SentimentAnalysis.id > state.last_id).order_by(SentimentAnalysis.id).all()
+                named_entities = set()
+            
+            if articles:
+                self._count_keywords(articles, state.keywords)
+                # Fingerprint theo đúng các bài đã đếm (không query lại -> không lẫn bài commit sau)
+                topic_ids = [row[4] for row in articles if row[4] is not None]
+                state.fingerprint = [
+                    state.fingerprint[0] + len(articles),
+                    state.fingerprint[1] + len(topic_ids),
+                    state.fingerprint[2] + sum(topic_ids)
+                ]
+                state.last_id = articles[-1][0]
+            store.save(state)
+        
+        keyword_data = state.keywords
+        if not keyword_data:
+            return []
         
         # Calculate weighted score = count * boost
         for key in keyword_data:
@@ -774,7 +840,7 @@ Giữ 25-35 cụm có nghĩa.
                 self.db.add(stat)
             results.append(stat)
         
-        logger.info(f"Calculated {len(results)} keyword stats for {period_type} (found {len(named_entities)} named entities)")
+        logger.info(f"Calculated {len(results)} keyword stats for {period_type} ({mode}: {len(articles)} articles counted, {len(named_entities)} named entities)")
         return results
     
     # ========== TOPIC MENTION STATS ==========
@@ -795,8 +861,7 @@ Giữ 25-35 cụm có nghĩa.
             func.sum(func.cast(SentimentAnalysis.sentiment_group == 'negative', Integer)).label('neg'),
         ).filter(
             and_(
-                func.date(SentimentAnalysis.published_date) >= start,
-                func.date(SentimentAnalysis.published_date) <= end,
+                within_days(SentimentAnalysis.published_date, start, end),
                 SentimentAnalysis.topic_id.isnot(None)
             )
         ).group_by(
@@ -819,8 +884,7 @@ Giữ 25-35 cụm có nghĩa.
             ).filter(
                 and_(
                     SentimentAnalysis.topic_id == topic_id,
-                    func.date(SentimentAnalysis.published_date) >= start,
-                    func.date(SentimentAnalysis.published_date) <= end
+                    within_days(SentimentAnalysis.published_date, start, end)
                 )
             ).group_by(SentimentAnalysis.emotion).all()
             emotion_breakdown = {e: c for e, c in emotions}
@@ -831,8 +895,7 @@ Giữ 25-35 cụm có nghĩa.
             prev_count = self.db.query(func.count(SentimentAnalysis.id)).filter(
                 and_(
                     SentimentAnalysis.topic_id == topic_id,
-                    func.date(SentimentAnalysis.published_date) >= prev_start,
-                    func.date(SentimentAnalysis.published_date) < start
+                    within_days(SentimentAnalysis.published_date, prev_start, start - timedelta(days=1))
                 )
             ).scalar() or 0
             
@@ -875,146 +938,184 @@ Giữ 25-35 cụm có nghĩa.
         
         return results
     
-    # ========== WEBSITE ACTIVITY STATS ==========
+    # ========== WEBSITE / SOCIAL ACTIVITY STATS ==========
+    
+    def _rollup_source_groups(self, start: date, end: date) -> List[Dict]:
+        """
+        Nhóm (domain, topic_id) của kỳ từ daily_sentiment_rollup, một query
+        
+        Returns:
+            [{domain, topic_id, topic_name, category, count, pos, neg, emotions, url}]
+            topic_name/category: giá trị nhiều bài nhất trong nhóm, url: max source_url
+        """
+        r = DailySentimentRollup
+        dims = (r.source_domain, r.topic_id, r.topic_name, r.category, r.sentiment_group, r.emotion)
+        rows = self.db.query(
+            *dims, func.sum(r.article_count), func.max(r.source_url)
+        ).filter(
+            r.day >= start, r.day <= end, r.source_domain.isnot(None)
+        ).group_by(*dims).all()
+        
+        groups = {}
+        for domain, topic_id, topic_name, category, sentiment_group, emotion, count, url in rows:
+            group = groups.get((domain, topic_id))
+            if group is None:
+                group = groups[(domain, topic_id)] = {
+                    "domain": domain, "topic_id": topic_id, "count": 0, "pos": 0, "neg": 0,
+                    "emotions": Counter(), "names": Counter(), "categories": Counter(), "url": None
+                }
+            count = int(count)
+            group["count"] += count
+            if sentiment_group == 'positive':
+                group["pos"] += count
+            elif sentiment_group == 'negative':
+                group["neg"] += count
+            group["emotions"][emotion] += count
+            group["names"][topic_name] += count
+            group["categories"][category] += count
+            if url is not None and (group["url"] is None or url > group["url"]):
+                group["url"] = url
+        
+        results = []
+        for key in sorted(groups, key=lambda k: (k[0], k[1] is not None, k[1] or 0)):
+            group = groups[key]
+            group["topic_name"] = group.pop("names").most_common(1)[0][0]
+            group["category"] = group.pop("categories").most_common(1)[0][0]
+            group["emotions"] = dict(group["emotions"])
+            results.append(group)
+        return results
+    
+    def _upsert_stats(self, model, rows: List[Dict], key_columns: List[str]) -> List:
+        """
+        Bulk INSERT ... ON CONFLICT DO UPDATE các dòng thống kê, một statement mỗi batch
+        
+        Args:
+            model: WebsiteActivityStats / SocialActivityStats
+            rows: Giá trị cột của từng dòng (cùng tập key)
+            key_columns: Cột của unique index, không kể coalesce(topic_id, NULL_TOPIC_KEY)
+        
+        Returns:
+            ORM objects sau upsert (RETURNING)
+        """
+        if not rows:
+            return []
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return self._merge_stats(model, rows, key_columns)
+        
+        conflict = [getattr(model, column) for column in key_columns]
+        conflict.append(func.coalesce(model.topic_id, NULL_TOPIC_KEY))
+        update_columns = [column for column in rows[0] if column not in key_columns and column != 'topic_id']
+        updated_at = datetime.now().timestamp()
+        
+        # Postgres giới hạn 65535 bind params mỗi statement (+2: created_at/updated_at default)
+        batch_size = max(1, 65535 // (len(rows[0]) + 2))
+        
+        results = []
+        for i in range(0, len(rows), batch_size):
+            stmt = dialect_insert(model).values(rows[i:i + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict,
+                set_={**{column: stmt.excluded[column] for column in update_columns}, 'updated_at': updated_at}
+            ).returning(model)
+            results.extend(self.db.scalars(stmt, execution_options={"populate_existing": True}))
+        return results
+    
+    def _merge_stats(self, model, rows: List[Dict], key_columns: List[str]) -> List:
+        """
+        Fallback của _upsert_stats cho dialect không có ON CONFLICT: load các dòng
+        hiện có của kỳ trong một query rồi cập nhật / thêm mới qua ORM
+        """
+        key_columns = key_columns + ['topic_id']
+        existing = {}
+        query = self.db.query(model).filter(
+            model.period_type.in_({row['period_type'] for row in rows}),
+            model.period_start.in_({row['period_start'] for row in rows})
+        )
+        for stat in query:
+            existing[tuple(getattr(stat, column) for column in key_columns)] = stat
+        
+        results = []
+        for row in rows:
+            stat = existing.get(tuple(row[column] for column in key_columns))
+            if stat is None:
+                stat = model(**row)
+                self.db.add(stat)
+            else:
+                for column, value in row.items():
+                    setattr(stat, column, value)
+            results.append(stat)
+        self.db.flush()
+        return results
     
     def calculate_website_stats(self, period_type: str = "weekly", reference_date: date = None) -> List[WebsiteActivityStats]:
         """Thống kê website hoạt động theo chủ đề"""
         start, end, label = self._get_period_range(period_type, reference_date)
-        
-        from sqlalchemy import Integer
-        # Query grouped by domain and topic
-        data = self.db.query(
-            SentimentAnalysis.source_domain,
-            SentimentAnalysis.topic_id,
-            SentimentAnalysis.topic_name,
-            SentimentAnalysis.category,
-            func.count(SentimentAnalysis.id).label('count'),
-            func.sum(func.cast(SentimentAnalysis.sentiment_group == 'positive', Integer)).label('pos'),
-            func.sum(func.cast(SentimentAnalysis.sentiment_group == 'negative', Integer)).label('neg'),
-        ).filter(
-            and_(
-                func.date(SentimentAnalysis.published_date) >= start,
-                func.date(SentimentAnalysis.published_date) <= end,
-                SentimentAnalysis.source_domain.isnot(None)
-            )
-        ).group_by(
-            SentimentAnalysis.source_domain,
-            SentimentAnalysis.topic_id,
-            SentimentAnalysis.topic_name,
-            SentimentAnalysis.category
-        ).all()
+        self.rollup.ensure_fresh(start, end)
         
         # Filter out social platforms (handled separately)
-        results = []
+        rows = []
         overall_ranks = {}  # domain -> total count
         
-        for domain, topic_id, topic_name, category, count, pos, neg in data:
+        for group in self._rollup_source_groups(start, end):
+            domain = group["domain"]
             if self._detect_platform(domain):
                 continue  # Skip social platforms
             
-            pos = pos or 0
-            neg = neg or 0
+            count, pos, neg = group["count"], group["pos"], group["neg"]
             neu = count - pos - neg
             
             # Accumulate for overall ranking
             overall_ranks[domain] = overall_ranks.get(domain, 0) + count
             
-            # Emotion distribution
-            emotions = self.db.query(
-                SentimentAnalysis.emotion,
-                func.count(SentimentAnalysis.id)
-            ).filter(
-                and_(
-                    SentimentAnalysis.source_domain == domain,
-                    SentimentAnalysis.topic_id == topic_id if topic_id else True,
-                    func.date(SentimentAnalysis.published_date) >= start,
-                    func.date(SentimentAnalysis.published_date) <= end
-                )
-            ).group_by(SentimentAnalysis.emotion).all()
-            emotion_dist = {e: c for e, c in emotions}
-            dominant = max(emotion_dist, key=emotion_dist.get) if emotion_dist else None
-            
-            # Check existing
-            existing = self.db.query(WebsiteActivityStats).filter(
-                and_(
-                    WebsiteActivityStats.period_type == period_type,
-                    WebsiteActivityStats.period_start == start,
-                    WebsiteActivityStats.domain == domain,
-                    WebsiteActivityStats.topic_id == topic_id if topic_id else WebsiteActivityStats.topic_id.is_(None)
-                )
-            ).first()
-            
-            stat = existing or WebsiteActivityStats()
-            stat.period_type = period_type
-            stat.period_start = start
-            stat.period_end = end
-            stat.domain = domain
-            stat.website_type = 'news'  # Default, có thể classify sau
-            stat.topic_id = topic_id
-            stat.topic_name = topic_name
-            stat.category = category
-            stat.article_count = count
-            stat.total_mentions = count
-            stat.positive_count = pos
-            stat.negative_count = neg
-            stat.neutral_count = neu
-            stat.avg_sentiment_score = self._calculate_sentiment_score(pos, neg, neu)
-            stat.emotion_distribution = emotion_dist
-            stat.dominant_emotion = dominant
-            
-            if not existing:
-                self.db.add(stat)
-            results.append(stat)
+            emotion_dist = group["emotions"]
+            rows.append({
+                "period_type": period_type,
+                "period_start": start,
+                "period_end": end,
+                "domain": domain,
+                "website_type": 'news',  # Default, có thể classify sau
+                "topic_id": group["topic_id"],
+                "topic_name": group["topic_name"],
+                "category": group["category"],
+                "article_count": count,
+                "total_mentions": count,
+                "positive_count": pos,
+                "negative_count": neg,
+                "neutral_count": neu,
+                "avg_sentiment_score": self._calculate_sentiment_score(pos, neg, neu),
+                "emotion_distribution": emotion_dist,
+                "dominant_emotion": max(emotion_dist, key=emotion_dist.get) if emotion_dist else None,
+            })
         
         # Set overall ranks
         sorted_domains = sorted(overall_ranks.items(), key=lambda x: x[1], reverse=True)
         domain_ranks = {d: r for r, (d, _) in enumerate(sorted_domains, 1)}
-        for stat in results:
-            stat.rank_overall = domain_ranks.get(stat.domain, 999)
+        for row in rows:
+            row["rank_overall"] = domain_ranks.get(row["domain"], 999)
         
-        return results
-    
-    # ========== SOCIAL ACTIVITY STATS ==========
+        return self._upsert_stats(WebsiteActivityStats, rows, ["period_type", "period_start", "domain"])
     
     def calculate_social_stats(self, period_type: str = "weekly", reference_date: date = None) -> List[SocialActivityStats]:
         """Thống kê mạng xã hội theo chủ đề"""
         start, end, label = self._get_period_range(period_type, reference_date)
+        self.rollup.ensure_fresh(start, end)
         
-        from sqlalchemy import Integer
-        # Query grouped by domain and topic
-        data = self.db.query(
-            SentimentAnalysis.source_domain,
-            SentimentAnalysis.source_url,
-            SentimentAnalysis.topic_id,
-            SentimentAnalysis.topic_name,
-            SentimentAnalysis.category,
-            func.count(SentimentAnalysis.id).label('count'),
-            func.sum(func.cast(SentimentAnalysis.sentiment_group == 'positive', Integer)).label('pos'),
-            func.sum(func.cast(SentimentAnalysis.sentiment_group == 'negative', Integer)).label('neg'),
-        ).filter(
-            and_(
-                func.date(SentimentAnalysis.published_date) >= start,
-                func.date(SentimentAnalysis.published_date) <= end,
-                SentimentAnalysis.source_domain.isnot(None)
-            )
-        ).group_by(
-            SentimentAnalysis.source_domain,
-            SentimentAnalysis.source_url,
-            SentimentAnalysis.topic_id,
-            SentimentAnalysis.topic_name,
-            SentimentAnalysis.category
-        ).all()
-        
-        results = []
+        rows = []
         platform_ranks = {}  # platform -> {account -> count}
         
-        for domain, url, topic_id, topic_name, category, count, pos, neg in data:
+        for group in self._rollup_source_groups(start, end):
+            domain = group["domain"]
             platform = self._detect_platform(domain)
             if not platform:
                 continue  # Skip non-social
             
-            pos = pos or 0
-            neg = neg or 0
+            count, pos, neg = group["count"], group["pos"], group["neg"]
             neu = count - pos - neg
             
             # Track for ranking
@@ -1022,63 +1123,36 @@ Giữ 25-35 cụm có nghĩa.
                 platform_ranks[platform] = {}
             platform_ranks[platform][domain] = platform_ranks[platform].get(domain, 0) + count
             
-            # Emotion distribution
-            emotions = self.db.query(
-                SentimentAnalysis.emotion,
-                func.count(SentimentAnalysis.id)
-            ).filter(
-                and_(
-                    SentimentAnalysis.source_domain == domain,
-                    SentimentAnalysis.topic_id == topic_id if topic_id else True,
-                    func.date(SentimentAnalysis.published_date) >= start,
-                    func.date(SentimentAnalysis.published_date) <= end
-                )
-            ).group_by(SentimentAnalysis.emotion).all()
-            emotion_dist = {e: c for e, c in emotions}
-            dominant = max(emotion_dist, key=emotion_dist.get) if emotion_dist else None
-            
-            # Check existing
-            existing = self.db.query(SocialActivityStats).filter(
-                and_(
-                    SocialActivityStats.period_type == period_type,
-                    SocialActivityStats.period_start == start,
-                    SocialActivityStats.platform == platform,
-                    SocialActivityStats.account_name == domain,
-                    SocialActivityStats.topic_id == topic_id if topic_id else SocialActivityStats.topic_id.is_(None)
-                )
-            ).first()
-            
-            stat = existing or SocialActivityStats()
-            stat.period_type = period_type
-            stat.period_start = start
-            stat.period_end = end
-            stat.platform = platform
-            stat.account_name = domain
-            stat.account_url = url
-            stat.topic_id = topic_id
-            stat.topic_name = topic_name
-            stat.category = category
-            stat.post_count = count
-            stat.total_mentions = count
-            stat.positive_count = pos
-            stat.negative_count = neg
-            stat.neutral_count = neu
-            stat.avg_sentiment_score = self._calculate_sentiment_score(pos, neg, neu)
-            stat.emotion_distribution = emotion_dist
-            stat.dominant_emotion = dominant
-            
-            if not existing:
-                self.db.add(stat)
-            results.append(stat)
+            emotion_dist = group["emotions"]
+            rows.append({
+                "period_type": period_type,
+                "period_start": start,
+                "period_end": end,
+                "platform": platform,
+                "account_name": domain,
+                "account_url": group["url"],
+                "topic_id": group["topic_id"],
+                "topic_name": group["topic_name"],
+                "category": group["category"],
+                "post_count": count,
+                "total_mentions": count,
+                "positive_count": pos,
+                "negative_count": neg,
+                "neutral_count": neu,
+                "avg_sentiment_score": self._calculate_sentiment_score(pos, neg, neu),
+                "emotion_distribution": emotion_dist,
+                "dominant_emotion": max(emotion_dist, key=emotion_dist.get) if emotion_dist else None,
+            })
         
         # Set platform ranks
-        for stat in results:
-            if stat.platform in platform_ranks:
-                sorted_accounts = sorted(platform_ranks[stat.platform].items(), key=lambda x: x[1], reverse=True)
-                account_ranks = {a: r for r, (a, _) in enumerate(sorted_accounts, 1)}
-                stat.rank_in_platform = account_ranks.get(stat.account_name, 999)
-        
-        return results
+        account_ranks = {}
+        for platform, accounts in platform_ranks.items():
+            sorted_accounts = sorted(accounts.items(), key=lambda x: x[1], reverse=True)
+            account_ranks[platform] = {a: r for r, (a, _) in enumerate(sorted_accounts, 1)}
+        for row in rows:
+            row["rank_in_platform"] = account_ranks[row["platform"]].get(row["account_name"], 999)
+        
+        return self._upsert_stats(SocialActivityStats, rows, ["period_type", "period_start", "platform", "account_name"])
     
     # ========== DAILY SNAPSHOT ==========
     
@@ -1089,7 +1163,7 @@ Giữ 25-35 cụm có nghĩa.
         from sqlalchemy import Integer
         # Query data for the day
         day_data = self.db.query(SentimentAnalysis).filter(
-            func.date(SentimentAnalysis.published_date) == target_date
+            within_days(SentimentAnalysis.published_date, target_date, target_date)
         ).all()
         
         if not day_data:
@@ -1156,7 +1230,7 @@ Giữ 25-35 cụm có nghĩa.
             # Weekly reports
             self.calculate_trend_report("weekly", ref)
             self.calculate_hot_topics("weekly", ref)
-            self.calculate_keyword_stats("weekly", ref)
+            self.calculate_keyword_stats("weekly", ref, incremental=True)
             self.calculate_topic_mention_stats("weekly", ref)
             self.calculate_website_stats("weekly", ref)
             self.calculate_social_stats("weekly", ref)
@@ -1165,7 +1239,7 @@ Giữ 25-35 cụm có nghĩa.
             if ref.day <= 7 or ref.day >= 25:
                 self.calculate_trend_report("monthly", ref)
                 self.calculate_hot_topics("monthly", ref)
-                self.calculate_keyword_stats("monthly", ref)
+                self.calculate_keyword_stats("monthly", ref, incremental=True)
                 self.calculate_topic_mention_stats("monthly", ref)
             
             self.db.commit()
@@ -207,24 +207,33 @@ class BertopicTopicSaver:
         training_params: Dict[str, Any],
         document_topics: List[Dict[str, Any]],
         model_saved_path: str = None,
-        notes: str = None
+        notes: str = None,
+        session_id: str = None
     ) -> str:
-        session_id = str(uuid.uuid4())
+        """
+        Lưu session + topics + mappings; session_id của session đã tạo sẵn
+        (BertopicTrainer) thì topics được lưu vào chính session đó
+        """
+        session_id = session_id or str(uuid.uuid4())
         started_at = datetime.now()
         
-        BertopicTopicSaver.save_training_session(
-            db=db,
-            session_id=session_id,
-            model_type=training_params.get('model_type', 'bertopic'),
-            min_topic_size=training_params.get('min_topic_size'),
-            embedding_model=training_params.get('embedding_model'),
-            use_vietnamese_tokenizer=training_params.get('use_vietnamese_tokenizer', False),
-            use_topicgpt=training_params.get('use_topicgpt', False),
-            num_documents=training_params.get('num_documents', 0),
-            training_duration_seconds=training_params.get('training_duration_seconds'),
-            started_at=started_at,
-            notes=notes
-        )
+        existing_session = db.query(TopicTrainingSession).filter(
+            TopicTrainingSession.session_id == session_id
+        ).first()
+        if not existing_session:
+            BertopicTopicSaver.save_training_session(
+                db=db,
+                session_id=session_id,
+                model_type=training_params.get('model_type', 'bertopic'),
+                min_topic_size=training_params.get('min_topic_size'),
+                embedding_model=training_params.get('embedding_model'),
+                use_vietnamese_tokenizer=training_params.get('use_vietnamese_tokenizer', False),
+                use_topicgpt=training_params.get('use_topicgpt', False),
+                num_documents=training_params.get('num_documents', 0),
+                training_duration_seconds=training_params.get('training_duration_seconds'),
+                started_at=started_at,
+                notes=notes
+            )
         
         discovered_topics = BertopicTopicSaver.save_discovered_topics(
             db=db,
@@ -140,14 +140,21 @@ class BertopicTrainer:
                 enable_topicgpt=enable_topicgpt
             )
             
-            # Train và auto-save to DB
+            # Train và auto-save to DB (topics under this session, the one the model is saved for)
             topics, probs = topic_model.fit(
                 documents=documents,
                 db=self.db,
                 save_to_db=True,
-                article_ids=article_ids
+                article_ids=article_ids,
+                session_id=session_id
             )
             
+            # Save model so hybrid transform / incremental updates can load it
+            try:
+                topic_model.save(f"{session_id}/bertopic_model")
+            except Exception as e:
+                logger.warning(f" Could not save model: {e}")
+            
             # 4. Get results
             logger.info("\n Step 4/4: Analyzing results...")
             num_topics = len(set(topics)) - 1  # Exclude outlier topic (-1)
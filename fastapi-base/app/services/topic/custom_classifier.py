@@ -10,6 +10,7 @@ from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 import numpy as np
 
+from app.services.classification.keyword_matcher import KeywordMatcher
 from app.models.model_custom_topic import CustomTopic, ArticleCustomTopic, TopicClassificationLog
 from app.models.model_article import Article
 from app.schemas.schema_custom_topic import (
@@ -22,10 +23,121 @@ from app.schemas.schema_custom_topic import (
 logger = logging.getLogger(__name__)
 
 
+class _TopicIndex:
+    """
+    Matrix form of a topic set for bulk classification
+    
+    Scores are identical to the per-topic path (_classify_keyword,
+    _classify_embedding_precomputed, hybrid weighting, negative keyword penalty)
+    """
+    
+    def __init__(self, topics: List[CustomTopic], method: ClassificationMethod, topic_embeddings: Dict[int, np.ndarray]):
+        # Plain (id, name) pairs: the index outlives the session that loaded the ORM topics
+        self.topics = [(t.id, t.name) for t in topics]
+        self.methods = [
+            method if method != ClassificationMethod.MANUAL else t.classification_method
+            for t in topics
+        ]
+        n = len(topics)
+        
+        self.is_keyword = np.array([m == ClassificationMethod.KEYWORD for m in self.methods])
+        self.is_embedding = np.array([m == ClassificationMethod.EMBEDDING for m in self.methods])
+        self.is_hybrid = np.array([m == ClassificationMethod.HYBRID for m in self.methods])
+        self.uses_keywords = self.is_keyword | self.is_hybrid
+        self.embedding_topics = self.is_embedding | self.is_hybrid
+        self.valid = self.is_keyword | self.is_embedding | self.is_hybrid  # Unknown methods bị bỏ qua
+        
+        self.keywords_weight = np.array([t.keywords_weight for t in topics], dtype=np.float64)
+        self.example_weight = np.array([t.example_weight for t in topics], dtype=np.float64)
+        self.topic_min_confidence = np.array([t.min_confidence for t in topics], dtype=np.float64)
+        
+        # Keyword → topic incidence (counts, duplicates trong topic.keywords giữ nguyên trọng số)
+        self.matcher = KeywordMatcher(kw for t in topics for kw in (t.keywords or []))
+        self.keyword_weights = np.zeros((len(self.matcher), n), dtype=np.float64)
+        for col, topic in enumerate(topics):
+            if topic.keywords:
+                for kw in topic.keywords:
+                    row = self.matcher.index_of(kw)
+                    if row is not None:
+                        self.keyword_weights[row, col] += 1.0 / len(topic.keywords)
+        
+        self.negative_matcher = KeywordMatcher(kw for t in topics for kw in (t.negative_keywords or []))
+        self.negative_topics = np.zeros((len(self.negative_matcher), n), dtype=bool)
+        for col, topic in enumerate(topics):
+            for kw in topic.negative_keywords or []:
+                row = self.negative_matcher.index_of(kw)
+                if row is not None:
+                    self.negative_topics[row, col] = True
+        
+        # Topic embeddings (rows of zeros → score 0 như khi chưa có embedding)
+        dimension = next((len(v) for v in topic_embeddings.values()), 0)
+        self.topic_matrix = np.zeros((n, dimension), dtype=np.float32)
+        for col, topic in enumerate(topics):
+            if topic.id in topic_embeddings:
+                self.topic_matrix[col] = topic_embeddings[topic.id]
+    
+    def keyword_scores(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(keyword scores, has negative keyword) matrices, shape (len(texts), n_topics)"""
+        n = len(self.topics)
+        scores = np.zeros((len(texts), n), dtype=np.float64)
+        negative = np.zeros((len(texts), n), dtype=bool)
+        
+        for row, text in enumerate(texts):
+            hits = self.matcher.matched_indices(text, lowercase=False)
+            if hits:
+                scores[row] = self.keyword_weights[list(hits)].sum(axis=0)
+            if len(self.negative_matcher):
+                neg_hits = self.negative_matcher.matched_indices(text, lowercase=False)
+                if neg_hits:
+                    negative[row] = self.negative_topics[list(neg_hits)].any(axis=0)
+        
+        return scores, negative
+    
+    def combine(self, keyword_scores: np.ndarray, similarities: np.ndarray, negative: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Final scores + effective embedding scores per classification method"""
+        hybrid_pass = self.is_hybrid & (keyword_scores >= 0.05)
+        embedding_scores = np.where(hybrid_pass | self.is_embedding, similarities, 0.0)
+        
+        hybrid = (
+            self.keywords_weight * keyword_scores + self.example_weight * similarities
+        ) / (self.keywords_weight + self.example_weight)
+        
+        final = np.where(self.is_keyword, keyword_scores, 0.0)
+        final = np.where(self.is_embedding, similarities, final)
+        final = np.where(hybrid_pass, hybrid, final)
+        final = np.where(negative, final * 0.3, final)
+        return final, embedding_scores
+    
+    def min_confidence(self, override: Optional[float]) -> np.ndarray:
+        if override is not None:
+            return np.full(len(self.topics), override, dtype=np.float64)
+        return self.topic_min_confidence
+    
+    def make_result(self, col: int, keyword_score: float, embedding_score: float,
+                    final_score: float, is_accepted: bool) -> TopicClassificationResult:
+        topic_id, topic_name = self.topics[col]
+        return TopicClassificationResult(
+            topic_id=topic_id,
+            topic_name=topic_name,
+            confidence=round(float(final_score), 4),
+            method=self.methods[col],
+            is_accepted=is_accepted,
+            scores=ClassificationScores(
+                keyword_score=round(float(keyword_score), 4) if self.uses_keywords[col] else 0.0,
+                embedding_score=round(float(embedding_score), 4) if self.embedding_topics[col] else None,
+                llm_score=None,
+                final_score=round(float(final_score), 4)
+            )
+        )
+
+
 class CustomTopicClassifier:
     def __init__(self):
         self.embedding_model = None
+        self.embedding_model_name = 'paraphrase-multilingual-MiniLM-L12-v2'
         self.topic_embeddings_cache: Dict[int, np.ndarray] = {}
+        self._topic_index: Optional[_TopicIndex] = None
+        self._topic_index_key = None
         self._init_embedding_model()
     
     def _init_embedding_model(self):
@@ -37,7 +149,7 @@ class CustomTopicClassifier:
             device = 'cuda' if torch.cuda.is_available() else 'cpu'
             
             self.embedding_model = SentenceTransformer(
-                'paraphrase-multilingual-MiniLM-L12-v2',
+                self.embedding_model_name,
                 device=device
             )
             logger.info(f"Embedding model loaded on {device}")
@@ -122,132 +234,107 @@ class CustomTopicClassifier:
         articles: List[Article],
         topics: List[CustomTopic],
         method: ClassificationMethod = ClassificationMethod.HYBRID,
-        min_confidence_override: Optional[float] = None
+        min_confidence_override: Optional[float] = None,
+        accepted_only: bool = False,
+        batch_size: int = 1000
     ) -> List[ArticleClassificationResult]:
-        """Batch processing with 10x speedup via batch encoding"""
-        results = []
+        """
+        Batch processing: article × topic scores computed as matrices
         
-        # Pre-compute all article embeddings in one batch (10x faster)
-        if self.embedding_model and method in [ClassificationMethod.EMBEDDING, ClassificationMethod.HYBRID]:
-            article_texts = [f"{a.title} {a.content or ''}"[:1000] for a in articles]
-            article_embeddings = self.embedding_model.encode(
-                article_texts,
-                batch_size=32,
-                show_progress_bar=len(articles) > 100,
-                convert_to_numpy=True,
-                normalize_embeddings=True
-            )
-        else:
-            article_embeddings = None
+        - Keyword scores: one compiled matcher pass per article (all topics)
+        - Embedding scores: one matmul per batch against the topic matrix
+        - Result objects for every valid topic, rejected ones included (như trước);
+          accepted_only=True chỉ tạo result cho topics được accept
+        """
+        results = []
         
         # Pre-compute topic embeddings with cache
         for topic in topics:
             if topic.is_active and topic.id not in self.topic_embeddings_cache:
                 self._compute_topic_embedding(topic)
         
-        # Classify each article
-        for idx, article in enumerate(articles):
+        index = self._get_topic_index(topics, method)
+        if index is None:
+            return [
+                ArticleClassificationResult(
+                    article_id=a.id, article_title=a.title, topics=[], processing_time_ms=0
+                )
+                for a in articles
+            ]
+        
+        use_embedding = (
+            bool(self.embedding_model)
+            and bool(index.embedding_topics.any())
+            and index.topic_matrix.shape[1] > 0
+        )
+        
+        for batch_start in range(0, len(articles), batch_size):
+            batch = articles[batch_start:batch_start + batch_size]
             start_time = time.time()
             
-            # Use pre-computed embedding if available
-            if article_embeddings is not None:
-                article_embedding = article_embeddings[idx]
+            # Article embeddings, only articles not yet in the shared embedding store are encoded
+            if use_embedding:
+                from app.services.topic.embedding_store import get_embedding_store
+                article_texts = [f"{a.title} {a.content or ''}"[:1000] for a in batch]
+                article_embeddings = get_embedding_store(self.embedding_model_name).encode(
+                    self.embedding_model,
+                    article_texts,
+                    batch_size=32,
+                    normalize=True,
+                    show_progress_bar=len(batch) > 100
+                )
+                similarities = np.clip(article_embeddings @ index.topic_matrix.T, 0.0, 1.0)
             else:
-                article_embedding = None
+                similarities = np.zeros((len(batch), len(index.topics)), dtype=np.float32)
             
-            topic_results = self._classify_article_with_embedding(
-                article=article,
-                topics=topics,
-                method=method,
-                min_confidence_override=min_confidence_override,
-                precomputed_embedding=article_embedding
-            )
+            texts = [f"{a.title} {a.content or ''}".lower().strip() for a in batch]
+            keyword_scores, negative = index.keyword_scores(texts)
+            final_scores, embedding_scores = index.combine(keyword_scores, similarities, negative)
             
-            processing_time = int((time.time() - start_time) * 1000)
+            accepted = (final_scores >= index.min_confidence(min_confidence_override)) & index.valid
+            per_article_ms = int((time.time() - start_time) * 1000 / max(len(batch), 1))
             
-            result = ArticleClassificationResult(
-                article_id=article.id,
-                article_title=article.title,
-                topics=topic_results,
-                processing_time_ms=processing_time
-            )
-            
-            results.append(result)
+            for row, article in enumerate(batch):
+                if not texts[row]:
+                    topic_cols = []
+                elif accepted_only:
+                    topic_cols = np.flatnonzero(accepted[row])
+                else:
+                    topic_cols = np.flatnonzero(index.valid)
+                
+                topic_results = [
+                    index.make_result(col, keyword_scores[row, col], embedding_scores[row, col],
+                                      final_scores[row, col], bool(accepted[row, col]))
+                    for col in topic_cols
+                ]
+                topic_results.sort(key=lambda x: x.confidence, reverse=True)
+                
+                results.append(ArticleClassificationResult(
+                    article_id=article.id,
+                    article_title=article.title,
+                    topics=topic_results,
+                    processing_time_ms=per_article_ms
+                ))
         
         return results
     
-    def _classify_article_with_embedding(
-        self,
-        article: Article,
-        topics: List[CustomTopic],
-        method: ClassificationMethod,
-        min_confidence_override: Optional[float],
-        precomputed_embedding: Optional[np.ndarray] = None
-    ) -> List[TopicClassificationResult]:
-        """Internal method that accepts pre-computed embeddings"""
-        text = f"{article.title} {article.content or ''}".lower().strip()
-        if not text:
-            return []
-        
-        results = []
+    def _get_topic_index(self, topics: List[CustomTopic], method: ClassificationMethod) -> Optional["_TopicIndex"]:
+        """Build (or reuse) matrices + keyword matchers for a topic set"""
+        active = [t for t in topics if t.is_active]
+        if not active:
+            return None
         
-        for topic in topics:
-            if not topic.is_active:
-                continue
-            
-            start_time = time.time()
-            classification_method = method if method != ClassificationMethod.MANUAL else topic.classification_method
-            
-            if classification_method == ClassificationMethod.KEYWORD:
-                keyword_score = self._classify_keyword(text, topic)
-                embedding_score = None
-                final_score = keyword_score
-                
-            elif classification_method == ClassificationMethod.EMBEDDING:
-                keyword_score = None
-                embedding_score = self._classify_embedding_precomputed(precomputed_embedding, topic)
-                final_score = embedding_score
-                
-            elif classification_method == ClassificationMethod.HYBRID:
-                keyword_score = self._classify_keyword(text, topic)
-                if keyword_score < 0.05:
-                    embedding_score = 0.0
-                    final_score = 0.0
-                else:
-                    embedding_score = self._classify_embedding_precomputed(precomputed_embedding, topic)
-                    final_score = (
-                        topic.keywords_weight * keyword_score +
-                        topic.example_weight * embedding_score
-                    ) / (topic.keywords_weight + topic.example_weight)
-            else:
-                continue
-            
-            if topic.negative_keywords:
-                has_negative = any(neg_kw.lower() in text for neg_kw in topic.negative_keywords)
-                if has_negative:
-                    final_score *= 0.3
-            
-            min_conf = min_confidence_override if min_confidence_override is not None else topic.min_confidence
-            is_accepted = final_score >= min_conf
-            
-            result = TopicClassificationResult(
-                topic_id=topic.id,
-                topic_name=topic.name,
-                confidence=round(final_score, 4),
-                method=classification_method,
-                is_accepted=is_accepted,
-                scores=ClassificationScores(
-                    keyword_score=round(keyword_score, 4) if keyword_score is not None else 0.0,
-                    embedding_score=round(embedding_score, 4) if embedding_score is not None else None,
-                    llm_score=None,
-                    final_score=round(final_score, 4)
-                )
+        key = (method, tuple(
+            (
+                t.id, t.name, t.classification_method, tuple(t.keywords or []), tuple(t.negative_keywords or []),
+                t.keywords_weight, t.example_weight, t.min_confidence, t.id in self.topic_embeddings_cache
             )
-            
-            results.append(result)
-        
-        results.sort(key=lambda x: x.confidence, reverse=True)
-        return results
+            for t in active
+        ))
+        if self._topic_index is None or self._topic_index_key != key:
+            self._topic_index = _TopicIndex(active, method, self.topic_embeddings_cache)
+            self._topic_index_key = key
+        return self._topic_index
     
     def save_classification_results(
         self,
@@ -441,6 +528,8 @@ class CustomTopicClassifier:
     
     def clear_cache(self):
         self.topic_embeddings_cache.clear()
+        self._topic_index = None
+        self._topic_index_key = None
         logger.info("Cache cleared")
 
 
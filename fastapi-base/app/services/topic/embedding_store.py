@@ -0,0 +1,258 @@
+"""
+Embedding Store - Persistent cache of sentence embeddings keyed by content hash
+
+Shared by TopicModel, CustomTopicClassifier, HybridTopicTrainer and the
+semantic deduplicator so the same text is only embedded once per model.
+
+Layout (one directory per embedding model):
+    data/embeddings/<model>/keys.bin      16-byte blake2b digest per row (append-only)
+    data/embeddings/<model>/vectors.f16   float16 vectors, one row per key (append-only)
+    data/embeddings/<model>/meta.json     {"model": ..., "dimension": ...}
+
+Vectors are stored un-normalized; encode(normalize=True) normalizes on read.
+Reads go through an in-process LRU (float32) in front of the memory-mapped file.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KEY_SIZE = 16
+DEFAULT_STORE_DIR = Path("data") / "embeddings"
+
+
+def content_key(text: str) -> bytes:
+    """Content hash used as cache key"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=KEY_SIZE).digest()
+
+
+def canonical_model_name(model_name: str) -> str:
+    """'sentence-transformers/xyz' and 'xyz' are the same model"""
+    return model_name.split("/", 1)[1] if model_name.startswith("sentence-transformers/") else model_name
+
+
+class EmbeddingStore:
+    """Content-hash → float16 vector store with an LRU front"""
+
+    def __init__(
+        self,
+        model_name: str,
+        store_dir: Path = DEFAULT_STORE_DIR,
+        lru_size: int = 20000
+    ):
+        """
+        Initialize embedding store for one embedding model
+
+        Args:
+            model_name: SentenceTransformer model name (namespace of the store)
+            store_dir: Root directory of all stores
+            lru_size: Max vectors kept in the in-process LRU
+        """
+        self.model_name = canonical_model_name(model_name)
+        self.dir = Path(store_dir) / re.sub(r'[^\w.-]+', '_', self.model_name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        self.keys_path = self.dir / "keys.bin"
+        self.vectors_path = self.dir / "vectors.f16"
+        self.meta_path = self.dir / "meta.json"
+        self.keys_path.touch(exist_ok=True)
+        self.vectors_path.touch(exist_ok=True)
+
+        self.dimension: Optional[int] = None
+        if self.meta_path.exists():
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.dimension = json.load(f).get("dimension")
+
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._rows: Dict[bytes, int] = {}
+        # Number of on-disk rows already indexed (may exceed len(_rows) if keys repeat)
+        self._loaded = 0
+        self._vectors: Optional[np.memmap] = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self.refresh()
+        logger.info(f"Embedding store {self.model_name}: {len(self._rows)} vectors")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def refresh(self):
+        """Index rows appended since last load (by this or another process)"""
+        if not self.dimension:
+            return
+
+        row_bytes = self.dimension * 2
+        total = min(
+            self.keys_path.stat().st_size // KEY_SIZE,
+            self.vectors_path.stat().st_size // row_bytes
+        )
+        if total <= self._loaded:
+            return
+
+        with open(self.keys_path, 'rb') as f:
+            f.seek(self._loaded * KEY_SIZE)
+            data = f.read((total - self._loaded) * KEY_SIZE)
+        for i in range(len(data) // KEY_SIZE):
+            self._rows.setdefault(data[i * KEY_SIZE:(i + 1) * KEY_SIZE], self._loaded + i)
+        self._loaded = total
+
+        self._vectors = np.memmap(
+            self.vectors_path, dtype=np.float16, mode='r', shape=(total, self.dimension)
+        )
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Get float32 vector for a content key (None if not cached)"""
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            return vector
+
+        row = self._rows.get(key)
+        if row is None or self._vectors is None or row >= len(self._vectors):
+            return None
+
+        vector = np.asarray(self._vectors[row], dtype=np.float32)
+        self._remember(key, vector)
+        return vector
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray):
+        """Append new vectors to disk (under an exclusive lock)"""
+        if not keys:
+            return
+
+        vectors = np.asarray(vectors)
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+            with open(self.meta_path, 'w', encoding='utf-8') as f:
+                json.dump({"model": self.model_name, "dimension": self.dimension}, f)
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(f"Embedding dimension mismatch: {vectors.shape[1]} vs {self.dimension}")
+
+        with open(self.keys_path, 'ab') as kf, open(self.vectors_path, 'ab') as vf:
+            fcntl.flock(kf, fcntl.LOCK_EX)
+            try:
+                # Pick up rows from other writers so row numbers stay aligned
+                self.refresh()
+                # Drop a torn tail left by a writer that crashed between the two appends
+                os.ftruncate(kf.fileno(), self._loaded * KEY_SIZE)
+                os.ftruncate(vf.fileno(), self._loaded * self.dimension * 2)
+                new = [(k, v) for k, v in zip(keys, vectors) if k not in self._rows]
+                if new:
+                    start = self._loaded
+                    # Vectors first, keys last: a row only exists once its key is written
+                    vf.write(np.array([v for _, v in new], dtype=np.float16).tobytes())
+                    vf.flush()
+                    kf.write(b"".join(k for k, _ in new))
+                    kf.flush()
+                    for i, (k, _) in enumerate(new):
+                        self._rows[k] = start + i
+                    self._loaded += len(new)
+            finally:
+                fcntl.flock(kf, fcntl.LOCK_UN)
+
+        self._vectors = np.memmap(
+            self.vectors_path, dtype=np.float16, mode='r', shape=(self._loaded, self.dimension)
+        ) if self._loaded else None
+        for key, vector in zip(keys, vectors):
+            self._remember(key, np.asarray(vector, dtype=np.float32))
+
+    def encode(
+        self,
+        model,
+        texts: List[str],
+        batch_size: int = 32,
+        normalize: bool = False,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """
+        Embed texts, encoding only those not already in the store
+
+        Args:
+            model: SentenceTransformer (or anything with .encode)
+            texts: Texts to embed
+            batch_size: Encoder batch size for cache misses
+            normalize: L2-normalize returned vectors
+            show_progress_bar: Forwarded to model.encode
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+
+        keys = [content_key(text) for text in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+
+        self.refresh()
+
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            vector = self.get(key)
+            if vector is None:
+                missing[key] = text
+            else:
+                found[key] = vector
+
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            logger.info(f"Embedding store: {len(found)} cached, encoding {len(missing)}")
+            encoded = model.encode(
+                list(missing.values()),
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=show_progress_bar
+            )
+            self.put_many(list(missing.keys()), encoded)
+            for key, vector in zip(missing.keys(), encoded):
+                found[key] = np.asarray(vector, dtype=np.float32)
+
+        result = np.stack([found[key] for key in keys]).astype(np.float32)
+        if normalize:
+            norms = np.linalg.norm(result, axis=1, keepdims=True)
+            result = result / np.maximum(norms, 1e-12)
+        return result
+
+    def get_stats(self) -> Dict:
+        """Get store statistics"""
+        return {
+            "model": self.model_name,
+            "path": str(self.dir),
+            "vectors": len(self._rows),
+            "dimension": self.dimension,
+            "lru_entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Global instances (one per embedding model)
+_stores: Dict[str, EmbeddingStore] = {}
+
+def get_embedding_store(model_name: str) -> EmbeddingStore:
+    """Get or create global embedding store for a model"""
+    name = canonical_model_name(model_name)
+    if name not in _stores:
+        _stores[name] = EmbeddingStore(name)
+    return _stores[name]
@@ -4,9 +4,13 @@ Hybrid Topic Training - Combine full training & incremental updates
 Strategy:
 - Full train: Monthly or when concept drift detected
 - Transform: Daily for new articles
+- Incremental: Fit a small model on new articles and merge it into the
+  existing one (BERTopic.merge_models) - existing topic IDs stay stable,
+  new themes become new topics; full retrain only on concept drift
 - Drift detection: Monitor topic distribution changes
 """
 import logging
+import time
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
@@ -26,11 +30,17 @@ class HybridTopicTrainer:
         self.db = db
         self.full_trainer = BertopicTrainer(db)
         self.drift_threshold = 0.3  # 30% topic distribution change triggers retrain
+        self.min_incremental_batch = 50  # Min new articles to fit a batch model for merging
+        self.merge_min_similarity = 0.7  # Batch topics less similar than this become new topics
+        self.model_session_id = None  # Session of the model loaded by _load_latest_model
     
-    def should_retrain(self) -> Tuple[bool, str]:
+    def should_retrain(self, incremental: bool = False) -> Tuple[bool, str]:
         """
         Check if full retrain is needed
         
+        Args:
+            incremental: Incremental mode - only concept drift (or no model) triggers retrain
+        
         Returns:
             (should_retrain, reason)
         """
@@ -40,6 +50,12 @@ class HybridTopicTrainer:
         if not last_train:
             return True, "No previous training found"
         
+        if incremental:
+            drift_score = self._detect_concept_drift()
+            if drift_score > self.drift_threshold:
+                return True, f"Concept drift detected (score: {drift_score:.2f})"
+            return False, f"Drift below threshold ({drift_score:.2f} <= {self.drift_threshold})"
+        
         days_since_train = (datetime.now() - last_train).days
         
         # Force retrain after 30 days
@@ -67,7 +83,8 @@ class HybridTopicTrainer:
         force_full_train: bool = False,
         min_topic_size: int = 10,
         use_vietnamese_tokenizer: bool = True,
-        enable_topicgpt: bool = False
+        enable_topicgpt: bool = False,
+        incremental: bool = False
     ) -> Dict:
         """
         Smart training: Full train or transform based on conditions
@@ -77,6 +94,8 @@ class HybridTopicTrainer:
             min_topic_size: Minimum topic size for training
             use_vietnamese_tokenizer: Use Vietnamese tokenizer
             enable_topicgpt: Enable TopicGPT for natural labels
+            incremental: Merge new articles into the existing model instead of
+                plain transform; full retrain only when drift > drift_threshold
         
         Returns:
             Dict with results and method used
@@ -90,13 +109,17 @@ class HybridTopicTrainer:
             pass
         
         # Check if retrain needed
-        should_retrain, reason = self.should_retrain()
+        should_retrain, reason = self.should_retrain(incremental=incremental)
         
         if force_full_train:
             should_retrain = True
             reason = "Forced full training"
         
-        logger.info(f"   Decision: {'FULL TRAIN' if should_retrain else 'TRANSFORM'}")
+        if should_retrain:
+            decision = 'FULL TRAIN'
+        else:
+            decision = 'INCREMENTAL' if incremental else 'TRANSFORM'
+        logger.info(f"   Decision: {decision}")
         logger.info(f"   Reason: {reason}")
         
         if should_retrain:
@@ -111,6 +134,15 @@ class HybridTopicTrainer:
             result['method'] = 'full_train'
             result['reason'] = reason
             return result
+        elif incremental:
+            logger.info(" Executing INCREMENTAL UPDATE...")
+            result = self._incremental_update(
+                min_topic_size=min_topic_size,
+                use_vietnamese_tokenizer=use_vietnamese_tokenizer
+            )
+            result['method'] = 'incremental'
+            result['reason'] = reason
+            return result
         else:
             # Transform new articles only
             logger.info(" Executing INCREMENTAL TRANSFORM...")
@@ -123,8 +155,6 @@ class HybridTopicTrainer:
         """
         Transform new articles using existing model
         """
-        from app.models import BertopicDiscoveredTopic, ArticleTopicMapping
-        
         # Get last training time
         last_train = self._get_last_training_time()
         
@@ -145,17 +175,7 @@ class HybridTopicTrainer:
             }
         
         # Get new articles
-        query = text("""
-            SELECT id, title, content, created_at
-            FROM articles
-            WHERE created_at > :since
-            AND content IS NOT NULL
-            AND LENGTH(content) > 100
-            AND id NOT IN (SELECT article_id FROM article_topic_mappings)
-            ORDER BY created_at DESC
-        """)
-        
-        rows = self.db.execute(query, {"since": last_train}).fetchall()
+        rows = self._get_new_articles(last_train)
         
         if not rows:
             logger.info(" No new articles to process")
@@ -178,20 +198,146 @@ class HybridTopicTrainer:
         
         # Save mappings
         logger.info(" Saving topic mappings...")
+        saved = self._save_mappings(article_ids, topics, probs)
+        
+        logger.info(f" Transform completed: {saved}/{len(documents)} mapped")
+        
+        return {
+            "status": "success",
+            "message": f"Transformed {len(documents)} new articles",
+            "processed": len(documents),
+            "mapped": saved,
+            "outliers": len([t for t in topics if t == -1]),
+            "method": "transform"
+        }
+    
+    def _incremental_update(
+        self,
+        min_topic_size: int = 10,
+        use_vietnamese_tokenizer: bool = True
+    ) -> Dict:
+        """
+        Update existing model with new articles without full retrain
+        
+        1. Fit a small BERTopic model on the new batch (reusing embeddings)
+        2. BERTopic.merge_models([base, batch]): base topics keep their IDs,
+           batch topics below merge_min_similarity are appended as new topics
+        3. Assign new articles with the merged model, save new topics + mappings
+        4. Overwrite the saved model so the next run starts from the merged one
+        """
+        from bertopic import BERTopic
+        from app.services.topic.bertopic_saver import BertopicTopicSaver
+        
+        last_train = self._get_last_training_time()
+        if not last_train:
+            return {
+                "status": "error",
+                "message": "No existing model found. Please run full training first."
+            }
+        
+        logger.info(" Loading existing model...")
+        model = self._load_latest_model()
+        if not model:
+            return {
+                "status": "error",
+                "message": "Failed to load existing model"
+            }
+        
+        rows = self._get_new_articles(last_train)
+        if not rows:
+            logger.info(" No new articles to process")
+            return {
+                "status": "success",
+                "message": "No new articles found",
+                "processed": 0,
+                "new_topics": 0
+            }
+        
+        start = time.time()
+        article_ids = [row[0] for row in rows]
+        documents = [f"{row[1] or ''}\n{row[2] or ''}" for row in rows]
+        logger.info(f"   Found {len(documents)} new articles")
+        
+        # Encode once (embedding store), reused by batch fit and transform
+        embeddings = model.embed(documents)
+        
+        new_topic_ids = []
+        if len(documents) >= max(self.min_incremental_batch, min_topic_size * 2):
+            logger.info(" Fitting batch model on new articles...")
+            batch_model = TopicModel(
+                min_topic_size=min_topic_size,
+                use_vietnamese_tokenizer=use_vietnamese_tokenizer
+            )
+            batch_model.embedding_model = model.embedding_model
+            batch_model.fit(documents, save_to_db=False, embeddings=embeddings)
+            
+            base_topics = set(model.topic_model.get_topics())
+            model.topic_model = BERTopic.merge_models(
+                [model.topic_model, batch_model.topic_model],
+                min_similarity=self.merge_min_similarity,
+                embedding_model=model.embedding_model
+            )
+            new_topic_ids = sorted(set(model.topic_model.get_topics()) - base_topics)
+            logger.info(f"   Merged model: {len(new_topic_ids)} new topics")
+        else:
+            logger.info(f"   Batch too small for new topics ({len(documents)} articles), transform only")
+        
+        topics, probs = model.transform(documents, embeddings=embeddings)
+        
+        if new_topic_ids:
+            topic_info = model.get_topic_info()
+            BertopicTopicSaver.save_discovered_topics(
+                db=self.db,
+                session_id=self.model_session_id,
+                topic_info={'topics': [t for t in topic_info['topics'] if t['topic_id'] in new_topic_ids]},
+                model_version='incremental'
+            )
+            model.save(f"{self.model_session_id}/bertopic_model")
+        
+        saved = self._save_mappings(article_ids, topics, probs)
+        duration = time.time() - start
+        
+        logger.info(f" Incremental update completed in {duration:.1f}s: {saved}/{len(documents)} mapped")
+        
+        return {
+            "status": "success",
+            "message": f"Incrementally updated model with {len(documents)} new articles",
+            "processed": len(documents),
+            "mapped": saved,
+            "outliers": len([t for t in topics if t == -1]),
+            "new_topics": len(new_topic_ids),
+            "duration_seconds": round(duration, 2)
+        }
+    
+    def _get_new_articles(self, since: datetime) -> List:
+        """Articles created after `since` that have no topic mapping yet"""
+        query = text("""
+            SELECT id, title, content, created_at
+            FROM articles
+            WHERE created_at > :since
+            AND content IS NOT NULL
+            AND LENGTH(content) > 100
+            AND id NOT IN (SELECT article_id FROM article_topic_mappings)
+            ORDER BY created_at DESC
+        """)
+        return self.db.execute(query, {"since": since}).fetchall()
+    
+    def _save_mappings(self, article_ids: List[int], topics: List[int], probs) -> int:
+        """Save article → topic mappings (outliers skipped), returns number saved"""
+        from app.models import ArticleTopicMapping
+        
+        topic_db_ids = self._topic_db_ids()
+        
         saved = 0
         for article_id, topic_id, prob in zip(article_ids, topics, probs):
             if topic_id == -1:  # Skip outliers
                 continue
             
-            # Get topic from DB
-            topic = self.db.query(BertopicDiscoveredTopic).filter(
-                BertopicDiscoveredTopic.topic_id == topic_id
-            ).first()
-            
-            if topic:
+            db_id = topic_db_ids.get(int(topic_id))
+            if db_id:
                 mapping = ArticleTopicMapping(
                     article_id=article_id,
-                    bertopic_topic_id=topic.id,
+                    bertopic_topic_id=db_id,
                     relevance_score=float(np.max(prob)),
                     detected_at=datetime.now()
                 )
@@ -199,17 +345,21 @@ class HybridTopicTrainer:
                 saved += 1
         
         self.db.commit()
-        
-        logger.info(f" Transform completed: {saved}/{len(documents)} mapped")
-        
-        return {
-            "status": "success",
-            "message": f"Transformed {len(documents)} new articles",
-            "processed": len(documents),
-            "mapped": saved,
-            "outliers": len([t for t in topics if t == -1]),
-            "method": "transform"
-        }
+        return saved
+    
+    def _topic_db_ids(self) -> Dict[int, int]:
+        """
+        BERTopic topic_id → DB id of the loaded model's session, one query
+        instead of one per article (topic_ids are only unique within a session)
+        """
+        topic_rows = self.db.execute(text("""
+            SELECT topic_id, id
+            FROM bertopic_discovered_topics
+            WHERE training_session_id = :session_id
+            ORDER BY created_at, id
+        """), {"session_id": self.model_session_id}).fetchall()
+        # Latest row wins if a topic_id was saved more than once
+        return {row[0]: row[1] for row in topic_rows}
     
     def _detect_concept_drift(self) -> float:
         """
@@ -330,6 +480,7 @@ class HybridTopicTrainer:
                 SELECT session_id, min_topic_size, use_vietnamese_tokenizer
                 FROM topic_training_sessions
                 WHERE status = 'completed'
+                AND model_saved_path IS NOT NULL
                 ORDER BY started_at DESC
                 LIMIT 1
             """)
@@ -355,8 +506,12 @@ class HybridTopicTrainer:
             
             # Load BERTopic model
             from bertopic import BERTopic
-            model.topic_model = BERTopic.load(str(model_path / "bertopic_model"))
+            model.topic_model = BERTopic.load(
+                str(model_path / "bertopic_model"),
+                embedding_model=model._setup_embedding_model()
+            )
             
+            self.model_session_id = session_id
             logger.info(f" Loaded model from {session_id}")
             return model
             
@@ -59,7 +59,29 @@ class FAISSIndexer:
                 results.append((doc_id, float(score)))
         
         return results
-    
+
+    def search_batch(self, query_embeddings: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search many queries in one call
+
+        Returns:
+            (similarities, indices), both shape (n_queries, k). Similarities are
+            cosine (L2 distances on normalized vectors are converted), -1 = no hit
+        """
+        if self.index is None:
+            raise ValueError("Index not built. Call build() first.")
+
+        queries = np.ascontiguousarray(query_embeddings, dtype='float32')
+        faiss.normalize_L2(queries)
+
+        scores, indices = self.index.search(queries, k)
+
+        if self.index.metric_type == faiss.METRIC_L2:
+            # ||a - b||^2 = 2 - 2cos(a, b) for unit vectors
+            scores = 1.0 - scores / 2.0
+
+        return scores, indices
+
     def save(self, index_name: str = "faiss_index"):
         if self.index is None:
             raise ValueError("No index to save")
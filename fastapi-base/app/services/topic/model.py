@@ -14,7 +14,11 @@ class TopicModel:
         min_topic_size: int = 10,
         embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
         use_vietnamese_tokenizer: bool = True,
-        enable_topicgpt: bool = False
+        enable_topicgpt: bool = False,
+        use_embedding_store: bool = True,
+        encode_batch_size: int = 64,
+        encode_threads: Optional[int] = None,
+        tokenize_workers: Optional[int] = None
     ):
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(parents=True, exist_ok=True)
@@ -24,9 +28,14 @@ class TopicModel:
         self.embedding_model_name = embedding_model
         self.use_vietnamese_tokenizer = use_vietnamese_tokenizer
         self.enable_topicgpt = enable_topicgpt
+        self.use_embedding_store = use_embedding_store
+        self.encode_batch_size = encode_batch_size
+        self.encode_threads = encode_threads
+        self.tokenize_workers = tokenize_workers
         
         self.topic_model = None
         self.embedding_model = None
+        self.embeddings = None  # Embeddings of the documents used in the last fit()
         self.topics = None
         self.probs = None
         self.vietnamese_tokenizer = None
@@ -71,10 +80,49 @@ class TopicModel:
         from sentence_transformers import SentenceTransformer
         
         device = 'cuda' if self.use_gpu else 'cpu'
+        if self.encode_threads and device == 'cpu':
+            import torch
+            torch.set_num_threads(self.encode_threads)
         self.embedding_model = SentenceTransformer(self.embedding_model_name, device=device)
         logger.info(f"Embedding model loaded on {device}")
         return self.embedding_model
     
+    def embed(self, documents: List[str]) -> np.ndarray:
+        """
+        Embed documents in batches (encode_batch_size), reusing vectors
+        from the shared embedding store
+        
+        Pass the result to fit()/transform() via `embeddings=` to skip encoding,
+        e.g. khi sweep UMAP/HDBSCAN params trên cùng một corpus.
+        """
+        if not self.embedding_model:
+            self._setup_embedding_model()
+        
+        if self.use_embedding_store:
+            from app.services.topic.embedding_store import get_embedding_store
+            store = get_embedding_store(self.embedding_model_name)
+            return store.encode(
+                self.embedding_model,
+                documents,
+                batch_size=self.encode_batch_size,
+                show_progress_bar=True
+            )
+        
+        return self.embedding_model.encode(
+            documents,
+            batch_size=self.encode_batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=True
+        )
+    
+    def _check_embeddings(self, embeddings: np.ndarray, documents: List[str]) -> np.ndarray:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or len(embeddings) != len(documents):
+            raise ValueError(
+                f"Embeddings shape {embeddings.shape} does not match {len(documents)} documents"
+            )
+        return embeddings
+    
     def _setup_umap(self, n_samples: int):
         from umap import UMAP
         # Adjust n_neighbors based on sample size
@@ -105,16 +153,26 @@ class TopicModel:
             return text
         
         try:
-            # Tokenize và join lại với underscore
-            tokens = self.vietnamese_tokenizer(text)
-            # Chỉ lấy từ đơn và bigrams (bỏ trigrams để không quá dài)
-            filtered = [t for t in tokens if ' ' not in t or t.count(' ') == 1]
-            return ' '.join(filtered) if filtered else text
+            return self._join_tokens(self.vietnamese_tokenizer(text), text)
         except Exception as e:
             logger.warning(f" Vietnamese preprocessing error: {e}")
             return text
     
-    def fit(self, documents: List[str], db=None, save_to_db: bool = True, article_ids: List[int] = None) -> Tuple[List[int], np.ndarray]:
+    @staticmethod
+    def _join_tokens(tokens: List[str], text: str) -> str:
+        """Tokens -> document cho vectorizer: chỉ lấy từ đơn và bigrams (bỏ trigrams để không quá dài)"""
+        filtered = [t for t in tokens if ' ' not in t or t.count(' ') == 1]
+        return ' '.join(filtered) if filtered else text
+    
+    def fit(
+        self,
+        documents: List[str],
+        db=None,
+        save_to_db: bool = True,
+        article_ids: List[int] = None,
+        embeddings: Optional[np.ndarray] = None,
+        session_id: Optional[str] = None
+    ) -> Tuple[List[int], np.ndarray]:
         """
         Fit BERTopic model và tự động lưu discovered topics vào database
         
@@ -123,15 +181,17 @@ class TopicModel:
             db: Database session (optional, nếu muốn lưu vào DB)
             save_to_db: Enable auto-save to database
             article_ids: List of article IDs tương ứng với documents
+            embeddings: Precomputed embeddings (từ embed() hoặc self.embeddings
+                của lần fit trước); None = encode documents
+            session_id: Training session đã tạo sẵn để lưu topics vào (None = tạo mới)
+        
+        Embeddings dùng để fit được giữ ở self.embeddings và lưu cùng model khi save().
         """
         from bertopic import BERTopic
         from sklearn.feature_extraction.text import CountVectorizer
         import time
         import uuid
         
-        if not self.embedding_model:
-            self._setup_embedding_model()
-        
         logger.info(f"Fitting BERTopic on {len(documents)} documents...")
         training_start_time = time.time()
         
@@ -140,12 +200,25 @@ class TopicModel:
         if self.use_vietnamese_tokenizer and self.vietnamese_tokenizer:
             logger.info(" Preprocessing documents with Vietnamese tokenizer...")
             try:
-                processed_documents = [self._preprocess_vietnamese(doc) for doc in documents]
+                # Batch + cache theo content hash: train lại trên cùng corpus không segment lại
+                from app.services.etl.vietnamese_tokenizer import tokenize_batch
+                token_lists = tokenize_batch(documents, workers=self.tokenize_workers)
+                processed_documents = [
+                    self._join_tokens(tokens, doc) if doc else doc
+                    for tokens, doc in zip(token_lists, documents)
+                ]
                 logger.info(" Vietnamese preprocessing completed")
             except Exception as e:
                 logger.warning(f" Vietnamese preprocessing failed: {e}, using original docs")
                 processed_documents = documents
         
+        if embeddings is None:
+            embeddings = self.embed(processed_documents)
+        else:
+            embeddings = self._check_embeddings(embeddings, processed_documents)
+            logger.info(" Using precomputed embeddings")
+        self.embeddings = embeddings
+        
         umap_model = self._setup_umap(len(processed_documents))
         hdbscan_model = self._setup_hdbscan()
         
@@ -178,7 +251,7 @@ class TopicModel:
             verbose=True
         )
         
-        self.topics, self.probs = self.topic_model.fit_transform(processed_documents)
+        self.topics, self.probs = self.topic_model.fit_transform(processed_documents, embeddings=embeddings)
         
         training_duration = time.time() - training_start_time
         num_topics = len(set(self.topics)) - 1
@@ -188,17 +261,21 @@ class TopicModel:
         if save_to_db and db is not None:
             try:
                 logger.info(" Saving discovered topics to database...")
-                self._save_to_database(db, documents, training_duration, article_ids)
+                self._save_to_database(db, documents, training_duration, article_ids, session_id=session_id)
             except Exception as e:
                 logger.error(f" Failed to save topics to database: {e}")
         
         return self.topics, self.probs
     
-    def transform(self, documents: List[str]) -> Tuple[List[int], np.ndarray]:
+    def transform(self, documents: List[str], embeddings: Optional[np.ndarray] = None) -> Tuple[List[int], np.ndarray]:
         if not self.topic_model:
             raise ValueError("Model not fitted. Call fit() first.")
         
-        topics, probs = self.topic_model.transform(documents)
+        if embeddings is None:
+            embeddings = self.embed(documents)
+        else:
+            embeddings = self._check_embeddings(embeddings, documents)
+        topics, probs = self.topic_model.transform(documents, embeddings=embeddings)
         return topics, probs
     
     def get_topic_info(self) -> Dict:
@@ -267,7 +344,8 @@ class TopicModel:
             for i, (doc, topic, prob) in enumerate(zip(documents, self.topics, self.probs))
         ]
     
-    def _save_to_database(self, db, documents: List[str], training_duration: float, article_ids: List[int] = None):
+    def _save_to_database(self, db, documents: List[str], training_duration: float, article_ids: List[int] = None,
+                          session_id: Optional[str] = None):
         """Lưu discovered topics vào database sau khi training"""
         import uuid
         from app.services.topic.bertopic_saver import BertopicTopicSaver
@@ -311,7 +389,8 @@ class TopicModel:
             training_params=training_params,
             document_topics=document_topics,
             model_saved_path=None,
-            notes='Auto-saved from TopicModel.fit()'
+            notes='Auto-saved from TopicModel.fit()',
+            session_id=session_id
         )
         
         logger.info(f" Saved discovered topics to database (session: {session_id})")
@@ -331,6 +410,11 @@ class TopicModel:
             save_ctfidf=True,
             save_embedding_model=self.embedding_model_name  # Save model name string
         )
+        
+        # Training embeddings (float16) để fit lại / sweep không cần encode lại
+        if self.embeddings is not None:
+            np.save(save_path / "embeddings.npy", self.embeddings.astype(np.float16))
+        
         logger.info(f"Model saved to {save_path}")
         
         return str(save_path)
@@ -349,10 +433,18 @@ class TopicModel:
             str(load_path),
             embedding_model=self.embedding_model
         )
+        self.embeddings = self.load_embeddings(model_name)
         logger.info(f"Model loaded from {load_path}")
         
         return self.topic_model
     
+    def load_embeddings(self, model_name: str = "bertopic_model") -> Optional[np.ndarray]:
+        """Load training embeddings saved alongside a model (None if not saved)"""
+        path = self.model_dir / model_name / "embeddings.npy"
+        if not path.exists():
+            return None
+        return np.load(path).astype(np.float32)
+    
     def get_topics_over_time(
         self, 
         documents: List[str], 
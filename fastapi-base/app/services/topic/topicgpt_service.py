@@ -5,10 +5,11 @@ Provides LLM-powered topic modeling enhancements
 import os
 import logging
 from typing import List, Dict, Optional, Tuple
-from pathlib import Path
 import json
 from datetime import datetime, timedelta
 
+from app.core.llm_cache import get_llm_cache, make_cache_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,7 +30,7 @@ class TopicGPTService:
         api: str = "openai",
         model: str = "gpt-4o-mini",
         cache_enabled: bool = True,
-        cache_dir: str = "data/cache/topicgpt"
+        cache_path: Optional[str] = None
     ):
         """
         Initialize TopicGPT Service
@@ -38,21 +39,18 @@ class TopicGPTService:
             api: API provider ('openai', 'gemini', 'azure', 'vertex')
             model: Model name
             cache_enabled: Enable caching to save costs
-            cache_dir: Directory for caching results
+            cache_path: LLM cache database (default: shared data/cache/llm_cache.db)
         """
         self.api = api
         self.model = model
         self.cache_enabled = cache_enabled
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize API client
         self.client = None
         self._init_api_client()
         
-        # Cache storage
-        self._cache = {}
-        self._load_cache()
+        # Shared content-addressed LLM cache
+        self._cache = get_llm_cache(cache_path) if cache_enabled else None
         
         logger.info(f"TopicGPT Service initialized with {api}/{model}")
     
@@ -85,51 +83,15 @@ class TopicGPTService:
             logger.error(f"Failed to initialize API client: {e}")
             self.client = None
     
-    def _load_cache(self):
-        """Load cached results from disk"""
-        cache_file = self.cache_dir / "cache.json"
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    self._cache = json.load(f)
-                logger.info(f"Loaded {len(self._cache)} cached results")
-            except Exception as e:
-                logger.warning(f"Could not load cache: {e}")
-                self._cache = {}
-    
-    def _save_cache(self):
-        """Save cache to disk"""
-        if not self.cache_enabled:
-            return
-        
-        cache_file = self.cache_dir / "cache.json"
-        try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.warning(f"Could not save cache: {e}")
-    
-    def _get_cache_key(self, operation: str, **kwargs) -> str:
-        """Generate cache key"""
-        key_data = f"{operation}:{json.dumps(kwargs, sort_keys=True)}"
-        import hashlib
-        return hashlib.md5(key_data.encode()).hexdigest()
-    
     def _call_llm(self, prompt: str, max_tokens: int = 500, temperature: float = 0.3) -> Optional[str]:
         """Call LLM API with caching"""
         if not self.client:
             logger.warning("LLM client not initialized")
             return None
         
-        # Check cache
-        cache_key = self._get_cache_key("llm_call", prompt=prompt[:100])
-        if self.cache_enabled and cache_key in self._cache:
-            logger.debug("Using cached LLM response")
-            return self._cache[cache_key]
-        
         try:
             if self.api == "openai":
-                response = self.client.chat.completions.create(
+                request = dict(
                     model=self.model,
                     messages=[
                         {"role": "system", "content": "You are a helpful assistant for Vietnamese text analysis."},
@@ -138,22 +100,28 @@ class TopicGPTService:
                     max_tokens=max_tokens,
                     temperature=temperature
                 )
-                result = response.choices[0].message.content
+                if self._cache is not None:
+                    return self._cache.chat(self.client, "topicgpt", **request)
+                response = self.client.chat.completions.create(**request)
+                return response.choices[0].message.content
             
             elif self.api == "gemini":
+                cache_key = make_cache_key(api="gemini", model=self.model, prompt=prompt)
+                if self._cache is not None:
+                    cached = self._cache.get(cache_key, "topicgpt")
+                    if cached is not None:
+                        return cached
+                
                 response = self.client.generate_content(prompt)
                 result = response.text
+                
+                if self._cache is not None:
+                    self._cache.set(cache_key, result, namespace="topicgpt", model=self.model)
+                return result
             
             else:
                 logger.warning(f"API {self.api} not implemented")
                 return None
-            
-            # Cache result
-            if self.cache_enabled:
-                self._cache[cache_key] = result
-                self._save_cache()
-            
-            return result
         
         except Exception as e:
             logger.error(f"LLM API call failed: {e}")
@@ -542,14 +510,14 @@ Kết quả:"""
             "api": self.api,
             "model": self.model,
             "cache_enabled": self.cache_enabled,
-            "cached_items": len(self._cache),
+            "cache": self._cache.get_stats() if self._cache is not None else None,
             "available": self.is_available()
         }
     
     def clear_cache(self):
-        """Clear all cached results"""
-        self._cache = {}
-        self._save_cache()
+        """Clear cached results written by this service"""
+        if self._cache is not None:
+            self._cache.clear(namespace="topicgpt")
         logger.info("Cache cleared")
 
 
@@ -5,7 +5,6 @@ Provides LLM-powered topic modeling with better structure and maintainability
 import os
 import logging
 from typing import List, Dict, Optional
-from pathlib import Path
 import json
 from pydantic import BaseModel, Field
 
@@ -15,9 +14,12 @@ from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_community.callbacks import get_openai_callback
 from langchain_core.runnables import RunnablePassthrough
-from langchain_community.cache import SQLiteCache
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
 from langchain.globals import set_llm_cache
 
+from app.core.llm_cache import LLMCache, get_llm_cache, make_cache_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,6 +59,40 @@ class MergeResult(BaseModel):
     merges: List[Dict] = Field(description="Danh sách đề xuất gộp topic")
 
 
+# ==================== CACHE ====================
+
+class SharedLLMCache(BaseCache):
+    """LangChain cache adapter over the shared content-addressed LLMCache"""
+    
+    namespace = "topicgpt_v2"
+    
+    def __init__(self, cache: LLMCache):
+        self.cache = cache
+    
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return make_cache_key(api="langchain", llm=llm_string, prompt=prompt)
+    
+    def lookup(self, prompt: str, llm_string: str):
+        cached = self.cache.get(self._key(prompt, llm_string), self.namespace)
+        if cached is None:
+            return None
+        try:
+            return [loads(gen) for gen in json.loads(cached)]
+        except Exception as e:
+            logger.warning(f"Could not deserialize cached generation: {e}")
+            return None
+    
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        self.cache.set(
+            self._key(prompt, llm_string),
+            json.dumps([dumps(gen) for gen in return_val]),
+            namespace=self.namespace
+        )
+    
+    def clear(self, **kwargs) -> None:
+        self.cache.clear(namespace=self.namespace)
+
+
 # ==================== MAIN SERVICE ====================
 
 class TopicGPTServiceV2:
@@ -68,7 +104,7 @@ class TopicGPTServiceV2:
     - Better prompt management
     - Automatic retry logic
     - Token usage tracking
-    - SQLite cache for persistence
+    - Shared content-addressed LLM cache (data/cache/llm_cache.db)
     """
     
     def __init__(
@@ -76,13 +112,12 @@ class TopicGPTServiceV2:
         api: str = "openai",
         model: str = "gpt-4o-mini",
         cache_enabled: bool = True,
-        cache_dir: str = "data/cache/topicgpt"
+        cache_path: Optional[str] = None
     ):
         self.api = api
         self.model = model
         self.cache_enabled = cache_enabled
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = None
         
         # Initialize LangChain LLM
         self.llm = None
@@ -90,9 +125,9 @@ class TopicGPTServiceV2:
         
         # Setup cache
         if cache_enabled:
-            cache_path = str(self.cache_dir / "langchain.db")
-            set_llm_cache(SQLiteCache(database_path=cache_path))
-            logger.info(f"LangChain cache enabled at {cache_path}")
+            self.cache = get_llm_cache(cache_path)
+            set_llm_cache(SharedLLMCache(self.cache))
+            logger.info(f"LangChain cache enabled at {self.cache.path}")
         
         # Token usage stats
         self.total_tokens = 0
@@ -480,6 +515,7 @@ Kết quả:"""
             "api": self.api,
             "model": self.model,
             "cache_enabled": self.cache_enabled,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
             "total_tokens": self.total_tokens,
             "total_cost": self.total_cost,
             "available": self.is_available()
@@ -13,6 +13,7 @@ from app.models.model_article import Article
 from app.models.model_sentiment import SentimentAnalysis
 from app.models.model_trends import TrendAlert, HashtagStats, ViralContent, CategoryTrendStats
 from app.services.classification import get_category_classifier, CATEGORIES
+from app.utils.time_utils import day_range, within_days
 
 logger = logging.getLogger(__name__)
 
@@ -134,12 +135,16 @@ class TrendAnalysisService:
         ).all()
     
     def _detect_crisis_topics(self, start: datetime, end: datetime) -> List[Tuple]:
-        """Phát hiện topics có dấu hiệu khủng hoảng (nhiều tiêu cực)"""
-        results = []
+        """
+        Phát hiện topics có dấu hiệu khủng hoảng (nhiều tiêu cực)
         
-        topic_sentiments = self.db.query(
+        Một query GROUP BY (topic_id, topic_name, emotion): tổng / số tiêu cực của
+        từng topic và emotion distribution (theo topic_id) gộp lại từ cùng kết quả
+        """
+        rows = self.db.query(
             SentimentAnalysis.topic_id,
             SentimentAnalysis.topic_name,
+            SentimentAnalysis.emotion,
             func.count(SentimentAnalysis.id).label('total'),
             func.sum(func.cast(SentimentAnalysis.sentiment_group == 'negative', Integer)).label('neg'),
         ).filter(
@@ -150,28 +155,28 @@ class TrendAnalysisService:
             )
         ).group_by(
             SentimentAnalysis.topic_id,
-            SentimentAnalysis.topic_name
-        ).having(func.count(SentimentAnalysis.id) >= 5).all()
+            SentimentAnalysis.topic_name,
+            SentimentAnalysis.emotion
+        ).all()
         
-        for topic_id, topic_name, total, neg in topic_sentiments:
-            neg = neg or 0
-            neg_ratio = neg / total if total > 0 else 0
+        topic_totals = {}  # (topic_id, topic_name) -> [total, neg]
+        topic_emotions = {}  # topic_id -> {emotion: count}
+        for topic_id, topic_name, emotion, total, neg in rows:
+            totals = topic_totals.setdefault((topic_id, topic_name), [0, 0])
+            totals[0] += total
+            totals[1] += neg or 0
+            emotions = topic_emotions.setdefault(topic_id, {})
+            emotions[emotion] = emotions.get(emotion, 0) + total
+        
+        results = []
+        for (topic_id, topic_name), (total, neg) in topic_totals.items():
+            if total < 5:
+                continue
+            neg_ratio = neg / total
             
             # Crisis: > 40% tiêu cực
             if neg_ratio > 0.4:
-                # Get emotion distribution
-                emotions = dict(self.db.query(
-                    SentimentAnalysis.emotion,
-                    func.count(SentimentAnalysis.id)
-                ).filter(
-                    and_(
-                        SentimentAnalysis.topic_id == topic_id,
-                        SentimentAnalysis.analyzed_at >= start,
-                        SentimentAnalysis.analyzed_at <= end
-                    )
-                ).group_by(SentimentAnalysis.emotion).all())
-                
-                results.append((topic_id, topic_name, neg_ratio, total, emotions))
+                results.append((topic_id, topic_name, neg_ratio, total, dict(topic_emotions[topic_id])))
         
         return results
     
@@ -247,7 +252,7 @@ class TrendAnalysisService:
             SentimentAnalysis.topic_name,
             SentimentAnalysis.source_domain
         ).filter(
-            func.date(SentimentAnalysis.published_date).between(start, end)
+            within_days(SentimentAnalysis.published_date, start, end)
         ).all()
         
         # Count hashtags
@@ -289,7 +294,7 @@ class TrendAnalysisService:
             # Check previous period
             prev_count = self.db.query(func.count(SentimentAnalysis.id)).filter(
                 and_(
-                    func.date(SentimentAnalysis.published_date).between(prev_start, prev_end),
+                    within_days(SentimentAnalysis.published_date, prev_start, prev_end),
                     or_(
                         SentimentAnalysis.title.ilike(f'%#{tag}%'),
                         SentimentAnalysis.content_snippet.ilike(f'%#{tag}%')
@@ -351,7 +356,8 @@ class TrendAnalysisService:
             start = today.replace(day=1)
             end = today
         
-        # Get articles with high engagement indicators
+        # Get articles with high engagement indicators (created_at là epoch timestamp)
+        created_lo, created_hi = day_range(start, end)
         articles = self.db.query(
             Article.id,
             Article.title,
@@ -366,7 +372,8 @@ class TrendAnalysisService:
         ).join(
             SentimentAnalysis, Article.id == SentimentAnalysis.article_id
         ).filter(
-            func.date(Article.created_at).between(start, end)
+            Article.created_at >= created_lo.timestamp(),
+            Article.created_at < created_hi.timestamp()
         ).all()
         
         # Calculate viral score
@@ -476,7 +483,7 @@ class TrendAnalysisService:
         ).join(
             SentimentAnalysis, Article.id == SentimentAnalysis.article_id
         ).filter(
-            func.date(SentimentAnalysis.published_date).between(start, end)
+            within_days(SentimentAnalysis.published_date, start, end)
         ).all()
         
         # Group by category
@@ -521,7 +528,7 @@ class TrendAnalysisService:
             
             # Previous period count (simplified)
             prev_count = self.db.query(func.count(SentimentAnalysis.id)).filter(
-                func.date(SentimentAnalysis.published_date).between(prev_start, start - timedelta(days=1))
+                within_days(SentimentAnalysis.published_date, prev_start, start - timedelta(days=1))
             ).scalar() or 0
             # Note: This is simplified, real implementation would classify prev articles too
             prev_count = int(prev_count * (total / max(len(articles), 1)))
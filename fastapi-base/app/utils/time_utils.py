@@ -1,4 +1,7 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from typing import Tuple
+
+from sqlalchemy import and_
 
 
 def timestamp_now() -> float:
@@ -71,3 +74,22 @@ def timestamp_before_now(
     )
     new_datetime = datetime_now_tmp - delta
     return datetime_to_timestamp(new_datetime)
+
+
+def day_range(start: date, end: date) -> Tuple[datetime, datetime]:
+    """
+    Khoảng nửa mở [start 00:00, end + 1 ngày 00:00) phủ các ngày start..end
+
+    Lọc `col >= lo AND col < hi` dùng được index trên col, còn
+    `func.date(col) BETWEEN start AND end` buộc quét toàn bảng.
+    """
+    return (
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(end + timedelta(days=1), datetime.min.time()),
+    )
+
+
+def within_days(column, start: date, end: date):
+    """Điều kiện SQL `column` thuộc các ngày start..end (khoảng nửa mở của day_range)"""
+    lo, hi = day_range(start, end)
+    return and_(column >= lo, column < hi)
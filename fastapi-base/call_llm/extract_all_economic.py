@@ -9,14 +9,16 @@ Extract và lưu vào 4 bảng:
   4. pii_detail - Chỉ số sản xuất công nghiệp
 
 Nguồn: important_posts với type_newspaper='economy'
+
+Post match nhiều category được extract bằng 1 LLM call duy nhất (schema gộp),
+validate theo từng bảng đích; chỉ gọi prompt riêng cho category thiếu/field lỗi.
+Đặt COMBINED_EXTRACTION=0 để quay về mỗi category 1 call.
 """
 
 import os
 import sys
 import json
-import time
 import logging
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from sqlalchemy import create_engine, text
@@ -25,6 +27,7 @@ from sqlalchemy.orm import sessionmaker
 # Import SessionLocal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import SessionLocal
+from call_llm.llm_engine import LLMEngine
 
 # Setup logging
 logging.basicConfig(
@@ -42,7 +45,8 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:7777")
 LLM_API_KEY = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "50"))
-DELAY_BETWEEN_CALLS = float(os.getenv("DELAY_BETWEEN_CALLS", "1"))
+# 1 LLM call/post cho tất cả chỉ số (0 = mỗi chỉ số 1 call như cũ)
+COMBINED_EXTRACTION = os.getenv("COMBINED_EXTRACTION", "1") != "0"
 
 if not LLM_API_KEY:
     logger.error("Không tìm thấy OPENROUTER_API_KEY hoặc OPENAI_API_KEY")
@@ -57,35 +61,7 @@ KEYWORDS = {
 }
 
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call OpenRouter LLM API"""
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {LLM_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": API_BASE_URL,
-        "X-Title": "Economic Data Extractor"
-    }
-    
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 3000
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.warning(f"LLM call attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    return None
+llm = LLMEngine(title="Economic Data Extractor")
 
 
 def classify_post(content: str, title: str) -> List[str]:
@@ -336,8 +312,158 @@ def save_to_pii(db, data: Dict) -> bool:
         return False
 
 
-def extract_digital_economy(post: Dict, db) -> int:
-    """Extract digital economy data"""
+# ============== SCHEMA & VALIDATION ==============
+
+# Metric columns của từng bảng đích (period + metadata xử lý riêng)
+INDICATOR_FIELDS = {
+    'digital_economy': [
+        'digital_economy_gdp', 'digital_economy_gdp_share', 'digital_economy_growth_rate',
+        'ecommerce_revenue', 'ecommerce_users', 'ecommerce_transactions',
+        'digital_payment_volume', 'digital_payment_transactions', 'digital_wallet_users', 'cashless_payment_rate',
+        'digital_companies', 'tech_startups', 'fintech_revenue', 'internet_penetration',
+        'digital_service_exports', 'digital_workforce'
+    ],
+    'fdi': [
+        'registered_capital', 'new_projects_capital', 'additional_capital',
+        'disbursed_capital', 'disbursement_rate',
+        'total_projects', 'new_projects', 'adjusted_projects',
+        'manufacturing_fdi', 'realestate_fdi', 'technology_fdi',
+        'japan_fdi', 'korea_fdi', 'singapore_fdi',
+        'fdi_contribution_grdp', 'fdi_export_value', 'fdi_employment'
+    ],
+    'digital_transformation': [
+        'dx_index', 'dx_readiness_index', 'egov_index',
+        'online_public_services', 'level3_services', 'level4_services', 'online_service_usage_rate',
+        'cloud_adoption_rate', 'broadband_coverage', 'fiveg_coverage',
+        'sme_dx_adoption', 'companies_using_ai', 'companies_using_iot', 'digital_literacy_rate',
+        'ai_projects', 'iot_projects', 'dx_investment', 'productivity_increase_from_dx'
+    ],
+    'pii': [
+        'pii_overall', 'pii_growth_rate', 'industrial_output_value',
+        'mining_index', 'manufacturing_index', 'electricity_index',
+        'food_processing_index', 'textile_index', 'electronics_index',
+        'state_owned_pii', 'private_pii', 'fdi_pii',
+        'manufacturing_share', 'hightech_industry_share',
+        'labor_productivity', 'capacity_utilization',
+        'industrial_enterprises', 'industrial_workers'
+    ]
+}
+
+INT_FIELDS = {
+    'ecommerce_users', 'ecommerce_transactions', 'digital_payment_transactions', 'digital_wallet_users',
+    'digital_companies', 'tech_startups', 'digital_workforce',
+    'total_projects', 'new_projects', 'adjusted_projects', 'fdi_employment',
+    'online_public_services', 'level3_services', 'level4_services',
+    'companies_using_ai', 'companies_using_iot', 'ai_projects', 'iot_projects',
+    'industrial_enterprises', 'industrial_workers'
+}
+
+PERCENT_FIELDS = {
+    'digital_economy_gdp_share', 'cashless_payment_rate', 'internet_penetration',
+    'disbursement_rate', 'fdi_contribution_grdp',
+    'dx_index', 'dx_readiness_index', 'egov_index', 'online_service_usage_rate',
+    'cloud_adoption_rate', 'broadband_coverage', 'fiveg_coverage', 'sme_dx_adoption', 'digital_literacy_rate',
+    'manufacturing_share', 'hightech_industry_share', 'capacity_utilization'
+}
+
+# Field có thể âm (tăng trưởng)
+SIGNED_FIELDS = {'digital_economy_growth_rate', 'pii_growth_rate', 'productivity_increase_from_dx'}
+
+PERIOD_RANGES = {'year': (2000, 2100), 'quarter': (1, 4), 'month': (1, 12)}
+
+
+def _to_number(value) -> Optional[float]:
+    """LLM có thể trả số dạng string ("1612.81", "20%") -> float, None nếu không parse được"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.strip().rstrip('%').replace(' ', '')
+        if cleaned.count(',') == 1 and '.' not in cleaned:
+            cleaned = cleaned.replace(',', '.')
+        try:
+            return float(cleaned)
+        except ValueError:
+            return None
+    return None
+
+
+def validate_indicator(category: str, data: Dict) -> Tuple[Dict, List[str]]:
+    """
+    Validate 1 record theo schema bảng đích
+
+    Returns:
+        (clean, failed): clean chỉ giữ field hợp lệ (ép kiểu int/float),
+        failed = field có giá trị nhưng sai kiểu/ngoài khoảng
+    """
+    clean, failed = {}, []
+
+    for field, (low, high) in PERIOD_RANGES.items():
+        value = data.get(field)
+        if value is None:
+            continue
+        number = _to_number(value)
+        if number is None or number != int(number) or not low <= number <= high:
+            failed.append(field)
+        else:
+            clean[field] = int(number)
+
+    for field in INDICATOR_FIELDS[category]:
+        value = data.get(field)
+        if value is None:
+            continue
+        number = _to_number(value)
+        if number is None:
+            failed.append(field)
+            continue
+        if field in INT_FIELDS:
+            if number < 0 or number != int(number):
+                failed.append(field)
+                continue
+            number = int(number)
+        elif field in PERCENT_FIELDS:
+            if not 0 <= number <= 100:
+                failed.append(field)
+                continue
+        elif field in SIGNED_FIELDS:
+            if number <= -100:
+                failed.append(field)
+                continue
+        elif number < 0:
+            failed.append(field)
+            continue
+        clean[field] = number
+
+    return clean, failed
+
+
+def is_complete(category: str, data: Dict) -> bool:
+    """Record lưu được: có year và ít nhất 1 chỉ số"""
+    return bool(data.get('year')) and any(data.get(f) is not None for f in INDICATOR_FIELDS[category])
+
+
+def parse_llm_json(llm_response: Optional[str], category: str, keep_skip: bool = False) -> Optional[Dict]:
+    """Parse JSON object từ response LLM (None nếu lỗi, hoặc skip khi keep_skip=False)"""
+    if not llm_response:
+        return None
+    json_start = llm_response.find('{')
+    json_end = llm_response.rfind('}') + 1
+    if json_start == -1 or json_end == 0:
+        return None
+    try:
+        data = json.loads(llm_response[json_start:json_end])
+    except json.JSONDecodeError as e:
+        logger.error(f"Extract {category} error: {e}")
+        return None
+    if not isinstance(data, dict) or (data.get('skip') and not keep_skip):
+        return None
+    return data
+
+
+
+async def extract_digital_economy(post: Dict) -> Optional[Dict]:
+    """Extract digital economy data (None nếu skip/lỗi)"""
     prompt = f"""
 Bạn là chuyên gia phân tích dữ liệu. NHIỆM VỤ: Trích xuất CHỈ SỐ KINH TẾ SỐ từ bài viết.
 
@@ -368,38 +494,11 @@ Bài: "Hưng Yên phát triển kinh tế số" (không có số liệu)
 Trả về JSON (CHỈ JSON):
 """
     
-    try:
-        llm_response = call_llm(prompt)
-        if not llm_response:
-            return 0
-        
-        # Parse JSON
-        json_start = llm_response.find('{')
-        json_end = llm_response.rfind('}') + 1
-        if json_start == -1 or json_end == 0:
-            return 0
-        
-        data = json.loads(llm_response[json_start:json_end])
-        
-        if data.get('skip'):
-            return 0
-        
-        # Add metadata (bỏ source_post_id và source_url vì DB không có cột này)
-        data['province'] = post.get('province') or 'Hưng Yên'
-        data['data_source'] = post.get('url') or 'LLM Extraction'
-        
-        if save_to_digital_economy(db, data):
-            logger.info(f"Digital Economy: {data.get('year')} - {data.get('digital_economy_gdp_share')}%")
-            return 1
-        return 0
-        
-    except Exception as e:
-        logger.error(f"Extract digital_economy error: {e}")
-        return 0
+    return parse_llm_json(await llm.complete(prompt), 'digital_economy')
 
 
-def extract_fdi(post: Dict, db) -> int:
-    """Extract FDI data"""
+async def extract_fdi(post: Dict) -> Optional[Dict]:
+    """Extract FDI data (None nếu skip/lỗi)"""
     prompt = f"""
 Bạn là chuyên gia phân tích dữ liệu. NHIỆM VỤ: Trích xuất CHỈ SỐ FDI từ bài viết.
 
@@ -431,37 +530,11 @@ Bài: "FDI tăng mạnh" (không có số) → {{"skip": true}}
 Trả về JSON:
 """
     
-    try:
-        llm_response = call_llm(prompt)
-        if not llm_response:
-            return 0
-        
-        json_start = llm_response.find('{')
-        json_end = llm_response.rfind('}') + 1
-        if json_start == -1 or json_end == 0:
-            return 0
-        
-        data = json.loads(llm_response[json_start:json_end])
-        
-        if data.get('skip'):
-            return 0
-        
-        # Add metadata (bỏ source_post_id và source_url vì DB không có cột này)
-        data['province'] = post.get('province') or 'Hưng Yên'
-        data['data_source'] = post.get('url') or 'LLM Extraction'
-        
-        if save_to_fdi(db, data):
-            logger.info(f"FDI: {data.get('year')} - {data.get('registered_capital')} triệu USD")
-            return 1
-        return 0
-        
-    except Exception as e:
-        logger.error(f"Extract FDI error: {e}")
-        return 0
+    return parse_llm_json(await llm.complete(prompt), 'fdi')
 
 
-def extract_digital_transformation(post: Dict, db) -> int:
-    """Extract digital transformation data"""
+async def extract_digital_transformation(post: Dict) -> Optional[Dict]:
+    """Extract digital transformation data (None nếu skip/lỗi)"""
     prompt = f"""
 Bạn là chuyên gia phân tích dữ liệu. NHIỆM VỤ: Extract CHỈ SỐ CHUYỂN ĐỔI SỐ.
 
@@ -493,37 +566,11 @@ Bài: "Hưng Yên đẩy mạnh CĐS" (không có số) → {{"skip": true}}
 Trả về JSON:
 """
     
-    try:
-        llm_response = call_llm(prompt)
-        if not llm_response:
-            return 0
-        
-        json_start = llm_response.find('{')
-        json_end = llm_response.rfind('}') + 1
-        if json_start == -1 or json_end == 0:
-            return 0
-        
-        data = json.loads(llm_response[json_start:json_end])
-        
-        if data.get('skip'):
-            return 0
-        
-        # Add metadata (bỏ source_post_id và source_url vì DB không có cột này)
-        data['province'] = post.get('province') or 'Hưng Yên'
-        data['data_source'] = post.get('url') or 'LLM Extraction'
-        
-        if save_to_digital_transformation(db, data):
-            logger.info(f"DX: {data.get('year')} - Index {data.get('dx_index')}")
-            return 1
-        return 0
-        
-    except Exception as e:
-        logger.error(f"Extract DX error: {e}")
-        return 0
+    return parse_llm_json(await llm.complete(prompt), 'digital_transformation')
 
 
-def extract_pii(post: Dict, db) -> int:
-    """Extract PII (Industrial Production Index) data"""
+async def extract_pii(post: Dict) -> Optional[Dict]:
+    """Extract PII (Industrial Production Index) data (None nếu skip/lỗi)"""
     prompt = f"""
 Bạn là chuyên gia phân tích dữ liệu. NHIỆM VỤ: Extract CHỈ SỐ SẢN XUẤT CÔNG NGHIỆP (IIP/PII).
 
@@ -554,33 +601,114 @@ Bài: "Công nghiệp phát triển tốt" (không có số) → {{"skip": true}
 Trả về JSON:
 """
     
-    try:
-        llm_response = call_llm(prompt)
-        if not llm_response:
-            return 0
-        
-        json_start = llm_response.find('{')
-        json_end = llm_response.rfind('}') + 1
-        if json_start == -1 or json_end == 0:
-            return 0
-        
-        data = json.loads(llm_response[json_start:json_end])
-        
-        if data.get('skip'):
-            return 0
-        
-        # Add metadata (bỏ source_post_id và source_url vì DB không có cột này)
-        data['province'] = post.get('province') or 'Hưng Yên'
-        data['data_source'] = post.get('url') or 'LLM Extraction'
-        
-        if save_to_pii(db, data):
-            logger.info(f"PII: {data.get('year')} - Growth {data.get('pii_growth_rate')}%")
-            return 1
-        return 0
-        
-    except Exception as e:
-        logger.error(f"Extract PII error: {e}")
-        return 0
+    return parse_llm_json(await llm.complete(prompt), 'pii')
+
+EXTRACTORS = {
+    'digital_economy': extract_digital_economy,
+    'fdi': extract_fdi,
+    'digital_transformation': extract_digital_transformation,
+    'pii': extract_pii
+}
+
+# Mô tả field cho prompt gộp (giống prompt từng chỉ số)
+COMBINED_SECTIONS = {
+    'digital_economy': ("KINH TẾ SỐ", """- digital_economy_gdp_share: % kinh tế số/GRDP (VD: "chiếm 20%")
+- digital_economy_growth_rate: Tăng trưởng % (VD: "tăng 15%")
+- ecommerce_revenue: Doanh thu TMĐT tỷ VNĐ (VD: "25.000 tỷ đồng")
+- digital_companies: Số DN công nghệ số (VD: "500 doanh nghiệp")"""),
+    'fdi': ("FDI", """- registered_capital: Vốn đăng ký (triệu USD)
+- disbursed_capital: Vốn giải ngân (triệu USD)
+- total_projects: Tổng dự án (số nguyên)
+- new_projects: Dự án mới (số nguyên)
+- japan_fdi, korea_fdi, singapore_fdi: Vốn từ quốc gia (triệu USD)
+- manufacturing_fdi: FDI sản xuất (triệu USD)"""),
+    'digital_transformation': ("CHUYỂN ĐỔI SỐ", """- dx_index: Chỉ số CĐS (0-100 điểm)
+- egov_index: Chỉ số chính quyền điện tử (0-100)
+- level3_services, level4_services: Số dịch vụ công (số nguyên)
+- online_service_usage_rate: Tỷ lệ sử dụng (%)
+- sme_dx_adoption: Tỷ lệ SME CĐS (%)
+- ai_projects, iot_projects: Số dự án (số nguyên)"""),
+    'pii': ("SẢN XUẤT CÔNG NGHIỆP (IIP/PII)", """- pii_growth_rate: % tăng trưởng IIP (VD: "tăng 11.51%")
+- pii_overall: Chỉ số IIP tổng (base 100)
+- industrial_output_value: Giá trị sản xuất (tỷ VNĐ)
+- manufacturing_index: Chỉ số chế biến (%)
+- mining_index, electricity_index: Chỉ số ngành (%)""")
+}
+
+
+def build_combined_prompt(post: Dict, categories: List[str]) -> str:
+    """1 prompt cho tất cả nhóm chỉ số đã match (nội dung bài chỉ gửi 1 lần)"""
+    sections = "\n\n".join(
+        f'"{category}" - {COMBINED_SECTIONS[category][0]}:\n{COMBINED_SECTIONS[category][1]}'
+        for category in categories
+    )
+    skeleton = ", ".join(f'"{category}": {{...}}' for category in categories)
+    return f"""
+Bạn là chuyên gia phân tích dữ liệu. NHIỆM VỤ: Trích xuất CÙNG LÚC các nhóm chỉ số kinh tế sau từ bài viết.
+
+TIÊU ĐỀ: {post['title']}
+NỘI DUNG: {post['content'][:3000]}
+
+⚠️ QUY TẮC BẮT BUỘC:
+1. CHỈ trích xuất số liệu ĐƯỢC NÊU RÕ RÀNG trong bài
+2. TUYỆT ĐỐI KHÔNG tự suy luận, ước tính, hoặc sinh ra số liệu
+3. Mỗi nhóm xử lý ĐỘC LẬP: nhóm nào bài KHÔNG có số liệu cụ thể → {{"skip": true}}
+4. Mỗi nhóm có year, quarter, month riêng (year BẮT BUỘC); thiếu field → null, KHÔNG đoán
+5. Số trả về dạng number (không kèm đơn vị, không dấu phân cách nghìn)
+
+CÁC NHÓM CHỈ SỐ:
+
+{sections}
+
+VÍ DỤ:
+Bài: "2025 thu hút 1.612,81 triệu USD FDI, 26 dự án mới; kinh tế số chiếm 20% GRDP"
+→ {{"digital_economy": {{"year": 2025, "digital_economy_gdp_share": 20}}, "fdi": {{"year": 2025, "registered_capital": 1612.81, "new_projects": 26}}}}
+
+Trả về ĐÚNG 1 JSON object với các key: {{{skeleton}}} (CHỈ JSON):
+"""
+
+
+async def extract_combined(post: Dict, categories: List[str]) -> Dict[str, Optional[Dict]]:
+    """
+    Extract tất cả nhóm chỉ số trong 1 LLM call
+
+    Mỗi nhóm được validate theo schema bảng đích; chỉ gọi lại prompt riêng
+    của nhóm khi response gộp thiếu nhóm đó hoặc có field sai kiểu/ngoài khoảng,
+    và chỉ lấy từ lần gọi riêng các field bị lỗi.
+
+    Returns:
+        {category: clean data hoặc None (skip / không đủ dữ liệu)}
+    """
+    combined = parse_llm_json(
+        await llm.complete(build_combined_prompt(post, categories)), 'combined', keep_skip=True
+    ) or {}
+    if combined.get('skip'):
+        # {"skip": true} ở top-level: bài không có số liệu cho nhóm nào, không gọi riêng
+        return {category: None for category in categories}
+
+    results = {}
+    for category in categories:
+        section = combined.get(category)
+        if isinstance(section, dict) and section.get('skip'):
+            results[category] = None
+            continue
+
+        if not isinstance(section, dict):
+            logger.info(f"{category}: thiếu trong response gộp -> gọi riêng")
+            fallback = await EXTRACTORS[category](post)
+            clean = validate_indicator(category, fallback)[0] if fallback else {}
+        else:
+            clean, failed = validate_indicator(category, section)
+            if failed:
+                logger.info(f"{category}: field lỗi {failed} -> gọi riêng")
+                fallback = await EXTRACTORS[category](post)
+                if fallback:
+                    fixed, _ = validate_indicator(category, fallback)
+                    clean.update({f: fixed[f] for f in failed if f in fixed})
+
+        results[category] = clean if is_complete(category, clean) else None
+    return results
+
 
 
 def get_posts_from_db(limit: int = 100) -> List[Dict]:
@@ -615,7 +743,30 @@ def get_posts_from_db(limit: int = 100) -> List[Dict]:
         return []
 
 
-def process_post(post: Dict, db) -> Dict[str, int]:
+SAVERS = {
+    'digital_economy': (save_to_digital_economy, lambda d: f"Digital Economy: {d.get('year')} - {d.get('digital_economy_gdp_share')}%"),
+    'fdi': (save_to_fdi, lambda d: f"FDI: {d.get('year')} - {d.get('registered_capital')} triệu USD"),
+    'digital_transformation': (save_to_digital_transformation, lambda d: f"DX: {d.get('year')} - Index {d.get('dx_index')}"),
+    'pii': (save_to_pii, lambda d: f"PII: {d.get('year')} - Growth {d.get('pii_growth_rate')}%")
+}
+
+
+def save_indicator(db, category: str, post: Dict, data: Optional[Dict]) -> int:
+    """Thêm metadata và lưu 1 record vào bảng đích của category"""
+    if not data:
+        return 0
+    # Add metadata (bỏ source_post_id và source_url vì DB không có cột này)
+    data['province'] = post.get('province') or 'Hưng Yên'
+    data['data_source'] = post.get('url') or 'LLM Extraction'
+
+    save, describe = SAVERS[category]
+    if save(db, data):
+        logger.info(describe(data))
+        return 1
+    return 0
+
+
+async def process_post(post: Dict, db) -> Dict[str, int]:
     """Process 1 post - extract tất cả categories phù hợp"""
     logger.info(f"\nPost {post['id']}: {post['title'][:80]}...")
     
@@ -635,23 +786,14 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         'pii': 0
     }
     
-    # Extract theo từng category
-    if 'digital_economy' in categories:
-        results['digital_economy'] = extract_digital_economy(post, db)
-        time.sleep(DELAY_BETWEEN_CALLS)
-    
-    if 'fdi' in categories:
-        results['fdi'] = extract_fdi(post, db)
-        time.sleep(DELAY_BETWEEN_CALLS)
-    
-    if 'digital_transformation' in categories:
-        results['digital_transformation'] = extract_digital_transformation(post, db)
-        time.sleep(DELAY_BETWEEN_CALLS)
-    
-    if 'pii' in categories:
-        results['pii'] = extract_pii(post, db)
-        time.sleep(DELAY_BETWEEN_CALLS)
-    
+    # Nhiều category -> 1 call gộp, 1 category -> prompt riêng
+    if COMBINED_EXTRACTION and len(categories) > 1:
+        extracted = await extract_combined(post, categories)
+    else:
+        extracted = {category: await EXTRACTORS[category](post) for category in categories}
+
+    for category, data in extracted.items():
+        results[category] = save_indicator(db, category, post, data)
     return results
 
 
@@ -681,15 +823,9 @@ def main():
             'pii': 0
         }
         
-        for i, post in enumerate(posts, 1):
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Progress: {i}/{len(posts)}")
-            try:
-                results = process_post(post, db)
-                for key in stats:
-                    stats[key] += results[key]
-            except Exception as e:
-                logger.error(f"Lỗi process post {post['id']}: {e}")
+        for results in llm.run(posts, lambda post: process_post(post, db)):
+            for key in stats:
+                stats[key] += (results or {}).get(key, 0)
         
         logger.info("\n" + "="*80)
         logger.info(f"Đã xử lý: {len(posts)} posts")
@@ -17,15 +17,14 @@ Bảng đích (2 bảng):
 import os
 import sys
 import json
-import time
 import logging
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 from sqlalchemy import text
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import SessionLocal
+from call_llm.llm_engine import LLMEngine
 
 # Setup logging
 logging.basicConfig(
@@ -43,7 +42,6 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:7777")
 LLM_API_KEY = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "20"))
-DELAY_BETWEEN_CALLS = 2  # seconds
 
 
 def save_to_highschool_graduation(db, data: Dict) -> bool:
@@ -100,38 +98,9 @@ def save_to_eqi_detail(db, data: Dict) -> bool:
         logger.error(f"Lỗi save eqi_detail: {e}")
         db.rollback()
         return False
-DELAY_BETWEEN_CALLS = float(os.getenv("DELAY_BETWEEN_CALLS", "1"))
 
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call OpenRouter LLM API"""
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {LLM_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": API_BASE_URL,
-        "X-Title": "Education Data Extractor"
-    }
-    
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 3000
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.warning(f"LLM call attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    return None
+llm = LLMEngine(title="Education Data Extractor")
 
 
 def get_posts_from_db(limit: int = 100) -> List[Dict]:
@@ -169,7 +138,7 @@ def get_posts_from_db(limit: int = 100) -> List[Dict]:
         return []
 
 
-def extract_highschool_graduation(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_highschool_graduation(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract tốt nghiệp THPT → highschool_graduation_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -227,7 +196,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -251,7 +220,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_eqi_detail(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_eqi_detail(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract chỉ số chất lượng giáo dục → eqi_detail"""
     prompt = f"""Phân tích văn bản sau và trích xuất các chỉ số về CHẤT LƯỢNG GIÁO DỤC.
 
@@ -316,7 +285,7 @@ Văn bản:
 CHỈ trả về JSON, không giải thích."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -340,7 +309,7 @@ CHỈ trả về JSON, không giải thích."""
         return None
 
 
-def process_post(post: Dict, db) -> Dict[str, int]:
+async def process_post(post: Dict, db) -> Dict[str, int]:
     """Xử lý 1 post - Extract 2 loại thống kê giáo dục"""
     post_id = post.get("id")
     content = post.get("content", "")
@@ -358,7 +327,7 @@ def process_post(post: Dict, db) -> Dict[str, int]:
     }
     
     # 1. Highschool Graduation
-    hs_grad = extract_highschool_graduation(content, url, province)
+    hs_grad = await extract_highschool_graduation(content, url, province)
     if hs_grad:
         if save_to_highschool_graduation(db, hs_grad):
             logger.info(f"Saved to highschool_graduation_detail")
@@ -366,10 +335,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save highschool_graduation")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 2. EQI Detail
-    eqi = extract_eqi_detail(content, url, province)
+    eqi = await extract_eqi_detail(content, url, province)
     if eqi:
         if save_to_eqi_detail(db, eqi):
             logger.info(f"Saved to eqi_detail")
@@ -377,7 +344,6 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save eqi_detail")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
     return results
 
 
@@ -404,14 +370,9 @@ def main():
             "eqi_detail": 0
         }
         
-        for i, post in enumerate(posts, 1):
-            logger.info(f"\nProgress: {i}/{len(posts)}")
-            try:
-                results = process_post(post, db)
-                for key in total_extracted:
-                    total_extracted[key] += results.get(key, 0)
-            except Exception as e:
-                logger.error(f"Lỗi: {e}")
+        for results in llm.run(posts, lambda post: process_post(post, db)):
+            for key in total_extracted:
+                total_extracted[key] += (results or {}).get(key, 0)
         
         logger.info("\n" + "="*80)
         logger.info(f"Đã xử lý: {len(posts)} posts")
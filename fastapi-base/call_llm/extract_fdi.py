@@ -15,9 +15,7 @@ Bảng đích:
 import os
 import sys
 import json
-import time
 import logging
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 from sqlalchemy import create_engine, text
@@ -26,6 +24,7 @@ from sqlalchemy.orm import sessionmaker
 # Import SessionLocal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import SessionLocal
+from call_llm.llm_engine import LLMEngine
 
 # Setup logging
 logging.basicConfig(
@@ -43,38 +42,9 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:7777")
 LLM_API_KEY = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "50"))
-DELAY_BETWEEN_CALLS = float(os.getenv("DELAY_BETWEEN_CALLS", "1"))
 
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call OpenRouter LLM API"""
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {LLM_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": API_BASE_URL,
-        "X-Title": "FDI Data Extractor"
-    }
-    
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 3000
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.warning(f"LLM call attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    return None
+llm = LLMEngine(title="FDI Data Extractor")
 
 
 def save_to_fdi(db, data: Dict) -> bool:
@@ -195,7 +165,7 @@ def get_posts_from_db(limit: int = 100) -> List[Dict]:
         return []
 
 
-def extract_fdi_data(content: str, url: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_fdi_data(content: str, url: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract chỉ số FDI từ văn bản"""
     prompt = f"""Phân tích văn bản và trích xuất các chỉ số THU HÚT FDI (Đầu tư Trực tiếp Nước ngoài).
 
@@ -321,7 +291,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -354,7 +324,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def process_post(post: Dict, db) -> int:
+async def process_post(post: Dict, db) -> int:
     """Xử lý 1 post - Extract FDI"""
     post_id = post.get("id")
     content = post.get("content", "")
@@ -366,7 +336,7 @@ def process_post(post: Dict, db) -> int:
     logger.info(f"Post ID: {post_id}")
     logger.info(f"Title: {title[:100]}")
     
-    data = extract_fdi_data(content, url, post_id, province)
+    data = await extract_fdi_data(content, url, post_id, province)
     if data:
         if save_to_fdi(db, data):
             logger.info(f"Saved to fdi_detail")
@@ -397,13 +367,8 @@ def main():
         
         total_extracted = 0
         
-        for i, post in enumerate(posts, 1):
-            logger.info(f"\nProgress: {i}/{len(posts)}")
-            try:
-                total_extracted += process_post(post, db)
-                time.sleep(DELAY_BETWEEN_CALLS)
-            except Exception as e:
-                logger.error(f"Lỗi: {e}")
+        results = llm.run(posts, lambda post: process_post(post, db))
+        total_extracted = sum(r or 0 for r in results)
         
         logger.info("\n" + "="*80)
         logger.info(f"Đã xử lý: {len(posts)} posts")
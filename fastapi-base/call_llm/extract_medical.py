@@ -18,9 +18,7 @@ Bảng đích (3 bảng):
 import os
 import sys
 import json
-import time
 import logging
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 from sqlalchemy import create_engine, text
@@ -29,6 +27,7 @@ from sqlalchemy.orm import sessionmaker
 # Import SessionLocal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import SessionLocal
+from call_llm.llm_engine import LLMEngine
 
 # Setup logging
 logging.basicConfig(
@@ -46,7 +45,6 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:7777")
 LLM_API_KEY = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "20"))
-DELAY_BETWEEN_CALLS = float(os.getenv("DELAY_BETWEEN_CALLS", "1"))
 
 
 # ============== DB SAVE FUNCTIONS ==============
@@ -131,35 +129,7 @@ def save_to_preventive_health(db, data: Dict) -> bool:
         return False
 
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call OpenRouter LLM API"""
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {LLM_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": API_BASE_URL,
-        "X-Title": "Medical Data Extractor"
-    }
-    
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 3000
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.warning(f"LLM call attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    return None
+llm = LLMEngine(title="Medical Data Extractor")
 
 
 def get_posts_from_db(limit: int = 100) -> List[Dict]:
@@ -199,7 +169,7 @@ def get_posts_from_db(limit: int = 100) -> List[Dict]:
         return []
 
 
-def extract_health_statistics(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_health_statistics(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract thống kê y tế → health_statistics_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -251,7 +221,7 @@ Văn bản:
 Chỉ trả về JSON, không thêm giải thích."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -275,7 +245,7 @@ Chỉ trả về JSON, không thêm giải thích."""
         return None
 
 
-def extract_health_insurance(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_health_insurance(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract bảo hiểm y tế → health_insurance_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -330,7 +300,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -354,7 +324,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_preventive_health(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_preventive_health(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract y tế dự phòng → preventive_health_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -411,7 +381,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -435,7 +405,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def process_post(post: Dict, db) -> Dict[str, int]:
+async def process_post(post: Dict, db) -> Dict[str, int]:
     """Xử lý 1 post - Extract 3 loại thống kê y tế"""
     post_id = post.get("id")
     content = post.get("content", "")
@@ -455,7 +425,7 @@ def process_post(post: Dict, db) -> Dict[str, int]:
     }
     
     # 1. Health Statistics
-    health_stats = extract_health_statistics(content, url, province)
+    health_stats = await extract_health_statistics(content, url, province)
     if health_stats:
         if save_to_health_statistics(db, health_stats):
             logger.info(f"Saved to health_statistics_detail")
@@ -463,10 +433,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save health_statistics")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 2. Health Insurance
-    health_insurance = extract_health_insurance(content, url, province)
+    health_insurance = await extract_health_insurance(content, url, province)
     if health_insurance:
         if save_to_health_insurance(db, health_insurance):
             logger.info(f"Saved to health_insurance_detail")
@@ -474,10 +442,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save health_insurance")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 3. Preventive Health
-    preventive_health = extract_preventive_health(content, url, province)
+    preventive_health = await extract_preventive_health(content, url, province)
     if preventive_health:
         if save_to_preventive_health(db, preventive_health):
             logger.info(f"Saved to preventive_health_detail")
@@ -485,7 +451,6 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save preventive_health")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
     return results
 
 
@@ -514,14 +479,9 @@ def main():
             "preventive_health": 0
         }
         
-        for i, post in enumerate(posts, 1):
-            logger.info(f"\nProgress: {i}/{len(posts)}")
-            try:
-                results = process_post(post, db)
-                for key in total_extracted:
-                    total_extracted[key] += results.get(key, 0)
-            except Exception as e:
-                logger.error(f"Lỗi: {e}")
+        for results in llm.run(posts, lambda post: process_post(post, db)):
+            for key in total_extracted:
+                total_extracted[key] += (results or {}).get(key, 0)
         
         logger.info("\n" + "="*80)
         logger.info(f"Đã xử lý: {len(posts)} posts")
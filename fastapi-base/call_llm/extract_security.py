@@ -19,9 +19,7 @@ Bảng đích (4 bảng):
 import os
 import sys
 import json
-import time
 import logging
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 from sqlalchemy import create_engine, text
@@ -30,6 +28,7 @@ from sqlalchemy.orm import sessionmaker
 # Import SessionLocal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import SessionLocal
+from call_llm.llm_engine import LLMEngine
 
 # Setup logging
 logging.basicConfig(
@@ -47,7 +46,6 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:7777")
 LLM_API_KEY = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "20"))
-DELAY_BETWEEN_CALLS = float(os.getenv("DELAY_BETWEEN_CALLS", "1"))
 
 
 # ============== DB SAVE FUNCTIONS ==============
@@ -153,35 +151,7 @@ def save_to_public_order_detail(db, data: Dict) -> bool:
         return False
 
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call OpenRouter LLM API"""
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {LLM_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": API_BASE_URL,
-        "X-Title": "Security Data Extractor"
-    }
-    
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 3000
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.warning(f"LLM call attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    return None
+llm = LLMEngine(title="Security Data Extractor")
 
 
 def get_posts_from_db(limit: int = 100) -> List[Dict]:
@@ -221,7 +191,7 @@ def get_posts_from_db(limit: int = 100) -> List[Dict]:
         return []
 
 
-def extract_security_detail(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_security_detail(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract an ninh ma túy → security_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -266,7 +236,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -290,7 +260,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_crime_prevention(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_crime_prevention(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract phòng chống tội phạm → crime_prevention_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -345,7 +315,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -369,7 +339,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_traffic_safety(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_traffic_safety(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract an toàn giao thông → traffic_safety_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -422,7 +392,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -446,7 +416,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_public_order(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_public_order(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract trật tự công cộng → public_order_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -499,7 +469,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -523,7 +493,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def process_post(post: Dict, db) -> Dict[str, int]:
+async def process_post(post: Dict, db) -> Dict[str, int]:
     """Xử lý 1 post - Extract 4 loại thống kê an ninh"""
     post_id = post.get("id")
     content = post.get("content", "")
@@ -543,7 +513,7 @@ def process_post(post: Dict, db) -> Dict[str, int]:
     }
     
     # 1. Security (ma túy)
-    security = extract_security_detail(content, url, province)
+    security = await extract_security_detail(content, url, province)
     if security:
         if save_to_security_detail(db, security):
             logger.info(f"Saved to security_detail")
@@ -551,10 +521,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save security_detail")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 2. Crime Prevention
-    crime_prev = extract_crime_prevention(content, url, province)
+    crime_prev = await extract_crime_prevention(content, url, province)
     if crime_prev:
         if save_to_crime_prevention_detail(db, crime_prev):
             logger.info(f"Saved to crime_prevention_detail")
@@ -562,10 +530,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save crime_prevention_detail")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 3. Traffic Safety
-    traffic = extract_traffic_safety(content, url, province)
+    traffic = await extract_traffic_safety(content, url, province)
     if traffic:
         if save_to_traffic_safety_detail_sec(db, traffic):
             logger.info(f"Saved to traffic_safety_detail")
@@ -573,10 +539,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save traffic_safety_detail")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 4. Public Order
-    public_ord = extract_public_order(content, url, province)
+    public_ord = await extract_public_order(content, url, province)
     if public_ord:
         if save_to_public_order_detail(db, public_ord):
             logger.info(f"Saved to public_order_detail")
@@ -584,7 +548,6 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save public_order_detail")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
     return results
 
 
@@ -613,14 +576,9 @@ def main():
             "public_order": 0
         }
         
-        for i, post in enumerate(posts, 1):
-            logger.info(f"\nProgress: {i}/{len(posts)}")
-            try:
-                results = process_post(post, db)
-                for key in total_extracted:
-                    total_extracted[key] += results.get(key, 0)
-            except Exception as e:
-                logger.error(f"Lỗi: {e}")
+        for results in llm.run(posts, lambda post: process_post(post, db)):
+            for key in total_extracted:
+                total_extracted[key] += (results or {}).get(key, 0)
         
         logger.info("\n" + "="*80)
         logger.info(f"Đã xử lý: {len(posts)} posts")
@@ -19,9 +19,7 @@ Bảng đích (4 bảng):
 import os
 import sys
 import json
-import time
 import logging
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 from sqlalchemy import create_engine, text
@@ -30,6 +28,7 @@ from sqlalchemy.orm import sessionmaker
 # Import SessionLocal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import SessionLocal
+from call_llm.llm_engine import LLMEngine
 
 # Setup logging
 logging.basicConfig(
@@ -47,7 +46,6 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:7777")
 LLM_API_KEY = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "20"))
-DELAY_BETWEEN_CALLS = float(os.getenv("DELAY_BETWEEN_CALLS", "1"))
 
 
 # ============== DB SAVE FUNCTIONS ==============
@@ -159,35 +157,7 @@ def save_to_social_security_coverage(db, data: Dict) -> bool:
         return False
 
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call OpenRouter LLM API"""
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {LLM_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": API_BASE_URL,
-        "X-Title": "Society Data Extractor"
-    }
-    
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 3000
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.warning(f"LLM call attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    return None
+llm = LLMEngine(title="Society Data Extractor")
 
 
 def get_posts_from_db(limit: int = 100) -> List[Dict]:
@@ -227,7 +197,7 @@ def get_posts_from_db(limit: int = 100) -> List[Dict]:
         return []
 
 
-def extract_culture_lifestyle_stats(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_culture_lifestyle_stats(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract văn hóa lối sống → culture_lifestyle_stats_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -278,7 +248,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -302,7 +272,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_cultural_infrastructure(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_cultural_infrastructure(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract cơ sở văn hóa → cultural_infrastructure_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -357,7 +327,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -381,7 +351,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_culture_sport_access(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_culture_sport_access(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract thể thao/thể dục → culture_sport_access_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -432,7 +402,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -456,7 +426,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_social_security_coverage(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_social_security_coverage(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract bảo trợ xã hội → social_security_coverage_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -509,7 +479,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -533,7 +503,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def process_post(post: Dict, db) -> Dict[str, int]:
+async def process_post(post: Dict, db) -> Dict[str, int]:
     """Xử lý 1 post - Extract 4 loại thống kê văn hóa xã hội"""
     post_id = post.get("id")
     content = post.get("content", "")
@@ -553,7 +523,7 @@ def process_post(post: Dict, db) -> Dict[str, int]:
     }
     
     # 1. Culture Lifestyle Stats
-    culture_life = extract_culture_lifestyle_stats(content, url, province)
+    culture_life = await extract_culture_lifestyle_stats(content, url, province)
     if culture_life:
         if save_to_culture_lifestyle_stats(db, culture_life):
             logger.info(f"Saved to culture_lifestyle_stats_detail")
@@ -561,10 +531,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save culture_lifestyle_stats")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 2. Cultural Infrastructure
-    culture_infra = extract_cultural_infrastructure(content, url, province)
+    culture_infra = await extract_cultural_infrastructure(content, url, province)
     if culture_infra:
         if save_to_cultural_infrastructure(db, culture_infra):
             logger.info(f"Saved to cultural_infrastructure_detail")
@@ -572,10 +540,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save cultural_infrastructure")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 3. Culture Sport Access
-    sport_access = extract_culture_sport_access(content, url, province)
+    sport_access = await extract_culture_sport_access(content, url, province)
     if sport_access:
         if save_to_culture_sport_access(db, sport_access):
             logger.info(f"Saved to culture_sport_access_detail")
@@ -583,10 +549,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save culture_sport_access")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 4. Social Security Coverage
-    social_sec = extract_social_security_coverage(content, url, province)
+    social_sec = await extract_social_security_coverage(content, url, province)
     if social_sec:
         if save_to_social_security_coverage(db, social_sec):
             logger.info(f"Saved to social_security_coverage_detail")
@@ -594,7 +558,6 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save social_security_coverage")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
     return results
 
 
@@ -623,14 +586,9 @@ def main():
             "social_security": 0
         }
         
-        for i, post in enumerate(posts, 1):
-            logger.info(f"\nProgress: {i}/{len(posts)}")
-            try:
-                results = process_post(post, db)
-                for key in total_extracted:
-                    total_extracted[key] += results.get(key, 0)
-            except Exception as e:
-                logger.error(f"Lỗi: {e}")
+        for results in llm.run(posts, lambda post: process_post(post, db)):
+            for key in total_extracted:
+                total_extracted[key] += (results or {}).get(key, 0)
         
         logger.info("\n" + "="*80)
         logger.info(f"Đã xử lý: {len(posts)} posts")
@@ -16,9 +16,7 @@ Bảng đích (2 bảng):
 import os
 import sys
 import json
-import time
 import logging
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 from sqlalchemy import create_engine, text
@@ -27,6 +25,7 @@ from sqlalchemy.orm import sessionmaker
 # Import SessionLocal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import SessionLocal
+from call_llm.llm_engine import LLMEngine
 
 # Setup logging
 logging.basicConfig(
@@ -44,7 +43,6 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:7777")
 LLM_API_KEY = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "50"))
-DELAY_BETWEEN_CALLS = float(os.getenv("DELAY_BETWEEN_CALLS", "1"))
 
 
 # ============== DB SAVE FUNCTIONS ==============
@@ -118,35 +116,7 @@ def save_to_political_statistics(db, data: Dict) -> bool:
         return False
 
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call OpenRouter LLM API"""
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {LLM_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": API_BASE_URL,
-        "X-Title": "Statistics Data Extractor"
-    }
-    
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 3000
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.warning(f"LLM call attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    return None
+llm = LLMEngine(title="Statistics Data Extractor")
 
 
 def get_posts_from_db(limit: int = 100) -> List[Dict]:
@@ -182,7 +152,7 @@ def get_posts_from_db(limit: int = 100) -> List[Dict]:
         return []
 
 
-def extract_economic_statistics(content: str, url: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_economic_statistics(content: str, url: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract thống kê kinh tế CHỈ cho xã Thư Vũ và phường Trà Lý"""
     prompt = f"""Phân tích văn bản và trích xuất các chỉ số KINH TẾ.
 
@@ -237,7 +207,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -273,7 +243,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_political_statistics(content: str, url: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_political_statistics(content: str, url: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract thống kê chính trị CHỈ cho xã Thư Vũ và phường Trà Lý"""
     prompt = f"""Phân tích văn bản và trích xuất các chỉ số CHÍNH TRỊ - ĐẢNG.
 
@@ -331,7 +301,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -367,7 +337,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def process_post(post: Dict, db) -> Dict[str, int]:
+async def process_post(post: Dict, db) -> Dict[str, int]:
     """Xử lý 1 post - Extract 2 loại thống kê"""
     post_id = post.get("id")
     content = post.get("content", "")
@@ -385,7 +355,7 @@ def process_post(post: Dict, db) -> Dict[str, int]:
     }
     
     # 1. Economic Statistics
-    econ = extract_economic_statistics(content, url, post_id, province)
+    econ = await extract_economic_statistics(content, url, post_id, province)
     if econ:
         if save_to_economic_statistics(db, econ):
             logger.info(f"Saved to economic_statistics")
@@ -393,10 +363,8 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save economic_statistics")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 2. Political Statistics
-    pol = extract_political_statistics(content, url, post_id, province)
+    pol = await extract_political_statistics(content, url, post_id, province)
     if pol:
         if save_to_political_statistics(db, pol):
             logger.info(f"Saved to political_statistics")
@@ -404,7 +372,6 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save political_statistics")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
     return results
 
 
@@ -431,14 +398,9 @@ def main():
             "political": 0
         }
         
-        for i, post in enumerate(posts, 1):
-            logger.info(f"\nProgress: {i}/{len(posts)}")
-            try:
-                results = process_post(post, db)
-                for key in total_extracted:
-                    total_extracted[key] += results.get(key, 0)
-            except Exception as e:
-                logger.error(f"Lỗi: {e}")
+        for results in llm.run(posts, lambda post: process_post(post, db)):
+            for key in total_extracted:
+                total_extracted[key] += (results or {}).get(key, 0)
         
         logger.info("\n" + "="*80)
         logger.info(f"Đã xử lý: {len(posts)} posts")
@@ -8,7 +8,6 @@ Extract TRANSPORTATION data from important_posts
 
 import os
 import sys
-import time
 import json
 import logging
 from typing import Dict, List, Optional
@@ -16,20 +15,13 @@ from typing import Dict, List, Optional
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.database import SessionLocal
+from call_llm.llm_engine import LLMEngine
 from sqlalchemy import text
-from openai import OpenAI
 
 # Config
-DELAY_BETWEEN_CALLS = 2  # seconds
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# OpenRouter API
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.environ.get("OPENROUTER_API_KEY")
-)
-
 
 def save_to_traffic_safety_detail(db, data: Dict) -> bool:
     """Save extracted data to traffic_safety_detail table"""
@@ -57,25 +49,9 @@ def save_to_traffic_safety_detail(db, data: Dict) -> bool:
         db.rollback()
         return False
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call LLM with retry logic"""
-    for attempt in range(max_retries):
-        try:
-            response = client.chat.completions.create(
-                model="openai/gpt-4-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=2000
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"LLM error (attempt {attempt+1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                time.sleep(5)
-            else:
-                return None
-
-def extract_transport_infrastructure(content: str, post_id: int, province: str) -> Optional[Dict]:
+llm = LLMEngine(title="Transportation Data Extractor", model="openai/gpt-4-turbo", max_tokens=2000)
+
+async def extract_transport_infrastructure(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract hạ tầng giao thông → transport_infrastructure_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -130,7 +106,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -154,7 +130,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_traffic_congestion(content: str, post_id: int, province: str) -> Optional[Dict]:
+async def extract_traffic_congestion(content: str, post_id: int, province: str) -> Optional[Dict]:
     """Extract ùn tắc giao thông → traffic_congestion_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -209,7 +185,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -233,7 +209,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def extract_traffic_safety(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_traffic_safety(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract tai nạn giao thông → traffic_safety_detail"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -290,7 +266,7 @@ Văn bản:
 Chỉ trả về JSON."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -314,7 +290,7 @@ Chỉ trả về JSON."""
         return None
 
 
-def process_post(post: Dict, db) -> Dict[str, int]:
+async def process_post(post: Dict, db) -> Dict[str, int]:
     """Xử lý 1 post - Extract 3 loại thống kê giao thông"""
     post_id = post.get("id")
     content = post.get("content", "")
@@ -334,25 +310,21 @@ def process_post(post: Dict, db) -> Dict[str, int]:
     }
     
     # # 1. Transport Infrastructure
-    # infra = extract_transport_infrastructure(content, post_id, province)
+    # infra = await extract_transport_infrastructure(content, post_id, province)
     # if infra:
     #     logger.info(f"Extracted transport_infrastructure_detail")
     #     results["transport_infrastructure"] = 1
     #     # TODO: Save to DB
     
-    # time.sleep(DELAY_BETWEEN_CALLS)
-    
     # # 2. Traffic Congestion
-    # congestion = extract_traffic_congestion(content, post_id, province)
+    # congestion = await extract_traffic_congestion(content, post_id, province)
     # if congestion:
     #     logger.info(f"Extracted traffic_congestion_detail")
     #     results["traffic_congestion"] = 1
     #     # TODO: Save to DB
     
-    # time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 3. Traffic Safety
-    safety = extract_traffic_safety(content, url, province)
+    safety = await extract_traffic_safety(content, url, province)
     if safety:
         if save_to_traffic_safety_detail(db, safety):
             logger.info(f"Saved to traffic_safety_detail")
@@ -360,7 +332,6 @@ def process_post(post: Dict, db) -> Dict[str, int]:
         else:
             logger.error(f"Failed to save traffic_safety_detail")
     
-    time.sleep(DELAY_BETWEEN_CALLS)
     return results
 
 
@@ -399,14 +370,9 @@ def main():
         "traffic_safety": 0
     }
     
-    for i, post in enumerate(posts, 1):
-        logger.info(f"\nProgress: {i}/{len(posts)}")
-        try:
-            results = process_post(post, db)
-            for key in total_extracted:
-                total_extracted[key] += results.get(key, 0)
-        except Exception as e:
-            logger.error(f"Lỗi: {e}")
+    for results in llm.run(posts, lambda post: process_post(post, db)):
+        for key in total_extracted:
+            total_extracted[key] += (results or {}).get(key, 0)
     
     db.close()
     
@@ -16,14 +16,17 @@ Bảng đích (3 bảng):
 """
 
 import os
+import asyncio
 import sys
 import json
-import time
 import logging
 import requests
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from call_llm.llm_engine import LLMEngine
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,47 +43,16 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:7777")
 LLM_API_KEY = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "10"))
-DELAY_BETWEEN_CALLS = float(os.getenv("DELAY_BETWEEN_CALLS", "2"))  # seconds
 
 if not LLM_API_KEY:
     logger.error("Không tìm thấy API key")
     sys.exit(1)
 
 
-def call_llm(prompt: str, max_retries: int = 3) -> Optional[str]:
-    """Call OpenRouter LLM API"""
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    
-    headers = {
-        "Authorization": f"Bearer {LLM_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": API_BASE_URL,
-        "X-Title": "Xay Dung Dang Extractor"
-    }
-    
-    payload = {
-        "model": LLM_MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 3000
-    }
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.warning(f"LLM call attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-            else:
-                logger.error(f"LLM call failed after {max_retries} attempts")
-                return None
+llm = LLMEngine(title="Xay Dung Dang Extractor")
 
 
-def extract_cadre_statistics(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_cadre_statistics(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract thống kê số lượng cán bộ"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -123,7 +95,7 @@ Văn bản:
 Chỉ trả về JSON, không thêm giải thích."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -154,7 +126,7 @@ Chỉ trả về JSON, không thêm giải thích."""
         return None
 
 
-def extract_party_discipline(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_party_discipline(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract thống kê kỷ luật Đảng"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -201,7 +173,7 @@ Văn bản:
 Chỉ trả về JSON, không thêm giải thích."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -227,7 +199,7 @@ Chỉ trả về JSON, không thêm giải thích."""
         return None
 
 
-def extract_cadre_quality(content: str, url: str, province: str) -> Optional[Dict]:
+async def extract_cadre_quality(content: str, url: str, province: str) -> Optional[Dict]:
     """Extract chất lượng cán bộ"""
     prompt = f"""Phân tích văn bản sau và trả về JSON theo đúng cấu trúc.
 Chỉ sử dụng thông tin có trong văn bản, không suy diễn.
@@ -276,7 +248,7 @@ Văn bản:
 Chỉ trả về JSON, không thêm giải thích."""
 
     try:
-        result = call_llm(prompt)
+        result = await llm.complete(prompt)
         if not result:
             return None
         
@@ -410,7 +382,7 @@ def get_politics_articles(limit: int = 100) -> List[Dict]:
         return []
 
 
-def process_article(article: Dict) -> Dict[str, int]:
+async def process_article(article: Dict) -> Dict[str, int]:
     """Xử lý 1 article và extract cả 3 loại thống kê"""
     url = article.get("id")
     content = article.get("content", "")
@@ -431,28 +403,22 @@ def process_article(article: Dict) -> Dict[str, int]:
     
     # 1. Extract cadre statistics
     logger.info("💼 Extracting cadre statistics...")
-    cadre_stats = extract_cadre_statistics(content, url, province)
+    cadre_stats = await extract_cadre_statistics(content, url, province)
     if cadre_stats:
-        if save_to_detail_table(cadre_stats, "cadre_statistics_detail"):
+        if await asyncio.to_thread(save_to_detail_table, cadre_stats, "cadre_statistics_detail"):
             results["cadre_statistics"] = 1
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 2. Extract party discipline
     logger.info("⚖️  Extracting party discipline...")
-    party_disc = extract_party_discipline(content, url, province)
+    party_disc = await extract_party_discipline(content, url, province)
     if party_disc:
-        if save_to_detail_table(party_disc, "party_discipline_detail"):
+        if await asyncio.to_thread(save_to_detail_table, party_disc, "party_discipline_detail"):
             results["party_discipline"] = 1
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     # 3. Extract cadre quality
     logger.info("⭐ Extracting cadre quality...")
-    cadre_qual = extract_cadre_quality(content, url, province)
+    cadre_qual = await extract_cadre_quality(content, url, province)
     if cadre_qual:
-        if save_to_detail_table(cadre_qual, "cadre_quality_detail"):
+        if await asyncio.to_thread(save_to_detail_table, cadre_qual, "cadre_quality_detail"):
             results["cadre_quality"] = 1
-    time.sleep(DELAY_BETWEEN_CALLS)
-    
     return results
 
 
@@ -484,17 +450,9 @@ def main():
         "cadre_quality": 0
     }
     
-    for i, article in enumerate(articles, 1):
-        logger.info(f"\nProgress: {i}/{len(articles)}")
-        
-        try:
-            results = process_article(article)
-            
-            for key, value in results.items():
-                total_extracted[key] += value
-                
-        except Exception as e:
-            logger.error(f"Lỗi khi xử lý article {article.get('id')}: {e}")
+    for results in llm.run(articles, process_article):
+        for key, value in (results or {}).items():
+            total_extracted[key] += value
     
     # Summary
     logger.info("\n" + "="*80)
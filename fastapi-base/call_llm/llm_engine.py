@@ -0,0 +1,280 @@
+"""
+LLM Engine - Async extraction engine dùng chung cho các script call_llm/
+
+Thay cho bản copy `requests.post` + `time.sleep(DELAY_BETWEEN_CALLS)` trong từng
+script: một httpx.AsyncClient (connection pooling, keep-alive), giới hạn số
+request song song, token bucket rate limit theo provider (dùng chung giữa các
+script chạy cùng process) và retry với exponential backoff + full jitter.
+
+Script chỉ cần cung cấp các callback:
+  - extract (prompt + parse):  async def extract_x(...) -> await llm.complete(prompt)
+  - process/save:              async def process_post(post, db) -> gọi extract + save_*
+  - chạy:                      results = llm.run(posts, lambda post: process_post(post, db))
+
+Configuration (env):
+  LLM_BASE_URL      OpenAI-compatible endpoint (mặc định OpenRouter; trỏ vào
+                    call_llm/mock_llm_server.py để benchmark offline)
+  LLM_MODEL         Model mặc định
+  LLM_CONCURRENCY   Số request song song tối đa mỗi engine (mặc định 8)
+  LLM_RATE_LIMIT    Requests/giây cho mỗi provider host (0 = không giới hạn)
+  LLM_RATE_BURST    Burst của token bucket (mặc định = LLM_CONCURRENCY)
+  LLM_TIMEOUT       Timeout mỗi request (giây)
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    `reserve()` không block: trừ 1 token (cho phép âm = xếp hàng) và trả về số
+    giây caller cần chờ, nên dùng được từ nhiều event loop / thread cùng lúc.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# Token buckets dùng chung (one per provider host)
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+def get_rate_limiter(base_url: str, rate: Optional[float] = None, burst: Optional[float] = None) -> TokenBucket:
+    """Get or create the token bucket of a provider (keyed by host)"""
+    host = urlparse(base_url).netloc or base_url
+    with _buckets_lock:
+        if host not in _buckets:
+            if rate is None:
+                rate = float(os.getenv("LLM_RATE_LIMIT", "5"))
+            if burst is None:
+                burst = float(os.getenv("LLM_RATE_BURST", os.getenv("LLM_CONCURRENCY", "8")))
+            _buckets[host] = TokenBucket(rate, burst)
+        return _buckets[host]
+
+
+class LLMEngine:
+    """Async OpenAI-compatible chat completion client with bounded concurrency"""
+
+    def __init__(
+        self,
+        title: str = "LLM Extractor",
+        model: Optional[str] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 3000,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        max_retries: int = 3,
+        timeout: Optional[float] = None,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0
+    ):
+        """
+        Initialize engine
+
+        Args:
+            title: X-Title header (tên extractor trên OpenRouter)
+            model: Model (mặc định env LLM_MODEL hoặc openai/gpt-4o-mini)
+            temperature: Sampling temperature
+            max_tokens: Max output tokens
+            base_url: OpenAI-compatible base URL (mặc định env LLM_BASE_URL / OpenRouter)
+            api_key: API key (mặc định OPENROUTER_API_KEY / OPENAI_API_KEY)
+            concurrency: Max in-flight requests (mặc định env LLM_CONCURRENCY)
+            max_retries: Số lần thử tối đa mỗi prompt
+            timeout: Timeout mỗi request (giây)
+            backoff_base: Backoff cơ sở (giây), nhân đôi mỗi lần retry
+            backoff_max: Trần backoff (giây)
+        """
+        self.title = title
+        self.model = model or os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.base_url = (base_url or os.getenv("LLM_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.api_key = api_key if api_key is not None else (
+            os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY", "")
+        )
+        self.concurrency = concurrency or int(os.getenv("LLM_CONCURRENCY", "8"))
+        self.max_retries = max_retries
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", "60"))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.rate_limiter = get_rate_limiter(self.base_url)
+        self.stats = {"requests": 0, "succeeded": 0, "failed": 0, "retries": 0}
+
+        # AsyncClient/Semaphore gắn với event loop -> tạo lại khi loop đổi
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency
+                ),
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "HTTP-Referer": os.getenv("API_BASE_URL", "http://localhost:7777"),
+                    "X-Title": self.title
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._client
+
+    async def aclose(self):
+        """Close the HTTP client of the current loop"""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    async def complete(self, prompt: str, **params: Any) -> Optional[str]:
+        """
+        Chat completion for a single user prompt
+
+        Args:
+            prompt: User message
+            **params: Override payload (model, temperature, max_tokens, ...)
+
+        Returns:
+            Message content, None nếu thất bại sau max_retries lần
+        """
+        client = self._ensure_client()
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            **params
+        }
+
+        self.stats["requests"] += 1
+        for attempt in range(self.max_retries):
+            retry_after = None
+            try:
+                await self.rate_limiter.acquire()
+                async with self._semaphore:
+                    response = await client.post("/chat/completions", json=payload)
+
+                if response.status_code in RETRYABLE_STATUS:
+                    retry_after = response.headers.get("Retry-After")
+                    raise httpx.HTTPStatusError(
+                        f"HTTP {response.status_code}", request=response.request, response=response
+                    )
+                if response.status_code >= 400:
+                    logger.error(f"LLM call failed (HTTP {response.status_code}): {response.text[:200]}")
+                    break
+
+                content = response.json()["choices"][0]["message"]["content"]
+                self.stats["succeeded"] += 1
+                return content
+            except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+                logger.warning(f"LLM call attempt {attempt + 1}/{self.max_retries} failed: {e}")
+                if attempt < self.max_retries - 1:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        self.stats["failed"] += 1
+        logger.error(f"LLM call failed after {self.max_retries} attempts")
+        return None
+
+    async def run_async(
+        self,
+        items: Iterable[Any],
+        handler: Callable[[Any], Awaitable[Any]],
+        progress_every: int = 10
+    ) -> List[Any]:
+        """
+        Run `handler` over items with bounded concurrency
+
+        Returns:
+            Kết quả theo đúng thứ tự items (None cho item bị lỗi)
+        """
+        items = list(items)
+        total = len(items)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        done = 0
+
+        async def run_one(item):
+            nonlocal done
+            async with semaphore:
+                try:
+                    return await handler(item)
+                except Exception as e:
+                    logger.error(f"Lỗi: {e}")
+                    return None
+                finally:
+                    done += 1
+                    if done % progress_every == 0 or done == total:
+                        logger.info(f"Progress: {done}/{total}")
+
+        started = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(run_one(item) for item in items))
+        finally:
+            await self.aclose()
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"LLM engine: {total} items in {elapsed:.1f}s "
+            f"(requests={self.stats['requests']}, retries={self.stats['retries']}, failed={self.stats['failed']})"
+        )
+        return results
+
+    def run(
+        self,
+        items: Iterable[Any],
+        handler: Callable[[Any], Awaitable[Any]],
+        progress_every: int = 10
+    ) -> List[Any]:
+        """Sync entry point (script main / FastAPI threadpool) - chạy run_async trong event loop riêng"""
+        return asyncio.run(self.run_async(items, handler, progress_every))
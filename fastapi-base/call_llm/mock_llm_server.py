@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Server - OpenAI-compatible /v1/chat/completions giả lập để benchmark offline
+
+Trả về JSON cố định sau một độ trễ ngẫu nhiên, có thể bơm lỗi 429/5xx để thử
+retry/backoff của call_llm/llm_engine.py. Không gọi API thật, không tốn token.
+
+Usage:
+    python call_llm/mock_llm_server.py --port 8900 --latency 0.8 --error-rate 0.05
+
+    # Trỏ các script extract vào mock server
+    LLM_BASE_URL=http://127.0.0.1:8900/v1 LLM_RATE_LIMIT=0 python call_llm/extract_fdi.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEFAULT_CONTENT = json.dumps({"no_data": True})
+
+
+def create_app(
+    latency: float = 0.5,
+    jitter: float = 0.2,
+    error_rate: float = 0.0,
+    content: str = DEFAULT_CONTENT
+) -> FastAPI:
+    """
+    Build mock app
+
+    Args:
+        latency: Độ trễ trung bình mỗi request (giây)
+        jitter: Biên độ dao động độ trễ (+/- giây)
+        error_rate: Tỷ lệ request trả về 429/500/503
+        content: Nội dung message trả về
+    """
+    app = FastAPI(title="Mock LLM Server")
+    stats = {"requests": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0, "started_at": time.time()}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+            if random.random() < error_rate:
+                stats["errors"] += 1
+                status = random.choice([429, 500, 503])
+                headers = {"Retry-After": "1"} if status == 429 else None
+                return JSONResponse({"error": {"message": "mock error", "code": status}}, status_code=status, headers=headers)
+
+            prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+            return {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": (len(prompt) + len(content)) // 4
+                }
+            }
+        finally:
+            stats["in_flight"] -= 1
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "uptime": round(time.time() - stats["started_at"], 1)}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean latency per request (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter (+/- seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/5xx")
+    parser.add_argument("--content", default=DEFAULT_CONTENT, help="Message content returned for every request")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(
+        create_app(args.latency, args.jitter, args.error_rate, args.content),
+        host=args.host, port=args.port, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark LLM extraction throughput: sequential requests.post vs async LLMEngine
+
+Khởi động call_llm/mock_llm_server.py trong process (không gọi API thật), rồi:
+  - sequential: đúng vòng lặp cũ của các script call_llm/ (requests.post +
+    time.sleep(DELAY_BETWEEN_CALLS) giữa các call)
+  - engine:     LLMEngine.run với các mức concurrency khác nhau
+
+Usage:
+    python scripts/benchmark_llm_engine.py
+    python scripts/benchmark_llm_engine.py --prompts 200 --latency 0.8 --concurrency 4 8 16 --error-rate 0.05
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+import uvicorn
+
+from call_llm.llm_engine import LLMEngine, get_rate_limiter
+from call_llm.mock_llm_server import create_app
+
+
+def start_mock_server(port: int, latency: float, jitter: float, error_rate: float) -> uvicorn.Server:
+    """Run the mock server in a daemon thread, return once it accepts requests"""
+    config = uvicorn.Config(
+        create_app(latency, jitter, error_rate), host="127.0.0.1", port=port, log_level="error"
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def run_sequential(base_url: str, prompts, delay: float, max_retries: int = 3):
+    """Old call_llm loop: one blocking request at a time + fixed delay"""
+    ok = 0
+    for prompt in prompts:
+        for attempt in range(max_retries):
+            try:
+                response = requests.post(
+                    f"{base_url}/chat/completions",
+                    json={"model": "mock", "messages": [{"role": "user", "content": prompt}]},
+                    timeout=60
+                )
+                response.raise_for_status()
+                response.json()["choices"][0]["message"]["content"]
+                ok += 1
+                break
+            except Exception:
+                if attempt < max_retries - 1:
+                    time.sleep(2 ** attempt)
+        time.sleep(delay)
+    return ok
+
+
+def run_engine(base_url: str, prompts, concurrency: int, rate: float):
+    """LLMEngine over the same prompts"""
+    bucket = get_rate_limiter(base_url)
+    bucket.rate, bucket.burst = rate, float(concurrency)
+
+    engine = LLMEngine(title="Benchmark", model="mock", base_url=base_url, api_key="mock", concurrency=concurrency)
+
+    async def handler(prompt):
+        return await engine.complete(prompt)
+
+    results = engine.run(prompts, handler, progress_every=10 ** 9)
+    return sum(1 for r in results if r is not None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs async LLM extraction")
+    parser.add_argument("--prompts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock latency per request (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--delay", type=float, default=1.0, help="DELAY_BETWEEN_CALLS of the sequential path")
+    parser.add_argument("--sequential-max", type=int, default=20, help="Cap prompts for the (slow) sequential run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--rate", type=float, default=0.0, help="Token bucket rate (req/s, 0 = unlimited)")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+
+    server = start_mock_server(args.port, args.latency, args.jitter, args.error_rate)
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    prompts = [f"Prompt {i}: " + "nội dung bài viết " * 50 for i in range(args.prompts)]
+
+    print(f"{'mode':<20}{'prompts':>8}{'ok':>8}{'seconds':>10}{'req/s':>10}")
+
+    seq_prompts = prompts[:args.sequential_max]
+    started = time.perf_counter()
+    ok = run_sequential(base_url, seq_prompts, args.delay)
+    elapsed = time.perf_counter() - started
+    print(f"{'sequential':<20}{len(seq_prompts):>8}{ok:>8}{elapsed:>10.2f}{len(seq_prompts) / elapsed:>10.2f}")
+
+    for concurrency in args.concurrency:
+        started = time.perf_counter()
+        ok = run_engine(base_url, prompts, concurrency, args.rate)
+        elapsed = time.perf_counter() - started
+        label = f"engine c={concurrency}"
+        print(f"{label:<20}{len(prompts):>8}{ok:>8}{elapsed:>10.2f}{len(prompts) / elapsed:>10.2f}")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
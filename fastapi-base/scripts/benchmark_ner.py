@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark rule-based NER: vòng lặp re.finditer cũ vs NEREngine
+
+Sinh bài viết giả (chức danh + tên người, cơ quan, địa danh, tỉnh/thành viết
+hoa/thường lẫn lộn, ngày tháng, số tiền), kiểm tra output của engine trùng khớp
+tuyệt đối với `_extract_rules` cũ (cả thứ tự entity và thứ tự label), rồi đo độ
+trễ mỗi bài và throughput của extract_batch (kể cả nhiều processes).
+
+Usage:
+    python scripts/benchmark_ner.py
+    python scripts/benchmark_ner.py --docs 10000 --sentences 25 --workers 2 4
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.etl.ner_extractor import PERSON_NAME_PATTERN, VietnameseNERExtractor
+
+SURNAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Vũ", "Đặng", "Bùi"]
+GIVEN = ["Văn", "Thị", "Minh", "Quốc", "Thanh", "Hùng", "Lan", "Tuấn", "Hải", "Dũng"]
+TITLES = ["Ông", "Bà", "Đồng chí", "PGS", "TS", "Bác sĩ", "Chủ tịch", "Phó chủ tịch",
+          "Phó Chủ tịch", "Bí thư", "Giám đốc", "Tổng giám đốc", "Trưởng ban", "Anh", "Chị"]
+ORGS = ["Công ty TNHH Minh Phát", "Tập đoàn Hòa Phát", "Ngân hàng TMCP Ngoại thương",
+        "Trường Đại học Sư phạm", "Bệnh viện Đa khoa tỉnh", "Sở Tài chính", "UBND Thành phố",
+        "Bộ Công an", "Viện Hàn lâm", "Đảng ủy khối doanh nghiệp", "Học viện Tài chính"]
+PLACES = ["tỉnh Hưng Yên", "Thành phố Hưng Yên", "huyện Văn Giang", "xã Phụng Công",
+          "phường Hiến Nam", "quận Ba Đình", "Quận 1", "thị trấn Như Quỳnh", "TP Hà Nội"]
+PROVINCES = ["Hà Nội", "hà nội", "HƯNG YÊN", "Hưng Yên", "Bắc Ninh", "Hải Dương",
+             "Bà Rịa - Vũng Tàu", "Thừa Thiên Huế", "đà nẵng", "Quảng Ninh"]
+FILLER = ("người dân địa phương cho biết dự án đầu tư hạ tầng giao thông đang được triển khai "
+          "theo kế hoạch kinh tế xã hội năm nay tăng trưởng ổn định vụ việc đang được xác minh").split()
+
+
+def legacy_extract_rules(extractor: VietnameseNERExtractor, text: str):
+    """_extract_rules trước khi có NEREngine (tham chiếu)"""
+    entities = defaultdict(list)
+
+    def add(label, pattern, source='rule', flags=0, fixed_text=None):
+        for match in re.finditer(pattern, text, flags):
+            entities[label].append({
+                'text': fixed_text if fixed_text is not None else match.group(0).strip(),
+                'start': match.start(),
+                'end': match.end(),
+                'source': source
+            })
+
+    for title_pattern in extractor.person_titles:
+        add('PERSON', title_pattern + PERSON_NAME_PATTERN)
+    for pattern in extractor.org_patterns:
+        add('ORG', pattern)
+    for pattern in extractor.location_patterns:
+        add('LOCATION', pattern)
+    for province in extractor.vn_provinces:
+        add('LOCATION', re.escape(province), 'gazetteer', re.IGNORECASE, province)
+    for pattern in extractor.date_patterns:
+        add('DATE', pattern)
+    for pattern in extractor.money_patterns:
+        add('MONEY', pattern)
+    return entities
+
+
+def make_sentence(rng: random.Random) -> str:
+    words = [rng.choice(FILLER) for _ in range(rng.randint(6, 14))]
+    roll = rng.random()
+    if roll < 0.25:
+        name = " ".join([rng.choice(SURNAMES)] + rng.sample(GIVEN, rng.randint(1, 3)))
+        words.insert(rng.randint(0, len(words)), f"{rng.choice(TITLES)} {name}")
+    elif roll < 0.4:
+        words.insert(rng.randint(0, len(words)), rng.choice(ORGS))
+    elif roll < 0.55:
+        words.insert(rng.randint(0, len(words)), rng.choice(PLACES))
+    elif roll < 0.7:
+        words.insert(rng.randint(0, len(words)), rng.choice(PROVINCES))
+    elif roll < 0.85:
+        day, month = rng.randint(1, 28), rng.randint(1, 12)
+        words.insert(rng.randint(0, len(words)), rng.choice([
+            f"ngày {day}/{month}/2025", f"Ngày {day} tháng {month} năm 2025", f"tháng {month}/2025",
+            "năm 2024", "quý IV/2025", f"{day}-{month}-25"
+        ]))
+    else:
+        words.insert(rng.randint(0, len(words)), rng.choice([
+            f"{rng.randint(1, 999)} tỷ đồng", f"{rng.randint(1, 99)}.500.000 đồng", f"{rng.randint(1, 50)},5 triệu đồng",
+            f"{rng.randint(1, 900)} USD"
+        ]))
+    return " ".join(words).capitalize() + rng.choice([". ", ", ", "! ", "\n"])
+
+
+def make_corpus(docs: int, sentences: int, seed: int):
+    rng = random.Random(seed)
+    corpus = ["".join(make_sentence(rng) for _ in range(sentences)) for _ in range(docs)]
+    corpus.extend(["", "Ông", "İstanbul Ông Nguyễn Văn A ở Hà Nội ngày 1/2/2025"])
+    return corpus
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rule-based NER engine")
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--sentences", type=int, default=25, help="Sentences per document")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    extractor = VietnameseNERExtractor()
+    corpus = make_corpus(args.docs, args.sentences, args.seed)
+    avg_chars = sum(len(text) for text in corpus) / len(corpus)
+    print(f"corpus: {len(corpus)} docs, {avg_chars:.0f} chars/doc")
+
+    legacy, legacy_seconds = timed(lambda: [legacy_extract_rules(extractor, text) for text in corpus])
+    engine, engine_seconds = timed(lambda: [extractor._extract_rules(text) for text in corpus])
+    mismatches = sum(1 for old, new in zip(legacy, engine) if list(old.items()) != list(new.items()))
+    entities = sum(len(ents) for result in engine for ents in result.values())
+    print(f"equivalence: {len(corpus)} docs, {entities} entities, {mismatches} mismatches")
+
+    print(f"{'mode':<20}{'docs':>8}{'seconds':>10}{'ms/doc':>10}{'docs/s':>12}")
+    for label, seconds in (("legacy rules", legacy_seconds), ("engine", engine_seconds)):
+        print(f"{label:<20}{len(corpus):>8}{seconds:>10.2f}{seconds * 1000 / len(corpus):>10.3f}{len(corpus) / seconds:>12.1f}")
+
+    serial, seconds = timed(lambda: extractor.extract_batch(corpus))
+    print(f"{'extract_batch':<20}{len(corpus):>8}{seconds:>10.2f}{seconds * 1000 / len(corpus):>10.3f}{len(corpus) / seconds:>12.1f}")
+
+    for workers in args.workers:
+        results, seconds = timed(lambda: extractor.extract_batch(corpus, workers=workers, chunk_size=500))
+        assert results == serial, f"workers={workers}: results differ from serial run"
+        label = f"batch x{workers} proc"
+        print(f"{label:<20}{len(corpus):>8}{seconds:>10.2f}{seconds * 1000 / len(corpus):>10.3f}{len(corpus) / seconds:>12.1f}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
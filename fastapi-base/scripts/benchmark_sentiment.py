@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark SentimentAnalyzer: vòng lặp lexicon cũ vs LexiconEngine
+
+Sinh văn bản giả từ chính lexicon (trộn từ phủ định / tăng cường / từ thường),
+kiểm tra kết quả (emotion, confidence, all_scores) trùng khớp tuyệt đối với
+cách tính cũ, rồi đo tốc độ analyze / analyze_batch (kể cả nhiều processes).
+
+Usage:
+    python scripts/benchmark_sentiment.py
+    python scripts/benchmark_sentiment.py --docs 5000 --words 300 --workers 4
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.sentiment.sentiment_service import SentimentAnalyzer
+
+FILLER = (
+    "người dân tỉnh hưng yên kinh tế năm nay tăng trưởng dự án đầu tư hạ tầng "
+    "giao thông trường học bệnh viện chính quyền địa phương cho biết theo báo cáo"
+).split()
+
+
+def legacy_emotion_score(analyzer: SentimentAnalyzer, text: str, words: set, weight: float) -> float:
+    """_calculate_emotion_score trước khi có LexiconEngine (tham chiếu)"""
+    score = 0.0
+    text_words = text.split()
+    for term in words:
+        if ' ' in term:
+            if term in text:
+                score += 1.5 * weight
+        else:
+            for i, word in enumerate(text_words):
+                if term in word:
+                    multiplier = 1.0
+                    if i > 0 and text_words[i-1] in analyzer.intensifiers:
+                        multiplier = 1.5
+                    elif i > 0 and text_words[i-1] in analyzer.diminishers:
+                        multiplier = 0.7
+                    if i > 0 and text_words[i-1] in analyzer.negation_words:
+                        score -= 0.5 * weight
+                    else:
+                        score += multiplier * weight
+    return max(0, score)
+
+
+def legacy_analyze(analyzer: SentimentAnalyzer, text: str):
+    """analyze() với vòng lặp lexicon cũ"""
+    original = analyzer._engine.score
+    analyzer._engine.score = lambda text_lower: [
+        legacy_emotion_score(analyzer, text_lower, data["words"], data["weight"])
+        for data in analyzer.emotion_lexicon.values()
+    ]
+    try:
+        return analyzer.analyze(text)
+    finally:
+        analyzer._engine.score = original
+
+
+def make_corpus(analyzer: SentimentAnalyzer, docs: int, words: int, seed: int):
+    rng = random.Random(seed)
+    terms = sorted({t for data in analyzer.emotion_lexicon.values() for t in data["words"]})
+    modifiers = sorted(analyzer.negation_words | analyzer.intensifiers | analyzer.diminishers)
+    corpus = []
+    for _ in range(docs):
+        tokens = []
+        while len(tokens) < words:
+            roll = rng.random()
+            if roll < 0.08:
+                tokens.extend(rng.choice(terms).split())
+            elif roll < 0.12:
+                tokens.extend(rng.choice(modifiers).split())
+            else:
+                tokens.append(rng.choice(FILLER))
+        text = " ".join(tokens)
+        corpus.append(text.capitalize() if rng.random() < 0.5 else text.upper())
+    corpus.extend(["", "   ", "không", "rất vui", "Không vui. Rất tức giận!"])
+    return corpus
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lexicon sentiment engine")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=200, help="Tokens per document")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--legacy-max", type=int, default=300, help="Cap docs for the (slow) legacy run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer()
+    corpus = make_corpus(analyzer, args.docs, args.words, args.seed)
+
+    legacy_docs = corpus[:args.legacy_max] + corpus[-5:]
+    legacy, legacy_seconds = timed(lambda: [legacy_analyze(analyzer, text) for text in legacy_docs])
+    engine, _ = timed(lambda: [analyzer.analyze(text) for text in legacy_docs])
+    mismatches = sum(1 for old, new in zip(legacy, engine) if old != new)
+    print(f"equivalence: {len(legacy_docs)} docs, {mismatches} mismatches")
+
+    print(f"{'mode':<20}{'docs':>8}{'seconds':>10}{'docs/s':>12}")
+    print(f"{'legacy':<20}{len(legacy_docs):>8}{legacy_seconds:>10.2f}{len(legacy_docs) / legacy_seconds:>12.1f}")
+
+    serial, seconds = timed(lambda: analyzer.analyze_batch(corpus))
+    print(f"{'engine':<20}{len(corpus):>8}{seconds:>10.2f}{len(corpus) / seconds:>12.1f}")
+
+    for workers in args.workers:
+        results, seconds = timed(lambda: analyzer.analyze_batch(corpus, workers=workers, chunk_size=250))
+        assert results == serial, f"workers={workers}: results differ from serial run"
+        label = f"engine x{workers} proc"
+        print(f"{label:<20}{len(corpus):>8}{seconds:>10.2f}{len(corpus) / seconds:>12.1f}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark SimHash near-duplicate lookup: linear scan vs numpy vs banded LSH
+
+Sinh SimHash ngẫu nhiên (kèm một tỉ lệ near-duplicates lệch 1-2 bits) rồi chạy
+đúng vòng lặp của HybridDeduplicator._hash_deduplicate: find_near → add.
+
+Usage:
+    python scripts/benchmark_simhash_index.py
+    python scripts/benchmark_simhash_index.py --sizes 10000 100000 1000000 --linear-max 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.etl.simhash_index import SimHashIndex, INDEX_MODES
+
+
+def generate_hashes(n: int, dup_ratio: float, max_distance: int, seed: int = 42):
+    """Random 64-bit hashes, dup_ratio of them are near-copies of an earlier hash"""
+    rng = random.Random(seed)
+    hashes = []
+    for _ in range(n):
+        if hashes and rng.random() < dup_ratio:
+            h = rng.choice(hashes)
+            for bit in rng.sample(range(64), rng.randint(1, max_distance)):
+                h ^= 1 << bit
+        else:
+            h = rng.getrandbits(64)
+        hashes.append(h)
+    return hashes
+
+
+def run(mode: str, hashes, max_distance: int):
+    """Run the dedupe loop, return (elapsed seconds, unique count)"""
+    index = SimHashIndex(max_distance=max_distance, mode=mode)
+    unique = 0
+    start = time.perf_counter()
+    for h in hashes:
+        if index.find_near(h) is None:
+            index.add(h)
+            unique += 1
+    return time.perf_counter() - start, unique
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SimHash index modes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--modes", nargs="+", default=list(INDEX_MODES), choices=INDEX_MODES)
+    parser.add_argument("--dup-ratio", type=float, default=0.1)
+    parser.add_argument("--max-distance", type=int, default=2)
+    parser.add_argument(
+        "--linear-max", type=int, default=100_000,
+        help="Skip linear/numpy modes above this size (they are quadratic)"
+    )
+    args = parser.parse_args()
+
+    print(f"\n{'size':>10} {'mode':>8} {'seconds':>10} {'docs/s':>12} {'unique':>10}")
+    print("-" * 54)
+
+    for n in args.sizes:
+        hashes = generate_hashes(n, args.dup_ratio, args.max_distance)
+        results = {}
+        for mode in args.modes:
+            if mode != "lsh" and n > args.linear_max:
+                print(f"{n:>10} {mode:>8} {'skipped':>10}")
+                continue
+            elapsed, unique = run(mode, hashes, args.max_distance)
+            results[mode] = unique
+            print(f"{n:>10} {mode:>8} {elapsed:>10.2f} {n / elapsed:>12,.0f} {unique:>10}")
+
+        if len(set(results.values())) > 1:
+            print(f"   ⚠️  Modes disagree on unique count: {results}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Benchmark số SQL statements của website / social stats và crisis detection
+
+Sinh một tháng dữ liệu sentiment_analysis giả (nhiều domain báo + mạng xã hội,
+nhiều topic) trong SQLite in-memory, đếm statements mỗi lần gọi (event
+before_cursor_execute) và so kết quả:
+  - legacy:  một query emotion + một query tồn tại cho mỗi (domain, topic),
+             một query emotion cho mỗi crisis topic
+  - current: GROUP BY trên daily_sentiment_rollup + một INSERT ... ON CONFLICT
+             mỗi batch, crisis topics trong một grouped query
+
+Số statements của current không phụ thuộc số nhóm; script thoát với mã 1 nếu
+kết quả lệch hoặc current vượt --max-statements.
+
+Usage:
+    python scripts/benchmark_stats_queries.py
+    python scripts/benchmark_stats_queries.py --articles 50000 --domains 80 --topics 50
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Integer, and_, create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import SentimentAnalysis
+from app.models.model_statistics import (
+    WebsiteActivityStats, SocialActivityStats, DailySentimentRollup, StatsRollupState
+)
+from app.services.statistics.statistics_service import StatisticsService
+from app.services.statistics.rollup_service import get_sentiment_rollup_service
+from app.services.trends.trend_service import TrendAnalysisService
+
+SOCIAL_DOMAINS = ["facebook.com", "youtube.com", "tiktok.com", "x.com", "threads.net"]
+EMOTIONS = ["vui_mừng", "ủng_hộ", "phẫn_nộ", "lo_ngại", "thất_vọng", "trung_lập", "hoài_nghi"]
+REFERENCE_DATE = date(2025, 6, 18)
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def legacy_source_stats(service: StatisticsService, period_type: str, social: bool):
+    """calculate_website_stats / calculate_social_stats trước khi có rollup + upsert (tham chiếu)"""
+    db = service.db
+    start, end, _ = service._get_period_range(period_type, REFERENCE_DATE)
+    in_period = and_(
+        func.date(SentimentAnalysis.published_date) >= start,
+        func.date(SentimentAnalysis.published_date) <= end
+    )
+    dims = [SentimentAnalysis.source_domain, SentimentAnalysis.topic_id,
+            SentimentAnalysis.topic_name, SentimentAnalysis.category]
+    if social:
+        dims.insert(1, SentimentAnalysis.source_url)
+    data = db.query(
+        *dims,
+        func.count(SentimentAnalysis.id),
+        func.sum(func.cast(SentimentAnalysis.sentiment_group == 'positive', Integer)),
+        func.sum(func.cast(SentimentAnalysis.sentiment_group == 'negative', Integer)),
+    ).filter(in_period, SentimentAnalysis.source_domain.isnot(None)).group_by(*dims).all()
+
+    model = SocialActivityStats if social else WebsiteActivityStats
+    for row in data:
+        domain, topic_id = row[0], row[2 if social else 1]
+        count, pos, neg = row[-3], row[-2] or 0, row[-1] or 0
+        platform = service._detect_platform(domain)
+        if bool(platform) != social:
+            continue
+
+        emotions = dict(db.query(SentimentAnalysis.emotion, func.count(SentimentAnalysis.id)).filter(
+            SentimentAnalysis.source_domain == domain,
+            SentimentAnalysis.topic_id == topic_id if topic_id else True,
+            in_period
+        ).group_by(SentimentAnalysis.emotion).all())
+
+        key = [model.period_type == period_type, model.period_start == start,
+               model.topic_id == topic_id if topic_id else model.topic_id.is_(None)]
+        key += [model.platform == platform, model.account_name == domain] if social else [model.domain == domain]
+        stat = db.query(model).filter(*key).first() or model()
+        stat.period_type, stat.period_start, stat.period_end, stat.topic_id = period_type, start, end, topic_id
+        if social:
+            stat.platform, stat.account_name, stat.post_count = platform, domain, count
+        else:
+            stat.domain, stat.article_count = domain, count
+        stat.positive_count, stat.negative_count, stat.neutral_count = pos, neg, count - pos - neg
+        stat.emotion_distribution = emotions
+        if stat.id is None:
+            db.add(stat)
+
+
+def legacy_crisis_topics(service: TrendAnalysisService, start: datetime, end: datetime):
+    """_detect_crisis_topics trước khi gộp emotion vào grouped query (tham chiếu)"""
+    db = service.db
+    in_window = and_(SentimentAnalysis.analyzed_at >= start, SentimentAnalysis.analyzed_at <= end)
+    groups = db.query(
+        SentimentAnalysis.topic_id, SentimentAnalysis.topic_name,
+        func.count(SentimentAnalysis.id),
+        func.sum(func.cast(SentimentAnalysis.sentiment_group == 'negative', Integer)),
+    ).filter(in_window, SentimentAnalysis.topic_id.isnot(None)).group_by(
+        SentimentAnalysis.topic_id, SentimentAnalysis.topic_name
+    ).having(func.count(SentimentAnalysis.id) >= 5).all()
+
+    results = []
+    for topic_id, topic_name, total, neg in groups:
+        neg_ratio = (neg or 0) / total
+        if neg_ratio > 0.4:
+            emotions = dict(db.query(SentimentAnalysis.emotion, func.count(SentimentAnalysis.id)).filter(
+                SentimentAnalysis.topic_id == topic_id, in_window
+            ).group_by(SentimentAnalysis.emotion).all())
+            results.append((topic_id, topic_name, neg_ratio, total, emotions))
+    return results
+
+
+def seed(db, articles: int, domains: int, topics: int, seed_value: int):
+    rng = random.Random(seed_value)
+    sources = [f"bao{i}.vn" for i in range(domains)] + SOCIAL_DOMAINS
+    negative_bias = {t: rng.uniform(0.1, 0.6) for t in range(1, topics + 1)}
+    month_start = REFERENCE_DATE.replace(day=1)
+
+    rows = []
+    for i in range(1, articles + 1):
+        topic_id = rng.choice([None] + list(range(1, topics + 1)))
+        if topic_id and rng.random() < negative_bias[topic_id]:
+            group = "negative"
+        else:
+            group = rng.choice(["positive", "neutral", "negative"])
+        published = datetime.combine(month_start, datetime.min.time()) + timedelta(minutes=rng.randint(0, 30 * 24 * 60 - 1))
+        rows.append({
+            "id": i, "article_id": i, "source_url": f"https://x/{i}", "source_domain": rng.choice(sources),
+            "emotion": rng.choice(EMOTIONS), "sentiment_group": group,
+            "topic_id": topic_id, "topic_name": f"topic {topic_id}" if topic_id else None,
+            "category": f"cat {topic_id % 7}" if topic_id else None,
+            "published_date": published, "analyzed_at": published,
+        })
+    db.bulk_insert_mappings(SentimentAnalysis, rows)
+    db.commit()
+
+
+def stats_snapshot(db, model):
+    """(key, count, pos, neg, neu, emotions) - emotions bỏ qua với dòng topic NULL (legacy gộp mọi topic)"""
+    rows = []
+    for stat in db.query(model):
+        account = (stat.platform, stat.account_name) if model is SocialActivityStats else (stat.domain,)
+        count = stat.post_count if model is SocialActivityStats else stat.article_count
+        counts = (count, stat.positive_count, stat.negative_count, stat.neutral_count)
+        if model is SocialActivityStats:
+            counts = ()  # legacy: nhiều nhóm source_url ghi đè cùng một dòng, số đếm = nhóm cuối
+        rows.append((account, stat.topic_id or -1, counts, sorted(stat.emotion_distribution.items()) if stat.topic_id else []))
+    return sorted(rows)
+
+
+def timed(counter, fn):
+    counter.count = 0
+    started = time.perf_counter()
+    result = fn()
+    return result, counter.count, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count SQL statements of stats queries")
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--domains", type=int, default=60, help="News domains (plus 5 social platforms)")
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--max-statements", type=int, default=20, help="Upper bound for the current code per call")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (SentimentAnalysis, WebsiteActivityStats, SocialActivityStats, DailySentimentRollup, StatsRollupState):
+        model.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.articles, args.domains, args.topics, args.seed)
+
+    stats = StatisticsService.__new__(StatisticsService)
+    stats.db = db
+    stats.rollup = get_sentiment_rollup_service(db)
+    trends = TrendAnalysisService.__new__(TrendAnalysisService)
+    trends.db = db
+
+    # Rollup được duy trì khi ingest; dựng trước để đo trạng thái thường trực
+    stats.rollup.apply_new()
+    db.commit()
+    counter = StatementCounter(engine)
+
+    failures = 0
+    print(f"{'call':<28}{'mode':<10}{'statements':>12}{'seconds':>10}")
+    for label, model, social in (("website_stats monthly", WebsiteActivityStats, False),
+                                 ("social_stats monthly", SocialActivityStats, True)):
+        # Legacy ghi bằng SELECT rồi INSERT từng dòng, không cần unique index upsert
+        unique_index = next(index for index in model.__table__.indexes if index.unique)
+        unique_index.drop(engine)
+        _, legacy_statements, legacy_seconds = timed(counter, lambda: (legacy_source_stats(stats, "monthly", social), db.commit()))
+        expected = stats_snapshot(db, model)
+        db.query(model).delete()
+        db.commit()
+        unique_index.create(engine)
+
+        current = stats.calculate_social_stats if social else stats.calculate_website_stats
+        _, statements, seconds = timed(counter, lambda: (current("monthly", REFERENCE_DATE), db.commit()))
+        _, rerun_statements, _ = timed(counter, lambda: (current("monthly", REFERENCE_DATE), db.commit()))
+        actual = stats_snapshot(db, model)
+
+        print(f"{label:<28}{'legacy':<10}{legacy_statements:>12}{legacy_seconds:>10.3f}")
+        print(f"{label:<28}{'current':<10}{statements:>12}{seconds:>10.3f}")
+        print(f"{label:<28}{'rerun':<10}{rerun_statements:>12}")
+        print(f"  rows: {len(actual)}, mismatches: {sum(1 for a, b in zip(expected, actual) if a != b) + abs(len(expected) - len(actual))}")
+        failures += expected != actual or max(statements, rerun_statements) > args.max_statements
+
+    start = datetime.combine(REFERENCE_DATE.replace(day=1), datetime.min.time())
+    end = start + timedelta(days=30)
+    expected, legacy_statements, legacy_seconds = timed(counter, lambda: legacy_crisis_topics(trends, start, end))
+    actual, statements, seconds = timed(counter, lambda: trends._detect_crisis_topics(start, end))
+    print(f"{'crisis_topics 30 days':<28}{'legacy':<10}{legacy_statements:>12}{legacy_seconds:>10.3f}")
+    print(f"{'crisis_topics 30 days':<28}{'current':<10}{statements:>12}{seconds:>10.3f}")
+    print(f"  crisis topics: {len(actual)}, equal: {sorted(expected) == sorted(actual)}")
+    failures += sorted(expected) != sorted(actual) or statements > args.max_statements
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark TextCleaner: chuỗi step tuần tự cũ vs fused pipeline (+ result cache)
+
+Sinh văn bản giả (HTML entity, URL, email, số điện thoại, emoji, viết tắt, lỗi
+dấu, ký tự lặp, xuống dòng), kiểm tra clean() trùng khớp tuyệt đối với chuỗi
+step cũ (deep_clean bật/tắt), rồi đo tốc độ:
+  - legacy:      chuỗi _normalize_* / _remove_* cũ
+  - fused:       clean() với cache tắt
+  - clean_many:  cache bật, mỗi văn bản được clean --repeat lần (như pipeline
+                 + tokenizer clean lại cùng một bài)
+
+Usage:
+    python scripts/benchmark_text_cleaner.py
+    python scripts/benchmark_text_cleaner.py --docs 5000 --sentences 20 --repeat 3
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.etl.text_cleaner import TextCleaner
+
+WORDS = ("Người dân tỉnh Hưng Yên vui mừng khi kinh tế tăng trưởng dự án đầu tư hạ tầng "
+         "giao thông được triển khai Hoà bình hòan thành ngươì dân dùn tìn").split()
+NOISE = ["&amp;", "&nbsp;", "&#8220;", "&#38;amp;", "http://vnexpress.net/a-b-c.html", "https://t.co/xyz",
+         "lienhe@ubnd.gov.vn", "x@http://y.z", "0912 345 678", "(024) 3825-1234", "..........",
+         "😀", "🔥🔥", "–", "“trích dẫn”", "k", "ko", "dc", "đc", "UBND", "TP.HCM", "vn", "hn",
+         "Heeeeello", "!!!!!!", "\n\n", "\t", "  ", "#hashtag", "@mention", "İstanbul", "ﬁ"]
+
+
+def legacy_clean(cleaner: TextCleaner, text: str, language: str = 'vi', deep_clean: bool = True) -> str:
+    """clean() trước khi có fused pipeline (tham chiếu, không tokenize)"""
+    if not text:
+        return ''
+    text = cleaner._normalize_unicode(text)
+    text = cleaner._remove_html_entities(text)
+    text = cleaner._remove_urls(text)
+    text = cleaner._remove_emails(text)
+    text = cleaner._remove_phone_numbers(text)
+    text = cleaner._remove_special_chars(text)
+    if deep_clean and language == 'vi':
+        text = cleaner._normalize_vietnamese_diacritics(text)
+        text = cleaner._expand_abbreviations(text)
+        text = text.lower()
+    text = cleaner._normalize_whitespace(text)
+    text = cleaner._remove_repeated_chars(text)
+    return text.strip()
+
+
+def make_corpus(docs: int, sentences: int, seed: int):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(docs):
+        parts = []
+        for _ in range(sentences):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(5, 15))]
+            for _ in range(rng.randint(0, 3)):
+                words.insert(rng.randint(0, len(words)), rng.choice(NOISE))
+            sep = rng.choice([" ", "", "\n"])
+            parts.append(sep.join(words) + rng.choice([". ", "! ", "\n", ", "]))
+        corpus.append("".join(parts))
+    corpus.extend(["", " ", "&amp;", "a@b", "hoà HOÀ Hoà", "ko dc\n\nk"])
+    return corpus
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fused TextCleaner")
+    parser.add_argument("--docs", type=int, default=3000)
+    parser.add_argument("--sentences", type=int, default=15, help="Sentences per document")
+    parser.add_argument("--repeat", type=int, default=3, help="Times each text is cleaned in the cached run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs, args.sentences, args.seed)
+    uncached = TextCleaner(cache_size=0)
+
+    mismatches = 0
+    for deep_clean in (True, False):
+        expected = [legacy_clean(uncached, text, deep_clean=deep_clean) for text in corpus]
+        actual = [uncached.clean(text, deep_clean=deep_clean) for text in corpus]
+        bad = sum(1 for old, new in zip(expected, actual) if old != new)
+        print(f"equivalence deep_clean={deep_clean}: {len(corpus)} docs, {bad} mismatches")
+        mismatches += bad
+
+    print(f"{'mode':<20}{'calls':>8}{'seconds':>10}{'us/call':>10}")
+    _, seconds = timed(lambda: [legacy_clean(uncached, text) for text in corpus])
+    print(f"{'legacy':<20}{len(corpus):>8}{seconds:>10.2f}{seconds * 1e6 / len(corpus):>10.1f}")
+    _, seconds = timed(lambda: [uncached.clean(text) for text in corpus])
+    print(f"{'fused':<20}{len(corpus):>8}{seconds:>10.2f}{seconds * 1e6 / len(corpus):>10.1f}")
+
+    calls = len(corpus) * args.repeat
+    _, seconds = timed(lambda: [legacy_clean(uncached, text) for _ in range(args.repeat) for text in corpus])
+    print(f"{'legacy x' + str(args.repeat):<20}{calls:>8}{seconds:>10.2f}{seconds * 1e6 / calls:>10.1f}")
+    cached = TextCleaner(cache_size=len(corpus))
+    _, seconds = timed(lambda: [cached.clean_many(corpus) for _ in range(args.repeat)])
+    print(f"{'clean_many x' + str(args.repeat):<20}{calls:>8}{seconds:>10.2f}{seconds * 1e6 / calls:>10.1f}")
+    print(f"cache: {cached.get_cache_stats()}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Make `app` importable when pytest runs from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,115 @@
+"""
+HybridTopicTrainer: a reloaded model must map transformed articles to the
+topics saved by full training
+"""
+import sys
+import types
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.model_base import Base
+from app.models.model_bertopic_discovered import (
+    ArticleBertopicTopic,
+    BertopicDiscoveredTopic,
+    TopicTrainingSession
+)
+from app.models.model_custom_topic import CustomTopic
+from app.services.topic import bertopic_trainer, hybrid_trainer
+from app.services.topic.bertopic_trainer import BertopicTrainer
+from app.services.topic.hybrid_trainer import HybridTopicTrainer
+from app.services.topic.model import TopicModel
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+class FakeTopicModel(TopicModel):
+    """TopicModel with BERTopic replaced by a 2-topic stub, DB saving kept"""
+
+    def __init__(self, min_topic_size: int = 10, **kwargs):
+        super().__init__(min_topic_size=min_topic_size, use_vietnamese_tokenizer=False)
+
+    def _assign(self, documents):
+        topics = [i % 2 for i in range(len(documents))]
+        return topics, np.eye(2)[topics]
+
+    def fit(self, documents, db=None, save_to_db=True, article_ids=None, embeddings=None, session_id=None):
+        self.topic_model = object()
+        self.topics, self.probs = self._assign(documents)
+        if save_to_db and db is not None:
+            self._save_to_database(db, documents, 0.0, article_ids, session_id=session_id)
+        return self.topics, self.probs
+
+    def transform(self, documents, embeddings=None):
+        return self._assign(documents)
+
+    def get_topic_info(self):
+        return {"topics": [
+            {"topic_id": topic_id, "count": self.topics.count(topic_id),
+             "words": [{"word": f"word{topic_id}", "score": 1.0}]}
+            for topic_id in (0, 1)
+        ]}
+
+    def save(self, model_name: str = "bertopic_model"):
+        path = self.model_dir / model_name
+        path.mkdir(parents=True, exist_ok=True)
+        return str(path)
+
+    def _setup_embedding_model(self):
+        return None
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(bertopic_trainer, "TopicModel", FakeTopicModel)
+    monkeypatch.setattr(hybrid_trainer, "TopicModel", FakeTopicModel)
+    fake_bertopic = types.ModuleType("bertopic")
+    fake_bertopic.BERTopic = types.SimpleNamespace(load=lambda path, embedding_model=None: object())
+    monkeypatch.setitem(sys.modules, "bertopic", fake_bertopic)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, content TEXT, created_at TIMESTAMP)"
+        ))
+    Base.metadata.create_all(engine, tables=[
+        CustomTopic.__table__,
+        TopicTrainingSession.__table__,
+        BertopicDiscoveredTopic.__table__,
+        ArticleBertopicTopic.__table__
+    ])
+
+    session = sessionmaker(bind=engine)()
+    for article_id in range(1, 7):
+        session.execute(
+            text("INSERT INTO articles (id, title, content, created_at) VALUES (:id, :title, :content, CURRENT_TIMESTAMP)"),
+            {"id": article_id, "title": f"Bài {article_id}", "content": "nội dung " * 20}
+        )
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_reloaded_model_maps_transformed_topics(db):
+    result = BertopicTrainer(db).train_from_articles(use_vietnamese_tokenizer=False)
+    assert result["status"] == "completed"
+
+    trainer = HybridTopicTrainer(db)
+    model = trainer._load_latest_model()
+    assert model is not None
+    assert trainer.model_session_id == result["session_id"]
+
+    topics, _ = model.transform(["bài mới 1", "bài mới 2"])
+    topic_db_ids = trainer._topic_db_ids()
+
+    assert topic_db_ids
+    assert all(int(topic_id) in topic_db_ids for topic_id in topics if topic_id != -1)